@@ -7,6 +7,7 @@ export interface Conversation {
   created_at: string;
   updated_at: string;
   pending_replies: number;
+  last_reply_at?: string;
   email_count?: number;
   participants?: string[];
   email_history?: Email[];
@@ -64,9 +65,9 @@ export interface Email {
 export interface PendingReply {
   reply_id: string;
   generated_at: string;
-  llm_prompt: string;
+  llm_prompt: string | null;
   llm_response: string;
-  status: 'pending' | 'approved' | 'rejected' | 'amended';
+  status: 'pending' | 'sending' | 'approved' | 'rejected' | 'amended';
   amended_content?: string;
   reviewed_by?: string;
   reviewed_at?: string;
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Import-time profile and budget check for the email intake Lambdas.
+
+Runs each Lambda entry point under ``python -X importtime`` in a fresh
+interpreter, parses the per-module timings from stderr and reports the
+slowest imports. With ``--check`` it fails (exit 1) when an entry point
+exceeds its cold-import budget or eagerly imports a module that should only
+load for the routes that use it.
+
+Usage:
+    python scripts/profile_imports.py                # report
+    python scripts/profile_imports.py --check        # CI budget gate
+    python scripts/profile_imports.py --json report.json --top 30
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Cumulative import time budgets (milliseconds, median of runs). boto3 alone
+# accounts for ~150-200ms, so these leave headroom for slower CI machines
+# while still catching a regression back to eager client/route imports.
+IMPORT_BUDGETS_MS: Dict[str, float] = {
+    "src.agents.email_intake.lambda_function": 400.0,
+    "src.agents.email_intake.api.lambda_api": 450.0,
+}
+
+# Route-specific modules that must not load when the entry point is imported
+DEFERRED_MODULES: Dict[str, Sequence[str]] = {
+    "src.agents.email_intake.lambda_function": (
+        "src.agents.email_intake.pdf_generator",
+        "src.agents.email_intake.vision_analyzer",
+        "src.agents.email_intake.reviewer",
+        "src.agents.email_intake.email_sender",
+        "src.providers",
+    ),
+    "src.agents.email_intake.api.lambda_api": (
+        "src.agents.email_intake.lambda_function",
+        "src.agents.email_intake.pdf_generator",
+        "src.agents.email_intake.vision_analyzer",
+        "src.agents.email_intake.reviewer",
+        "src.agents.email_intake.response_reviser",
+        "src.agents.email_intake.email_sender",
+        "src.agents.email_intake.requirement_extractor",
+        "src.agents.email_intake.proposal_mapper",
+        "src.providers",
+    ),
+}
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+@dataclass
+class ImportRecord:
+    """One line of ``-X importtime`` output."""
+
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> List[ImportRecord]:
+    """Parse ``-X importtime`` stderr into records.
+
+    Args:
+        output: Captured stderr of an interpreter run with ``-X importtime``
+
+    Returns:
+        Records in the order the interpreter reported them
+    """
+    records = []
+    for line in output.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        records.append(
+            ImportRecord(
+                module=module,
+                self_us=int(self_us),
+                cumulative_us=int(cumulative_us),
+                depth=(len(indent) - 1) // 2,
+            )
+        )
+    return records
+
+
+def _import_env() -> Dict[str, str]:
+    env = dict(os.environ)
+    # Client construction needs a region; no AWS calls are made at import time
+    env.setdefault("AWS_DEFAULT_REGION", env.get("AWS_REGION", "us-east-2"))
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(PROJECT_ROOT), env.get("PYTHONPATH")]))
+    return env
+
+
+def profile_module(module: str, python: str = sys.executable) -> Dict[str, object]:
+    """Import a module in a fresh interpreter and collect timings.
+
+    Args:
+        module: Dotted module name to import
+        python: Interpreter to run
+
+    Returns:
+        Dict with ``records`` (List[ImportRecord]), ``total_ms`` and ``loaded``
+        (sorted names from sys.modules after the import)
+    """
+    code = f"import sys, {module}; print('\\n'.join(sorted(sys.modules)))"
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", code],
+        cwd=PROJECT_ROOT,
+        env=_import_env(),
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    records = parse_importtime(result.stderr)
+    top_level = [r for r in records if r.module == module]
+    total_us = top_level[-1].cumulative_us if top_level else 0
+    return {
+        "records": records,
+        "total_ms": total_us / 1000.0,
+        "loaded": result.stdout.split(),
+    }
+
+
+def check_module(
+    module: str,
+    runs: int = 3,
+    budget_ms: Optional[float] = None,
+    deferred: Sequence[str] = (),
+) -> Dict[str, object]:
+    """Profile a module several times and evaluate it against its budget.
+
+    Args:
+        module: Dotted module name
+        runs: Number of fresh-interpreter runs; the median total is used
+        budget_ms: Cumulative import budget, or None to skip the time check
+        deferred: Modules that must not be loaded by the import
+
+    Returns:
+        Summary dict including ``violations`` (empty when within budget)
+    """
+    samples = [profile_module(module) for _ in range(max(runs, 1))]
+    median_ms = statistics.median(sample["total_ms"] for sample in samples)
+    fastest = min(samples, key=lambda sample: sample["total_ms"])
+    loaded = set(fastest["loaded"])
+
+    violations = []
+    if budget_ms is not None and median_ms > budget_ms:
+        violations.append(f"import time {median_ms:.1f}ms exceeds budget {budget_ms:.0f}ms")
+    for name in deferred:
+        eager = sorted(m for m in loaded if m == name or m.startswith(f"{name}."))
+        if eager:
+            violations.append(f"eagerly imports {eager[0]}")
+
+    return {
+        "module": module,
+        "median_ms": round(median_ms, 1),
+        "budget_ms": budget_ms,
+        "runs": [round(sample["total_ms"], 1) for sample in samples],
+        "violations": violations,
+        "records": fastest["records"],
+    }
+
+
+def format_report(summary: Dict[str, object], top: int = 15) -> str:
+    """Render a human-readable report for one module."""
+    records: List[ImportRecord] = summary["records"]
+    budget = summary["budget_ms"]
+    lines = [
+        f"📦 {summary['module']}",
+        f"   median {summary['median_ms']}ms"
+        + (f" (budget {budget:.0f}ms)" if budget is not None else "")
+        + f" runs={summary['runs']}",
+        f"   {'self ms':>9} {'cum ms':>9}  module",
+    ]
+    for record in sorted(records, key=lambda r: r.cumulative_us, reverse=True)[:top]:
+        lines.append(
+            f"   {record.self_us / 1000:>9.1f} {record.cumulative_us / 1000:>9.1f}  "
+            f"{'  ' * record.depth}{record.module}"
+        )
+    for violation in summary["violations"]:
+        lines.append(f"   ❌ {violation}")
+    if not summary["violations"]:
+        lines.append("   ✅ within budget")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "modules",
+        nargs="*",
+        default=list(IMPORT_BUDGETS_MS),
+        help="Modules to profile (default: both email intake Lambda entry points)",
+    )
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per module")
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports to list")
+    parser.add_argument("--check", action="store_true", help="Exit 1 on budget violations")
+    parser.add_argument("--json", metavar="PATH", help="Write the full report as JSON")
+    args = parser.parse_args(argv)
+
+    summaries = []
+    for module in args.modules:
+        summary = check_module(
+            module,
+            runs=args.runs,
+            budget_ms=IMPORT_BUDGETS_MS.get(module),
+            deferred=DEFERRED_MODULES.get(module, ()),
+        )
+        summaries.append(summary)
+        print(format_report(summary, top=args.top))
+        print()
+
+    if args.json:
+        payload = [
+            {**summary, "records": [asdict(r) for r in summary["records"]]}
+            for summary in summaries
+        ]
+        Path(args.json).write_text(json.dumps(payload, indent=2))
+        print(f"📝 Report written to {args.json}")
+
+    failed = [summary for summary in summaries if summary["violations"]]
+    if args.check and failed:
+        print(f"❌ Import budget exceeded for {len(failed)} module(s)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -15,6 +15,7 @@ from email.mime.text import MIMEText
 from typing import Any, Dict, List, Optional
 
 import boto3
+from boto3.dynamodb.conditions import Key
 from botocore.exceptions import ClientError
 
 logger = logging.getLogger(__name__)
@@ -54,6 +55,7 @@ class IntakeAdapter:
         intake_email: str = DEFAULT_INTAKE_EMAIL,
         dynamodb_table: str = "conversations",
         sender_domain: str = DEFAULT_SENDER_DOMAIN,
+        participant_table: str = "conversation_participants",
     ):
         """Initialize adapter with AWS clients.
         
@@ -63,6 +65,7 @@ class IntakeAdapter:
             intake_email: Email address that receives client emails
             dynamodb_table: Name of the DynamoDB conversations table
             sender_domain: Domain to use for simulated client emails
+            participant_table: Name of the participant index table
         """
         self.aws_profile = aws_profile
         self.aws_region = aws_region
@@ -75,6 +78,7 @@ class IntakeAdapter:
         self.ses = session.client("ses")
         self.dynamodb = session.resource("dynamodb")
         self.table = self.dynamodb.Table(dynamodb_table)
+        self.participant_table = self.dynamodb.Table(participant_table)
         
         # Track simulated client emails for threading
         self._client_emails: Dict[str, str] = {}  # conversation_id -> client_email
@@ -160,11 +164,12 @@ class IntakeAdapter:
         start_time = time.time()
         
         while time.time() - start_time < timeout_seconds:
-            # Scan for conversations with this client email
+            # Query the participant index for this client's newest conversations
             try:
-                response = self.table.scan(
-                    FilterExpression="contains(participants, :email)",
-                    ExpressionAttributeValues={":email": client_email},
+                response = self.participant_table.query(
+                    IndexName="UpdatedAtIndex",
+                    KeyConditionExpression=Key("participant").eq(client_email.lower()),
+                    ScanIndexForward=False,
                     Limit=10,
                 )
                 
@@ -177,7 +182,7 @@ class IntakeAdapter:
                         return conversation_id
                     
             except ClientError as e:
-                logger.warning(f"Error scanning for conversation: {e}")
+                logger.warning(f"Error querying for conversation: {e}")
             
             time.sleep(poll_interval)
         
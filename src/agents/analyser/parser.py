@@ -9,15 +9,15 @@ This module contains the main components for processing client requirements:
 
 import json
 import os
-import re
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 import pytesseract
-import yaml
 from PIL import Image
 
+from src.common.config_loader import load_config
+
 # Load environment variables from .env file
 try:
     from dotenv import load_dotenv
@@ -78,32 +78,19 @@ class TextParser:
         """Load model configuration with environment variable substitution."""
         config_file = config_path or "config/model_config.yaml"
 
-        if os.path.exists(config_file):
-            with open(config_file) as f:
-                content = f.read()
-
-            # Substitute environment variables in format ${VAR:-default}
-            def env_substitute(match):
-                var_spec = match.group(1)
-                if ":-" in var_spec:
-                    var_name, default = var_spec.split(":-", 1)
-                    return os.getenv(var_name, default)
-                else:
-                    return os.getenv(var_spec, "")
-
-            content = re.sub(r"\$\{([^}]+)\}", env_substitute, content)
-            return yaml.safe_load(content)
-
         # Fallback config with inference profile ARN
-        return {
-            "llm": {
-                "primary": "bedrock",
-                "bedrock": {
-                    "inference_profile_arn": "arn:aws:bedrock:us-east-2:392894085110:inference-profile/us.anthropic.claude-sonnet-4-5-20250514-v1:0",
-                    "region": "us-east-2",
-                },
-            }
-        }
+        return load_config(
+            config_file,
+            default={
+                "llm": {
+                    "primary": "bedrock",
+                    "bedrock": {
+                        "inference_profile_arn": "arn:aws:bedrock:us-east-2:392894085110:inference-profile/us.anthropic.claude-sonnet-4-5-20250514-v1:0",
+                        "region": "us-east-2",
+                    },
+                }
+            },
+        )
 
     def _model_id_from_arn(self, arn: str) -> str:
         """Extract modelId from inference profile ARN.
@@ -6,17 +6,16 @@ Transforms planning output into milestone-based code structure with skeleton imp
 
 import json
 import os
-import re
 import time
 import traceback
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
-
-import yaml
+from typing import Any, Callable, Dict, List, Optional
 
 from src.agents.dev.context_engine import get_context_engine
-from src.providers import ProviderError, get_provider
+from src.common.config_loader import load_config
+from src.providers import ProviderError, consume_stream, get_provider
+from src.providers.base import agent_scope
 from src.utils.linter_integration import LinterManager
 
 
@@ -39,6 +38,9 @@ class DevAgent:
             else:
                 raise
 
+        # Stream LLM output to the console as it is generated (DEV_AGENT_STREAM=1)
+        self.stream_output = os.getenv("DEV_AGENT_STREAM", "0") == "1"
+
         # Initialize context engine
         try:
             self.context_engine = get_context_engine()
@@ -63,20 +65,7 @@ class DevAgent:
 
     def _load_config(self, config_path: str) -> Dict[str, Any]:
         """Load configuration from YAML file with environment variable substitution."""
-        with open(config_path) as f:
-            content = f.read()
-
-        # Substitute environment variables in format ${VAR:-default}
-        def env_substitute(match):
-            var_spec = match.group(1)
-            if ":-" in var_spec:
-                var_name, default = var_spec.split(":-", 1)
-                return os.getenv(var_name, default)
-            else:
-                return os.getenv(var_spec, "")
-
-        content = re.sub(r"\$\{([^}]+)\}", env_substitute, content)
-        return yaml.safe_load(content)
+        return load_config(config_path)
 
     def _log_performance_metrics(self, metrics: Dict[str, Any]) -> None:
         """Log performance metrics for dev agent operations."""
@@ -112,10 +101,24 @@ class DevAgent:
                 with open("logs/slow_operations.log", "a") as f:
                     f.write(json.dumps(slow_trace) + "\n")
 
+    @staticmethod
+    def _print_delta(delta: str) -> None:
+        """Echo a streamed text delta to the console."""
+        print(delta, end="", flush=True)
+
     def _call_llm(
-        self, prompt: str, milestone_path: Optional[Path] = None, timeout: Optional[int] = None
+        self,
+        prompt: str,
+        milestone_path: Optional[Path] = None,
+        timeout: Optional[int] = None,
+        on_delta: Optional[Callable[[str], None]] = None,
     ) -> str:
-        """Call AI provider with context packing and performance monitoring."""
+        """Call AI provider with context packing and performance monitoring.
+
+        When on_delta is given (or DEV_AGENT_STREAM=1), the response is streamed via
+        provider.stream_code() and each text delta is passed on as it arrives; the
+        time to first token is recorded alongside the total generation time.
+        """
         if not self.provider:
             raise ProviderError("❌ AI provider not available.")
 
@@ -146,22 +149,36 @@ class DevAgent:
             else:
                 timeout = 60  # Extended timeout for complex prompts
 
+        stream = on_delta is not None or self.stream_output
+        time_to_first_token = None
+
         try:
-            # Use provider's generate_code method with timeout
-            result = self.provider.generate_code(prompt, files, timeout=timeout)
+            with agent_scope("dev_agent"):
+                if stream:
+                    result, time_to_first_token = consume_stream(
+                        self.provider.stream_code(prompt, files, timeout=timeout),
+                        on_delta or self._print_delta,
+                    )
+                    if on_delta is None:
+                        print()
+                else:
+                    # Use provider's generate_code method with timeout
+                    result = self.provider.generate_code(prompt, files, timeout=timeout)
 
             # Log performance metrics
             generation_time = time.time() - generation_start_time
-            self._log_performance_metrics(
-                {
-                    "prompt_size": prompt_size,
-                    "generation_time": generation_time,
-                    "timeout_used": timeout,
-                    "milestone_path": str(milestone_path) if milestone_path else None,
-                    "context_time": time.time() - context_start_time,
-                    "success": True,
-                }
-            )
+            metrics = {
+                "prompt_size": prompt_size,
+                "generation_time": generation_time,
+                "timeout_used": timeout,
+                "milestone_path": str(milestone_path) if milestone_path else None,
+                "context_time": time.time() - context_start_time,
+                "success": True,
+            }
+            if stream:
+                metrics["streamed"] = True
+                metrics["time_to_first_token"] = time_to_first_token
+            self._log_performance_metrics(metrics)
 
             return result
 
@@ -1,9 +1,18 @@
 """Email intake agent for processing Apollo.io replies."""
 
-from .conversation_state import ConversationStateManager
-from .email_parser import EmailParser
-from .lambda_function import lambda_handler
-from .requirement_extractor import RequirementExtractor
+from .lazy_imports import lazy_exports
+
+# Re-exports resolve on first access so importing a submodule (e.g. the API
+# Lambda importing conversation_state) does not load the intake handler too.
+__getattr__ = lazy_exports(
+    __name__,
+    {
+        "lambda_handler": ".lambda_function",
+        "EmailParser": ".email_parser",
+        "ConversationStateManager": ".conversation_state",
+        "RequirementExtractor": ".requirement_extractor",
+    },
+)
 
 __all__ = [
     "lambda_handler",
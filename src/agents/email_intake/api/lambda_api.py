@@ -13,7 +13,6 @@ from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 from typing import Any, Dict, List, Optional
 
-import boto3
 from boto3.dynamodb.types import TypeDeserializer
 from botocore.exceptions import ClientError
 
@@ -28,20 +27,28 @@ class DecimalEncoder(json.JSONEncoder):
         return super(DecimalEncoder, self).default(obj)
 
 from src.agents.email_intake.conversation_state import (  # Needed to append sent email to history
-    ConversationStateManager,
-)
-from src.agents.email_intake.email_sender import (
-    extract_email_metadata,
-    format_proposal_email_body,
-    send_proposal_email,
-    send_reply_email,
+    EMAIL_STORAGE_ITEMS,
+    ReplyStateError,
 )
+from src.agents.email_intake.lazy_imports import lazy_import
+from src.agents.email_intake.service_container import get_services
 # Uncomment when we revert to code overrides
 # from src.providers import ProviderError, get_provider
 
-# Initialize services
-dynamodb = boto3.resource("dynamodb")
-s3 = boto3.client("s3")
+# Initialize services once per execution environment; routes share them while warm.
+# Clients are created on first use so each route only pays for what it calls.
+services = get_services()
+dynamodb = services.lazy_resource("dynamodb")
+s3 = services.lazy_client("s3")
+
+# Route-specific dependencies, imported on first use rather than at cold start
+_email_sender = lazy_import("src.agents.email_intake.email_sender")
+_reviewer = lazy_import("src.agents.email_intake.reviewer")
+_response_reviser = lazy_import("src.agents.email_intake.response_reviser")
+_vision_analyzer = lazy_import("src.agents.email_intake.vision_analyzer")
+_requirement_extractor = lazy_import("src.agents.email_intake.requirement_extractor")
+_proposal_mapper = lazy_import("src.agents.email_intake.proposal_mapper")
+_budget_utils = lazy_import("src.storage.budget_utils")
 
 # Configuration
 TABLE_NAME = os.environ.get("CONVERSATIONS_TABLE", "conversations")
@@ -96,6 +103,8 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 return update_conversation_mode(path_params.get("id"), body)
             if res == "/conversations/{id}/pending-replies" and http_method == "GET":
                 return get_pending_replies(path_params.get("id"))
+            if res == "/conversations/{id}/emails" and http_method == "GET":
+                return list_conversation_emails(path_params.get("id"), query_params)
             if res == "/conversations/{id}" and http_method == "GET":
                 return get_conversation_detail(path_params.get("id"))
             if res == "/conversations/{id}" and http_method == "DELETE":
@@ -206,36 +215,20 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
 
 
 def list_conversations(query_params: Dict[str, str]) -> Dict[str, Any]:
-    """List all conversations with pagination."""
+    """List conversations newest first with pagination and optional phase/status filters."""
     try:
-        table = dynamodb.Table(TABLE_NAME)
-
         # Pagination parameters
         limit = int(query_params.get("limit", "20"))
-        last_evaluated_key = query_params.get("nextToken")
-
-        # Build scan parameters - include metadata fields
-        scan_params = {
-            "Limit": limit,
-            "ProjectionExpression": "conversation_id, subject, participants, phase, reply_mode, created_at, updated_at, client_name, project_name, project_type, latest_metadata, metadata_updated_at",
-        }
-
-        if last_evaluated_key:
-            scan_params["ExclusiveStartKey"] = json.loads(last_evaluated_key)
-
-        # Scan table
-        response = table.scan(**scan_params)
+        page = services.state_manager(TABLE_NAME).list_conversations_page(
+            limit=limit,
+            next_token=query_params.get("nextToken"),
+            phase=query_params.get("phase"),
+            status=query_params.get("status"),
+        )
 
         # Process items
         conversations = []
-        for item in response.get("Items", []):
-            # Check for pending replies
-            pending_count = 0
-            if "pending_replies" in item:
-                pending_count = sum(
-                    1 for r in item["pending_replies"] if r.get("status") == "pending"
-                )
-
+        for item in page["conversations"]:
             conversations.append(
                 {
                     "conversation_id": item["conversation_id"],
@@ -245,7 +238,9 @@ def list_conversations(query_params: Dict[str, str]) -> Dict[str, Any]:
                     "reply_mode": item.get("reply_mode", "manual"),
                     "created_at": item.get("created_at"),
                     "updated_at": item.get("updated_at"),
-                    "pending_replies": pending_count,
+                    # Counter maintained on reply writes; never negative for legacy items
+                    "pending_replies": max(int(item.get("pending_reply_count", 0)), 0),
+                    "last_reply_at": item.get("last_reply_at"),
                     # Include metadata fields
                     "client_name": item.get("client_name"),
                     "project_name": item.get("project_name"),
@@ -255,14 +250,11 @@ def list_conversations(query_params: Dict[str, str]) -> Dict[str, Any]:
                 }
             )
 
-        # Sort by updated_at descending
-        conversations.sort(key=lambda x: x.get("updated_at", ""), reverse=True)
-
         # Build response
         result = {"conversations": conversations, "count": len(conversations)}
 
-        if "LastEvaluatedKey" in response:
-            result["nextToken"] = json.dumps(response["LastEvaluatedKey"], default=str)
+        if page["next_token"]:
+            result["nextToken"] = page["next_token"]
 
         return {"statusCode": 200, "body": json.dumps(result, default=str)}
 
@@ -274,15 +266,14 @@ def list_conversations(query_params: Dict[str, str]) -> Dict[str, Any]:
 def get_conversation_detail(conversation_id: str) -> Dict[str, Any]:
     """Get full conversation details including email history."""
     try:
-        table = dynamodb.Table(TABLE_NAME)
+        state_manager = services.state_manager(TABLE_NAME)
 
-        # Get conversation
-        response = table.get_item(Key={"conversation_id": conversation_id})
+        # Get conversation without pending replies (served by their own route)
+        conversation = state_manager.load_conversation(conversation_id, "detail")
 
-        if "Item" not in response:
+        if conversation is None:
             return {"statusCode": 404, "body": json.dumps({"error": "Conversation not found"})}
-
-        conversation = response["Item"]
+        state_manager.hydrate_email_history(conversation)
 
         # Convert Decimal to int/float for JSON serialization
         conversation = _convert_decimals(conversation)
@@ -301,6 +292,34 @@ def get_conversation_detail(conversation_id: str) -> Dict[str, Any]:
         return {"statusCode": 500, "body": json.dumps({"error": "Failed to get conversation"})}
 
 
+def list_conversation_emails(conversation_id: str, query_params: Dict[str, str]) -> Dict[str, Any]:
+    """Page through a conversation's emails without loading the whole thread."""
+    try:
+        limit = int(query_params.get("limit", "20"))
+        newest_first = query_params.get("order", "asc").lower() == "desc"
+
+        page = services.state_manager(TABLE_NAME).get_email_page(
+            conversation_id,
+            limit=limit,
+            next_token=query_params.get("nextToken"),
+            newest_first=newest_first,
+        )
+
+        result = {
+            "conversation_id": conversation_id,
+            "emails": _convert_decimals(page["emails"]),
+            "count": len(page["emails"]),
+        }
+        if page["next_token"]:
+            result["nextToken"] = page["next_token"]
+
+        return {"statusCode": 200, "body": json.dumps(result, default=str)}
+
+    except Exception as e:
+        logger.error(f"Error listing emails for {conversation_id}: {str(e)}")
+        return {"statusCode": 500, "body": json.dumps({"error": "Failed to list emails"})}
+
+
 def update_conversation_mode(conversation_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
     """Update conversation reply mode (auto/manual)."""
     try:
@@ -384,22 +403,41 @@ def get_pending_replies(conversation_id: str) -> Dict[str, Any]:
         return {"statusCode": 500, "body": json.dumps({"error": "Failed to get pending replies"})}
 
 
+def _release_reply_claim(conversation_id: str, reply_id: str, reply_index: int) -> None:
+    """Put a reply claimed for sending back to "pending" after a failed send."""
+    try:
+        services.state_manager(TABLE_NAME).update_reply(
+            conversation_id,
+            reply_id,
+            {"status": "pending"},
+            expected_status="sending",
+            reply_index=reply_index,
+        )
+    except Exception as e:
+        logger.error(f"Failed to release claim on reply {reply_id}: {str(e)}")
+
+
 def approve_reply(reply_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
-    """Approve a pending reply and send it."""
+    """Approve a pending reply and send it.
+
+    The reply is first moved from "pending" to "sending" with a conditional
+    write, so only one reviewer can send it. A failed send puts it back to
+    "pending"; a successful one finalizes it as "approved".
+    """
+    claimed = sent = False
+    conversation_id = reply_index = None
     try:
         conversation_id = body.get("conversation_id")
         if not conversation_id:
             return {"statusCode": 400, "body": json.dumps({"error": "conversation_id is required"})}
 
-        table = dynamodb.Table(TABLE_NAME)
-
-        # Get conversation
-        response = table.get_item(Key={"conversation_id": conversation_id})
+        # Get replies plus what proposal generation reads
+        conversation = services.state_manager(TABLE_NAME).load_conversation(
+            conversation_id, "approval"
+        )
 
-        if "Item" not in response:
+        if conversation is None:
             return {"statusCode": 404, "body": json.dumps({"error": "Conversation not found"})}
-
-        conversation = response["Item"]
         pending_replies = conversation.get("pending_replies", [])
 
         # Find the reply
@@ -420,8 +458,25 @@ def approve_reply(reply_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
                 "body": json.dumps({"error": f"Reply is already {reply_data.get('status')}"}),
             }
 
+        # Claim the reply before doing any work; a concurrent reviewer gets 409
+        try:
+            services.state_manager(TABLE_NAME).update_reply(
+                conversation_id,
+                reply_id,
+                {"status": "sending"},
+                expected_status="pending",
+                reply_index=reply_index,
+            )
+        except ReplyStateError as e:
+            logger.info(f"Reply {reply_id} was claimed concurrently: {str(e)}")
+            return {
+                "statusCode": 409,
+                "body": json.dumps({"error": "Reply was reviewed concurrently"}),
+            }
+        claimed = True
+
         # Extract email metadata from the pending reply BEFORE updating status
-        email_meta = extract_email_metadata(reply_data)
+        email_meta = _email_sender.extract_email_metadata(reply_data)
         
         # IMPORTANT: Use the current conversation phase, not the stale one from pending reply
         # The phase may have been updated after the reply was queued
@@ -463,11 +518,7 @@ def approve_reply(reply_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
 
             if pregen_version:
                 try:
-                    from src.storage import S3ProposalStore  # type: ignore
-                    s3_store = S3ProposalStore(
-                        bucket_name=os.environ.get("DOCUMENT_BUCKET")
-                        or os.environ.get("ATTACHMENTS_BUCKET", "solopilot-attachments")
-                    )
+                    s3_store = services.proposal_store(S3_BUCKET)
                     pregen_pdf_bytes = s3_store.get_proposal_pdf(conversation_id, int(pregen_version))
                     if pregen_pdf_bytes:
                         storage_info = {"version": int(pregen_version)}
@@ -482,8 +533,6 @@ def approve_reply(reply_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
             if pregen_pdf_bytes is None:
                 # Fall back to generating now
                 try:
-                    from pdf_generator import ProposalPDFGenerator
-
                     pdf_lambda_arn = os.environ.get("PDF_LAMBDA_ARN", "")
                     if not pdf_lambda_arn:
                         error_details = {
@@ -503,7 +552,7 @@ def approve_reply(reply_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
                                 }
                             ),
                         }
-                    pdf_generator = ProposalPDFGenerator(pdf_lambda_arn)
+                    pdf_generator = services.pdf_generator(pdf_lambda_arn)
                     pregen_pdf_bytes, pdf_error, storage_info = (
                         pdf_generator.generate_and_store_proposal_pdf(conversation)
                     )
@@ -555,14 +604,14 @@ def approve_reply(reply_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
             email_body_to_send = email_meta.get("body", "")
             if not email_body_to_send:
                 logger.warning("No email body in metadata, using template fallback")
-                email_body_to_send = format_proposal_email_body(
+                email_body_to_send = _email_sender.format_proposal_email_body(
                     client_name=client_name,
                     project_title=project_title,
                     conversation_id=conversation_id,
                 )
 
             # Send email with PDF attachment
-            success, ses_message_id, error_msg = send_proposal_email(
+            success, ses_message_id, error_msg = _email_sender.send_proposal_email(
                 to_email=email_meta["recipient"],
                 subject=email_meta["subject"],
                 body=email_body_to_send,
@@ -575,7 +624,7 @@ def approve_reply(reply_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
             )
         else:
             # Send regular text email
-            success, ses_message_id, error_msg = send_reply_email(
+            success, ses_message_id, error_msg = _email_sender.send_reply_email(
                 to_email=email_meta["recipient"],
                 subject=email_meta["subject"],
                 body=email_meta["body"],
@@ -591,19 +640,22 @@ def approve_reply(reply_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
                 "statusCode": 500,
                 "body": json.dumps({"error": f"Failed to send email: {error_msg}"}),
             }
-
-        # Only NOW update the reply status after successful email sending
-        pending_replies[reply_index]["status"] = "approved"
-        pending_replies[reply_index]["reviewed_at"] = now
-        pending_replies[reply_index]["reviewed_by"] = body.get("reviewed_by", "admin")
-        pending_replies[reply_index]["sent_at"] = now
-        pending_replies[reply_index]["ses_message_id"] = ses_message_id
+        sent = True
+
+        # Only NOW finalize the reply status after successful email sending
+        reply_updates = {
+            "status": "approved",
+            "reviewed_at": now,
+            "reviewed_by": body.get("reviewed_by", "admin"),
+            "sent_at": now,
+            "ses_message_id": ses_message_id,
+        }
 
         # Store S3 storage info if available
         if storage_info and storage_info.get("version") is not None:
-            pending_replies[reply_index]["proposal_version"] = storage_info.get("version")
+            reply_updates["proposal_version"] = storage_info.get("version")
             if storage_info.get("s3_key"):
-                pending_replies[reply_index]["s3_key"] = storage_info.get("s3_key")
+                reply_updates["s3_key"] = storage_info.get("s3_key")
             logger.info(
                 f"Stored proposal version {storage_info.get('version')} info in pending reply"
             )
@@ -614,7 +666,7 @@ def approve_reply(reply_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
                 or (reply_data or {}).get("metadata", {}).get("proposal_version")
             )
             if pregen_version_to_keep:
-                pending_replies[reply_index]["proposal_version"] = int(pregen_version_to_keep)
+                reply_updates["proposal_version"] = int(pregen_version_to_keep)
                 logger.info(
                     f"Kept pre-generated proposal version {pregen_version_to_keep} on pending reply"
                 )
@@ -672,7 +724,7 @@ def approve_reply(reply_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
         #  Add the outbound email to email_history so the frontend sees it
         # ------------------------------------------------------------------
         try:
-            state_mgr = ConversationStateManager(table_name=TABLE_NAME)
+            state_mgr = services.state_manager(TABLE_NAME)
             
             # Build attachments list with proposal version if PDF was sent
             attachments_list = []
@@ -702,12 +754,19 @@ def approve_reply(reply_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
             # Log but don’t fail approval if history append fails
             logger.warning(f"Failed to append outbound email to history: {hist_err}")
 
-        # Update conversation
-        table.update_item(
-            Key={"conversation_id": conversation_id},
-            UpdateExpression="SET pending_replies = :replies, updated_at = :updated",
-            ExpressionAttributeValues={":replies": pending_replies, ":updated": now},
-        )
+        # Finalize only this reply; this request holds the "sending" claim
+        try:
+            services.state_manager(TABLE_NAME).update_reply(
+                conversation_id,
+                reply_id,
+                reply_updates,
+                expected_status="sending",
+                reply_index=reply_index,
+                reply_activity=True,
+            )
+        except ReplyStateError as e:
+            # The email is out; leave the reply in "sending" rather than re-queue it
+            logger.error(f"Reply {reply_id} was sent but could not be finalized: {str(e)}")
 
         return {
             "statusCode": 200,
@@ -718,6 +777,11 @@ def approve_reply(reply_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
         logger.error(f"Error approving reply: {str(e)}")
         return {"statusCode": 500, "body": json.dumps({"error": "Failed to approve reply"})}
 
+    finally:
+        # Any exit before the email went out hands the reply back to reviewers
+        if claimed and not sent:
+            _release_reply_claim(conversation_id, reply_id, reply_index)
+
 
 def reject_reply(reply_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
     """Reject a pending reply."""
@@ -726,19 +790,17 @@ def reject_reply(reply_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
         if not conversation_id:
             return {"statusCode": 400, "body": json.dumps({"error": "conversation_id is required"})}
 
-        table = dynamodb.Table(TABLE_NAME)
+        state_manager = services.state_manager(TABLE_NAME)
 
-        # Get conversation
-        response = table.get_item(Key={"conversation_id": conversation_id})
+        # Get the reply list only
+        conversation = state_manager.load_conversation(conversation_id, "replies")
 
-        if "Item" not in response:
+        if conversation is None:
             return {"statusCode": 404, "body": json.dumps({"error": "Conversation not found"})}
-
-        conversation = response["Item"]
         pending_replies = conversation.get("pending_replies", [])
 
-        # Find and update the reply
-        reply_found = False
+        # Find the reply
+        reply_index = None
         for i, reply in enumerate(pending_replies):
             if reply.get("reply_id") == reply_id:
                 if reply.get("status") != "pending":
@@ -746,27 +808,29 @@ def reject_reply(reply_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
                         "statusCode": 400,
                         "body": json.dumps({"error": f"Reply is already {reply.get('status')}"}),
                     }
-
-                now = datetime.now(timezone.utc).isoformat()
-                pending_replies[i]["status"] = "rejected"
-                pending_replies[i]["reviewed_at"] = now
-                pending_replies[i]["reviewed_by"] = body.get("reviewed_by", "admin")
-                pending_replies[i]["rejection_reason"] = body.get("reason", "")
-                reply_found = True
+                reply_index = i
                 break
 
-        if not reply_found:
+        if reply_index is None:
             return {"statusCode": 404, "body": json.dumps({"error": "Reply not found"})}
 
-        # Update conversation
-        table.update_item(
-            Key={"conversation_id": conversation_id},
-            UpdateExpression="SET pending_replies = :replies, updated_at = :updated",
-            ExpressionAttributeValues={
-                ":replies": pending_replies,
-                ":updated": datetime.now(timezone.utc).isoformat(),
-            },
-        )
+        # Update only this reply
+        try:
+            state_manager.update_reply(
+                conversation_id,
+                reply_id,
+                {
+                    "status": "rejected",
+                    "reviewed_at": datetime.now(timezone.utc).isoformat(),
+                    "reviewed_by": body.get("reviewed_by", "admin"),
+                    "rejection_reason": body.get("reason", ""),
+                },
+                expected_status="pending",
+                reply_index=reply_index,
+                reply_activity=True,
+            )
+        except ReplyStateError as e:
+            return {"statusCode": 409, "body": json.dumps({"error": str(e)})}
 
         return {"statusCode": 200, "body": json.dumps({"reply_id": reply_id, "status": "rejected"})}
 
@@ -788,19 +852,17 @@ def amend_reply(reply_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
                 "body": json.dumps({"error": "conversation_id and content are required"}),
             }
 
-        table = dynamodb.Table(TABLE_NAME)
+        state_manager = services.state_manager(TABLE_NAME)
 
-        # Get conversation
-        response = table.get_item(Key={"conversation_id": conversation_id})
+        # Get the reply list only
+        conversation = state_manager.load_conversation(conversation_id, "replies")
 
-        if "Item" not in response:
+        if conversation is None:
             return {"statusCode": 404, "body": json.dumps({"error": "Conversation not found"})}
-
-        conversation = response["Item"]
         pending_replies = conversation.get("pending_replies", [])
 
         # Find and update the reply
-        reply_found = False
+        reply_index = None
         for i, reply in enumerate(pending_replies):
             if reply.get("reply_id") == reply_id:
                 if reply.get("status") != "pending":
@@ -809,43 +871,44 @@ def amend_reply(reply_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
                         "body": json.dumps({"error": f"Reply is already {reply.get('status')}"}),
                     }
 
-                # Ensure metadata exists
-                if "metadata" not in pending_replies[i]:
-                    pending_replies[i]["metadata"] = {}
+                metadata = dict(reply.get("metadata") or {})
                 
                 # Store original email_body for audit trail (only if not already stored)
-                if "original_email_body" not in pending_replies[i]["metadata"]:
-                    original_body = pending_replies[i]["metadata"].get("email_body", "")
+                if "original_email_body" not in metadata:
+                    original_body = metadata.get("email_body", "")
                     if original_body:  # Only store if there's an original
-                        pending_replies[i]["metadata"]["original_email_body"] = original_body
+                        metadata["original_email_body"] = original_body
 
                 # Update the email_body in metadata directly - this becomes the source of truth
-                pending_replies[i]["metadata"]["email_body"] = amended_content
+                metadata["email_body"] = amended_content
                 if content_format:
-                    pending_replies[i]["metadata"]["email_body_format"] = content_format
-                
-                # Track amendment details for audit trail
-                pending_replies[i]["amended_at"] = datetime.now(timezone.utc).isoformat()
-                pending_replies[i]["amended_by"] = body.get("amended_by", "admin")
+                    metadata["email_body_format"] = content_format
                 
                 # Log the amendment for debugging
                 logger.info(f"Amended reply {reply_id}: updated metadata.email_body with {len(amended_content)} characters")
                 
-                reply_found = True
+                reply_index = i
                 break
 
-        if not reply_found:
+        if reply_index is None:
             return {"statusCode": 404, "body": json.dumps({"error": "Reply not found"})}
 
-        # Update conversation
-        table.update_item(
-            Key={"conversation_id": conversation_id},
-            UpdateExpression="SET pending_replies = :replies, updated_at = :updated",
-            ExpressionAttributeValues={
-                ":replies": pending_replies,
-                ":updated": datetime.now(timezone.utc).isoformat(),
-            },
-        )
+        # Update only this reply, tracking amendment details for audit trail
+        try:
+            state_manager.update_reply(
+                conversation_id,
+                reply_id,
+                {
+                    "metadata": metadata,
+                    "amended_at": datetime.now(timezone.utc).isoformat(),
+                    "amended_by": body.get("amended_by", "admin"),
+                },
+                expected_status="pending",
+                reply_index=reply_index,
+                reply_activity=True,
+            )
+        except ReplyStateError as e:
+            return {"statusCode": 409, "body": json.dumps({"error": str(e)})}
 
         return {"statusCode": 200, "body": json.dumps({"reply_id": reply_id, "status": "amended"})}
 
@@ -857,17 +920,15 @@ def amend_reply(reply_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
 def get_reply_prompt(reply_id: str) -> Dict[str, Any]:
     """Get the LLM prompt used for a specific reply."""
     try:
-        # This would require searching through all conversations
-        # For now, return a placeholder
+        # Large prompts are stored in S3 and only loaded here
+        prompt = services.state_manager(TABLE_NAME).get_reply_prompt(reply_id)
+
+        if prompt is None:
+            return {"statusCode": 404, "body": json.dumps({"error": "Reply not found"})}
+
         return {
             "statusCode": 200,
-            "body": json.dumps(
-                {
-                    "reply_id": reply_id,
-                    "prompt": "Prompt retrieval not yet implemented",
-                    "note": "This will require scanning conversations for the specific reply",
-                }
-            ),
+            "body": json.dumps({"reply_id": reply_id, "prompt": prompt}),
         }
 
     except Exception as e:
@@ -900,33 +961,18 @@ def get_reply_review(reply_id: str) -> Dict[str, Any]:
                 }, cls=DecimalEncoder)
             }
         
-        # Search for the reply across all conversations
-        table = dynamodb.Table(TABLE_NAME)
+        # Resolve the owning conversation through the reply index
+        state_manager = services.state_manager(TABLE_NAME)
+        found = state_manager.load_reply(reply_id, view="review")
         
-        # Scan for conversations that might contain this reply
-        response = table.scan(
-            FilterExpression="attribute_exists(pending_replies)",
-            ProjectionExpression="conversation_id, pending_replies, email_history, phase, client_email"
-        )
-        
-        reply_data = None
-        conversation_data = None
-        
-        for item in response['Items']:
-            pending_replies = item.get('pending_replies', [])
-            for reply in pending_replies:
-                if reply.get('reply_id') == reply_id:
-                    reply_data = reply
-                    conversation_data = item
-                    break
-            if reply_data:
-                break
-        
-        if not reply_data:
+        if not found:
             return {
                 "statusCode": 404,
                 "body": json.dumps({"error": "Reply not found"})
             }
+
+        conversation_data, reply_index, reply_data = found
+        state_manager.hydrate_email_history(conversation_data)
         
         # Check if review is already cached (and not null)
         if 'review' in reply_data and reply_data['review'] is not None:
@@ -940,9 +986,7 @@ def get_reply_review(reply_id: str) -> Dict[str, Any]:
             }
         
         # Generate new review
-        from src.agents.email_intake.reviewer import EmailReviewer
-        
-        reviewer = EmailReviewer()
+        reviewer = _reviewer.EmailReviewer()
         response_text = reply_data.get('llm_response', '')
         metadata = reply_data.get('metadata', {})
         
@@ -952,19 +996,10 @@ def get_reply_review(reply_id: str) -> Dict[str, Any]:
         try:
             # Update the specific reply with review data
             conversation_id = conversation_data['conversation_id']
-            pending_replies = conversation_data.get('pending_replies', [])
             
-            # Find and update the specific reply
-            for i, reply in enumerate(pending_replies):
-                if reply.get('reply_id') == reply_id:
-                    pending_replies[i]['review'] = review
-                    break
-            
-            # Update the conversation with the new review
-            table.update_item(
-                Key={"conversation_id": conversation_id},
-                UpdateExpression="SET pending_replies = :pr",
-                ExpressionAttributeValues={":pr": pending_replies}
+            # Update only the specific reply with the new review
+            state_manager.update_reply(
+                conversation_id, reply_id, {'review': review}, reply_index=reply_index
             )
             
             logger.info(f"Cached review for reply {reply_id} with overall score: {review.get('overall_score', 0)}")
@@ -1006,33 +1041,18 @@ def request_reply_revision(reply_id: str) -> Dict[str, Any]:
                 })
             }
         
-        # Search for the reply across all conversations
-        table = dynamodb.Table(TABLE_NAME)
-        
-        # Scan for conversations that might contain this reply
-        response = table.scan(
-            FilterExpression="attribute_exists(pending_replies)",
-            ProjectionExpression="conversation_id, pending_replies, email_history, phase, client_email"
-        )
-        
-        reply_data = None
-        conversation_data = None
-        
-        for item in response['Items']:
-            pending_replies = item.get('pending_replies', [])
-            for reply in pending_replies:
-                if reply.get('reply_id') == reply_id:
-                    reply_data = reply
-                    conversation_data = item
-                    break
-            if reply_data:
-                break
+        # Resolve the owning conversation through the reply index
+        state_manager = services.state_manager(TABLE_NAME)
+        found = state_manager.load_reply(reply_id, view="review")
         
-        if not reply_data:
+        if not found:
             return {
                 "statusCode": 404,
                 "body": json.dumps({"error": "Reply not found"})
             }
+
+        conversation_data, reply_index, reply_data = found
+        state_manager.hydrate_email_history(conversation_data)
         
         # Check if reply already has a revision
         if 'revision' in reply_data and reply_data['revision']:
@@ -1049,18 +1069,14 @@ def request_reply_revision(reply_id: str) -> Dict[str, Any]:
         review = reply_data.get('review')
         if not review:
             # Generate review first
-            from src.agents.email_intake.reviewer import EmailReviewer
-            reviewer = EmailReviewer()
+            reviewer = _reviewer.EmailReviewer()
             response_text = reply_data.get('llm_response', '')
             metadata = reply_data.get('metadata', {})
             review = reviewer.review_response(conversation_data, response_text, metadata)
         
         # Generate feedback from review
-        from src.agents.email_intake.reviewer import EmailReviewer
-        from src.agents.email_intake.response_reviser import ResponseReviser
-        
-        reviewer = EmailReviewer()
-        reviser = ResponseReviser()
+        reviewer = _reviewer.EmailReviewer()
+        reviser = _response_reviser.ResponseReviser()
         
         original_response = reply_data.get('llm_response', '')
         
@@ -1093,22 +1109,14 @@ def request_reply_revision(reply_id: str) -> Dict[str, Any]:
         # Cache the revision in DynamoDB
         try:
             conversation_id = conversation_data['conversation_id']
-            pending_replies = conversation_data.get('pending_replies', [])
             
-            # Find and update the specific reply
-            for i, reply in enumerate(pending_replies):
-                if reply.get('reply_id') == reply_id:
-                    pending_replies[i]['revision'] = revision_result
-                    # Also ensure review is cached
-                    if not pending_replies[i].get('review'):
-                        pending_replies[i]['review'] = review
-                    break
-            
-            # Update the conversation with the revision
-            table.update_item(
-                Key={"conversation_id": conversation_id},
-                UpdateExpression="SET pending_replies = :pr",
-                ExpressionAttributeValues={":pr": pending_replies}
+            # Update only the specific reply with the revision
+            revision_updates = {'revision': revision_result}
+            # Also ensure review is cached
+            if not reply_data.get('review'):
+                revision_updates['review'] = review
+            state_manager.update_reply(
+                conversation_id, reply_id, revision_updates, reply_index=reply_index
             )
             
             logger.info(f"Cached revision for reply {reply_id}. Successful: {revision_result.get('revision_successful', False)}")
@@ -1192,10 +1200,7 @@ def list_proposals(conversation_id: str) -> Dict[str, Any]:
         API response with list of proposals
     """
     try:
-        # Canonical import path for Lambda package layout
-        from src.storage import ProposalVersionIndex  # type: ignore
-
-        version_index = ProposalVersionIndex()
+        version_index = services.version_index()
         proposals = version_index.list_versions(conversation_id)
 
         # Convert to API response format
@@ -1244,22 +1249,14 @@ def generate_proposal(conversation_id: str) -> Dict[str, Any]:
         API response with generated proposal info
     """
     try:
-        table = dynamodb.Table(TABLE_NAME)
-
-        # Get conversation
-        response = table.get_item(Key={"conversation_id": conversation_id})
+        # Get requirements for proposal generation
+        conversation = services.state_manager(TABLE_NAME).load_conversation(
+            conversation_id, "requirements"
+        )
 
-        if "Item" not in response:
+        if conversation is None:
             return {"statusCode": 404, "body": json.dumps({"error": "Conversation not found"})}
 
-        conversation = response["Item"]
-
-        # Import PDF generator
-        try:
-            from pdf_generator import ProposalPDFGenerator
-        except ImportError:
-            from src.agents.email_intake.pdf_generator import ProposalPDFGenerator
-
         pdf_lambda_arn = os.environ.get("PDF_LAMBDA_ARN", "")
         if not pdf_lambda_arn:
             return {
@@ -1267,7 +1264,7 @@ def generate_proposal(conversation_id: str) -> Dict[str, Any]:
                 "body": json.dumps({"error": "PDF_LAMBDA_ARN not configured"}),
             }
 
-        pdf_generator = ProposalPDFGenerator(pdf_lambda_arn)
+        pdf_generator = services.pdf_generator(pdf_lambda_arn)
         pdf_bytes, pdf_error, storage_info = pdf_generator.generate_and_store_proposal_pdf(
             conversation
         )
@@ -1318,13 +1315,7 @@ def get_proposal_url(conversation_id: str, version: str) -> Dict[str, Any]:
                 "body": json.dumps({"error": "Invalid version number"}),
             }
 
-        # Canonical import path for Lambda package layout
-        from src.storage import S3ProposalStore  # type: ignore
-
-        s3_store = S3ProposalStore(
-            bucket_name=os.environ.get("DOCUMENT_BUCKET")
-            or os.environ.get("ATTACHMENTS_BUCKET", "solopilot-attachments")
-        )
+        s3_store = services.proposal_store(S3_BUCKET)
 
         # Generate presigned URL
         url = s3_store.generate_presigned_url(conversation_id, version_num)
@@ -1416,8 +1407,9 @@ def annotate_vision(conversation_id: str, version: str, body: Optional[Dict[str,
 
         # Load conversation
         table = dynamodb.Table(TABLE_NAME)
-        resp = table.get_item(Key={"conversation_id": conversation_id})
-        conv = resp.get("Item")
+        conv = services.state_manager(TABLE_NAME).load_conversation(
+            conversation_id, "vision"
+        )
         if not conv:
             return {"statusCode": 404, "body": json.dumps({"error": "Conversation not found"})}
 
@@ -1431,17 +1423,12 @@ def annotate_vision(conversation_id: str, version: str, body: Optional[Dict[str,
             }
 
         # Stage 1: Vision model -> Edit Intent (plain text)
-        from src.agents.email_intake.vision_analyzer import VisionAnalyzer, VisionModelError  # type: ignore
-        from src.agents.email_intake.requirement_extractor import RequirementEditError, RequirementExtractor  # type: ignore
-        from src.agents.email_intake.proposal_mapper import ProposalDataMapper  # type: ignore
-        from src.storage import S3ProposalStore  # type: ignore
-
         base_instructions = (
             "You see page images of a PDF proposal with user-made highlight/notes already drawn. "
             "Describe the requested changes as precise requirement updates (e.g., fields to modify, new copy, numbers). "
             "Focus on factual updates that can be reflected in the requirements JSON (titles, summaries, scope items, pricing, etc.)."
         )
-        analyzer = VisionAnalyzer()
+        analyzer = _vision_analyzer.VisionAnalyzer()
 
         intent_text = ""
         updated_requirements = current_requirements
@@ -1475,13 +1462,13 @@ def annotate_vision(conversation_id: str, version: str, body: Optional[Dict[str,
                 debug_s3_bucket=debug_s3_bucket,
                 debug_s3_prefix=debug_s3_prefix,
             )
-        except VisionModelError as vision_err:
+        except _vision_analyzer.VisionModelError as vision_err:
             raise VisionProcessingError(str(vision_err)) from vision_err
 
         logger.info("[VISION] Response intent: %s", intent_text)
 
         # Apply instructions to requirements via LLM-based editor
-        extractor = RequirementExtractor()
+        extractor = services.requirement_extractor()
         combined_intent = intent_text
         if user_prompt and user_prompt.lower() not in (intent_text or "").lower():
             combined_intent = (
@@ -1496,7 +1483,7 @@ def annotate_vision(conversation_id: str, version: str, body: Optional[Dict[str,
             updated_requirements = extractor.apply_edit_instructions(
                 current_requirements, combined_intent
             )
-        except RequirementEditError as edit_err:
+        except _requirement_extractor.RequirementEditError as edit_err:
             raise RequirementUpdateError(str(edit_err)) from edit_err
 
         logger.info(
@@ -1547,10 +1534,7 @@ def annotate_vision(conversation_id: str, version: str, body: Optional[Dict[str,
             return hashlib.sha256(encoded).hexdigest()
 
         # Allocate new version and render PDF to target key
-        s3_store = S3ProposalStore(
-            bucket_name=os.environ.get("DOCUMENT_BUCKET")
-            or os.environ.get("ATTACHMENTS_BUCKET", "solopilot-attachments")
-        )
+        s3_store = services.proposal_store(S3_BUCKET)
         requirements_hash = s3_store._calculate_requirements_hash(updated_requirements) or ""
         idempotency_key = _build_idempotency_key(base_version, annotations, body.get("prompt"))
         latest_version = None
@@ -1591,11 +1575,11 @@ def annotate_vision(conversation_id: str, version: str, body: Optional[Dict[str,
         s3_key_prefix = f"proposals/{conversation_id}/v{new_version:04d}"
         target_pdf_key = f"{s3_key_prefix}/proposal.pdf"
 
-        mapper = ProposalDataMapper()
+        mapper = _proposal_mapper.ProposalDataMapper()
         proposal_data = mapper.map_requirements_to_proposal_data(updated_requirements)
 
         # Call doc-service to write directly
-        lambda_client = boto3.client("lambda")
+        lambda_client = services.client("lambda")
         pdf_lambda_arn = os.environ.get("PDF_LAMBDA_ARN", "")
         if not pdf_lambda_arn:
             return {"statusCode": 500, "body": json.dumps({"error": "PDF generation service not configured"})}
@@ -1627,9 +1611,7 @@ def annotate_vision(conversation_id: str, version: str, body: Optional[Dict[str,
 
         # Metadata and version record
         base_meta = s3_store.get_proposal_metadata(conversation_id, int(base_version)) or {}
-        from src.storage.budget_utils import compute_budget_total  # type: ignore
-
-        budget_total = compute_budget_total(updated_requirements, proposal_data)
+        budget_total = _budget_utils.compute_budget_total(updated_requirements, proposal_data)
         metadata = {
             "version": new_version,
             "created_at": datetime.now(timezone.utc).isoformat(),
@@ -1683,15 +1665,16 @@ def annotate_vision(conversation_id: str, version: str, body: Optional[Dict[str,
                 UpdateExpression="SET updated_at = :ts",
                 ExpressionAttributeValues={":ts": datetime.now(timezone.utc).isoformat()},
             )
-            pending_replies = conv.get("pending_replies", [])
-            for r in pending_replies:
+            state_mgr = services.state_manager(TABLE_NAME)
+            for i, r in enumerate(conv.get("pending_replies", [])):
                 if r.get("status") == "pending":
-                    r["proposal_version"] = new_version
-            table.update_item(
-                Key={"conversation_id": conversation_id},
-                UpdateExpression="SET pending_replies = :pr",
-                ExpressionAttributeValues={":pr": pending_replies},
-            )
+                    state_mgr.update_reply(
+                        conversation_id,
+                        r["reply_id"],
+                        {"proposal_version": new_version},
+                        expected_status="pending",
+                        reply_index=i,
+                    )
         except Exception as upd_err:
             logger.warning(f"Failed to persist vision changes: {upd_err}")
 
@@ -1749,6 +1732,26 @@ def annotate_vision(conversation_id: str, version: str, body: Optional[Dict[str,
         logger.error(f"Error in annotate_vision: {str(e)}", exc_info=True)
         return {"statusCode": 500, "body": json.dumps({"error": "Failed to annotate with vision"})}
 
+def _release_attachment_references(conversation_id: str, emails: List[Dict[str, Any]]) -> None:
+    """Release a deleted conversation's attachment references (non-fatal on failure)."""
+    attachment_index = services.attachment_index()
+    if attachment_index is None:
+        return
+    for email in emails:
+        for attachment in email.get("attachments") or []:
+            if not (attachment.get("sha256") and email.get("message_id")):
+                continue
+            try:
+                attachment_index.release_reference(
+                    conversation_id, email["message_id"], attachment["sha256"]
+                )
+            except Exception as e:
+                logger.warning(
+                    f"Failed to release attachment {attachment['sha256'][:12]} "
+                    f"for {conversation_id}: {str(e)}"
+                )
+
+
 def delete_conversation(conversation_id: str) -> Dict[str, Any]:
     """Delete a conversation and all its related data."""
     try:
@@ -1774,6 +1777,15 @@ def delete_conversation(conversation_id: str) -> Dict[str, Any]:
                 "body": json.dumps({"error": "Conversation not found"}),
             }
 
+        deleted = response["Attributes"]
+        state_mgr = services.state_manager(TABLE_NAME)
+        # Read the history (email items included) before its items are deleted
+        emails = state_mgr.hydrate_email_history(dict(deleted)).get("email_history") or []
+        if state_mgr.email_storage_mode == EMAIL_STORAGE_ITEMS:
+            state_mgr.delete_email_items(conversation_id)
+        state_mgr.delete_reply_index(deleted.get("pending_replies", []))
+        _release_attachment_references(conversation_id, emails)
+
         logger.info(f"Deleted conversation {conversation_id}")
 
         return {
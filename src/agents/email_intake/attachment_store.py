@@ -0,0 +1,367 @@
+"""Content-addressed S3 storage for inbound email attachments.
+
+Attachment parts are decoded in slices and written through an
+``AttachmentUpload``, which hashes and counts bytes as they arrive and sends
+them to S3 as multipart upload parts once a part's worth is buffered. At most
+one part is held in memory per attachment; small attachments fall back to a
+single ``put_object``.
+
+Objects are keyed by SHA-256, so a brief re-sent in every reply of a thread is
+stored once. Multipart uploads go to a staging key first (the digest is only
+known at the end) and are copied into place unless the content already exists.
+``AttachmentIndex`` keeps a per-conversation reference count for each digest;
+references are released when their conversation is deleted. The S3 objects
+are not deleted, since other conversations may share them.
+"""
+
+import hashlib
+import logging
+import os
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+
+import boto3
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger(__name__)
+
+EMAIL_ATTACHMENT_BUCKET = os.environ.get("EMAIL_ATTACHMENT_BUCKET", "")
+EMAIL_ATTACHMENT_PREFIX = os.environ.get("EMAIL_ATTACHMENT_PREFIX", "email-attachments/")
+# S3 requires every multipart part except the last to be at least 5 MiB
+ATTACHMENT_PART_SIZE = max(
+    int(os.environ.get("ATTACHMENT_PART_SIZE", str(8 * 1024 * 1024))), 5 * 1024 * 1024
+)
+
+# Attachment index table: one item per (sha256, conversation_id) with ref_count
+ATTACHMENT_INDEX_TABLE = os.environ.get("ATTACHMENT_INDEX_TABLE", "conversation_attachments")
+
+
+def _object_exists(s3_client, bucket: str, key: str) -> bool:
+    """Check whether an object is already stored."""
+    try:
+        s3_client.head_object(Bucket=bucket, Key=key)
+        return True
+    except ClientError as e:
+        if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+            return False
+        raise
+
+
+class AttachmentUpload:
+    """Incremental writer that hashes an attachment and streams it to S3.
+
+    With no S3 client the writer only computes size and SHA-256, so callers
+    get the same metadata whether or not storage is configured.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        content_type: str,
+        bucket_name: Optional[str] = None,
+        prefix: str = EMAIL_ATTACHMENT_PREFIX,
+        part_size: int = ATTACHMENT_PART_SIZE,
+        s3_client=None,
+    ):
+        self.filename = filename
+        self.content_type = content_type
+        self.bucket_name = bucket_name
+        self.prefix = prefix
+        self.part_size = part_size
+        self.s3_client = s3_client
+
+        self.size = 0
+        self._sha256 = hashlib.sha256()
+        self._buffer = bytearray()
+        self._staging_key = f"{prefix}staging/{uuid4().hex}"
+        self._upload_id: Optional[str] = None
+        self._parts: List[Dict[str, Any]] = []
+
+    def write(self, data: bytes) -> None:
+        """Add decoded bytes, flushing full parts to S3."""
+        if not data:
+            return
+        self.size += len(data)
+        self._sha256.update(data)
+        if self.s3_client is None:
+            return
+
+        self._buffer.extend(data)
+        while len(self._buffer) >= self.part_size:
+            self._upload_part(bytes(self._buffer[: self.part_size]))
+            del self._buffer[: self.part_size]
+
+    def close(self) -> Dict[str, Any]:
+        """Finish the upload and move the content to its SHA-256 key.
+
+        Returns:
+            Attachment metadata: filename, content_type, size, sha256 and, when
+            stored, s3_bucket and s3_key
+        """
+        digest = self._sha256.hexdigest()
+        info: Dict[str, Any] = {
+            "filename": self.filename,
+            "content_type": self.content_type,
+            "size": self.size,
+            "sha256": digest,
+        }
+        if self.s3_client is None:
+            return info
+
+        key = f"{self.prefix}{digest[:2]}/{digest}"
+        try:
+            if self._upload_id is None:
+                stored = not _object_exists(self.s3_client, self.bucket_name, key)
+                if stored:
+                    self.s3_client.put_object(
+                        Bucket=self.bucket_name,
+                        Key=key,
+                        Body=bytes(self._buffer),
+                        ContentType=self.content_type,
+                        Metadata={"sha256": digest},
+                    )
+            else:
+                if self._buffer:
+                    self._upload_part(bytes(self._buffer))
+                self.s3_client.complete_multipart_upload(
+                    Bucket=self.bucket_name,
+                    Key=self._staging_key,
+                    UploadId=self._upload_id,
+                    MultipartUpload={"Parts": self._parts},
+                )
+                self._upload_id = None
+                stored = self._promote_staged(key, digest)
+        except Exception:
+            self.abort()
+            raise
+        finally:
+            self._buffer = bytearray()
+
+        if stored:
+            logger.info(
+                f"Stored attachment {self.filename} at s3://{self.bucket_name}/{key} "
+                f"({self.size} bytes, {len(self._parts) or 1} part(s))"
+            )
+        else:
+            logger.info(f"Attachment {self.filename} already stored at {key}, skipping upload")
+        info.update({"s3_bucket": self.bucket_name, "s3_key": key})
+        return info
+
+    def abort(self) -> None:
+        """Abandon a partial multipart upload so S3 does not keep its parts."""
+        if self._upload_id is None:
+            return
+        try:
+            self.s3_client.abort_multipart_upload(
+                Bucket=self.bucket_name, Key=self._staging_key, UploadId=self._upload_id
+            )
+        except Exception as e:
+            logger.warning(f"Failed to abort multipart upload for {self._staging_key}: {str(e)}")
+        self._upload_id = None
+
+    def _promote_staged(self, key: str, digest: str) -> bool:
+        """Copy the staged object to its content key unless it exists; drop the staging copy."""
+        try:
+            if _object_exists(self.s3_client, self.bucket_name, key):
+                return False
+            self.s3_client.copy_object(
+                Bucket=self.bucket_name,
+                Key=key,
+                CopySource={"Bucket": self.bucket_name, "Key": self._staging_key},
+                ContentType=self.content_type,
+                Metadata={"sha256": digest},
+                MetadataDirective="REPLACE",
+            )
+            return True
+        finally:
+            self.s3_client.delete_object(Bucket=self.bucket_name, Key=self._staging_key)
+
+    def _upload_part(self, body: bytes) -> None:
+        if self._upload_id is None:
+            response = self.s3_client.create_multipart_upload(
+                Bucket=self.bucket_name, Key=self._staging_key, ContentType=self.content_type
+            )
+            self._upload_id = response["UploadId"]
+
+        part_number = len(self._parts) + 1
+        try:
+            response = self.s3_client.upload_part(
+                Bucket=self.bucket_name,
+                Key=self._staging_key,
+                UploadId=self._upload_id,
+                PartNumber=part_number,
+                Body=body,
+            )
+        except Exception:
+            self.abort()
+            raise
+        self._parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+
+
+class AttachmentStore:
+    """Creates streaming uploads for inbound attachments in one bucket."""
+
+    def __init__(
+        self,
+        bucket_name: str = EMAIL_ATTACHMENT_BUCKET,
+        prefix: str = EMAIL_ATTACHMENT_PREFIX,
+        part_size: int = ATTACHMENT_PART_SIZE,
+        s3_client=None,
+    ):
+        """Initialize attachment store.
+
+        Args:
+            bucket_name: S3 bucket for attachments
+            prefix: Key prefix for attachments
+            part_size: Multipart part size in bytes (at least 5 MiB)
+            s3_client: Optional S3 client (for testing)
+        """
+        if not bucket_name:
+            raise ValueError("bucket_name is required for AttachmentStore")
+
+        self.bucket_name = bucket_name
+        self.prefix = prefix
+        self.part_size = part_size
+        self.s3_client = s3_client or boto3.client("s3")
+
+    @classmethod
+    def from_env(cls, s3_client=None) -> Optional["AttachmentStore"]:
+        """Create a store if EMAIL_ATTACHMENT_BUCKET is configured, else None (hash only)."""
+        if not EMAIL_ATTACHMENT_BUCKET:
+            return None
+        return cls(s3_client=s3_client)
+
+    def open_upload(self, filename: str, content_type: str) -> AttachmentUpload:
+        """Start a streaming upload for one attachment.
+
+        Args:
+            filename: Attachment filename from the MIME part
+            content_type: MIME content type
+
+        Returns:
+            AttachmentUpload to write decoded bytes to
+        """
+        return AttachmentUpload(
+            filename,
+            content_type,
+            bucket_name=self.bucket_name,
+            prefix=self.prefix,
+            part_size=self.part_size,
+            s3_client=self.s3_client,
+        )
+
+
+class AttachmentIndex:
+    """Per-conversation reference counts for attachment content."""
+
+    def __init__(self, table_name: str = ATTACHMENT_INDEX_TABLE, dynamodb_resource=None):
+        """Initialize index.
+
+        Args:
+            table_name: Name of the attachment index table
+            dynamodb_resource: Optional shared DynamoDB resource (see service_container)
+        """
+        self.dynamodb = dynamodb_resource or boto3.resource("dynamodb")
+        self.table = self.dynamodb.Table(table_name)
+        self.table_name = table_name
+
+    def add_reference(
+        self, conversation_id: str, message_id: str, attachment: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Count an email's reference to an attachment in a conversation.
+
+        Each (message, content) pair is counted once, so redelivered emails do not
+        inflate the count.
+
+        Args:
+            conversation_id: Conversation identifier
+            message_id: Message-ID of the email carrying the attachment
+            attachment: Attachment metadata with sha256
+
+        Returns:
+            Reference item with ref_count and first_message_id; the attachment is a
+            duplicate within the conversation when first_message_id differs from
+            message_id
+        """
+        key = {"sha256": attachment["sha256"], "conversation_id": conversation_id}
+        now = datetime.now(timezone.utc).isoformat()
+        try:
+            response = self.table.update_item(
+                Key=key,
+                UpdateExpression="""
+                    ADD ref_count :one, message_ids :mids
+                    SET first_message_id = if_not_exists(first_message_id, :mid),
+                        filename = if_not_exists(filename, :filename),
+                        content_type = :content_type,
+                        #size = :size,
+                        s3_key = :s3_key,
+                        first_seen_at = if_not_exists(first_seen_at, :now),
+                        last_seen_at = :now
+                """,
+                ConditionExpression=(
+                    "attribute_not_exists(message_ids) OR NOT contains(message_ids, :mid)"
+                ),
+                ExpressionAttributeNames={"#size": "size"},
+                ExpressionAttributeValues={
+                    ":one": Decimal(1),
+                    ":mids": {message_id},
+                    ":mid": message_id,
+                    ":filename": attachment.get("filename", ""),
+                    ":content_type": attachment.get("content_type", ""),
+                    ":size": Decimal(attachment.get("size", 0)),
+                    ":s3_key": attachment.get("s3_key", ""),
+                    ":now": now,
+                },
+                ReturnValues="ALL_NEW",
+            )
+            return response["Attributes"]
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+            # Already counted for this message (redelivery or repeated part)
+            response = self.table.get_item(Key=key, ConsistentRead=True)
+            return response.get("Item", {})
+
+    def release_reference(self, conversation_id: str, message_id: str, sha256: str) -> int:
+        """Drop an email's reference; the item is deleted when no references remain.
+
+        Args:
+            conversation_id: Conversation identifier
+            message_id: Message-ID whose reference is released
+            sha256: Attachment digest
+
+        Returns:
+            Remaining reference count
+        """
+        key = {"sha256": sha256, "conversation_id": conversation_id}
+        try:
+            response = self.table.update_item(
+                Key=key,
+                UpdateExpression="ADD ref_count :minus DELETE message_ids :mids",
+                ConditionExpression="contains(message_ids, :mid)",
+                ExpressionAttributeValues={
+                    ":minus": Decimal(-1),
+                    ":mids": {message_id},
+                    ":mid": message_id,
+                },
+                ReturnValues="UPDATED_NEW",
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+            return 0
+
+        remaining = int(response["Attributes"].get("ref_count", 0))
+        if remaining <= 0:
+            try:
+                self.table.delete_item(
+                    Key=key,
+                    ConditionExpression="ref_count <= :zero",
+                    ExpressionAttributeValues={":zero": Decimal(0)},
+                )
+            except ClientError as e:
+                if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                    raise
+        return remaining
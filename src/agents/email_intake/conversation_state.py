@@ -1,42 +1,198 @@
 """Enhanced DynamoDB wrapper with manual approval workflow support."""
 
+import hashlib
+import heapq
+import json
 import logging
+import os
 from datetime import datetime, timedelta, timezone
 from decimal import Decimal
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 from uuid import uuid4
 
 import boto3
+from boto3.dynamodb.conditions import Attr, Key
+from boto3.dynamodb.types import TypeSerializer
 from botocore.exceptions import ClientError
 
 try:
     # For Lambda runtime
+    from reply_blob_store import ReplyBlobStore, hydrate_reply
     from utils import EmailThreadingUtils
 except ImportError:
     # For local development/testing
+    from .reply_blob_store import ReplyBlobStore, hydrate_reply
     from .utils import EmailThreadingUtils
 
 logger = logging.getLogger(__name__)
 
+# Participant index table: one item per (participant, conversation_id), with an
+# LSI sorted by updated_at so a participant's threads can be queried newest-first.
+PARTICIPANT_INDEX_TABLE = os.environ.get("PARTICIPANT_INDEX_TABLE", "conversation_participants")
+PARTICIPANT_UPDATED_AT_INDEX = "UpdatedAtIndex"
+
+# Email storage modes: "inline" keeps the thread in the conversation item's
+# email_history list; "items" writes each email to the email items table keyed by
+# (conversation_id, seq) and keeps only a compact header on the conversation.
+EMAIL_STORAGE_INLINE = "inline"
+EMAIL_STORAGE_ITEMS = "items"
+EMAIL_STORAGE_MODE = os.environ.get("EMAIL_STORAGE_MODE", EMAIL_STORAGE_INLINE)
+EMAIL_ITEMS_TABLE = os.environ.get("EMAIL_ITEMS_TABLE", "conversation_emails")
+
+# Reply index table: reply_id -> conversation_id, written when a reply is queued so
+# review routes that only know the reply ID can resolve it with one key read.
+REPLY_INDEX_TABLE = os.environ.get("REPLY_INDEX_TABLE", "conversation_replies")
+
+# Listing GSI on the conversations table: hash listing_shard, range updated_at.
+# Conversations are spread over LISTING_SHARDS partitions (one by default) so the
+# dashboard can query newest-first; re-run the listing backfill after changing it.
+LISTING_INDEX = "ListingIndex"
+LISTING_SHARDS = int(os.environ.get("LISTING_SHARDS", "1"))
+LISTING_ATTRIBUTES: Tuple[str, ...] = (
+    "conversation_id",
+    "listing_shard",
+    "subject",
+    "participants",
+    "phase",
+    "status",
+    "reply_mode",
+    "created_at",
+    "updated_at",
+    "client_name",
+    "project_name",
+    "project_type",
+    "latest_metadata",
+    "metadata_updated_at",
+    "pending_reply_count",
+    "last_reply_at",
+)
+
+
+def listing_shard_for(conversation_id: str, shards: int = LISTING_SHARDS) -> str:
+    """Stable listing partition for a conversation."""
+    digest = hashlib.sha1(conversation_id.encode("utf-8")).hexdigest()
+    return str(int(digest[:8], 16) % max(shards, 1))
+
+# Top-level attributes each pipeline stage reads. Loading a view projects only
+# these, so hot paths skip pending_replies (with their full llm_prompt strings)
+# and the inline email_history unless the stage actually needs them.
+HEADER_ATTRIBUTES: Tuple[str, ...] = (
+    "conversation_id",
+    "subject",
+    "participants",
+    "phase",
+    "status",
+    "reply_mode",
+    "created_at",
+    "updated_at",
+    "last_seq",
+    "original_message_id",
+    "thread_references",
+    "requirements_version",
+    "client_name",
+    "project_name",
+    "project_type",
+    "email_count",
+    "last_email",
+    "pending_reply_count",
+    "last_reply_at",
+)
+REQUIREMENTS_ATTRIBUTES: Tuple[str, ...] = HEADER_ATTRIBUTES + (
+    "requirements",
+    "revised_requirements",
+    "latest_metadata",
+)
+CONVERSATION_VIEWS: Dict[str, Tuple[str, ...]] = {
+    "header": HEADER_ATTRIBUTES,
+    "requirements": REQUIREMENTS_ATTRIBUTES,
+    # Optimistic-lock state read before appending an email
+    "append": ("conversation_id", "last_seq", "participants", "thread_references", "email_count"),
+    # Duplicate-delivery checks only need the thread
+    "thread": ("conversation_id", "email_history", "email_count"),
+    # Reply review paths (approve/reject/amend) only touch the reply list
+    "replies": ("conversation_id", "phase", "pending_replies"),
+    # AI review/revision: replies plus the thread the reviewer reads
+    "review": (
+        "conversation_id",
+        "phase",
+        "participants",
+        "client_email",
+        "pending_replies",
+        "email_history",
+        "email_count",
+    ),
+    # API approval: reply list plus what PDF generation reads
+    "approval": REQUIREMENTS_ATTRIBUTES + ("pending_replies",),
+    # Vision annotation: requirements plus replies to re-point at the new version
+    "vision": REQUIREMENTS_ATTRIBUTES + ("pending_replies",),
+    # Dashboard detail: everything except pending_replies (served by its own route)
+    "detail": REQUIREMENTS_ATTRIBUTES
+    + (
+        "last_updated_at",
+        "phase_history",
+        "sent_message_ids",
+        "email_history",
+        "understanding_context",
+        "proposal",
+        "final_documentation",
+        "approval_status",
+        "attachments",
+        "metadata",
+        "metadata_updated_at",
+    ),
+}
+
+
+class ReplyStateError(ValueError):
+    """Raised when a pending reply is no longer in the status an update expects."""
+
 
 class ConversationStateManager:
     """Thread-safe conversation state management with manual approval workflow."""
 
-    def __init__(self, table_name: str = "conversations"):
+    def __init__(
+        self,
+        table_name: str = "conversations",
+        participant_table_name: str = PARTICIPANT_INDEX_TABLE,
+        email_storage_mode: str = EMAIL_STORAGE_MODE,
+        emails_table_name: str = EMAIL_ITEMS_TABLE,
+        blob_store: Optional[ReplyBlobStore] = None,
+        reply_index_table_name: str = REPLY_INDEX_TABLE,
+        dynamodb_resource=None,
+    ):
         """Initialize with DynamoDB table.
 
         Args:
             table_name: Name of DynamoDB table
+            participant_table_name: Name of the participant index table
+            email_storage_mode: "inline" or "items" (see EMAIL_STORAGE_MODE)
+            emails_table_name: Name of the per-email items table
+            blob_store: Store for large reply prompts; defaults to one configured
+                from REPLY_BLOB_BUCKET, or inline storage when that is unset
+            reply_index_table_name: Name of the reply ID -> conversation table
+            dynamodb_resource: Optional shared DynamoDB resource (see service_container)
         """
-        self.dynamodb = boto3.resource("dynamodb")
+        if email_storage_mode not in (EMAIL_STORAGE_INLINE, EMAIL_STORAGE_ITEMS):
+            raise ValueError(f"Invalid email storage mode: {email_storage_mode}")
+
+        self.dynamodb = dynamodb_resource or boto3.resource("dynamodb")
         self.table = self.dynamodb.Table(table_name)
         self.table_name = table_name
+        self.participant_table = self.dynamodb.Table(participant_table_name)
+        self.participant_table_name = participant_table_name
+        self.email_storage_mode = email_storage_mode
+        self.emails_table = self.dynamodb.Table(emails_table_name)
+        self.emails_table_name = emails_table_name
+        self.blob_store = blob_store if blob_store is not None else ReplyBlobStore.from_env()
+        self.reply_index_table = self.dynamodb.Table(reply_index_table_name)
+        self.reply_index_table_name = reply_index_table_name
 
     def fetch_or_create_conversation(
         self,
         conversation_id: str,
         original_message_id: str,
         initial_email: Dict[str, Any],
+        view: Optional[str] = None,
     ) -> Dict[str, Any]:
         """Fetch existing conversation or create new one atomically.
 
@@ -44,19 +200,25 @@ class ConversationStateManager:
             conversation_id: Unique conversation identifier
             original_message_id: First email's Message-ID
             initial_email: Initial email data for new conversations
+            view: Optional CONVERSATION_VIEWS name to project an existing
+                conversation; None fetches the full item
 
         Returns:
             Conversation state dict
         """
         try:
             # Try to get existing conversation
-            response = self.table.get_item(
-                Key={"conversation_id": conversation_id}, ConsistentRead=True
-            )
+            if view:
+                existing = self.load_conversation(conversation_id, view, consistent_read=True)
+            else:
+                response = self.table.get_item(
+                    Key={"conversation_id": conversation_id}, ConsistentRead=True
+                )
+                existing = self._deserialize_item(response["Item"]) if "Item" in response else None
 
-            if "Item" in response:
+            if existing:
                 logger.info(f"Found existing conversation: {conversation_id}")
-                return self._deserialize_item(response["Item"])
+                return existing
 
             # If not found by conversation_id, check if this is a reply to a sent message
             in_reply_to = initial_email.get("in_reply_to", "")
@@ -82,6 +244,63 @@ class ConversationStateManager:
             logger.error(f"Error accessing conversation {conversation_id}: {str(e)}")
             raise
 
+    def load_conversation(
+        self,
+        conversation_id: str,
+        view: str = "header",
+        consistent_read: bool = False,
+        extra_attributes: Sequence[str] = (),
+    ) -> Optional[Dict[str, Any]]:
+        """Load only the attributes a pipeline stage needs.
+
+        Args:
+            conversation_id: Conversation identifier
+            view: Name of a CONVERSATION_VIEWS entry
+            consistent_read: Use a strongly consistent read
+            extra_attributes: Additional top-level attributes to project
+
+        Returns:
+            Projected conversation dict, or None if not found
+        """
+        if view not in CONVERSATION_VIEWS:
+            raise ValueError(f"Unknown conversation view: {view}")
+
+        projection, names = self._build_projection(
+            tuple(CONVERSATION_VIEWS[view]) + tuple(extra_attributes)
+        )
+        response = self.table.get_item(
+            Key={"conversation_id": conversation_id},
+            ProjectionExpression=projection,
+            ExpressionAttributeNames=names,
+            ConsistentRead=consistent_read,
+        )
+
+        if "Item" not in response:
+            return None
+        return self._deserialize_item(response["Item"])
+
+    def load_header(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        """Load the compact conversation header (no replies, emails or requirements)."""
+        return self.load_conversation(conversation_id, "header")
+
+    def load_requirements_view(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        """Load the header plus requirements and extracted metadata."""
+        return self.load_conversation(conversation_id, "requirements")
+
+    def load_replies_view(
+        self, conversation_id: str, consistent_read: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        """Load the pending reply list and current phase for reply review paths."""
+        return self.load_conversation(conversation_id, "replies", consistent_read=consistent_read)
+
+    @staticmethod
+    def _build_projection(attributes: Sequence[str]) -> Tuple[str, Dict[str, str]]:
+        """Build a ProjectionExpression with every name aliased (many are reserved words)."""
+        names: Dict[str, str] = {}
+        for attribute in dict.fromkeys(attributes):
+            names[f"#p{len(names)}"] = attribute
+        return ", ".join(names), names
+
     def _create_conversation_atomic(
         self,
         conversation_id: str,
@@ -127,11 +346,19 @@ class ConversationStateManager:
             # NEW: Manual approval workflow fields
             "reply_mode": "manual",  # "manual" | "auto" - default to manual
             "pending_replies": [],  # List of pending replies awaiting approval
+            "pending_reply_count": Decimal(0),  # Replies still in "pending" status
             "attachments": [],  # List of attachments sent/received
             # Metadata
             "metadata": {"priority": "medium", "tags": [], "client_info": {}},
+            # Listing index partition
+            "listing_shard": listing_shard_for(conversation_id),
         }
 
+        if self.email_storage_mode == EMAIL_STORAGE_ITEMS:
+            # Emails live in the email items table; the header only tracks a count
+            del conversation["email_history"]
+            conversation["email_count"] = Decimal(0)
+
         try:
             # Conditional put - only if conversation doesn't exist
             self.table.put_item(
@@ -188,13 +415,27 @@ class ConversationStateManager:
                 "metadata": metadata or {},
             }
 
+            if self.blob_store:
+                try:
+                    self.blob_store.offload_reply(pending_reply)
+                except Exception as e:
+                    # Keep the prompt inline rather than losing the draft
+                    logger.warning(f"Failed to offload prompt for reply {reply_id}: {str(e)}")
+                    pending_reply["llm_prompt"] = llm_prompt
+                    pending_reply.pop("llm_prompt_ref", None)
+
+            # Index the reply first so it is never visible without its mapping
+            self._put_reply_index(reply_id, conversation_id, now)
+
             # Update conversation with new pending reply
             self.table.update_item(
                 Key={"conversation_id": conversation_id},
                 UpdateExpression="""
                     SET pending_replies = list_append(if_not_exists(pending_replies, :empty), :reply),
                         updated_at = :updated,
+                        last_reply_at = :updated,
                         last_seq = last_seq + :one
+                    ADD pending_reply_count :one
                 """,
                 ExpressionAttributeValues={
                     ":empty": [],
@@ -212,6 +453,99 @@ class ConversationStateManager:
             logger.error(f"Error adding pending reply: {str(e)}")
             raise
 
+    def find_conversation_for_reply(self, reply_id: str) -> Optional[str]:
+        """Resolve the conversation that owns a reply.
+
+        Reads the reply index only. Replies queued before the index existed are
+        indexed by ``migrate_dynamodb --backfill-replies``; until then they miss.
+
+        Args:
+            reply_id: Reply identifier
+
+        Returns:
+            The conversation ID, or None if the reply is not indexed
+        """
+        response = self.reply_index_table.get_item(Key={"reply_id": reply_id})
+        if "Item" not in response:
+            logger.info(f"Reply {reply_id} not found in reply index")
+            return None
+        return response["Item"]["conversation_id"]
+
+    def load_reply(
+        self, reply_id: str, view: str = "replies"
+    ) -> Optional[Tuple[Dict[str, Any], int, Dict[str, Any]]]:
+        """Load a reply and its conversation by reply ID.
+
+        Args:
+            reply_id: Reply identifier
+            view: CONVERSATION_VIEWS entry to load; must include pending_replies
+
+        Returns:
+            Tuple of (conversation, reply index, reply), or None if not found
+        """
+        conversation_id = self.find_conversation_for_reply(reply_id)
+        if not conversation_id:
+            return None
+
+        conversation = self.load_conversation(conversation_id, view)
+        if conversation is None:
+            return None
+
+        for i, reply in enumerate(conversation.get("pending_replies", [])):
+            if reply.get("reply_id") == reply_id:
+                return conversation, i, reply
+        return None
+
+    def _put_reply_index(self, reply_id: str, conversation_id: str, created_at: str) -> None:
+        """Write the reply ID -> conversation mapping (non-fatal on failure)."""
+        try:
+            self.reply_index_table.put_item(
+                Item={
+                    "reply_id": reply_id,
+                    "conversation_id": conversation_id,
+                    "created_at": created_at,
+                }
+            )
+        except Exception as e:
+            # The reply stays reachable from its conversation; --backfill-replies re-indexes it
+            logger.error(f"Failed to index reply {reply_id}: {str(e)}")
+
+    def delete_reply_index(self, replies: List[Dict[str, Any]]) -> int:
+        """Delete the reply index entries of a deleted conversation's replies.
+
+        Index entries do not expire, so they are removed with their conversation.
+
+        Args:
+            replies: The conversation's pending_replies
+
+        Returns:
+            Number of index entries deleted
+        """
+        deleted = 0
+        with self.reply_index_table.batch_writer() as batch:
+            for reply in replies:
+                if reply.get("reply_id"):
+                    batch.delete_item(Key={"reply_id": reply["reply_id"]})
+                    deleted += 1
+        logger.info(f"Deleted {deleted} reply index entries")
+        return deleted
+
+    def get_reply_prompt(self, reply_id: str) -> Optional[str]:
+        """Get the LLM prompt for a reply, loading it from S3 if it was offloaded.
+
+        Args:
+            reply_id: Reply identifier
+
+        Returns:
+            The prompt text, or None if the reply is not found
+        """
+        found = self.load_reply(reply_id)
+        if found is None:
+            return None
+
+        _, _, reply = found
+        return hydrate_reply(reply, ("llm_prompt",), store=self.blob_store).get("llm_prompt")
+
     def approve_reply(
         self,
         conversation_id: str,
@@ -231,54 +565,141 @@ class ConversationStateManager:
             The approved reply data
         """
         try:
-            # Get current conversation
-            response = self.table.get_item(
-                Key={"conversation_id": conversation_id}, ConsistentRead=True
+            now = datetime.now(timezone.utc).isoformat()
+            updates: Dict[str, Any] = {
+                "status": "approved",
+                "reviewed_by": reviewed_by,
+                "reviewed_at": now,
+            }
+            if amended_content:
+                updates["amended_content"] = amended_content
+                updates["amended_at"] = now
+
+            return self.update_reply(
+                conversation_id, reply_id, updates, expected_status="pending", reply_activity=True
             )
 
-            if "Item" not in response:
-                raise ValueError(f"Conversation {conversation_id} not found")
+        except Exception as e:
+            logger.error(f"Error approving reply: {str(e)}")
+            raise
 
-            conversation = response["Item"]
-            pending_replies = conversation.get("pending_replies", [])
+    def update_reply(
+        self,
+        conversation_id: str,
+        reply_id: str,
+        updates: Dict[str, Any],
+        expected_status: Optional[str] = None,
+        reply_index: Optional[int] = None,
+        reply_activity: bool = False,
+    ) -> Dict[str, Any]:
+        """Update fields of a single pending reply in place.
 
-            # Find and update the reply
-            updated_reply = None
-            for i, reply in enumerate(pending_replies):
-                if reply.get("reply_id") == reply_id:
-                    if reply.get("status") != "pending":
-                        raise ValueError(f"Reply {reply_id} is not pending")
+        Writes only ``pending_replies[i].<field>`` paths, conditioned on the entry
+        at that index still being this reply (and, optionally, still in the
+        expected status), so concurrent reviewers cannot overwrite each other.
+        Moving a reply out of "pending" decrements pending_reply_count in the
+        same write; moving it back (e.g. "sending" -> "pending") increments it.
 
-                    now = datetime.now(timezone.utc).isoformat()
-                    pending_replies[i]["status"] = "approved"
-                    pending_replies[i]["reviewed_by"] = reviewed_by
-                    pending_replies[i]["reviewed_at"] = now
+        Args:
+            conversation_id: Conversation identifier
+            reply_id: Reply identifier
+            updates: Top-level reply fields to set
+            expected_status: Status the reply must currently have, if any
+            reply_index: Position of the reply if the caller already knows it
+            reply_activity: Also bump last_reply_at (review actions, not caching)
 
-                    if amended_content:
-                        pending_replies[i]["amended_content"] = amended_content
-                        pending_replies[i]["amended_at"] = now
+        Returns:
+            The reply with updates applied (just reply_id and the updates when
+            reply_index was supplied and the list was not read)
 
-                    updated_reply = pending_replies[i]
-                    break
+        Raises:
+            ValueError: If the conversation or reply is not found
+            ReplyStateError: If the reply is not in expected_status
+        """
+        reply: Dict[str, Any] = {"reply_id": reply_id}
+
+        for attempt in range(2):
+            if reply_index is None:
+                reply_index, reply = self._find_reply(conversation_id, reply_id)
+                if expected_status and reply.get("status") != expected_status:
+                    raise ReplyStateError(
+                        f"Reply {reply_id} is {reply.get('status')}, not {expected_status}"
+                    )
+
+            names = {"#status": "status"}
+            values: Dict[str, Any] = {
+                ":rid": reply_id,
+                ":updated": datetime.now(timezone.utc).isoformat(),
+            }
+            assignments = []
+            for n, (field, value) in enumerate(updates.items()):
+                names[f"#f{n}"] = field
+                values[f":v{n}"] = value
+                assignments.append(f"pending_replies[{reply_index}].#f{n} = :v{n}")
+
+            assignments.append("updated_at = :updated")
+            if reply_activity:
+                assignments.append("last_reply_at = :updated")
+            update_expression = "SET " + ", ".join(assignments)
+
+            condition = f"pending_replies[{reply_index}].reply_id = :rid"
+            if expected_status:
+                condition += f" AND pending_replies[{reply_index}].#status = :expected"
+                values[":expected"] = expected_status
+            else:
+                del names["#status"]
 
-            if not updated_reply:
-                raise ValueError(f"Reply {reply_id} not found")
+            # The status condition guarantees this write is the one leaving or
+            # re-entering "pending"
+            new_status = updates.get("status", expected_status)
+            if expected_status and (expected_status == "pending") != (new_status == "pending"):
+                update_expression += " ADD pending_reply_count :delta"
+                values[":delta"] = Decimal(-1 if expected_status == "pending" else 1)
 
-            # Update conversation
-            self.table.update_item(
-                Key={"conversation_id": conversation_id},
-                UpdateExpression="SET pending_replies = :replies, updated_at = :updated",
-                ExpressionAttributeValues={
-                    ":replies": pending_replies,
-                    ":updated": datetime.now(timezone.utc).isoformat(),
-                },
+            try:
+                self.table.update_item(
+                    Key={"conversation_id": conversation_id},
+                    UpdateExpression=update_expression,
+                    ConditionExpression=condition,
+                    ExpressionAttributeNames=names,
+                    ExpressionAttributeValues=self._convert_floats_to_decimal(values),
+                )
+            except ClientError as e:
+                if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                    raise
+                # Either the status changed under us or the caller's index was stale;
+                # re-read once to tell which.
+                if attempt == 0:
+                    logger.info(f"Reply {reply_id} changed concurrently, re-reading")
+                    reply_index = None
+                    continue
+                raise ReplyStateError(f"Reply {reply_id} was updated concurrently")
+
+            reply.update(updates)
+            logger.info(
+                f"Updated reply {reply_id} in conversation {conversation_id}: {sorted(updates)}"
             )
+            return reply
 
-            return updated_reply
+        raise ReplyStateError(f"Reply {reply_id} was updated concurrently")
 
-        except Exception as e:
-            logger.error(f"Error approving reply: {str(e)}")
-            raise
+    def _find_reply(self, conversation_id: str, reply_id: str) -> Tuple[int, Dict[str, Any]]:
+        """Locate a reply in the pending_replies list.
+
+        Returns:
+            Tuple of (index, reply)
+
+        Raises:
+            ValueError: If the conversation or reply is not found
+        """
+        conversation = self.load_replies_view(conversation_id)
+        if conversation is None:
+            raise ValueError(f"Conversation {conversation_id} not found")
+
+        for i, reply in enumerate(conversation.get("pending_replies", [])):
+            if reply.get("reply_id") == reply_id:
+                return i, reply
+        raise ValueError(f"Reply {reply_id} not found")
 
     def add_attachment(
         self,
@@ -413,15 +834,24 @@ class ConversationStateManager:
 
         while retries <= max_retries:
             try:
-                # Get current state with sequence number
-                response = self.table.get_item(
-                    Key={"conversation_id": conversation_id}, ConsistentRead=True
-                )
+                # Get current state with sequence number. Inline mode gets the full
+                # item back from the update, so only the lock fields are read here;
+                # items mode returns this state to the caller and needs all of it.
+                if self.email_storage_mode == EMAIL_STORAGE_ITEMS:
+                    response = self.table.get_item(
+                        Key={"conversation_id": conversation_id}, ConsistentRead=True
+                    )
+                    current_state = (
+                        self._deserialize_item(response["Item"]) if "Item" in response else None
+                    )
+                else:
+                    current_state = self.load_conversation(
+                        conversation_id, "append", consistent_read=True
+                    )
 
-                if "Item" not in response:
+                if current_state is None:
                     raise ValueError(f"Conversation {conversation_id} not found")
 
-                current_state = self._deserialize_item(response["Item"])
                 current_seq = int(current_state.get("last_seq", 0))
 
                 # Prepare email entry
@@ -442,6 +872,22 @@ class ConversationStateManager:
                     EmailThreadingUtils.parse_references(email_data.get("references", "")),
                 )
 
+                if self.email_storage_mode == EMAIL_STORAGE_ITEMS:
+                    updated_state = self._append_email_item(
+                        conversation_id,
+                        email_entry,
+                        current_state,
+                        new_seq,
+                        all_participants,
+                        new_refs,
+                        now,
+                    )
+                    logger.info(
+                        f"Added email item to conversation {conversation_id} (seq: {current_seq} -> {new_seq})"
+                    )
+                    self._update_participant_index(conversation_id, all_participants, updated_state)
+                    return updated_state
+
                 update_response = self.table.update_item(
                     Key={"conversation_id": conversation_id},
                     UpdateExpression="""
@@ -451,10 +897,12 @@ class ConversationStateManager:
                             last_seq = :new_seq,
                             participants = :participants,
                             thread_references = :refs,
-                            #ttl = :ttl
+                            #ttl = :ttl,
+                            listing_shard = if_not_exists(listing_shard, :shard)
                     """,
                     ExpressionAttributeNames={"#ttl": "ttl"},
                     ExpressionAttributeValues={
+                        ":shard": listing_shard_for(conversation_id),
                         ":email": [email_entry],
                         ":updated": now,
                         ":new_seq": Decimal(new_seq),
@@ -470,10 +918,15 @@ class ConversationStateManager:
                 logger.info(
                     f"Added email to conversation {conversation_id} (seq: {current_seq} -> {new_seq})"
                 )
-                return self._deserialize_item(update_response["Attributes"])
+                updated_state = self._deserialize_item(update_response["Attributes"])
+                self._update_participant_index(conversation_id, all_participants, updated_state)
+                return updated_state
 
             except ClientError as e:
-                if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                if e.response["Error"]["Code"] in (
+                    "ConditionalCheckFailedException",
+                    "TransactionCanceledException",
+                ):
                     retries += 1
                     if retries <= max_retries:
                         logger.warning(
@@ -488,6 +941,233 @@ class ConversationStateManager:
                 logger.error(f"Error adding email to {conversation_id}: {str(e)}")
                 raise
 
+    def _append_email_item(
+        self,
+        conversation_id: str,
+        email_entry: Dict[str, Any],
+        current_state: Dict[str, Any],
+        new_seq: int,
+        participants: Iterable[str],
+        thread_references: List[str],
+        now: str,
+    ) -> Dict[str, Any]:
+        """Write one email item and bump the conversation header in a single transaction.
+
+        The header update carries the same ``last_seq`` optimistic lock as the
+        inline path, so a conflict cancels the whole transaction and the caller
+        retries. Returns the updated header (without email_history).
+        """
+        serializer = TypeSerializer()
+        email_count = int(current_state.get("email_count", 0)) + 1
+        ttl = EmailThreadingUtils.calculate_ttl(days=30)
+        last_email = {
+            "seq": Decimal(new_seq),
+            "email_id": email_entry["email_id"],
+            "message_id": email_entry["message_id"],
+            "from": email_entry["from"],
+            "subject": email_entry["subject"],
+            "timestamp": email_entry["timestamp"],
+            "direction": email_entry["direction"],
+        }
+        header_values = {
+            ":updated": now,
+            ":new_seq": Decimal(new_seq),
+            ":current_seq": Decimal(int(current_state.get("last_seq", 0))),
+            ":participants": set(participants),
+            ":refs": thread_references,
+            ":ttl": ttl,
+            ":count": Decimal(email_count),
+            ":last_email": last_email,
+            ":shard": listing_shard_for(conversation_id),
+        }
+        email_item = {
+            "conversation_id": conversation_id,
+            "seq": Decimal(new_seq),
+            **self._convert_floats_to_decimal(email_entry),
+        }
+
+        self.dynamodb.meta.client.transact_write_items(
+            TransactItems=[
+                {
+                    "Update": {
+                        "TableName": self.table_name,
+                        "Key": {"conversation_id": serializer.serialize(conversation_id)},
+                        "UpdateExpression": """
+                            SET updated_at = :updated,
+                                last_updated_at = :updated,
+                                last_seq = :new_seq,
+                                participants = :participants,
+                                thread_references = :refs,
+                                #ttl = :ttl,
+                                email_count = :count,
+                                last_email = :last_email,
+                                listing_shard = if_not_exists(listing_shard, :shard)
+                        """,
+                        "ConditionExpression": "last_seq = :current_seq",
+                        "ExpressionAttributeNames": {"#ttl": "ttl"},
+                        "ExpressionAttributeValues": {
+                            k: serializer.serialize(v) for k, v in header_values.items()
+                        },
+                    }
+                },
+                {
+                    "Put": {
+                        "TableName": self.emails_table_name,
+                        "Item": {k: serializer.serialize(v) for k, v in email_item.items()},
+                        "ConditionExpression": "attribute_not_exists(seq)",
+                    }
+                },
+            ]
+        )
+
+        updated_state = dict(current_state)
+        updated_state.update(
+            {
+                "updated_at": now,
+                "last_updated_at": now,
+                "last_seq": new_seq,
+                "participants": list(participants),
+                "thread_references": thread_references,
+                "ttl": ttl,
+                "email_count": email_count,
+                "last_email": self._deserialize_item(last_email),
+            }
+        )
+        return updated_state
+
+    def get_email_page(
+        self,
+        conversation_id: str,
+        limit: int = 20,
+        next_token: Optional[str] = None,
+        newest_first: bool = False,
+    ) -> Dict[str, Any]:
+        """Read one page of a conversation's emails.
+
+        In "items" mode this is a key-range query on the email items table, so the
+        cost depends on the page size rather than the thread length. In "inline"
+        mode the history is sliced out of the conversation item.
+
+        Args:
+            conversation_id: Conversation identifier
+            limit: Maximum number of emails to return
+            next_token: Opaque token from a previous page
+            newest_first: Return the most recent emails first
+
+        Returns:
+            Dict with ``emails`` and ``next_token`` (None on the last page)
+        """
+        if self.email_storage_mode == EMAIL_STORAGE_INLINE:
+            response = self.table.get_item(
+                Key={"conversation_id": conversation_id}, ProjectionExpression="email_history"
+            )
+            history = response.get("Item", {}).get("email_history", [])
+            if newest_first:
+                history = list(reversed(history))
+            offset = int(next_token) if next_token else 0
+            page = history[offset : offset + limit]
+            has_more = offset + limit < len(history)
+            return {
+                "emails": [self._deserialize_item(email) for email in page],
+                "next_token": str(offset + limit) if has_more else None,
+            }
+
+        query_kwargs: Dict[str, Any] = {
+            "KeyConditionExpression": Key("conversation_id").eq(conversation_id),
+            "ScanIndexForward": not newest_first,
+            "Limit": limit,
+        }
+        if next_token:
+            query_kwargs["ExclusiveStartKey"] = json.loads(next_token)
+
+        response = self.emails_table.query(**query_kwargs)
+
+        result: Dict[str, Any] = {
+            "emails": [self._deserialize_item(item) for item in response.get("Items", [])],
+            "next_token": None,
+        }
+        if "LastEvaluatedKey" in response:
+            result["next_token"] = json.dumps(response["LastEvaluatedKey"], default=str)
+        return result
+
+    def get_email_history(self, conversation_id: str) -> List[Dict[str, Any]]:
+        """Load a conversation's full email history, oldest first."""
+        emails: List[Dict[str, Any]] = []
+        next_token = None
+        while True:
+            page = self.get_email_page(conversation_id, limit=100, next_token=next_token)
+            emails.extend(page["emails"])
+            next_token = page["next_token"]
+            if not next_token:
+                return emails
+
+    def hydrate_email_history(self, conversation: Dict[str, Any]) -> Dict[str, Any]:
+        """Fill ``email_history`` on a freshly loaded conversation header.
+
+        No-op in inline mode. In items mode any inline history left on a
+        conversation that has not been split yet (see
+        ``DynamoDBMigration.split_email_history``) is kept ahead of the email
+        items, so call this once per loaded header.
+        """
+        if self.email_storage_mode == EMAIL_STORAGE_ITEMS:
+            legacy_history = list(conversation.get("email_history") or [])
+            conversation["email_history"] = legacy_history + self.get_email_history(
+                conversation["conversation_id"]
+            )
+        return conversation
+
+    def has_email(self, conversation_id: str, message_id: str) -> bool:
+        """Check whether an email with this Message-ID is already in the thread.
+
+        Used before re-appending a redelivered inbound email.
+
+        Args:
+            conversation_id: Conversation identifier
+            message_id: Message-ID header of the email
+
+        Returns:
+            True if the conversation already holds the email
+        """
+        target = EmailThreadingUtils.canonicalize_message_id(message_id)
+        if not target:
+            return False
+
+        conversation = self.load_conversation(conversation_id, "thread", consistent_read=True)
+        if conversation is None:
+            return False
+
+        history = self.hydrate_email_history(conversation).get("email_history") or []
+        return any(
+            EmailThreadingUtils.canonicalize_message_id(email.get("message_id", "")) == target
+            for email in history
+        )
+
+    def delete_email_items(self, conversation_id: str) -> int:
+        """Delete every email item stored for a conversation.
+
+        Returns:
+            Number of email items deleted
+        """
+        deleted = 0
+        query_kwargs: Dict[str, Any] = {
+            "KeyConditionExpression": Key("conversation_id").eq(conversation_id),
+            "ProjectionExpression": "conversation_id, seq",
+        }
+        with self.emails_table.batch_writer() as batch:
+            while True:
+                response = self.emails_table.query(**query_kwargs)
+                for item in response.get("Items", []):
+                    batch.delete_item(
+                        Key={"conversation_id": item["conversation_id"], "seq": item["seq"]}
+                    )
+                    deleted += 1
+                if "LastEvaluatedKey" not in response:
+                    break
+                query_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+        logger.info(f"Deleted {deleted} email items for conversation {conversation_id}")
+        return deleted
+
     def _prepare_email_entry(
         self,
         conversation_id: str,
@@ -544,15 +1224,12 @@ class ConversationStateManager:
             Updated conversation state
         """
         try:
-            # Get current state
-            response = self.table.get_item(
-                Key={"conversation_id": conversation_id}, ConsistentRead=True
-            )
+            # Get current version
+            current_state = self.load_conversation(conversation_id, "header", consistent_read=True)
 
-            if "Item" not in response:
+            if current_state is None:
                 raise ValueError(f"Conversation {conversation_id} not found")
 
-            current_state = self._deserialize_item(response["Item"])
             current_version = int(current_state.get("requirements_version", 0))
 
             # If expected version provided, validate it
@@ -739,6 +1416,79 @@ class ConversationStateManager:
             logger.error(f"Error updating phase for {conversation_id}: {str(e)}")
             raise
 
+    def schedule_response(self, conversation_id: str, seq: int) -> bool:
+        """Mark a conversation as awaiting a (debounced) response as of ``seq``.
+
+        ``response_due_seq`` only moves forward, so the delayed check carrying
+        the newest token is the only one that can claim the response.
+
+        Args:
+            conversation_id: Conversation identifier
+            seq: Token for the scheduled check (``last_seq`` after the append)
+
+        Returns:
+            True if recorded, False if a newer check is already scheduled
+        """
+        try:
+            self.table.update_item(
+                Key={"conversation_id": conversation_id},
+                UpdateExpression="SET response_due_seq = :seq, response_due_at = :now",
+                ConditionExpression=(
+                    "attribute_not_exists(response_due_seq) OR response_due_seq < :seq"
+                ),
+                ExpressionAttributeValues={
+                    ":seq": Decimal(seq),
+                    ":now": datetime.now(timezone.utc).isoformat(),
+                },
+            )
+            return True
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                logger.info(f"Newer response check already scheduled for {conversation_id}")
+                return False
+            raise
+
+    def claim_response(self, conversation_id: str, seq: int) -> Optional[Dict[str, Any]]:
+        """Claim the debounced response for ``seq`` if no newer email arrived since.
+
+        Args:
+            conversation_id: Conversation identifier
+            seq: Token carried by the delayed check
+
+        Returns:
+            Full conversation state if claimed, None if the check is stale or
+            the response was already generated
+        """
+        try:
+            response = self.table.update_item(
+                Key={"conversation_id": conversation_id},
+                UpdateExpression="SET response_seq = :seq",
+                ConditionExpression=(
+                    "response_due_seq = :seq "
+                    "AND (attribute_not_exists(response_seq) OR response_seq < :seq)"
+                ),
+                ExpressionAttributeValues={":seq": Decimal(seq)},
+                ReturnValues="ALL_NEW",
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                return None
+            raise
+        return self._deserialize_item(response["Attributes"])
+
+    def release_response_claim(self, conversation_id: str, seq: int) -> None:
+        """Undo claim_response after a failed pass so a retried check can claim again."""
+        try:
+            self.table.update_item(
+                Key={"conversation_id": conversation_id},
+                UpdateExpression="REMOVE response_seq",
+                ConditionExpression="response_seq = :seq",
+                ExpressionAttributeValues={":seq": Decimal(seq)},
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+
     def add_outbound_reply(
         self, conversation_id: str, reply_data: Dict[str, Any]
     ) -> Dict[str, Any]:
@@ -830,41 +1580,280 @@ class ConversationStateManager:
             logger.error(f"Error finding conversation by sent message ID {message_id}: {str(e)}")
             return None
 
+    def list_conversations_page(
+        self,
+        limit: int = 20,
+        next_token: Optional[str] = None,
+        phase: Optional[str] = None,
+        status: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """List conversations newest first from the listing index.
+
+        Each shard is queried in updated_at order and the streams are merged, so a
+        page costs O(limit) reads per shard regardless of table size.
+
+        Args:
+            limit: Maximum conversations to return
+            next_token: Token from a previous page
+            phase: Optional phase filter
+            status: Optional status filter
+
+        Returns:
+            Dict with "conversations" (listing attributes only) and "next_token"
+            (None when there are no more results)
+        """
+        # Token maps each shard to the key of the last item returned from it
+        cursors: Dict[str, Dict[str, Any]] = json.loads(next_token) if next_token else {}
+        shards = [str(n) for n in range(max(LISTING_SHARDS, 1))]
+
+        filter_expression = None
+        if phase:
+            filter_expression = Attr("phase").eq(phase)
+        if status:
+            status_filter = Attr("status").eq(status)
+            filter_expression = (
+                status_filter if filter_expression is None else filter_expression & status_filter
+            )
+
+        projection, names = self._build_projection(LISTING_ATTRIBUTES)
+        streams = []
+        for shard in shards:
+            query_kwargs = {
+                "IndexName": LISTING_INDEX,
+                "KeyConditionExpression": Key("listing_shard").eq(shard),
+                "ScanIndexForward": False,
+                "Limit": limit,
+                "ProjectionExpression": projection,
+                "ExpressionAttributeNames": names,
+            }
+            if filter_expression is not None:
+                query_kwargs["FilterExpression"] = filter_expression
+            streams.append(self._listing_stream(shard, query_kwargs, cursors.get(shard)))
+
+        merged = heapq.merge(*streams, key=lambda entry: entry[0], reverse=True)
+
+        conversations = []
+        has_more = False
+        try:
+            for _, shard, item in merged:
+                if len(conversations) == limit:
+                    has_more = True
+                    break
+                conversations.append(self._deserialize_item(dict(item)))
+                cursors[shard] = {
+                    "conversation_id": item["conversation_id"],
+                    "listing_shard": shard,
+                    "updated_at": item["updated_at"],
+                }
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ValidationException":
+                raise
+            # Index not created yet; keep the dashboard working with the old scan
+            logger.warning(f"Listing index unavailable, falling back to scan: {str(e)}")
+            return self._scan_conversations_page(limit, next_token, filter_expression)
+
+        return {
+            "conversations": conversations,
+            "next_token": json.dumps(cursors, default=str) if has_more else None,
+        }
+
+    def _scan_conversations_page(
+        self, limit: int, next_token: Optional[str], filter_expression: Any
+    ) -> Dict[str, Any]:
+        """Legacy listing: one scan page sorted by updated_at."""
+        projection, names = self._build_projection(LISTING_ATTRIBUTES)
+        scan_kwargs = {
+            "Limit": limit,
+            "ProjectionExpression": projection,
+            "ExpressionAttributeNames": names,
+        }
+        if filter_expression is not None:
+            scan_kwargs["FilterExpression"] = filter_expression
+        if next_token:
+            scan_kwargs["ExclusiveStartKey"] = json.loads(next_token)
+
+        response = self.table.scan(**scan_kwargs)
+        conversations = [self._deserialize_item(item) for item in response.get("Items", [])]
+        conversations.sort(key=lambda item: item.get("updated_at", ""), reverse=True)
+
+        return {
+            "conversations": conversations,
+            "next_token": (
+                json.dumps(response["LastEvaluatedKey"], default=str)
+                if "LastEvaluatedKey" in response
+                else None
+            ),
+        }
+
+    def _listing_stream(
+        self,
+        shard: str,
+        query_kwargs: Dict[str, Any],
+        start_key: Optional[Dict[str, Any]],
+    ) -> Iterable[Tuple[str, str, Dict[str, Any]]]:
+        """Yield (updated_at, shard, item) from one listing shard, newest first."""
+        if start_key:
+            query_kwargs["ExclusiveStartKey"] = start_key
+        while True:
+            response = self.table.query(**query_kwargs)
+            for item in response.get("Items", []):
+                yield item.get("updated_at", ""), shard, item
+            if "LastEvaluatedKey" not in response:
+                return
+            query_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
     def get_conversations_by_participant(
         self, email_address: str, status_filter: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """Query conversations by participant email.
 
+        Reads conversation IDs from the participant index (newest first) and
+        batch-fetches the full items. Falls back to a table scan if the index
+        table has not been created yet.
+
         Args:
             email_address: Participant email address
             status_filter: Optional status filter
 
         Returns:
-            List of conversations
+            List of conversations, most recently updated first
         """
         try:
-            # This would use GSI2 (ParticipantIndex) once created
-            # For now, scan with filter
-            filter_exp = "contains(participants, :email)"
-            exp_values = {":email": email_address.lower()}
+            conversation_ids: List[str] = []
+            next_token = None
+            while True:
+                page = self.query_conversations_by_participant(
+                    email_address, limit=100, next_token=next_token
+                )
+                conversation_ids.extend(c["conversation_id"] for c in page["conversations"])
+                next_token = page["next_token"]
+                if not next_token:
+                    break
 
+            items = self._batch_get_conversations(conversation_ids)
             if status_filter:
-                filter_exp += " AND #status = :status"
-                exp_values[":status"] = status_filter
+                items = [item for item in items if item.get("status") == status_filter]
+            return items
 
-            response = self.table.scan(
-                FilterExpression=filter_exp,
-                ExpressionAttributeNames=({"#status": "status"} if status_filter else None),
-                ExpressionAttributeValues=exp_values,
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ResourceNotFoundException":
+                logger.error(f"Error querying by participant {email_address}: {str(e)}")
+                raise
+            logger.warning(
+                f"Participant index {self.participant_table_name} not found, falling back to scan"
             )
-
-            items = [self._deserialize_item(item) for item in response.get("Items", [])]
-            return sorted(items, key=lambda x: x.get("updated_at", ""), reverse=True)
-
+            return self._scan_conversations_by_participant(email_address, status_filter)
         except Exception as e:
             logger.error(f"Error querying by participant {email_address}: {str(e)}")
             raise
 
+    def query_conversations_by_participant(
+        self,
+        email_address: str,
+        limit: int = 20,
+        next_token: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Page through a participant's conversations, newest first, without scanning.
+
+        Args:
+            email_address: Participant email address
+            limit: Maximum number of index entries to return
+            next_token: Opaque token from a previous page
+
+        Returns:
+            Dict with ``conversations`` (index entries holding conversation_id,
+            subject, status, phase, last_seq and updated_at) and ``next_token``
+            (None on the last page)
+        """
+        query_kwargs: Dict[str, Any] = {
+            "IndexName": PARTICIPANT_UPDATED_AT_INDEX,
+            "KeyConditionExpression": Key("participant").eq(email_address.lower()),
+            "ScanIndexForward": False,
+            "Limit": limit,
+        }
+        if next_token:
+            query_kwargs["ExclusiveStartKey"] = json.loads(next_token)
+
+        response = self.participant_table.query(**query_kwargs)
+
+        result: Dict[str, Any] = {
+            "conversations": [self._deserialize_item(item) for item in response.get("Items", [])],
+            "next_token": None,
+        }
+        if "LastEvaluatedKey" in response:
+            result["next_token"] = json.dumps(response["LastEvaluatedKey"], default=str)
+        return result
+
+    def _update_participant_index(
+        self,
+        conversation_id: str,
+        participants: Iterable[str],
+        conversation: Dict[str, Any],
+    ) -> None:
+        """Upsert one participant index item per (participant, conversation).
+
+        Failures are logged and swallowed: the conversation item remains the
+        source of truth and the next appended email refreshes the index.
+        """
+        try:
+            with self.participant_table.batch_writer(
+                overwrite_by_pkeys=["participant", "conversation_id"]
+            ) as batch:
+                for participant in sorted({p.lower() for p in participants if p}):
+                    batch.put_item(
+                        Item={
+                            "participant": participant,
+                            "conversation_id": conversation_id,
+                            "updated_at": conversation.get("updated_at", ""),
+                            "subject": conversation.get("subject", ""),
+                            "status": conversation.get("status", "active"),
+                            "phase": conversation.get("phase", "understanding"),
+                            "last_seq": Decimal(int(conversation.get("last_seq", 0))),
+                            "ttl": conversation.get("ttl")
+                            or EmailThreadingUtils.calculate_ttl(days=30),
+                        }
+                    )
+        except Exception as e:
+            logger.warning(f"Failed to update participant index for {conversation_id}: {str(e)}")
+
+    def _batch_get_conversations(self, conversation_ids: List[str]) -> List[Dict[str, Any]]:
+        """Fetch full conversation items by ID, preserving the given order."""
+        found: Dict[str, Dict[str, Any]] = {}
+        # BatchGetItem accepts at most 100 keys per request
+        for start in range(0, len(conversation_ids), 100):
+            request = {
+                self.table_name: {
+                    "Keys": [{"conversation_id": cid} for cid in conversation_ids[start : start + 100]]
+                }
+            }
+            while request:
+                response = self.dynamodb.batch_get_item(RequestItems=request)
+                for item in response.get("Responses", {}).get(self.table_name, []):
+                    found[item["conversation_id"]] = self._deserialize_item(item)
+                request = response.get("UnprocessedKeys") or None
+
+        return [found[cid] for cid in conversation_ids if cid in found]
+
+    def _scan_conversations_by_participant(
+        self, email_address: str, status_filter: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Legacy scan-based participant lookup, used before the index table exists."""
+        filter_exp = "contains(participants, :email)"
+        exp_values = {":email": email_address.lower()}
+
+        if status_filter:
+            filter_exp += " AND #status = :status"
+            exp_values[":status"] = status_filter
+
+        response = self.table.scan(
+            FilterExpression=filter_exp,
+            ExpressionAttributeNames=({"#status": "status"} if status_filter else None),
+            ExpressionAttributeValues=exp_values,
+        )
+
+        items = [self._deserialize_item(item) for item in response.get("Items", [])]
+        return sorted(items, key=lambda x: x.get("updated_at", ""), reverse=True)
+
     def _deserialize_item(self, item: Dict[str, Any]) -> Dict[str, Any]:
         """Convert DynamoDB item to Python dict with proper types."""
         # Convert Decimal to int/float
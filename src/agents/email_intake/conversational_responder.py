@@ -16,10 +16,10 @@ try:
     USE_AI_PROVIDER = True
 except ImportError:
     # Running in Lambda environment
-    import boto3
-
     USE_AI_PROVIDER = False
 
+from src.common.bedrock_invoker import build_cached_request, get_bedrock_invoker, usage_summary
+
 logger = logging.getLogger(__name__)
 
 # Get AI provider from environment
@@ -43,24 +43,30 @@ def decimal_to_json_serializable(obj):
 class ConversationalResponder:
     """Generates unified conversational responses with Claude 4 Sonnet."""
 
-    def __init__(self, sender_name="Abdul", calendly_link="[CALENDLY_LINK]"):
+    def __init__(
+        self,
+        sender_name="Abdul",
+        calendly_link="[CALENDLY_LINK]",
+        bedrock_client=None,
+        metadata_extractor=None,
+    ):
         """Initialize with AI provider or Bedrock client.
 
         Args:
             sender_name: Name to use in email signatures
             calendly_link: Calendly link for scheduling meetings
+            bedrock_client: Optional shared Bedrock runtime client
+            metadata_extractor: Optional shared MetadataExtractor
         """
         self.sender_name = sender_name
         self.calendly_link = calendly_link
-        self.metadata_extractor = MetadataExtractor()
+        self.metadata_extractor = metadata_extractor or MetadataExtractor()
 
         if USE_AI_PROVIDER:
             self.provider = get_provider(AI_PROVIDER)
         else:
             # Lambda environment - use Bedrock directly
-            self.bedrock_client = boto3.client(
-                "bedrock-runtime", region_name=os.environ.get("AWS_REGION", "us-east-2")
-            )
+            self.invoker = get_bedrock_invoker(bedrock_client)
             self.inference_profile_arn = (
                 os.environ.get("BEDROCK_IP_ARN")
                 or os.environ.get("VISION_INFERENCE_PROFILE_ARN")
@@ -119,20 +125,24 @@ class ConversationalResponder:
     ) -> Tuple[str, Dict[str, Any], str]:
         """Generate response using unified approach with full context."""
         
-        # Build comprehensive prompt
-        prompt = self._build_unified_prompt(
+        # Build comprehensive prompt: instructions and history first, then this turn's context
+        system_prompt, history, prompt = self._build_unified_prompt(
             conversation, latest_email, metadata, extraction_notes=extraction_notes
         )
         
         # Generate response body only
-        response_body = self._call_llm(prompt)
+        response_body, usage = self._call_llm(
+            prompt, system_prompt=system_prompt, cached_context=history
+        )
         
         # Determine what action the AI took based on response
         response_metadata = self._analyze_response_action(
             response_body, conversation, metadata
         )
+        if usage:
+            response_metadata["llm_usage"] = usage
         
-        return response_body, response_metadata, prompt
+        return response_body, response_metadata, f"{system_prompt}\n\n{history}\n{prompt}"
 
     def _build_unified_prompt(
         self,
@@ -140,8 +150,15 @@ class ConversationalResponder:
         latest_email: Dict[str, Any],
         metadata: Dict[str, Any],
         extraction_notes: Optional[str] = None,
-    ) -> str:
-        """Build comprehensive prompt with all context."""
+    ) -> Tuple[str, str, str]:
+        """Build comprehensive prompt with all context.
+
+        Returns:
+            Tuple of (system_prompt, history, prompt). The system prompt (instructions
+            plus stage guidance) and the conversation history form the cacheable
+            prefix; on their own the instructions are below Sonnet's 1024-token
+            minimum.
+        """
         
         # Get conversation details
         email_history = conversation.get("email_history", [])
@@ -155,8 +172,8 @@ class ConversationalResponder:
         else:
             client_context = "helping a potential client"
         
-        # Build conversation history
-        history_text = self._build_conversation_history(email_history[-5:])  # Last 5 emails
+        # Build conversation history; the whole thread, so the cached prefix only grows
+        history_text = self._build_conversation_history(email_history)
         
         # Determine conversation stage and capabilities
         stage_info = self._determine_stage_info(conversation, metadata)
@@ -169,7 +186,7 @@ class ConversationalResponder:
                 "- Do not include any other dollar amounts in the response\n"
             )
         
-        prompt = f"""You are {self.sender_name}, a freelance developer {client_context}.
+        prompt = f"""You are {client_context}.
 
 CONVERSATION CONTEXT:
 - Project: {metadata.get('project_name', 'Not yet defined')}
@@ -191,28 +208,32 @@ METADATA ANALYSIS:
 - Key Topics: {', '.join(metadata.get('key_topics', []))}
 - Extraction Notes: {(extraction_notes or '').strip() or 'None provided'}
 
-CONVERSATION HISTORY:
-{history_text}
-
 LATEST EMAIL FROM CLIENT:
 {latest_email.get('body', '')}
 
-{stage_info}
+Should send PDF = {metadata.get('should_send_pdf', False)}
+{pricing_guard}
+
+What is the most appropriate response to this email?"""
+        
+        history = f"CONVERSATION HISTORY:\n{history_text}\n"
+        return f"{self._build_system_prompt()}\n{stage_info}", history, prompt
+
+    def _build_system_prompt(self) -> str:
+        """Static instructions shared by every unified response request."""
+        return f"""You are {self.sender_name}, a freelance developer replying to a potential client by email.
+Stage instructions follow, then the conversation history, context and the client's latest email.
 
 RESPONSE GUIDELINES:
 1. Generate ONLY the email body - no greeting, no signature
 2. Be concise and natural (2-3 paragraphs max)
 3. Focus on the client's specific questions/concerns
 4. Don't repeat information already discussed
-5. IMPORTANT: Should send PDF = {metadata.get('should_send_pdf', False)}
+5. IMPORTANT: Check "Should send PDF" after the stage instructions
    - If True: You MUST mention "attached" or "I've attached" when referring to the proposal
    - If False: DO NOT mention attachments, just discuss the project
 6. If they want a meeting, acknowledge it (system will add Calendly)
-{pricing_guard}
-
-What is the most appropriate response to this email?"""
-        
-        return prompt
+7. If a PRICING GUARD is given, follow it exactly"""
 
     def _determine_stage_info(self, conversation: Dict[str, Any], metadata: Dict[str, Any]) -> str:
         """Determine stage-specific instructions based on conversation state."""
@@ -371,37 +392,38 @@ CONSTRAINTS:
         
         return response_metadata
 
-    def _call_llm(self, prompt: str) -> str:
-        """Call LLM with prompt."""
+    def _call_llm(
+        self, prompt: str, system_prompt: str = "", cached_context: str = ""
+    ) -> Tuple[str, Dict[str, int]]:
+        """Call LLM with prompt.
+
+        Returns:
+            Tuple of (response_text, token usage including prompt cache reads/writes)
+        """
         try:
             if USE_AI_PROVIDER:
                 # Use provider
-                response = self.provider.generate_code(prompt, [])
-                return response.strip()
+                full_prompt = "\n\n".join(p for p in (system_prompt, cached_context, prompt) if p)
+                response = self.provider.generate_code(full_prompt, [])
+                return response.strip(), {}
             else:
                 # Call Bedrock directly
-                request_body = {
-                    "anthropic_version": "bedrock-2023-05-31",
-                    "max_tokens": 2000,
-                    "messages": [{"role": "user", "content": prompt}],
-                    "temperature": 0.7,
-                }
-                payload = json.dumps(request_body)
-                if self.inference_profile_arn:
-                    response = self.bedrock_client.invoke_model(
-                        modelId=self.inference_profile_arn,
-                        body=payload,
-                        contentType="application/json",
-                    )
-                else:
-                    response = self.bedrock_client.invoke_model(
-                        modelId=self.model_id,
-                        body=payload,
-                        contentType="application/json",
-                    )
-                response_body = json.loads(response["body"].read())
+                request_body = build_cached_request(
+                    system_prompt,
+                    prompt,
+                    max_tokens=2000,
+                    temperature=0.7,
+                    cached_context=cached_context,
+                    model_id=self.model_id,
+                )
+                response_body = self.invoker.invoke(
+                    request_body,
+                    model_id=self.model_id,
+                    inference_profile_arn=self.inference_profile_arn,
+                    agent="conversational_responder",
+                )
                 content = response_body["content"][0]["text"]
-                return content.strip()
+                return content.strip(), usage_summary(response_body)
 
         except Exception as e:
             logger.error(f"Error calling LLM: {str(e)}", exc_info=True)
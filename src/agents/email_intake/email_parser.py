@@ -1,33 +1,144 @@
 """Email parser for extracting thread information."""
 
+import binascii
 import email
 import email.message
 import logging
+import quopri
 import re
 from datetime import datetime, timezone
+from email.feedparser import BytesFeedParser
+from email.header import Header, decode_header
+from email.policy import compat32
 from email.utils import parsedate_to_datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
 
 try:
     # For Lambda runtime
+    from attachment_store import AttachmentUpload
+    from quote_detector import BLANK, QUOTED, REPLY_HEADER_KINDS, SIGNATURE, iter_line_kinds
     from utils import EmailThreadingUtils
 except ImportError:
     # For local development/testing
+    from .attachment_store import AttachmentUpload
+    from .quote_detector import BLANK, QUOTED, REPLY_HEADER_KINDS, SIGNATURE, iter_line_kinds
     from .utils import EmailThreadingUtils
 
 logger = logging.getLogger(__name__)
 
+# Raw bytes fed to BytesFeedParser per read when parsing a stream
+FEED_CHUNK_SIZE = 64 * 1024
+# Encoded characters decoded per slice when streaming an attachment part
+DECODE_CHUNK_SIZE = 256 * 1024
+
+
+def _header(msg: email.message.Message, name: str, default: str = "") -> str:
+    """Get a header as text.
+
+    compat32 returns ``email.header.Header`` objects for headers with raw 8-bit
+    bytes (e.g. ``Subject: Café plans``); those are decoded as UTF-8, falling
+    back to Latin-1, like the text ``parse`` path sees them.
+    """
+    value = msg.get(name, default)
+    if not isinstance(value, Header):
+        return value
+    text = []
+    for chunk, charset in decode_header(value):
+        if isinstance(chunk, str):
+            text.append(chunk)
+            continue
+        if not charset or charset == "unknown-8bit":
+            charset = "utf-8"
+        try:
+            text.append(chunk.decode(charset))
+        except (LookupError, UnicodeDecodeError):
+            text.append(chunk.decode("latin-1"))
+    return "".join(text)
+
+
+def _is_attachment(part: email.message.Message) -> bool:
+    return "attachment" in _header(part, "Content-Disposition") and bool(part.get_filename())
+
+
+def _payload_bytes(payload: str) -> bytes:
+    """Recover raw bytes from a compat32 payload string (as Message.get_payload does)."""
+    try:
+        return payload.encode("ascii", "surrogateescape")
+    except UnicodeEncodeError:
+        return payload.encode("raw-unicode-escape")
+
+
+def _iter_decoded(
+    payload: str, encoding: str, chunk_size: int = DECODE_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """Decode a transfer-encoded payload in line-aligned slices.
+
+    Args:
+        payload: Encoded part payload
+        encoding: Content-Transfer-Encoding of the part
+        chunk_size: Approximate encoded characters per slice
+
+    Yields:
+        Decoded bytes
+    """
+    encoding = (encoding or "").strip().lower()
+    pending = ""
+    start = 0
+    while start < len(payload):
+        end = payload.find("\n", start + chunk_size)
+        end = len(payload) if end == -1 else end + 1
+        piece = payload[start:end]
+        start = end
+
+        if encoding == "base64":
+            data = pending + "".join(piece.split())
+            usable = len(data) - len(data) % 4
+            pending = data[usable:]
+            if usable:
+                yield binascii.a2b_base64(data[:usable])
+        elif encoding == "quoted-printable":
+            yield quopri.decodestring(_payload_bytes(piece))
+        else:
+            yield _payload_bytes(piece)
+
+    if pending:
+        # Tolerate truncated base64 the way Message.get_payload does
+        yield binascii.a2b_base64(pending + "=" * (-len(pending) % 4))
+
+
+class _StreamedMessage(email.message.Message):
+    """Message whose attachment payloads are handed to the parser on arrival.
+
+    BytesFeedParser sets a part's payload as soon as the part ends, so the
+    encoded text of one attachment is decoded, hashed and uploaded before the
+    next part is read, and only its metadata is kept on the message tree.
+    """
+
+    def __init__(self, store_attachment, policy=compat32):
+        super().__init__(policy)
+        self._store_attachment = store_attachment
+        self.attachment_info: Optional[Dict[str, Any]] = None
+
+    def set_payload(self, payload, charset=None):
+        if isinstance(payload, str) and payload and _is_attachment(self):
+            self.attachment_info = self._store_attachment(self, payload)
+            payload = ""
+        super().set_payload(payload, charset)
+
 
 class EmailParser:
     """Parses raw email content to extract relevant information."""
 
-    def __init__(self, state_manager=None):
+    def __init__(self, state_manager=None, attachment_store=None):
         """Initialize parser with optional state manager.
 
         Args:
             state_manager: ConversationStateManager instance for lookups
+            attachment_store: Optional AttachmentStore; when set, attachment parts
+                are streamed to S3, otherwise they are only hashed and sized
         """
         self.state_manager = state_manager
+        self.attachment_store = attachment_store
 
     def parse(self, raw_email: str) -> Dict[str, Any]:
         """Parse raw email content.
@@ -39,66 +150,102 @@ class EmailParser:
             Parsed email data with thread ID, sender, subject, body
         """
         try:
-            # Parse email message
-            msg = email.message_from_string(raw_email)
-            self.current_msg = msg  # Store for thread ID extraction
-
-            # Extract basic fields
-            from_addr = self._extract_email_address(msg.get("From", ""))
-            subject = msg.get("Subject", "No Subject")
-            message_id = msg.get("Message-ID", "")
-            in_reply_to = msg.get("In-Reply-To", "")
-            references = msg.get("References", "")
-
-            # Extract recipients
-            to_addrs = self._extract_recipients(msg.get("To", ""))
-            cc_addrs = self._extract_recipients(msg.get("Cc", ""))
-
-            # Extract thread information
-            thread_info = self._extract_thread_id(
-                message_id, in_reply_to, references, subject, from_addr
-            )
+            return self._parse_message(email.message_from_string(raw_email))
+        except Exception as e:
+            logger.error(f"Error parsing email: {str(e)}")
+            raise
+
+    def parse_bytes(self, source: Union[bytes, Iterable[bytes], Any]) -> Dict[str, Any]:
+        """Parse a raw email incrementally from bytes.
+
+        The message is fed to ``BytesFeedParser`` in chunks, and each attachment
+        part is decoded, hashed and (with an attachment store) uploaded as soon as
+        it is complete, so neither the whole object nor decoded attachment
+        payloads are held in memory.
 
-            # Extract timestamp
-            date_str = msg.get("Date", "")
-            timestamp = self._parse_date(date_str)
-
-            # Extract body
-            body = self._extract_body(msg)
-
-            # Clean up subject (remove Re:, Fwd:, etc)
-            clean_subject = self._clean_subject(subject)
-
-            parsed = {
-                # Legacy field for compatibility
-                "thread_id": thread_info["conversation_id"],
-                # Enhanced fields
-                "conversation_id": thread_info["conversation_id"],
-                "original_message_id": thread_info["original_message_id"],
-                "message_id": message_id,
-                "in_reply_to": in_reply_to,
-                "references": references,
-                "from": from_addr,
-                "to": to_addrs,
-                "cc": cc_addrs,
-                "subject": clean_subject,
-                "original_subject": subject,
-                "body": body,
-                "timestamp": timestamp,
-                "is_reply": bool(in_reply_to or references),
-                "attachments": self._extract_attachments(msg),
-                # Custom headers for better tracking
-                "x_conversation_id": msg.get("X-Conversation-ID", ""),
-                "x_solopilot_message_id": msg.get("X-SoloPilot-Message-ID", ""),
-            }
-
-            logger.info(f"Parsed email from {from_addr} with thread {thread_info}")
-            return parsed
+        Args:
+            source: Raw email as bytes, an iterable of byte chunks, or a
+                file-like object with ``read`` (e.g. an S3 StreamingBody)
 
+        Returns:
+            Parsed email data, as for ``parse``
+        """
+        try:
+            parser = BytesFeedParser(
+                _factory=lambda policy=compat32: _StreamedMessage(
+                    self._store_streamed_attachment, policy
+                ),
+                policy=compat32,
+            )
+            if isinstance(source, (bytes, bytearray)):
+                chunks: Iterable[bytes] = [bytes(source)]
+            elif hasattr(source, "read"):
+                chunks = iter(lambda: source.read(FEED_CHUNK_SIZE), b"")
+            else:
+                chunks = source
+            for chunk in chunks:
+                parser.feed(chunk)
+            return self._parse_message(parser.close())
         except Exception as e:
             logger.error(f"Error parsing email: {str(e)}")
             raise
 
+    def _parse_message(self, msg: email.message.Message) -> Dict[str, Any]:
+        """Extract parsed email fields from a message tree."""
+        self.current_msg = msg  # Store for thread ID extraction
+
+        # Extract basic fields
+        from_addr = self._extract_email_address(_header(msg, "From"))
+        subject = _header(msg, "Subject", "No Subject")
+        message_id = _header(msg, "Message-ID")
+        in_reply_to = _header(msg, "In-Reply-To")
+        references = _header(msg, "References")
+
+        # Extract recipients
+        to_addrs = self._extract_recipients(_header(msg, "To"))
+        cc_addrs = self._extract_recipients(_header(msg, "Cc"))
+
+        # Extract thread information
+        thread_info = self._extract_thread_id(
+            message_id, in_reply_to, references, subject, from_addr
+        )
+
+        # Extract timestamp
+        date_str = _header(msg, "Date")
+        timestamp = self._parse_date(date_str)
+
+        # Extract body
+        body = self._extract_body(msg)
+
+        # Clean up subject (remove Re:, Fwd:, etc)
+        clean_subject = self._clean_subject(subject)
+
+        parsed = {
+            # Legacy field for compatibility
+            "thread_id": thread_info["conversation_id"],
+            # Enhanced fields
+            "conversation_id": thread_info["conversation_id"],
+            "original_message_id": thread_info["original_message_id"],
+            "message_id": message_id,
+            "in_reply_to": in_reply_to,
+            "references": references,
+            "from": from_addr,
+            "to": to_addrs,
+            "cc": cc_addrs,
+            "subject": clean_subject,
+            "original_subject": subject,
+            "body": body,
+            "timestamp": timestamp,
+            "is_reply": bool(in_reply_to or references),
+            "attachments": self._extract_attachments(msg),
+            # Custom headers for better tracking
+            "x_conversation_id": _header(msg, "X-Conversation-ID"),
+            "x_solopilot_message_id": _header(msg, "X-SoloPilot-Message-ID"),
+        }
+
+        logger.info(f"Parsed email from {from_addr} with thread {thread_info}")
+        return parsed
+
     def _extract_email_address(self, from_header: str) -> str:
         """Extract email address from From header."""
         # Match email pattern
@@ -132,7 +279,7 @@ class EmailParser:
             subject,
             from_addr,
             (
-                self._parse_date(self.current_msg.get("Date", ""))
+                self._parse_date(_header(self.current_msg, "Date"))
                 if hasattr(self, "current_msg")
                 else None
             ),
@@ -165,25 +312,44 @@ class EmailParser:
 
         if msg.is_multipart():
             for part in msg.walk():
-                content_disposition = part.get("Content-Disposition", "")
-
-                if "attachment" in content_disposition:
-                    filename = part.get_filename()
-                    if filename:
-                        attachments.append(
-                            {
-                                "filename": filename,
-                                "content_type": part.get_content_type(),
-                                "size": (
-                                    len(part.get_payload(decode=True))
-                                    if part.get_payload(decode=True)
-                                    else 0
-                                ),
-                            }
-                        )
+                info = getattr(part, "attachment_info", None)
+                if info is None and _is_attachment(part):
+                    payload = part.get_payload()
+                    info = self._store_streamed_attachment(
+                        part, payload if isinstance(payload, str) else ""
+                    )
+                if info:
+                    attachments.append(info)
 
         return attachments
 
+    def _store_streamed_attachment(
+        self, part: email.message.Message, payload: str
+    ) -> Dict[str, Any]:
+        """Decode an attachment part slice by slice into an AttachmentUpload.
+
+        Args:
+            part: MIME part with attachment headers
+            payload: Transfer-encoded payload of the part
+
+        Returns:
+            Attachment metadata with size and sha256 (plus S3 location when stored)
+        """
+        filename = part.get_filename()
+        content_type = part.get_content_type()
+        if self.attachment_store is not None:
+            upload = self.attachment_store.open_upload(filename, content_type)
+        else:
+            upload = AttachmentUpload(filename, content_type)
+
+        try:
+            for data in _iter_decoded(payload, _header(part, "Content-Transfer-Encoding")):
+                upload.write(data)
+            return upload.close()
+        except Exception:
+            upload.abort()
+            raise
+
     def _parse_date(self, date_str: str) -> str:
         """Parse email date to ISO format."""
         try:
@@ -227,51 +393,40 @@ class EmailParser:
 
     def _clean_body(self, body: str) -> str:
         """Clean email body text."""
-        # Remove email signatures (simple heuristic)
-        signature_markers = ["--", "___", "Sent from", "Get Outlook"]
         lines = body.split("\n")
 
-        def _is_reply_header(line: str) -> bool:
-            normalized = line.lstrip("> ").strip()
-            if not normalized:
-                return False
-            if normalized.lower().startswith("-----original message-----"):
-                return True
-            if re.match(r"^on .+wrote:$", normalized, flags=re.IGNORECASE):
-                return True
-            return bool(re.match(r"^(from|sent|to|subject|cc):", normalized, flags=re.IGNORECASE))
-
         cleaned_lines = []
         quoted_lines = []
         has_content = False
-        for line in lines:
+        for i, kind in iter_line_kinds(lines):
+            line = lines[i]
             # Stop at signature markers
-            if any(line.strip().startswith(marker) for marker in signature_markers):
+            if kind == SIGNATURE:
                 break
-            if _is_reply_header(line):
+            if kind in REPLY_HEADER_KINDS:
                 if has_content:
                     break
                 continue
-            if line.lstrip().startswith(">"):
+            if kind == QUOTED:
                 stripped = line.lstrip()[1:]
                 if stripped.startswith(" "):
                     stripped = stripped[1:]
                 quoted_lines.append(stripped)
                 continue
             cleaned_lines.append(line)
-            if line.strip():
+            if kind != BLANK:
                 has_content = True
 
         # Join and clean whitespace
         cleaned = "\n".join(cleaned_lines)
         if not has_content and quoted_lines:
             fallback_lines = []
-            for line in quoted_lines:
-                if any(line.strip().startswith(marker) for marker in signature_markers):
+            for i, kind in iter_line_kinds(quoted_lines):
+                if kind == SIGNATURE:
                     break
-                if _is_reply_header(line):
+                if kind in REPLY_HEADER_KINDS:
                     continue
-                fallback_lines.append(line)
+                fallback_lines.append(quoted_lines[i])
             cleaned = "\n".join(fallback_lines)
 
         # Remove excessive blank lines
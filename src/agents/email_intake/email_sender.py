@@ -11,13 +11,19 @@ from email.mime.text import MIMEText
 from html.parser import HTMLParser
 from typing import Any, Dict, List, Optional, Tuple
 
-import boto3
 from botocore.exceptions import ClientError
 
+try:
+    # For Lambda runtime
+    from service_container import get_services
+except ImportError:
+    # For local development/testing
+    from .service_container import get_services
+
 logger = logging.getLogger(__name__)
 
-# AWS SES client
-ses_client = boto3.client("ses", region_name=os.environ.get("AWS_REGION", "us-east-2"))
+# AWS SES client, created on the first send
+ses_client = get_services().lazy_client("ses", os.environ.get("AWS_REGION", "us-east-2"))
 
 # Email configuration
 SENDER_EMAIL = os.environ.get("SENDER_EMAIL", "intake@solopilot.abdulkhurram.com")
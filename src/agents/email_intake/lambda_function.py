@@ -14,26 +14,25 @@ import re
 from datetime import datetime, timezone
 from decimal import Decimal
 from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import unquote_plus
 
 import boto3
 from botocore.exceptions import ClientError
 
 # Import modules using package imports for Lambda
 from src.agents.email_intake.conversation_state import ConversationStateManager
-from src.agents.email_intake.conversational_responder import ConversationalResponder
-from src.agents.email_intake.email_parser import EmailParser
-from src.agents.email_intake.metadata_extractor import MetadataExtractor
-from src.agents.email_intake.requirement_extractor import RequirementExtractor
+from src.agents.email_intake.service_container import get_services
 from src.agents.email_intake.utils import EmailThreadingUtils
-from src.storage import ProposalVersionIndex
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-# AWS clients
-s3_client = boto3.client("s3")
-ses_client = boto3.client("ses")
-sqs_client = boto3.client("sqs")
+# AWS clients, pooled and reused across warm invocations. Each is created on
+# first use so cold starts only pay for the services an event actually touches.
+services = get_services()
+s3_client = services.lazy_client("s3")
+ses_client = services.lazy_client("ses")
+sqs_client = services.lazy_client("sqs")
 
 # Environment variables
 QUEUE_URL = os.environ.get("REQUIREMENT_QUEUE_URL", "")
@@ -42,6 +41,13 @@ DYNAMO_TABLE = os.environ.get("DYNAMO_TABLE", "conversations")
 ENABLE_OUTBOUND_TRACKING = os.environ.get("ENABLE_OUTBOUND_TRACKING", "true").lower() == "true"
 CALENDLY_LINK = os.environ.get("CALENDLY_LINK", "https://calendly.com/your-link")
 BUCKET_NAME = os.environ.get("EMAIL_BUCKET", "solopilot-emails")
+# Hold response generation until a conversation has been quiet this long (0 = respond
+# immediately). Checks are delayed SQS messages, so the queue must trigger this Lambda.
+RESPONSE_DEBOUNCE_SECONDS = int(os.environ.get("RESPONSE_DEBOUNCE_SECONDS", "0"))
+RESPONSE_DEBOUNCE_QUEUE_URL = os.environ.get("RESPONSE_DEBOUNCE_QUEUE_URL", "")
+DEBOUNCED_RESPONSE_MESSAGE = "debounced_response"
+# SQS caps DelaySeconds at 15 minutes
+MAX_SQS_DELAY_SECONDS = 900
 
 
 def _normalize_phase(phase: Optional[str]) -> str:
@@ -52,7 +58,7 @@ def _normalize_phase(phase: Optional[str]) -> str:
 
 def _should_run_full_extraction(conversation_id: str, conversation: Dict[str, Any]) -> bool:
     try:
-        version_index = ProposalVersionIndex()
+        version_index = services.version_index()
         latest_version = version_index.get_latest_version(conversation_id)
         if latest_version:
             logger.info(
@@ -181,494 +187,841 @@ def _apply_pricing_guard(
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """Enhanced Lambda handler for processing incoming emails with thread safety.
 
+    SES and S3 events carry one email. SQS events (S3 notifications delivered
+    through a queue) are processed as a batch, see ``_handle_sqs_batch``.
+
     Args:
-        event: Lambda event containing S3 bucket/key info
+        event: Lambda event containing S3 bucket/key info, or SQS records
         context: Lambda context
 
     Returns:
-        Response dict with status code and message
+        Response dict with status code and message, or an SQS partial batch
+        response (``batchItemFailures``) for SQS events
     """
+    records = event.get("Records") or []
+    if records and records[0].get("eventSource") == "aws:sqs":
+        return _handle_sqs_batch(records)
+
     try:
-        # Extract S3 info from event
-        record = event["Records"][0]
-        
-        # Handle SES event (when Lambda is triggered directly by SES)
-        if "ses" in record:
-            # For SES events, the email is stored in S3 with the message ID as the key
-            ses_mail = record["ses"]["mail"]
-            bucket = BUCKET_NAME
-            key = ses_mail["messageId"]
-            logger.info(f"Processing SES event with message ID: {key}")
-        # Handle S3 event (when Lambda is triggered by S3)
-        elif "s3" in record:
-            bucket = record["s3"]["bucket"]["name"]
-            key = record["s3"]["object"]["key"]
-            logger.info(f"Processing S3 event from: {bucket}/{key}")
-        else:
-            raise ValueError("Unknown event type - neither SES nor S3 event")
+        bucket, key = _email_location(records[0])
+        parsed_email = _load_email(bucket, key)
+        conversation = _append_inbound_email(parsed_email, bucket, key)
+        conversation, scheduled = _respond_or_schedule(parsed_email, conversation)
 
-        logger.info(f"Fetching email from S3: {bucket}/{key}")
+        return {
+            "statusCode": 200,
+            "body": json.dumps(
+                {
+                    "message": (
+                        "Email stored, response scheduled"
+                        if scheduled
+                        else "Email processed successfully"
+                    ),
+                    "conversation_id": parsed_email["conversation_id"],
+                    "email_count": len(conversation.get("email_history", [])),
+                    "status": conversation.get("status"),
+                }
+            ),
+        }
 
-        # Download email from S3
-        email_obj = s3_client.get_object(Bucket=bucket, Key=key)
-        email_content = email_obj["Body"].read().decode("utf-8")
+    except ClientError as e:
+        logger.error(f"AWS error processing email: {str(e)}")
+        return {
+            "statusCode": 503,
+            "body": json.dumps({"error": "Service temporarily unavailable"}),
+        }
+    except Exception as e:
+        logger.error(f"Error processing email: {str(e)}", exc_info=True)
+        return {
+            "statusCode": 500,
+            "body": json.dumps({"error": "Internal server error"}),
+        }
 
-        # Initialize managers first
-        state_manager = ConversationStateManager(table_name=DYNAMO_TABLE)
-        extractor = RequirementExtractor()
-        metadata_extractor = MetadataExtractor()
 
-        # Parse email with state manager for conversation lookups
-        parser = EmailParser(state_manager=state_manager)
-        parsed_email = parser.parse(email_content)
+def _email_location(record: Dict[str, Any]) -> Tuple[str, str]:
+    """Resolve the S3 bucket/key of the raw email for an SES or S3 event record."""
+    # Handle SES event (when Lambda is triggered directly by SES)
+    if "ses" in record:
+        # For SES events, the email is stored in S3 with the message ID as the key
+        ses_mail = record["ses"]["mail"]
+        bucket = BUCKET_NAME
+        key = ses_mail["messageId"]
+        logger.info(f"Processing SES event with message ID: {key}")
+    # Handle S3 event (when Lambda is triggered by S3)
+    elif "s3" in record:
+        bucket = record["s3"]["bucket"]["name"]
+        key = unquote_plus(record["s3"]["object"]["key"])
+        logger.info(f"Processing S3 event from: {bucket}/{key}")
+    else:
+        raise ValueError("Unknown event type - neither SES nor S3 event")
+    return bucket, key
 
-        # Get conversation ID and original message ID
-        conversation_id = parsed_email["conversation_id"]
-        original_message_id = parsed_email.get("original_message_id", "")
 
-        # Fetch or create conversation (conversation ID is now stable from message mapping)
-        conversation = state_manager.fetch_or_create_conversation(
-            conversation_id, original_message_id, parsed_email
-        )
+def _sqs_email_locations(record: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """Resolve the emails referenced by one SQS record.
 
+    The message body is an S3 event notification, optionally wrapped in an SNS
+    envelope, or an SES receipt notification. S3 test events yield no emails.
+    """
+    payload = json.loads(record["body"])
+    if "Message" in payload and payload.get("Type") == "Notification":
+        payload = json.loads(payload["Message"])
 
-        # Append email with retry for concurrent access
-        conversation = state_manager.append_email_with_retry(
-            conversation_id,
-            {
-                "message_id": parsed_email["message_id"],
-                "in_reply_to": parsed_email.get("in_reply_to", ""),
-                "references": parsed_email.get("references", ""),
-                "from": parsed_email["from"],
-                "to": parsed_email.get("to", []),
-                "cc": parsed_email.get("cc", []),
-                "subject": parsed_email["subject"],
-                "body": parsed_email["body"],
-                "timestamp": parsed_email["timestamp"],
-                "attachments": parsed_email.get("attachments", []),
-                "direction": "inbound",
-                "metadata": {
-                    "s3_bucket": bucket,
-                    "s3_key": key,
-                    "is_reply": parsed_email["is_reply"],
-                },
-            },
-            max_retries=2,  # Allow up to 2 retries for concurrent access
+    if "Records" in payload:
+        return [_email_location(inner) for inner in payload["Records"]]
+    if "mail" in payload:
+        action = payload.get("receipt", {}).get("action", {})
+        if action.get("type") == "S3":
+            return [(action["bucketName"], action["objectKey"])]
+        return [(BUCKET_NAME, payload["mail"]["messageId"])]
+    if payload.get("Event") == "s3:TestEvent":
+        return []
+    raise ValueError("Unknown SQS message - neither S3 nor SES notification")
+
+
+def _load_email(bucket: str, key: str) -> Dict[str, Any]:
+    """Download and parse a raw email, resolving its conversation ID."""
+    logger.info(f"Fetching email from S3: {bucket}/{key}")
+
+    # Stream the object into the parser; attachments are uploaded as their parts end
+    email_obj = s3_client.get_object(Bucket=bucket, Key=key)
+
+    # Parse email with state manager for conversation lookups
+    parser = services.email_parser(DYNAMO_TABLE)
+    return parser.parse_bytes(email_obj["Body"])
+
+
+def _append_inbound_email(
+    parsed_email: Dict[str, Any], bucket: str, key: str, skip_duplicate: bool = False
+) -> Optional[Dict[str, Any]]:
+    """Append a parsed inbound email to its conversation and record its Message-IDs.
+
+    Args:
+        parsed_email: Output of EmailParser.parse
+        bucket: S3 bucket holding the raw email
+        key: S3 key of the raw email
+        skip_duplicate: Check whether the email is already in the thread first
+            (redelivered SQS messages) and skip the append if so
+
+    Returns:
+        Updated conversation state, or None when the email was already appended
+    """
+    state_manager = services.state_manager(DYNAMO_TABLE)
+
+    # Get conversation ID and original message ID
+    conversation_id = parsed_email["conversation_id"]
+    original_message_id = parsed_email.get("original_message_id", "")
+
+    # Fetch or create conversation (conversation ID is now stable from message mapping).
+    # Only existence matters here; the append below returns the full state.
+    state_manager.fetch_or_create_conversation(
+        conversation_id, original_message_id, parsed_email, view="header"
+    )
+
+    if skip_duplicate and state_manager.has_email(conversation_id, parsed_email["message_id"]):
+        logger.info(
+            f"Email {parsed_email['message_id']} already in conversation {conversation_id}, "
+            "skipping append"
         )
+        return None
 
-        normalized_phase = _normalize_phase(conversation.get("phase"))
-        if normalized_phase != conversation.get("phase"):
+    # Append email with retry for concurrent access
+    conversation = state_manager.append_email_with_retry(
+        conversation_id,
+        {
+            "message_id": parsed_email["message_id"],
+            "in_reply_to": parsed_email.get("in_reply_to", ""),
+            "references": parsed_email.get("references", ""),
+            "from": parsed_email["from"],
+            "to": parsed_email.get("to", []),
+            "cc": parsed_email.get("cc", []),
+            "subject": parsed_email["subject"],
+            "body": parsed_email["body"],
+            "timestamp": parsed_email["timestamp"],
+            "attachments": _index_attachments(conversation_id, parsed_email),
+            "direction": "inbound",
+            "metadata": {
+                "s3_bucket": bucket,
+                "s3_key": key,
+                "is_reply": parsed_email["is_reply"],
+            },
+        },
+        max_retries=2,  # Allow up to 2 retries for concurrent access
+    )
+
+    # Store message ID mapping for future thread lookups
+    if parsed_email.get("message_id"):
+        raw_msg_id = parsed_email["message_id"]
+        canonical_msg_id = EmailThreadingUtils.canonicalize_message_id(raw_msg_id)
+        logger.info(
+            f"Storing incoming Message-ID mapping: raw='{raw_msg_id}' canonical='{canonical_msg_id}' -> {conversation_id}"
+        )
+        if canonical_msg_id:
+            state_manager.store_message_id_mapping(canonical_msg_id, conversation_id)
             logger.info(
-                "Normalizing phase for %s: %s -> %s",
-                conversation_id,
-                conversation.get("phase"),
-                normalized_phase,
-            )
-            state_manager.update_phase(
-                conversation_id,
-                normalized_phase,
-                metadata={"normalized_from": conversation.get("phase")},
+                f"Successfully stored Message-ID mapping: {canonical_msg_id} -> {conversation_id}"
             )
-            conversation["phase"] = normalized_phase
 
-        # Store message ID mapping for future thread lookups
-        if parsed_email.get("message_id"):
-            raw_msg_id = parsed_email["message_id"]
-            canonical_msg_id = EmailThreadingUtils.canonicalize_message_id(raw_msg_id)
+    # Also store our custom Message-ID if present (for replies to our emails)
+    if parsed_email.get("x_solopilot_message_id"):
+        custom_msg_id = EmailThreadingUtils.canonicalize_message_id(
+            parsed_email["x_solopilot_message_id"]
+        )
+        if custom_msg_id:
             logger.info(
-                f"Storing incoming Message-ID mapping: raw='{raw_msg_id}' canonical='{canonical_msg_id}' -> {conversation_id}"
+                f"Storing custom SoloPilot Message-ID: {custom_msg_id} -> {conversation_id}"
             )
-            if canonical_msg_id:
-                state_manager.store_message_id_mapping(canonical_msg_id, conversation_id)
-                logger.info(
-                    f"Successfully stored Message-ID mapping: {canonical_msg_id} -> {conversation_id}"
-                )
+            state_manager.store_message_id_mapping(custom_msg_id, conversation_id)
+
+    return conversation
+
+
+def _index_attachments(conversation_id: str, parsed_email: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Count the email's attachments against the conversation and compact repeats.
+
+    Attachments already seen earlier in the thread are stored once in S3 under their
+    SHA-256; the email entry keeps only a reference to them.
+
+    Args:
+        conversation_id: Conversation the email belongs to
+        parsed_email: Output of EmailParser.parse
 
-        # Also store our custom Message-ID if present (for replies to our emails)
-        if parsed_email.get("x_solopilot_message_id"):
-            custom_msg_id = EmailThreadingUtils.canonicalize_message_id(
-                parsed_email["x_solopilot_message_id"]
+    Returns:
+        Attachment entries for the email history
+    """
+    attachments = parsed_email.get("attachments", [])
+    attachment_index = services.attachment_index()
+    if attachment_index is None or not attachments:
+        return attachments
+
+    entries = []
+    for attachment in attachments:
+        if not attachment.get("sha256"):
+            entries.append(attachment)
+            continue
+        reference = attachment_index.add_reference(
+            conversation_id, parsed_email["message_id"], attachment
+        )
+        first_message_id = reference.get("first_message_id", parsed_email["message_id"])
+        if first_message_id != parsed_email["message_id"]:
+            logger.info(
+                f"Attachment {attachment['filename']} already in conversation "
+                f"{conversation_id} (first sent in {first_message_id})"
             )
-            if custom_msg_id:
-                logger.info(
-                    f"Storing custom SoloPilot Message-ID: {custom_msg_id} -> {conversation_id}"
-                )
-                state_manager.store_message_id_mapping(custom_msg_id, conversation_id)
+            entries.append(
+                {
+                    "filename": attachment["filename"],
+                    "sha256": attachment["sha256"],
+                    "s3_key": attachment.get("s3_key"),
+                    "duplicate_of": first_message_id,
+                }
+            )
+        else:
+            entries.append(attachment)
+    return entries
+
+
+def _respond_to_conversation(
+    parsed_email: Dict[str, Any], conversation: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Run requirements extraction and response generation for a conversation.
 
-        # Extract/update requirements with version control
-        logger.info(f"Evaluating requirements extraction for conversation {conversation_id}")
-        updated_requirements = conversation.get("requirements", {})
-        requirements_changed = False
+    Args:
+        parsed_email: Latest inbound email; the response replies to it
+        conversation: State returned by the last append, or None to load it
+
+    Returns:
+        Conversation state after the pass
+    """
+    state_manager = services.state_manager(DYNAMO_TABLE)
+    extractor = services.requirement_extractor()
+    metadata_extractor = services.metadata_extractor()
 
-        if _should_run_full_extraction(conversation_id, conversation):
-            current_version = conversation.get("requirements_version", 0)
+    conversation_id = parsed_email["conversation_id"]
+    original_message_id = parsed_email.get("original_message_id", "")
+    if conversation is None:
+        conversation = state_manager.fetch_or_create_conversation(
+            conversation_id, original_message_id, parsed_email
+        )
+
+    # Extraction and response generation need the whole thread
+    email_history = state_manager.hydrate_email_history(conversation)["email_history"]
+
+    normalized_phase = _normalize_phase(conversation.get("phase"))
+    if normalized_phase != conversation.get("phase"):
+        logger.info(
+            "Normalizing phase for %s: %s -> %s",
+            conversation_id,
+            conversation.get("phase"),
+            normalized_phase,
+        )
+        state_manager.update_phase(
+            conversation_id,
+            normalized_phase,
+            metadata={"normalized_from": conversation.get("phase")},
+        )
+        conversation["phase"] = normalized_phase
+
+    # Extract/update requirements with version control
+    logger.info(f"Evaluating requirements extraction for conversation {conversation_id}")
+    updated_requirements = conversation.get("requirements", {})
+    requirements_changed = False
+
+    if _should_run_full_extraction(conversation_id, conversation):
+        current_version = conversation.get("requirements_version", 0)
+        updated_requirements = extractor.extract(
+            conversation["email_history"], conversation.get("requirements", {})
+        )
+
+        # Update requirements atomically
+        try:
+            conversation = state_manager.update_requirements_atomic(
+                conversation_id, updated_requirements, expected_version=current_version
+            )
+            requirements_changed = True
+        except ValueError as e:
+            # Requirements were updated by another Lambda - refetch and retry once
+            logger.warning(f"Requirements version conflict, retrying: {str(e)}")
+            conversation = state_manager.fetch_or_create_conversation(
+                conversation_id, original_message_id, parsed_email
+            )
+            email_history = state_manager.hydrate_email_history(conversation)["email_history"]
             updated_requirements = extractor.extract(
                 conversation["email_history"], conversation.get("requirements", {})
             )
-
-            # Update requirements atomically
+            conversation = state_manager.update_requirements_atomic(
+                conversation_id, updated_requirements
+            )
+            requirements_changed = True
+
+    # Header-only updates (EMAIL_STORAGE_MODE=items) come back without the thread
+    conversation.setdefault("email_history", email_history)
+
+    # Extract metadata for current email (reused across requirements + response)
+    current_phase = _normalize_phase(conversation.get("phase"))
+    extracted_metadata = metadata_extractor.extract_metadata(conversation, current_phase)
+    logger.info(f"Extracted metadata (pre-response): {json.dumps(extracted_metadata, default=str)}")
+    extraction_notes = (extracted_metadata.get("extraction_notes") or "").strip()
+    logger.info(
+        "[METADATA][EXTRACTION_NOTES] len=%s notes=%s",
+        len(extraction_notes),
+        extraction_notes or "none",
+    )
+
+    # Update requirements from feedback whenever we're in the proposal phase
+    normalized_phase = _normalize_phase(conversation.get("phase"))
+    if normalized_phase == "proposal":
+        logger.info("Proposal phase - updating requirements based on feedback")
+        updated_requirements_from_feedback = extractor.update_requirements_from_feedback(
+            conversation.get("requirements", {}),
+            parsed_email,
+            extraction_notes=extraction_notes,
+        )
+        if updated_requirements_from_feedback != conversation.get("requirements", {}):
             try:
+                current_version = conversation.get("requirements_version", 0)
                 conversation = state_manager.update_requirements_atomic(
-                    conversation_id, updated_requirements, expected_version=current_version
-                )
-                requirements_changed = True
-            except ValueError as e:
-                # Requirements were updated by another Lambda - refetch and retry once
-                logger.warning(f"Requirements version conflict, retrying: {str(e)}")
-                conversation = state_manager.fetch_or_create_conversation(
-                    conversation_id, original_message_id, parsed_email
-                )
-                updated_requirements = extractor.extract(
-                    conversation["email_history"], conversation.get("requirements", {})
-                )
-                conversation = state_manager.update_requirements_atomic(
-                    conversation_id, updated_requirements
+                    conversation_id,
+                    updated_requirements_from_feedback,
+                    expected_version=current_version,
                 )
+                updated_requirements = updated_requirements_from_feedback
                 requirements_changed = True
-
-        # Extract metadata for current email (reused across requirements + response)
-        current_phase = _normalize_phase(conversation.get("phase"))
-        extracted_metadata = metadata_extractor.extract_metadata(conversation, current_phase)
-        logger.info(f"Extracted metadata (pre-response): {json.dumps(extracted_metadata, default=str)}")
-        extraction_notes = (extracted_metadata.get("extraction_notes") or "").strip()
-        logger.info(
-            "[METADATA][EXTRACTION_NOTES] len=%s notes=%s",
-            len(extraction_notes),
-            extraction_notes or "none",
+                logger.info("Successfully updated requirements based on feedback")
+            except Exception as e:
+                logger.error(f"Failed to update requirements from feedback: {str(e)}")
+        else:
+            updated_requirements = conversation.get("requirements", {})
+
+    conversation.setdefault("email_history", email_history)
+
+    if requirements_changed:
+        _send_to_queue_enhanced(conversation_id, updated_requirements, conversation)
+
+    # Use ConversationalResponder to generate appropriate response
+    responder = services.conversational_responder(CALENDLY_LINK)
+    response_text, response_metadata, llm_prompt = responder.generate_response_with_tracking(
+        conversation, parsed_email, extracted_metadata=extracted_metadata
+    )
+    normalized_phase = _normalize_phase(conversation.get("phase"))
+    if normalized_phase == "proposal":
+        response_text = _apply_pricing_guard(
+            response_text, updated_requirements, conversation_id
         )
 
-        # Update requirements from feedback whenever we're in the proposal phase
-        normalized_phase = _normalize_phase(conversation.get("phase"))
-        if normalized_phase == "proposal":
-            logger.info("Proposal phase - updating requirements based on feedback")
-            updated_requirements_from_feedback = extractor.update_requirements_from_feedback(
-                conversation.get("requirements", {}),
-                parsed_email,
-                extraction_notes=extraction_notes,
-            )
-            if updated_requirements_from_feedback != conversation.get("requirements", {}):
-                try:
-                    current_version = conversation.get("requirements_version", 0)
-                    conversation = state_manager.update_requirements_atomic(
-                        conversation_id,
-                        updated_requirements_from_feedback,
-                        expected_version=current_version,
-                    )
-                    updated_requirements = updated_requirements_from_feedback
-                    requirements_changed = True
-                    logger.info("Successfully updated requirements based on feedback")
-                except Exception as e:
-                    logger.error(f"Failed to update requirements from feedback: {str(e)}")
-            else:
-                updated_requirements = conversation.get("requirements", {})
-
-        if requirements_changed:
-            _send_to_queue_enhanced(conversation_id, updated_requirements, conversation)
-
-        # Use ConversationalResponder to generate appropriate response
-        responder = ConversationalResponder(calendly_link=CALENDLY_LINK)
-        response_text, response_metadata, llm_prompt = responder.generate_response_with_tracking(
-            conversation, parsed_email, extracted_metadata=extracted_metadata
-        )
-        normalized_phase = _normalize_phase(conversation.get("phase"))
-        if normalized_phase == "proposal":
-            response_text = _apply_pricing_guard(
-                response_text, updated_requirements, conversation_id
-            )
+    # Check reply mode (default to manual if not set)
+    reply_mode = conversation.get("reply_mode", "manual")
 
-        # Check reply mode (default to manual if not set)
-        reply_mode = conversation.get("reply_mode", "manual")
+    if reply_mode == "manual":
+        # Queue response for manual approval
+        logger.info("Manual mode - queuing response for approval")
 
-        if reply_mode == "manual":
-            # Queue response for manual approval
-            logger.info("Manual mode - queuing response for approval")
+        # Add pending reply
+        # BACKWARD COMPATIBILITY: Translate should_send_proposal to should_send_pdf
+        # This handles legacy code that might still use the old field name
+        # New code should use should_send_pdf directly
+        should_send_pdf = response_metadata.get("should_send_pdf", response_metadata.get("should_send_proposal", False))
+        logger.info(f"[FIELD_TRANSLATION] Resolved should_send_pdf={should_send_pdf} (checked both should_send_pdf and should_send_proposal)")
+        
+        metadata_to_store = {
+            "recipient": parsed_email["from"],
+            "subject": f"Re: {parsed_email['subject']}",
+            "in_reply_to": parsed_email.get("message_id", ""),
+            "references": conversation.get("thread_references", []),
+            "should_send_pdf": should_send_pdf,  # Use the resolved value
+            "email_body": response_text,  # ALWAYS store the email body
+        }
 
-            # Add pending reply
-            # BACKWARD COMPATIBILITY: Translate should_send_proposal to should_send_pdf
-            # This handles legacy code that might still use the old field name
-            # New code should use should_send_pdf directly
-            should_send_pdf = response_metadata.get("should_send_pdf", response_metadata.get("should_send_proposal", False))
-            logger.info(f"[FIELD_TRANSLATION] Resolved should_send_pdf={should_send_pdf} (checked both should_send_pdf and should_send_proposal)")
-            
-            metadata_to_store = {
-                "recipient": parsed_email["from"],
-                "subject": f"Re: {parsed_email['subject']}",
-                "in_reply_to": parsed_email.get("message_id", ""),
-                "references": conversation.get("thread_references", []),
-                "should_send_pdf": should_send_pdf,  # Use the resolved value
-                "email_body": response_text,  # ALWAYS store the email body
-            }
-
-            # Note: proposal_content is no longer used - PDFs are generated from requirements
-
-            # Extract client name from conversation for better personalization
-            email_history = conversation.get("email_history", [])
-            client_name = "Client"  # Default
-            for email in email_history:
-                if email.get("direction") == "inbound" and email.get("from"):
-                    # Try to extract name from email address
-                    from_email = email["from"]
-                    if "@" in from_email:
-                        client_name = (
-                            from_email.split("@")[0].replace(".", " ").replace("_", " ").title()
-                        )
-                        break
+        # Note: proposal_content is no longer used - PDFs are generated from requirements
+
+        # Extract client name from conversation for better personalization
+        email_history = conversation.get("email_history", [])
+        client_name = "Client"  # Default
+        for email in email_history:
+            if email.get("direction") == "inbound" and email.get("from"):
+                # Try to extract name from email address
+                from_email = email["from"]
+                if "@" in from_email:
+                    client_name = (
+                        from_email.split("@")[0].replace(".", " ").replace("_", " ").title()
+                    )
+                    break
 
-            metadata_to_store["client_name"] = client_name
-            metadata_to_store["sender_name"] = responder.sender_name
-            
-            # If we plan to send a proposal, pre-generate and store it now so it appears in UI
-            if should_send_pdf:
-                try:
-                    from pdf_generator import ProposalPDFGenerator  # Lazy import to avoid cold start cost
-
-                    pdf_lambda_arn = os.environ.get("PDF_LAMBDA_ARN", "")
-                    if not pdf_lambda_arn:
-                        logger.warning("PDF_LAMBDA_ARN not configured; skipping pre-generation of proposal PDF")
+        metadata_to_store["client_name"] = client_name
+        metadata_to_store["sender_name"] = responder.sender_name
+        
+        # If we plan to send a proposal, pre-generate and store it now so it appears in UI
+        if should_send_pdf:
+            try:
+                pdf_lambda_arn = os.environ.get("PDF_LAMBDA_ARN", "")
+                if not pdf_lambda_arn:
+                    logger.warning("PDF_LAMBDA_ARN not configured; skipping pre-generation of proposal PDF")
+                else:
+                    pdf_generator = services.pdf_generator(pdf_lambda_arn)
+                    # Generate and store proposal (records version + S3 key)
+                    pdf_bytes, pdf_error, storage_info = pdf_generator.generate_and_store_proposal_pdf(conversation)
+
+                    if pdf_bytes and storage_info:
+                        # Stash version info on the pending reply metadata so approval can reuse it
+                        metadata_to_store["proposal_version"] = storage_info.get("version")
+                        metadata_to_store["s3_key"] = storage_info.get("s3_key")
+                        logger.info(
+                            f"Pre-generated proposal v{storage_info.get('version')} for conversation {conversation_id}"
+                        )
+                    elif pdf_error:
+                        logger.warning(f"Pre-generation of proposal PDF failed: {pdf_error}")
                     else:
-                        pdf_generator = ProposalPDFGenerator(pdf_lambda_arn)
-                        # Generate and store proposal (records version + S3 key)
-                        pdf_bytes, pdf_error, storage_info = pdf_generator.generate_and_store_proposal_pdf(conversation)
-
-                        if pdf_bytes and storage_info:
-                            # Stash version info on the pending reply metadata so approval can reuse it
-                            metadata_to_store["proposal_version"] = storage_info.get("version")
-                            metadata_to_store["s3_key"] = storage_info.get("s3_key")
-                            logger.info(
-                                f"Pre-generated proposal v{storage_info.get('version')} for conversation {conversation_id}"
-                            )
-                        elif pdf_error:
-                            logger.warning(f"Pre-generation of proposal PDF failed: {pdf_error}")
-                        else:
-                            logger.warning("Pre-generation of proposal PDF produced no bytes and no error")
-                except Exception as e:
-                    # Do not block reply creation if pre-generation fails; approval path will retry
-                    logger.warning(f"Exception during proposal pre-generation (non-fatal): {str(e)}", exc_info=True)
-
-            # Store the extracted metadata for frontend display
-            if "extracted_metadata" in response_metadata:
-                extracted = response_metadata["extracted_metadata"]
-                # Convert floats to Decimal for DynamoDB storage
-                extracted_for_storage = state_manager._convert_floats_to_decimal(extracted)
-                metadata_to_store["extracted_metadata"] = extracted_for_storage
-                
-                # Also update the conversation with key extracted fields
-                # Only update client_name if we have a new, confident value
-                existing_client_name = conversation.get("client_name")
-                new_client_name = extracted.get("client_name")
-                confidence_score = extracted.get("confidence_score", 0.5)
-                
-                # Decide whether to update client_name
-                should_update_client_name = False
-                final_client_name = existing_client_name
-                
-                if new_client_name and confidence_score >= 0.7:
-                    # We have a confident new name
-                    if not existing_client_name or existing_client_name == "Client":
-                        # No existing name or default name - use new one
-                        should_update_client_name = True
-                        final_client_name = new_client_name
-                    elif new_client_name != existing_client_name:
-                        # Different name with high confidence - update
-                        logger.info(f"Updating client name from '{existing_client_name}' to '{new_client_name}' (confidence: {confidence_score})")
-                        should_update_client_name = True
-                        final_client_name = new_client_name
-                
-                # Build update expression dynamically
-                update_parts = []
-                expression_values = {}
-                
-                if should_update_client_name:
-                    update_parts.append("client_name = :cn")
-                    expression_values[":cn"] = final_client_name
-                
-                # Always update project_name and project_type if provided
-                if extracted.get("project_name"):
-                    update_parts.append("project_name = :pn")
-                    expression_values[":pn"] = extracted.get("project_name")
-                    
-                if extracted.get("project_type"):
-                    update_parts.append("project_type = :pt")
-                    expression_values[":pt"] = extracted.get("project_type")
-                
-                # Always update metadata
-                update_parts.extend(["latest_metadata = :lm", "metadata_updated_at = :mua", "updated_at = :updated"])
-                expression_values.update({
-                    ":lm": extracted_for_storage,
-                    ":mua": datetime.now(timezone.utc).isoformat(),
-                    ":updated": datetime.now(timezone.utc).isoformat()
-                })
-                
-                update_expression = "SET " + ", ".join(update_parts)
-                
-                logger.info(f"[DEBUG] Client name update: existing='{existing_client_name}', new='{new_client_name}', confidence={confidence_score}, updating={should_update_client_name}")
+                        logger.warning("Pre-generation of proposal PDF produced no bytes and no error")
+            except Exception as e:
+                # Do not block reply creation if pre-generation fails; approval path will retry
+                logger.warning(f"Exception during proposal pre-generation (non-fatal): {str(e)}", exc_info=True)
+
+        # Store the extracted metadata for frontend display
+        if "extracted_metadata" in response_metadata:
+            extracted = response_metadata["extracted_metadata"]
+            # Convert floats to Decimal for DynamoDB storage
+            extracted_for_storage = state_manager._convert_floats_to_decimal(extracted)
+            metadata_to_store["extracted_metadata"] = extracted_for_storage
+            
+            # Also update the conversation with key extracted fields
+            # Only update client_name if we have a new, confident value
+            existing_client_name = conversation.get("client_name")
+            new_client_name = extracted.get("client_name")
+            confidence_score = extracted.get("confidence_score", 0.5)
+            
+            # Decide whether to update client_name
+            should_update_client_name = False
+            final_client_name = existing_client_name
+            
+            if new_client_name and confidence_score >= 0.7:
+                # We have a confident new name
+                if not existing_client_name or existing_client_name == "Client":
+                    # No existing name or default name - use new one
+                    should_update_client_name = True
+                    final_client_name = new_client_name
+                elif new_client_name != existing_client_name:
+                    # Different name with high confidence - update
+                    logger.info(f"Updating client name from '{existing_client_name}' to '{new_client_name}' (confidence: {confidence_score})")
+                    should_update_client_name = True
+                    final_client_name = new_client_name
+            
+            # Build update expression dynamically
+            update_parts = []
+            expression_values = {}
+            
+            if should_update_client_name:
+                update_parts.append("client_name = :cn")
+                expression_values[":cn"] = final_client_name
+            
+            # Always update project_name and project_type if provided
+            if extracted.get("project_name"):
+                update_parts.append("project_name = :pn")
+                expression_values[":pn"] = extracted.get("project_name")
                 
-                # Update conversation with extracted metadata
-                try:
-                    # Use direct DynamoDB update instead of the update_conversation method
-                    state_manager.table.update_item(
-                        Key={"conversation_id": conversation_id},
-                        UpdateExpression=update_expression,
-                        ExpressionAttributeValues=expression_values
-                    )
-                    logger.info(f"Updated conversation with extracted metadata: client={extracted.get('client_name')}, project={extracted.get('project_name')}")
-                except Exception as e:
-                    logger.error(f"Failed to update conversation with metadata: {str(e)}")
-                    logger.error(f"[DEBUG] Exception details:", exc_info=True)
+            if extracted.get("project_type"):
+                update_parts.append("project_type = :pt")
+                expression_values[":pt"] = extracted.get("project_type")
+            
+            # Always update metadata
+            update_parts.extend(["latest_metadata = :lm", "metadata_updated_at = :mua", "updated_at = :updated"])
+            expression_values.update({
+                ":lm": extracted_for_storage,
+                ":mua": datetime.now(timezone.utc).isoformat(),
+                ":updated": datetime.now(timezone.utc).isoformat()
+            })
+            
+            update_expression = "SET " + ", ".join(update_parts)
+            
+            logger.info(f"[DEBUG] Client name update: existing='{existing_client_name}', new='{new_client_name}', confidence={confidence_score}, updating={should_update_client_name}")
+            
+            # Update conversation with extracted metadata
+            try:
+                # Use direct DynamoDB update instead of the update_conversation method
+                state_manager.table.update_item(
+                    Key={"conversation_id": conversation_id},
+                    UpdateExpression=update_expression,
+                    ExpressionAttributeValues=expression_values
+                )
+                logger.info(f"Updated conversation with extracted metadata: client={extracted.get('client_name')}, project={extracted.get('project_name')}")
+            except Exception as e:
+                logger.error(f"Failed to update conversation with metadata: {str(e)}")
+                logger.error(f"[DEBUG] Exception details:", exc_info=True)
 
-            state_manager.add_pending_reply(
-                conversation_id,
-                llm_prompt,
-                response_text,
-                response_metadata.get("phase", "unknown"),
-                metadata_to_store,
-            )
+        state_manager.add_pending_reply(
+            conversation_id,
+            llm_prompt,
+            response_text,
+            response_metadata.get("phase", "unknown"),
+            metadata_to_store,
+        )
 
-            logger.info(f"Response queued for manual approval in conversation {conversation_id}")
-        else:
-            # Auto mode - send immediately
-            logger.info("Auto mode - sending response immediately")
+        logger.info(f"Response queued for manual approval in conversation {conversation_id}")
+    else:
+        # Auto mode - send immediately
+        logger.info("Auto mode - sending response immediately")
+        
+        # Store the extracted metadata for auto mode too
+        if "extracted_metadata" in response_metadata:
+            extracted = response_metadata["extracted_metadata"]
             
-            # Store the extracted metadata for auto mode too
-            if "extracted_metadata" in response_metadata:
-                extracted = response_metadata["extracted_metadata"]
-                
-                # Convert floats to Decimal for DynamoDB storage
-                extracted_for_storage = state_manager._convert_floats_to_decimal(extracted)
-                
-                # Update conversation with key extracted fields - same logic as manual mode
-                # Only update client_name if we have a new, confident value
-                existing_client_name = conversation.get("client_name")
-                new_client_name = extracted.get("client_name")
-                confidence_score = extracted.get("confidence_score", 0.5)
-                
-                # Decide whether to update client_name
-                should_update_client_name = False
-                final_client_name = existing_client_name
-                
-                if new_client_name and confidence_score >= 0.7:
-                    # We have a confident new name
-                    if not existing_client_name or existing_client_name == "Client":
-                        # No existing name or default name - use new one
-                        should_update_client_name = True
-                        final_client_name = new_client_name
-                    elif new_client_name != existing_client_name:
-                        # Different name with high confidence - update
-                        logger.info(f"[AUTO MODE] Updating client name from '{existing_client_name}' to '{new_client_name}' (confidence: {confidence_score})")
-                        should_update_client_name = True
-                        final_client_name = new_client_name
-                
-                # Build update expression dynamically
-                update_parts = []
-                expression_values = {}
-                
-                if should_update_client_name:
-                    update_parts.append("client_name = :cn")
-                    expression_values[":cn"] = final_client_name
-                
-                # Always update project_name and project_type if provided
-                if extracted.get("project_name"):
-                    update_parts.append("project_name = :pn")
-                    expression_values[":pn"] = extracted.get("project_name")
-                    
-                if extracted.get("project_type"):
-                    update_parts.append("project_type = :pt")
-                    expression_values[":pt"] = extracted.get("project_type")
-                
-                # Always update metadata
-                update_parts.extend(["latest_metadata = :lm", "metadata_updated_at = :mua", "updated_at = :updated"])
-                expression_values.update({
-                    ":lm": extracted_for_storage,
-                    ":mua": datetime.now(timezone.utc).isoformat(),
-                    ":updated": datetime.now(timezone.utc).isoformat()
-                })
-                
-                update_expression = "SET " + ", ".join(update_parts)
-                
-                logger.info(f"[DEBUG][AUTO MODE] Client name update: existing='{existing_client_name}', new='{new_client_name}', confidence={confidence_score}, updating={should_update_client_name}")
+            # Convert floats to Decimal for DynamoDB storage
+            extracted_for_storage = state_manager._convert_floats_to_decimal(extracted)
+            
+            # Update conversation with key extracted fields - same logic as manual mode
+            # Only update client_name if we have a new, confident value
+            existing_client_name = conversation.get("client_name")
+            new_client_name = extracted.get("client_name")
+            confidence_score = extracted.get("confidence_score", 0.5)
+            
+            # Decide whether to update client_name
+            should_update_client_name = False
+            final_client_name = existing_client_name
+            
+            if new_client_name and confidence_score >= 0.7:
+                # We have a confident new name
+                if not existing_client_name or existing_client_name == "Client":
+                    # No existing name or default name - use new one
+                    should_update_client_name = True
+                    final_client_name = new_client_name
+                elif new_client_name != existing_client_name:
+                    # Different name with high confidence - update
+                    logger.info(f"[AUTO MODE] Updating client name from '{existing_client_name}' to '{new_client_name}' (confidence: {confidence_score})")
+                    should_update_client_name = True
+                    final_client_name = new_client_name
+            
+            # Build update expression dynamically
+            update_parts = []
+            expression_values = {}
+            
+            if should_update_client_name:
+                update_parts.append("client_name = :cn")
+                expression_values[":cn"] = final_client_name
+            
+            # Always update project_name and project_type if provided
+            if extracted.get("project_name"):
+                update_parts.append("project_name = :pn")
+                expression_values[":pn"] = extracted.get("project_name")
                 
-                try:
-                    # Use direct DynamoDB update instead of the update_conversation method
-                    state_manager.table.update_item(
-                        Key={"conversation_id": conversation_id},
-                        UpdateExpression=update_expression,
-                        ExpressionAttributeValues=expression_values
-                    )
-                    logger.info(f"Updated conversation with extracted metadata: client={extracted.get('client_name')}, project={extracted.get('project_name')}")
-                except Exception as e:
-                    logger.error(f"Failed to update conversation with metadata: {str(e)}")
-                    logger.error(f"[DEBUG-AUTO] Exception details:", exc_info=True)
-
-            # Determine email type and send
-            if response_metadata.get("phase") == "proposal":
-                # Send proposal email
-                result = _send_confirmation_email_v2(
-                    parsed_email["from"], updated_requirements, conversation_id
-                )
-            else:
-                # Send follow-up email
-                result = _send_followup_email_v2(
-                    parsed_email["from"],
-                    parsed_email["subject"],
-                    response_text,
-                    conversation_id,
-                    parsed_email.get("message_id", ""),
-                    conversation.get("original_message_id", ""),
-                    conversation.get("thread_references", []),
-                )
-
-            # Track outbound reply if enabled
-            if ENABLE_OUTBOUND_TRACKING and result:
-                _track_outbound_reply(
-                    state_manager,
-                    conversation_id,
-                    result,  # Pass the full tuple (ses_message_id, generated_message_id)
-                    response_metadata.get("phase", "followup"),
-                    parsed_email["from"],
+            if extracted.get("project_type"):
+                update_parts.append("project_type = :pt")
+                expression_values[":pt"] = extracted.get("project_type")
+            
+            # Always update metadata
+            update_parts.extend(["latest_metadata = :lm", "metadata_updated_at = :mua", "updated_at = :updated"])
+            expression_values.update({
+                ":lm": extracted_for_storage,
+                ":mua": datetime.now(timezone.utc).isoformat(),
+                ":updated": datetime.now(timezone.utc).isoformat()
+            })
+            
+            update_expression = "SET " + ", ".join(update_parts)
+            
+            logger.info(f"[DEBUG][AUTO MODE] Client name update: existing='{existing_client_name}', new='{new_client_name}', confidence={confidence_score}, updating={should_update_client_name}")
+            
+            try:
+                # Use direct DynamoDB update instead of the update_conversation method
+                state_manager.table.update_item(
+                    Key={"conversation_id": conversation_id},
+                    UpdateExpression=update_expression,
+                    ExpressionAttributeValues=expression_values
                 )
+                logger.info(f"Updated conversation with extracted metadata: client={extracted.get('client_name')}, project={extracted.get('project_name')}")
+            except Exception as e:
+                logger.error(f"Failed to update conversation with metadata: {str(e)}")
+                logger.error(f"[DEBUG-AUTO] Exception details:", exc_info=True)
+
+        # Determine email type and send
+        if response_metadata.get("phase") == "proposal":
+            # Send proposal email
+            result = _send_confirmation_email_v2(
+                parsed_email["from"], updated_requirements, conversation_id
+            )
+        else:
+            # Send follow-up email
+            result = _send_followup_email_v2(
+                parsed_email["from"],
+                parsed_email["subject"],
+                response_text,
+                conversation_id,
+                parsed_email.get("message_id", ""),
+                conversation.get("original_message_id", ""),
+                conversation.get("thread_references", []),
+            )
 
-            logger.info(
-                f"Sent {response_metadata.get('phase', 'followup')} email for {conversation_id}"
+        # Track outbound reply if enabled
+        if ENABLE_OUTBOUND_TRACKING and result:
+            _track_outbound_reply(
+                state_manager,
+                conversation_id,
+                result,  # Pass the full tuple (ses_message_id, generated_message_id)
+                response_metadata.get("phase", "followup"),
+                parsed_email["from"],
             )
 
-        # Update conversation phase based on AI's actions
-        current_phase = conversation.get("phase", "understanding")
-        suggested_phase = response_metadata.get("suggested_phase")
-        
-        # Handle phase transitions based on actions taken
-        if response_metadata.get("action_taken") == "initial_proposal_sent":
-            new_phase = "proposal"
-            logger.info(f"Phase transition: {current_phase} -> {new_phase} (proposal sent)")
-            state_manager.update_phase(conversation_id, new_phase)
-        elif suggested_phase and suggested_phase != current_phase:
-            # Honor other AI-suggested phase transitions
-            logger.info(f"Phase transition: {current_phase} -> {suggested_phase} (AI suggested)")
-            state_manager.update_phase(conversation_id, suggested_phase)
+        logger.info(
+            f"Sent {response_metadata.get('phase', 'followup')} email for {conversation_id}"
+        )
 
-        return {
-            "statusCode": 200,
-            "body": json.dumps(
-                {
-                    "message": "Email processed successfully",
-                    "conversation_id": conversation_id,
-                    "email_count": len(conversation.get("email_history", [])),
-                    "status": conversation.get("status"),
-                }
-            ),
-        }
+    # Update conversation phase based on AI's actions
+    current_phase = conversation.get("phase", "understanding")
+    suggested_phase = response_metadata.get("suggested_phase")
+    
+    # Handle phase transitions based on actions taken
+    if response_metadata.get("action_taken") == "initial_proposal_sent":
+        new_phase = "proposal"
+        logger.info(f"Phase transition: {current_phase} -> {new_phase} (proposal sent)")
+        state_manager.update_phase(conversation_id, new_phase)
+    elif suggested_phase and suggested_phase != current_phase:
+        # Honor other AI-suggested phase transitions
+        logger.info(f"Phase transition: {current_phase} -> {suggested_phase} (AI suggested)")
+        state_manager.update_phase(conversation_id, suggested_phase)
+
+    return conversation
+
+
+def _debounce_enabled() -> bool:
+    """Whether response generation is debounced (needs a window and a check queue)."""
+    if RESPONSE_DEBOUNCE_SECONDS <= 0:
+        return False
+    if not RESPONSE_DEBOUNCE_QUEUE_URL:
+        logger.warning(
+            "RESPONSE_DEBOUNCE_SECONDS set without RESPONSE_DEBOUNCE_QUEUE_URL; not debouncing"
+        )
+        return False
+    return True
 
-    except ClientError as e:
-        logger.error(f"AWS error processing email: {str(e)}")
-        return {
-            "statusCode": 503,
-            "body": json.dumps({"error": "Service temporarily unavailable"}),
-        }
-    except Exception as e:
-        logger.error(f"Error processing email: {str(e)}", exc_info=True)
+
+def _respond_or_schedule(
+    parsed_email: Dict[str, Any], conversation: Optional[Dict[str, Any]]
+) -> Tuple[Dict[str, Any], bool]:
+    """Generate the response now, or schedule a debounced check when enabled.
+
+    Returns:
+        Tuple of (conversation state, whether the response was scheduled)
+    """
+    if not _debounce_enabled():
+        return _respond_to_conversation(parsed_email, conversation), False
+
+    conversation_id = parsed_email["conversation_id"]
+    if conversation is None:
+        # Redelivered email that was already appended; token off the current header
+        conversation = services.state_manager(DYNAMO_TABLE).load_header(conversation_id) or {}
+    _schedule_response_check(conversation_id, int(conversation.get("last_seq", 0)))
+    return conversation, True
+
+
+def _schedule_response_check(conversation_id: str, seq: int) -> None:
+    """Record the newest response token and enqueue a delayed check for it."""
+    if not services.state_manager(DYNAMO_TABLE).schedule_response(conversation_id, seq):
+        return
+
+    delay = min(RESPONSE_DEBOUNCE_SECONDS, MAX_SQS_DELAY_SECONDS)
+    sqs_client.send_message(
+        QueueUrl=RESPONSE_DEBOUNCE_QUEUE_URL,
+        MessageBody=json.dumps(
+            {"type": DEBOUNCED_RESPONSE_MESSAGE, "conversation_id": conversation_id, "seq": seq}
+        ),
+        DelaySeconds=delay,
+    )
+    logger.info(f"Scheduled response check for {conversation_id} (seq {seq}) in {delay}s")
+
+
+def _latest_inbound_email(conversation: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Rebuild EmailParser-shaped data for the newest inbound email of a conversation."""
+    history = services.state_manager(DYNAMO_TABLE).hydrate_email_history(dict(conversation))
+    for email in reversed(history.get("email_history") or []):
+        if email.get("direction") != "inbound":
+            continue
         return {
-            "statusCode": 500,
-            "body": json.dumps({"error": "Internal server error"}),
+            "conversation_id": conversation["conversation_id"],
+            "original_message_id": conversation.get("original_message_id", ""),
+            "message_id": email.get("message_id", ""),
+            "in_reply_to": email.get("in_reply_to", ""),
+            # Stored entries keep references as a parsed list
+            "references": " ".join(email.get("references") or []),
+            "from": email.get("from", ""),
+            "to": email.get("to", []),
+            "cc": email.get("cc", []),
+            "subject": email.get("subject", ""),
+            "body": email.get("body", ""),
+            "timestamp": email.get("timestamp", ""),
+            "attachments": email.get("attachments", []),
+            "is_reply": (email.get("metadata") or {}).get("is_reply", False),
         }
+    return None
+
+
+def _run_response_check(conversation_id: str, seq: int) -> bool:
+    """Generate the debounced response if the thread stayed quiet since ``seq``.
+
+    Returns:
+        True if a response pass ran, False if the check was stale or already handled
+    """
+    state_manager = services.state_manager(DYNAMO_TABLE)
+    conversation = state_manager.claim_response(conversation_id, seq)
+    if conversation is None:
+        logger.info(f"Skipping response check for {conversation_id} (seq {seq}): superseded")
+        return False
+
+    try:
+        parsed_email = _latest_inbound_email(conversation)
+        if parsed_email is None:
+            logger.warning(f"No inbound email to answer in {conversation_id}")
+            return False
+        logger.info(
+            f"Thread {conversation_id} quiet since seq {seq}; "
+            f"answering {parsed_email['message_id']}"
+        )
+        _respond_to_conversation(parsed_email, conversation)
+        return True
+    except Exception:
+        state_manager.release_response_claim(conversation_id, seq)
+        raise
+
+
+def _email_sort_key(parsed_email: Dict[str, Any]) -> datetime:
+    """Sort key for emails of one conversation (Date header, UTC)."""
+    timestamp = datetime.fromisoformat(parsed_email["timestamp"])
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp
+
+
+def _handle_sqs_batch(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Process a batch of SQS records, one extraction/response pass per conversation.
+
+    Bursts of emails on one thread (reply-all storms) used to arrive as
+    concurrent invocations that raced on the conversation's ``last_seq`` lock
+    and each ran a full extraction and LLM response. Here records are parsed,
+    grouped by conversation ID and appended in Date order; the group then gets
+    a single pass that answers the latest email with the whole thread in view.
+
+    Failed records are returned as ``batchItemFailures`` (the event source
+    mapping must enable ReportBatchItemFailures). Within a group, a failed
+    append also fails every later email so order is kept on redelivery, and a
+    failed response pass fails the email it was answering. Redelivered records
+    skip emails that are already in the thread.
+
+    Args:
+        records: SQS event records
+
+    Returns:
+        Partial batch response
+    """
+    failed: List[str] = []
+    groups: Dict[str, List[Tuple[Dict[str, Any], Dict[str, Any], str, str]]] = {}
+
+    checks: List[Tuple[str, Dict[str, Any]]] = []
+
+    for record in records:
+        message_id = record["messageId"]
+        try:
+            payload = json.loads(record["body"])
+            if payload.get("type") == DEBOUNCED_RESPONSE_MESSAGE:
+                checks.append((message_id, payload))
+                continue
+            for bucket, key in _sqs_email_locations(record):
+                parsed_email = _load_email(bucket, key)
+                groups.setdefault(parsed_email["conversation_id"], []).append(
+                    (record, parsed_email, bucket, key)
+                )
+        except Exception as e:
+            logger.error(
+                f"Failed to load email for SQS message {message_id}: {str(e)}", exc_info=True
+            )
+            failed.append(message_id)
+
+    for conversation_id, emails in groups.items():
+        try:
+            emails.sort(key=lambda item: _email_sort_key(item[1]))
+        except (TypeError, ValueError):
+            logger.warning(f"Unsortable email dates for {conversation_id}; keeping arrival order")
+
+        logger.info(f"Processing {len(emails)} email(s) for conversation {conversation_id}")
+        conversation = None
+        latest = None
+        for index, (record, parsed_email, bucket, key) in enumerate(emails):
+            redelivered = int(record.get("attributes", {}).get("ApproximateReceiveCount", "1")) > 1
+            try:
+                conversation = _append_inbound_email(
+                    parsed_email, bucket, key, skip_duplicate=redelivered
+                )
+                latest = (record, parsed_email)
+            except Exception as e:
+                logger.error(
+                    f"Failed to append email to {conversation_id}, deferring "
+                    f"{len(emails) - index} email(s): {str(e)}",
+                    exc_info=True,
+                )
+                failed.extend(item[0]["messageId"] for item in emails[index:])
+                break
+
+        if latest is None:
+            continue
+
+        record, parsed_email = latest
+        try:
+            _respond_or_schedule(parsed_email, conversation)
+        except Exception as e:
+            logger.error(f"Response pass failed for {conversation_id}: {str(e)}", exc_info=True)
+            failed.append(record["messageId"])
+
+    # Debounce checks run after this batch's emails so a check made stale by them is skipped
+    for message_id, payload in checks:
+        try:
+            _run_response_check(payload["conversation_id"], int(payload["seq"]))
+        except Exception as e:
+            logger.error(
+                f"Response check failed for {payload.get('conversation_id')}: {str(e)}",
+                exc_info=True,
+            )
+            failed.append(message_id)
+
+    # A record can carry several emails; report it once
+    failures = list(dict.fromkeys(failed))
+    if failures:
+        logger.warning(f"{len(failures)} of {len(records)} SQS record(s) failed")
+    return {"batchItemFailures": [{"itemIdentifier": message_id} for message_id in failures]}
 
 
 def _send_to_queue_enhanced(
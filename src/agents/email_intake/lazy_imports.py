@@ -0,0 +1,104 @@
+"""Deferred imports for route-specific Lambda dependencies.
+
+Both Lambda entry points serve many routes, and most invocations never touch
+the PDF generator, vision analyzer, reviewer or SES sender. Importing those
+modules (and the clients they create at import time) on every cold start adds
+to init duration for nothing. ``lazy_import`` returns a proxy that resolves
+the module through ``importlib`` on first attribute access, and
+``lazy_exports`` builds a PEP 562 ``__getattr__`` for package ``__init__``
+re-exports.
+"""
+
+import importlib
+import threading
+from types import ModuleType
+from typing import Any, Callable, Dict, Optional
+
+
+class LazyModule:
+    """Proxy for a module that is imported on first attribute access."""
+
+    def __init__(self, *module_names: str):
+        """Initialize proxy.
+
+        Args:
+            module_names: Candidate import paths, tried in order. Lambda bundles
+                flatten some modules to the top level (``pdf_generator``) while the
+                package layout uses ``src.agents.email_intake.pdf_generator``.
+        """
+        if not module_names:
+            raise ValueError("At least one module name is required")
+        self._module_names = module_names
+        self._module: Optional[ModuleType] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the underlying module has been imported."""
+        return self._module is not None
+
+    def load(self) -> ModuleType:
+        """Import the module now (idempotent) and return it."""
+        if self._module is not None:
+            return self._module
+
+        with self._lock:
+            if self._module is None:
+                error: Optional[ImportError] = None
+                for name in self._module_names:
+                    try:
+                        self._module = importlib.import_module(name)
+                        break
+                    except ImportError as e:
+                        # Only fall through when the candidate itself is missing,
+                        # not when one of its own imports fails
+                        if e.name is not None and not name.startswith(e.name):
+                            raise
+                        error = e
+                else:
+                    raise error
+        return self._module
+
+    def __getattr__(self, attr: str) -> Any:
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        return getattr(self.load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.loaded else "deferred"
+        return f"<LazyModule {self._module_names[0]} ({state})>"
+
+
+def lazy_import(*module_names: str) -> LazyModule:
+    """Return a proxy that imports the first available module on first use.
+
+    Args:
+        module_names: Candidate import paths, tried in order
+
+    Returns:
+        LazyModule proxy
+    """
+    return LazyModule(*module_names)
+
+
+def lazy_exports(package: str, exports: Dict[str, str]) -> Callable[[str], Any]:
+    """Build a module-level ``__getattr__`` that imports re-exports on demand.
+
+    Args:
+        package: ``__name__`` of the package doing the re-exporting
+        exports: Exported name -> relative submodule (e.g. ``".email_parser"``)
+
+    Returns:
+        Function suitable for assignment to the package's ``__getattr__``
+    """
+
+    def __getattr__(name: str) -> Any:
+        submodule = exports.get(name)
+        if submodule is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(submodule, package), name)
+        # Cache on the package so later lookups skip this hook
+        setattr(importlib.import_module(package), name, value)
+        return value
+
+    return __getattr__
@@ -10,7 +10,7 @@ import logging
 import os
 import re
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Callable, Dict, Any, Optional, List
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +22,74 @@ def _clean_json_response(text: Optional[str]) -> str:
         cleaned = re.sub(r"\s*```$", "", cleaned)
     return cleaned.strip()
 
+
+def _is_metadata_response(response_body: Dict[str, Any]) -> bool:
+    text = response_body["content"][0]["text"]
+    return isinstance(json.loads(_clean_json_response(text)), dict)
+
+
+# Static prefix of every extraction request, sent as a cacheable system block;
+# the per-conversation context comes after it (see _build_extraction_prompt)
+EXTRACTION_INSTRUCTIONS = """You are analyzing an email conversation to extract metadata for automated response handling.
+The conversation to analyze follows in <context>, <latest_email> and <recent_conversation>.
+
+<task>
+Analyze this email using logical reasoning to determine appropriate metadata values.
+
+REASONING APPROACH:
+1. First understand the client's intent - what are they trying to achieve?
+2. Consider the conversation context - where are we in the sales process?
+3. Determine what action a human freelancer would take next
+4. Map those insights to the metadata fields
+
+FIELD DEFINITIONS:
+- client_name: The person's actual name (not email address). Only update if found with high confidence, otherwise keep existing.
+- project_name: Descriptive name for what's being built. Keep existing unless client explicitly provides a new one.
+- should_send_pdf: Should we attach a PDF proposal document to our response?
+  * First check: Has a PDF already been sent? (see <context>: "PDF proposal already sent")
+  * If PDF was already sent: ONLY set to true if client is explicitly requesting it again or asking for changes
+  * If PDF was NOT sent yet: Consider if client is ready for a formal proposal
+  * Consider phrases like: "send proposal", "what's the cost", "I meant the pdf", "just send me something", "give me a quote", "pricing details", etc.
+  * Also true if: We're in proposal phase and haven't sent one yet, OR client is asking for revisions to existing proposal
+  * IMPORTANT: Set to FALSE if we've already sent a PDF proposal and client is just asking questions or discussing without requesting changes
+- proposal_explicitly_requested: Did client directly ask for a proposal/quote using clear language?
+- meeting_requested: Is client asking to schedule a call/meeting IN THIS SPECIFIC EMAIL (not in conversation history)?
+  * Look for actual scheduling intent, not just mentions of future communication
+- revision_requested: Is client asking for changes to an existing proposal they've seen?
+- feedback_sentiment: What's the emotional tone - positive, negative, neutral, or needs_revision?
+- action_required: What's the most logical next step based on client's message?
+  * Options: send_proposal, answer_question, revise_proposal, schedule_meeting, close_conversation
+
+CRITICAL REASONING POINTS:
+- If client references "the pdf" or "the proposal" they likely want the PDF document (should_send_pdf = true)
+- If client seems confused about next steps and we're in proposal phase, they probably need the proposal
+- IMPORTANT: If we're in proposal phase and client is just asking questions or discussing WITHOUT requesting changes, DO NOT resend the PDF
+- Don't be overly rigid - understand intent, not just exact words
+- Consider what would be most helpful to the client at this moment
+- Avoid sending duplicate PDFs unless explicitly requested or changes are needed
+
+Output a JSON object with your reasoning-based analysis:
+{
+  "client_name": string or null,
+  "client_first_name": string or null,
+  "project_name": string,
+  "project_type": "website|web_app|dashboard|api|mobile_app|other",
+  "current_phase": "<current phase from context>",
+  "should_send_pdf": boolean,
+  "proposal_explicitly_requested": boolean,
+  "meeting_requested": boolean,
+  "meeting_confidence": 0.0-1.0,
+  "revision_requested": boolean,
+  "feedback_sentiment": "positive|negative|neutral|needs_revision",
+  "key_topics": ["main", "topics", "from", "email"],
+  "action_required": "send_proposal|answer_question|revise_proposal|schedule_meeting|close_conversation",
+  "confidence_score": 0.0-1.0,
+  "extraction_notes": "Brief explanation of reasoning for key decisions, especially should_send_pdf"
+}
+</task>
+"""
+
+
 # Try to use the AI provider framework, fallback to Bedrock if not available
 try:
     from src.providers import get_provider
@@ -29,21 +97,26 @@ try:
 except ImportError:
     USE_AI_PROVIDER = False
     logger.warning("AI provider framework not available, using Bedrock directly")
-    
-# Use Bedrock in Lambda environment
-if not USE_AI_PROVIDER:
-    import boto3
-    bedrock_client = boto3.client(
-        "bedrock-runtime", 
-        region_name=os.environ.get("AWS_REGION", "us-east-2")
-    )
+
+from src.common.bedrock_invoker import build_cached_request, get_bedrock_invoker
+from src.common.model_router import (
+    MIN_CONFIDENCE,
+    ModelTier,
+    RoutingRejected,
+    build_tiers,
+    route,
+)
 
 
 class MetadataExtractor:
     """Extracts structured metadata from conversations using Claude Haiku."""
     
-    def __init__(self):
-        """Initialize the metadata extractor with Claude Haiku model."""
+    def __init__(self, bedrock_client=None):
+        """Initialize the metadata extractor with Claude Haiku model.
+
+        Args:
+            bedrock_client: Optional shared Bedrock runtime client
+        """
         # Use Haiku for fast extraction
         self.model = os.environ.get(
             "BEDROCK_MODEL_ID", "anthropic.claude-haiku-4-5-20251001-v1:0"
@@ -56,6 +129,11 @@ class MetadataExtractor:
         
         if USE_AI_PROVIDER:
             self.provider = get_provider(os.environ.get("AI_PROVIDER", "bedrock"))
+            self.tiers = [ModelTier(self.model, self.inference_profile_arn)]
+        else:
+            self.invoker = get_bedrock_invoker(bedrock_client)
+            # Haiku first; low-confidence or malformed extractions escalate
+            self.tiers = build_tiers("metadata", self.model, self.inference_profile_arn)
         
     def extract_metadata(self, conversation: Dict[str, Any], current_phase: str) -> Dict[str, Any]:
         """
@@ -75,21 +153,30 @@ class MetadataExtractor:
             # Build the extraction prompt
             prompt = self._build_extraction_prompt(conversation, current_phase, existing_metadata)
             
-            # Call Haiku for extraction
-            response = self._call_haiku(prompt)
-            
-            # Parse and validate the response
-            metadata = json.loads(_clean_json_response(response))
-            validated_metadata = self._validate_metadata(metadata, current_phase, existing_metadata)
+            def validate(response: str):
+                metadata = json.loads(_clean_json_response(response))
+                if not isinstance(metadata, dict):
+                    raise RoutingRejected("metadata answer is not a JSON object")
+                validated = self._validate_metadata(metadata, current_phase, existing_metadata)
+                return validated, validated["confidence_score"] >= MIN_CONFIDENCE
+
+            # Call the cheapest model, escalating until the extraction is confident
+            result = route(
+                "metadata", self.tiers, lambda tier: self._call_haiku(prompt, tier), validate
+            )
+            validated_metadata = result.value
             
             # Log successful extraction
-            logger.info(f"Successfully extracted metadata with confidence: {validated_metadata.get('confidence_score', 0)}")
+            logger.info(
+                f"Successfully extracted metadata with confidence: "
+                f"{validated_metadata.get('confidence_score', 0)} ({result.tier.model_id})"
+            )
             
             return validated_metadata
             
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse metadata JSON: {str(e)}")
-            logger.error(f"Raw response: {response[:500]}...")
+            logger.error(f"Raw response: {e.doc[:500]}...")
             return self._get_default_metadata(current_phase)
             
         except Exception as e:
@@ -97,7 +184,10 @@ class MetadataExtractor:
             return self._get_default_metadata(current_phase)
     
     def _build_extraction_prompt(self, conversation: Dict[str, Any], current_phase: str, existing_metadata: Dict[str, Any]) -> str:
-        """Build reasoning-based prompt for metadata extraction."""
+        """Build the per-conversation part of the extraction prompt.
+
+        The instructions are the static EXTRACTION_INSTRUCTIONS prefix.
+        """
         # Get only the latest 2 emails (latest inbound and latest outbound if available)
         email_history = conversation.get("email_history", [])
         recent_emails = email_history[-2:] if len(email_history) > 1 else email_history
@@ -115,9 +205,7 @@ class MetadataExtractor:
         existing_client_name = existing_metadata.get("client_name")
         existing_project_name = existing_metadata.get("project_name")
         
-        prompt = f"""You are analyzing an email conversation to extract metadata for automated response handling.
-
-<context>
+        prompt = f"""<context>
 Current conversation phase: {current_phase}
 Previous client name (if known): {existing_client_name or 'Not identified'}
 Previous project name (if known): {existing_project_name or 'Not defined'}
@@ -134,60 +222,6 @@ Body: {latest_email.get('body', 'No body')}
 {conversation_text}
 </recent_conversation>
 
-<task>
-Analyze this email using logical reasoning to determine appropriate metadata values.
-
-REASONING APPROACH:
-1. First understand the client's intent - what are they trying to achieve?
-2. Consider the conversation context - where are we in the sales process?
-3. Determine what action a human freelancer would take next
-4. Map those insights to the metadata fields
-
-FIELD DEFINITIONS:
-- client_name: The person's actual name (not email address). Only update if found with high confidence, otherwise keep existing.
-- project_name: Descriptive name for what's being built. Keep existing unless client explicitly provides a new one.
-- should_send_pdf: Should we attach a PDF proposal document to our response?
-  * First check: Has a PDF already been sent? (see context above: "PDF proposal already sent")
-  * If PDF was already sent: ONLY set to true if client is explicitly requesting it again or asking for changes
-  * If PDF was NOT sent yet: Consider if client is ready for a formal proposal
-  * Consider phrases like: "send proposal", "what's the cost", "I meant the pdf", "just send me something", "give me a quote", "pricing details", etc.
-  * Also true if: We're in proposal phase and haven't sent one yet, OR client is asking for revisions to existing proposal
-  * IMPORTANT: Set to FALSE if we've already sent a PDF proposal and client is just asking questions or discussing without requesting changes
-- proposal_explicitly_requested: Did client directly ask for a proposal/quote using clear language?
-- meeting_requested: Is client asking to schedule a call/meeting IN THIS SPECIFIC EMAIL (not in conversation history)?
-  * Look for actual scheduling intent, not just mentions of future communication
-- revision_requested: Is client asking for changes to an existing proposal they've seen?
-- feedback_sentiment: What's the emotional tone - positive, negative, neutral, or needs_revision?
-- action_required: What's the most logical next step based on client's message?
-  * Options: send_proposal, answer_question, revise_proposal, schedule_meeting, close_conversation
-
-CRITICAL REASONING POINTS:
-- If client references "the pdf" or "the proposal" they likely want the PDF document (should_send_pdf = true)
-- If client seems confused about next steps and we're in proposal phase, they probably need the proposal
-- IMPORTANT: If we're in proposal phase and client is just asking questions or discussing WITHOUT requesting changes, DO NOT resend the PDF
-- Don't be overly rigid - understand intent, not just exact words
-- Consider what would be most helpful to the client at this moment
-- Avoid sending duplicate PDFs unless explicitly requested or changes are needed
-
-Output a JSON object with your reasoning-based analysis:
-{{
-  "client_name": string or null,
-  "client_first_name": string or null,
-  "project_name": string,
-  "project_type": "website|web_app|dashboard|api|mobile_app|other",
-  "current_phase": "{current_phase}",
-  "should_send_pdf": boolean,
-  "proposal_explicitly_requested": boolean,
-  "meeting_requested": boolean,
-  "meeting_confidence": 0.0-1.0,
-  "revision_requested": boolean,
-  "feedback_sentiment": "positive|negative|neutral|needs_revision",
-  "key_topics": ["main", "topics", "from", "email"],
-  "action_required": "send_proposal|answer_question|revise_proposal|schedule_meeting|close_conversation",
-  "confidence_score": 0.0-1.0,
-  "extraction_notes": "Brief explanation of reasoning for key decisions, especially should_send_pdf"
-}}
-
 Think through the client's needs step by step, then provide ONLY the JSON object:
 """
         
@@ -238,34 +272,44 @@ Think through the client's needs step by step, then provide ONLY the JSON object
             
         return "\n---\n".join(formatted) if formatted else "No conversation history"
     
-    def _invoke_bedrock(self, request_body: Dict[str, Any]) -> Dict[str, Any]:
-        payload = json.dumps(request_body)
-        if self.inference_profile_arn:
-            response = bedrock_client.invoke_model(
-                modelId=self.inference_profile_arn, body=payload, contentType="application/json"
-            )
-            return json.loads(response["body"].read())
-        response = bedrock_client.invoke_model(
-            modelId=self.model, body=payload, contentType="application/json"
+    def _invoke_bedrock(
+        self,
+        request_body: Dict[str, Any],
+        cache: bool = False,
+        tier: Optional[ModelTier] = None,
+        validate: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    ) -> Dict[str, Any]:
+        tier = tier or self.tiers[0]
+        return self.invoker.invoke(
+            request_body,
+            model_id=tier.model_id,
+            inference_profile_arn=tier.inference_profile_arn,
+            agent="metadata_extractor",
+            cache=cache,
+            validate=validate,
         )
-        return json.loads(response["body"].read())
 
-    def _call_haiku(self, prompt: str) -> str:
-        """Call Claude Haiku model for extraction."""
+    def _call_haiku(self, prompt: str, tier: Optional[ModelTier] = None) -> str:
+        """Call the extraction model (Claude Haiku unless escalated to ``tier``)."""
         try:
             if USE_AI_PROVIDER:
                 # Use the AI provider framework
-                response = self.provider.generate_code(prompt, [])
+                response = self.provider.generate_code(f"{EXTRACTION_INSTRUCTIONS}\n{prompt}", [])
                 return response
             else:
                 # Use Bedrock directly in Lambda
-                request_body = {
-                    "anthropic_version": "bedrock-2023-05-31",
-                    "max_tokens": 1000,
-                    "messages": [{"role": "user", "content": prompt}],
-                    "temperature": 0.1,  # Low temperature for consistent extraction
-                }
-                response_body = self._invoke_bedrock(request_body)
+                tier = tier or self.tiers[0]
+                request_body = build_cached_request(
+                    EXTRACTION_INSTRUCTIONS,
+                    prompt,
+                    max_tokens=1000,
+                    temperature=0.1,  # Low temperature for consistent extraction
+                    model_id=tier.model_id,
+                )
+                # Only well-formed JSON objects are cached for replay
+                response_body = self._invoke_bedrock(
+                    request_body, cache=True, tier=tier, validate=_is_metadata_response
+                )
                 return response_body["content"][0]["text"].strip()
                 
         except Exception as e:
@@ -9,6 +9,12 @@ from typing import Any, Dict
 import boto3
 from botocore.exceptions import ClientError
 
+from src.agents.email_intake.conversation_state import (
+    LISTING_ATTRIBUTES,
+    LISTING_INDEX,
+    listing_shard_for,
+)
+from src.agents.email_intake.reply_blob_store import ReplyBlobStore
 from src.agents.email_intake.utils import EmailThreadingUtils
 
 logging.basicConfig(level=logging.INFO)
@@ -161,6 +167,392 @@ class DynamoDBMigration:
             else:
                 raise
 
+    def backfill_participant_index(
+        self, participant_table: str = "conversation_participants", dry_run: bool = True
+    ) -> int:
+        """Write participant index items for every existing conversation.
+
+        New emails keep the index current; this only seeds conversations that
+        predate the conversation_participants table.
+
+        Args:
+            participant_table: Name of the participant index table
+            dry_run: If True, only count the items that would be written
+
+        Returns:
+            Number of index items written (or that would be written)
+        """
+        index_table = self.dynamodb.Table(participant_table)
+        scan_kwargs = {
+            "ProjectionExpression": "conversation_id, participants, subject, #status, phase, last_seq, updated_at, #ttl",
+            "ExpressionAttributeNames": {"#status": "status", "#ttl": "ttl"},
+        }
+        written = 0
+
+        done = False
+        start_key = None
+
+        with index_table.batch_writer(overwrite_by_pkeys=["participant", "conversation_id"]) as batch:
+            while not done:
+                if start_key:
+                    scan_kwargs["ExclusiveStartKey"] = start_key
+
+                response = self.table.scan(**scan_kwargs)
+
+                for item in response.get("Items", []):
+                    for participant in {p.lower() for p in item.get("participants", []) if p}:
+                        written += 1
+                        if dry_run:
+                            continue
+                        batch.put_item(
+                            Item={
+                                "participant": participant,
+                                "conversation_id": item["conversation_id"],
+                                "updated_at": item.get("updated_at", ""),
+                                "subject": item.get("subject", ""),
+                                "status": item.get("status", "active"),
+                                "phase": item.get("phase", "understanding"),
+                                "last_seq": item.get("last_seq", Decimal(0)),
+                                "ttl": item.get("ttl") or EmailThreadingUtils.calculate_ttl(days=30),
+                            }
+                        )
+
+                start_key = response.get("LastEvaluatedKey", None)
+                done = start_key is None
+
+        logger.info(
+            f"Participant index backfill {'simulated' if dry_run else 'complete'}: {written} items"
+        )
+        return written
+
+    def backfill_listing_shards(self, dry_run: bool = True) -> int:
+        """Set listing_shard on conversations that predate the listing index.
+
+        Conversations without it are missing from ListingIndex until their next
+        email. Also re-run after changing LISTING_SHARDS to move items to their
+        new partitions.
+
+        Args:
+            dry_run: If True, only count the conversations that would be updated
+
+        Returns:
+            Number of conversations updated (or that would be updated)
+        """
+        scan_kwargs = {"ProjectionExpression": "conversation_id, listing_shard"}
+        updated = 0
+
+        done = False
+        start_key = None
+
+        while not done:
+            if start_key:
+                scan_kwargs["ExclusiveStartKey"] = start_key
+
+            response = self.table.scan(**scan_kwargs)
+
+            for item in response.get("Items", []):
+                shard = listing_shard_for(item["conversation_id"])
+                if item.get("listing_shard") == shard:
+                    continue
+                updated += 1
+                if dry_run:
+                    continue
+                try:
+                    self.table.update_item(
+                        Key={"conversation_id": item["conversation_id"]},
+                        UpdateExpression="SET listing_shard = :shard",
+                        ExpressionAttributeValues={":shard": shard},
+                    )
+                except Exception as e:
+                    logger.error(
+                        f"Failed to set listing shard for {item['conversation_id']}: {str(e)}"
+                    )
+                    self.stats["failed"] += 1
+
+            start_key = response.get("LastEvaluatedKey", None)
+            done = start_key is None
+
+        logger.info(f"Listing shard backfill {'simulated' if dry_run else 'complete'}: {updated}")
+        return updated
+
+    def backfill_reply_counters(self, dry_run: bool = True) -> int:
+        """Seed pending_reply_count and last_reply_at from existing pending replies.
+
+        Reply writes keep both current afterwards. The rewrite is conditioned on
+        the reply list length so a reply queued mid-backfill is not miscounted;
+        re-run to pick up any conversation reported as failed.
+
+        Args:
+            dry_run: If True, only count the conversations that would be updated
+
+        Returns:
+            Number of conversations updated (or that would be updated)
+        """
+        scan_kwargs = {
+            "FilterExpression": "attribute_exists(pending_replies)",
+            "ProjectionExpression": "conversation_id, pending_replies",
+        }
+        updated = 0
+
+        done = False
+        start_key = None
+
+        while not done:
+            if start_key:
+                scan_kwargs["ExclusiveStartKey"] = start_key
+
+            response = self.table.scan(**scan_kwargs)
+
+            for item in response.get("Items", []):
+                replies = item.get("pending_replies", [])
+                pending = sum(1 for r in replies if r.get("status") == "pending")
+                timestamps = [
+                    t
+                    for r in replies
+                    for t in (r.get("generated_at"), r.get("reviewed_at"), r.get("amended_at"))
+                    if t
+                ]
+                updated += 1
+                if dry_run:
+                    continue
+                try:
+                    self.table.update_item(
+                        Key={"conversation_id": item["conversation_id"]},
+                        UpdateExpression="SET pending_reply_count = :count, last_reply_at = :last",
+                        ConditionExpression="size(pending_replies) = :size",
+                        ExpressionAttributeValues={
+                            ":count": Decimal(pending),
+                            ":last": max(timestamps) if timestamps else None,
+                            ":size": Decimal(len(replies)),
+                        },
+                    )
+                except Exception as e:
+                    logger.error(
+                        f"Failed to backfill reply counters for {item['conversation_id']}: {str(e)}"
+                    )
+                    self.stats["failed"] += 1
+
+            start_key = response.get("LastEvaluatedKey", None)
+            done = start_key is None
+
+        logger.info(f"Reply counter backfill {'simulated' if dry_run else 'complete'}: {updated}")
+        return updated
+
+    def backfill_reply_index(
+        self, reply_table: str = "conversation_replies", dry_run: bool = True
+    ) -> int:
+        """Write reply ID -> conversation mappings for existing pending replies.
+
+        New replies are indexed by add_pending_reply. Reply lookups only read
+        the index, so replies queued before it existed are not found by the
+        reply routes until this has run.
+
+        Args:
+            reply_table: Name of the reply index table
+            dry_run: If True, only count the mappings that would be written
+
+        Returns:
+            Number of mappings written (or that would be written)
+        """
+        index_table = self.dynamodb.Table(reply_table)
+        scan_kwargs = {
+            "FilterExpression": "attribute_exists(pending_replies)",
+            "ProjectionExpression": "conversation_id, pending_replies",
+        }
+        written = 0
+
+        done = False
+        start_key = None
+
+        with index_table.batch_writer(overwrite_by_pkeys=["reply_id"]) as batch:
+            while not done:
+                if start_key:
+                    scan_kwargs["ExclusiveStartKey"] = start_key
+
+                response = self.table.scan(**scan_kwargs)
+
+                for item in response.get("Items", []):
+                    for reply in item.get("pending_replies", []):
+                        if not reply.get("reply_id"):
+                            continue
+                        written += 1
+                        if dry_run:
+                            continue
+                        batch.put_item(
+                            Item={
+                                "reply_id": reply["reply_id"],
+                                "conversation_id": item["conversation_id"],
+                                "created_at": reply.get("generated_at", ""),
+                            }
+                        )
+
+                start_key = response.get("LastEvaluatedKey", None)
+                done = start_key is None
+
+        logger.info(f"Reply index backfill {'simulated' if dry_run else 'complete'}: {written} items")
+        return written
+
+    def split_email_history(
+        self, emails_table: str = "conversation_emails", dry_run: bool = True
+    ) -> int:
+        """Move inline email_history lists into per-email items.
+
+        Run before switching the Lambdas to EMAIL_STORAGE_MODE=items. Each email is
+        written as (conversation_id, seq) with seq = its 1-based position, which is
+        always <= last_seq, so new emails (seq = last_seq + 1) sort after them. The
+        header rewrite is conditioned on last_seq, so a conversation that receives
+        mail mid-migration is left inline and reported as failed; re-run to retry.
+
+        Args:
+            emails_table: Name of the per-email items table
+            dry_run: If True, only count the conversations that would be split
+
+        Returns:
+            Number of conversations split (or that would be split)
+        """
+        email_items = self.dynamodb.Table(emails_table)
+        scan_kwargs = {
+            "FilterExpression": "attribute_exists(email_history)",
+            "ProjectionExpression": "conversation_id, email_history, last_seq",
+        }
+        split = 0
+
+        done = False
+        start_key = None
+
+        while not done:
+            if start_key:
+                scan_kwargs["ExclusiveStartKey"] = start_key
+
+            response = self.table.scan(**scan_kwargs)
+
+            for item in response.get("Items", []):
+                conversation_id = item["conversation_id"]
+                history = item.get("email_history", [])
+                if dry_run:
+                    logger.info(f"Would split {len(history)} emails for {conversation_id}")
+                    split += 1
+                    continue
+
+                try:
+                    with email_items.batch_writer() as batch:
+                        for seq, email in enumerate(history, start=1):
+                            batch.put_item(
+                                Item={"conversation_id": conversation_id, "seq": Decimal(seq), **email}
+                            )
+
+                    update_values = {
+                        ":count": Decimal(len(history)),
+                        ":seq": item.get("last_seq", Decimal(0)),
+                    }
+                    update_expression = "SET email_count = :count REMOVE email_history"
+                    if history:
+                        last = history[-1]
+                        update_values[":last_email"] = {
+                            "seq": Decimal(len(history)),
+                            "email_id": last.get("email_id", ""),
+                            "message_id": last.get("message_id", ""),
+                            "from": last.get("from", ""),
+                            "subject": last.get("subject", ""),
+                            "timestamp": last.get("timestamp", ""),
+                            "direction": last.get("direction", "inbound"),
+                        }
+                        update_expression = (
+                            "SET email_count = :count, last_email = :last_email REMOVE email_history"
+                        )
+
+                    self.table.update_item(
+                        Key={"conversation_id": conversation_id},
+                        UpdateExpression=update_expression,
+                        ConditionExpression="last_seq = :seq",
+                        ExpressionAttributeValues=update_values,
+                    )
+                    split += 1
+                    logger.info(f"Split {len(history)} emails out of {conversation_id}")
+                except Exception as e:
+                    logger.error(f"Failed to split email history for {conversation_id}: {str(e)}")
+                    self.stats["failed"] += 1
+
+            start_key = response.get("LastEvaluatedKey", None)
+            done = start_key is None
+
+        logger.info(
+            f"Email history split {'simulated' if dry_run else 'complete'}: {split} conversations"
+        )
+        return split
+
+    def offload_reply_prompts(self, bucket_name: str, dry_run: bool = True) -> int:
+        """Move large inline llm_prompt values on existing replies to S3 blobs.
+
+        Each reply is rewritten by list index, conditioned on its reply_id, so
+        concurrent appends and status changes are not overwritten.
+
+        Args:
+            bucket_name: S3 bucket for reply blobs
+            dry_run: If True, only count the prompts that would be offloaded
+
+        Returns:
+            Number of prompts offloaded (or that would be offloaded)
+        """
+        blob_store = ReplyBlobStore(bucket_name=bucket_name)
+        scan_kwargs = {
+            "FilterExpression": "attribute_exists(pending_replies)",
+            "ProjectionExpression": "conversation_id, pending_replies",
+        }
+        offloaded = 0
+
+        done = False
+        start_key = None
+
+        while not done:
+            if start_key:
+                scan_kwargs["ExclusiveStartKey"] = start_key
+
+            response = self.table.scan(**scan_kwargs)
+
+            for item in response.get("Items", []):
+                conversation_id = item["conversation_id"]
+                for index, reply in enumerate(item.get("pending_replies", [])):
+                    prompt = reply.get("llm_prompt")
+                    if not isinstance(prompt, str) or (
+                        len(prompt.encode("utf-8")) <= blob_store.threshold_bytes
+                    ):
+                        continue
+                    if dry_run:
+                        logger.info(f"Would offload prompt for reply {reply.get('reply_id')}")
+                        offloaded += 1
+                        continue
+
+                    try:
+                        ref = blob_store.put_text(prompt)
+                        self.table.update_item(
+                            Key={"conversation_id": conversation_id},
+                            UpdateExpression=(
+                                f"SET pending_replies[{index}].llm_prompt = :none, "
+                                f"pending_replies[{index}].llm_prompt_ref = :ref"
+                            ),
+                            ConditionExpression=f"pending_replies[{index}].reply_id = :rid",
+                            ExpressionAttributeValues={
+                                ":none": None,
+                                ":ref": {**ref, "size": Decimal(ref["size"])},
+                                ":rid": reply.get("reply_id"),
+                            },
+                        )
+                        offloaded += 1
+                    except Exception as e:
+                        logger.error(
+                            f"Failed to offload prompt for reply {reply.get('reply_id')}: {str(e)}"
+                        )
+                        self.stats["failed"] += 1
+
+            start_key = response.get("LastEvaluatedKey", None)
+            done = start_key is None
+
+        logger.info(
+            f"Prompt offload {'simulated' if dry_run else 'complete'}: {offloaded} prompts"
+        )
+        return offloaded
+
     def create_gsi_if_needed(self, dry_run: bool = True) -> None:
         """Create Global Secondary Indexes if they don't exist.
 
@@ -184,15 +576,19 @@ class DynamoDBMigration:
                 ],
                 "Projection": {"ProjectionType": "ALL"},
             },
-            "ParticipantIndex": {
-                "IndexName": "ParticipantIndex",
+            LISTING_INDEX: {
+                "IndexName": LISTING_INDEX,
                 "Keys": [
-                    {"AttributeName": "participant", "KeyType": "HASH"},
+                    {"AttributeName": "listing_shard", "KeyType": "HASH"},
                     {"AttributeName": "updated_at", "KeyType": "RANGE"},
                 ],
                 "Projection": {
                     "ProjectionType": "INCLUDE",
-                    "NonKeyAttributes": ["subject", "status", "last_seq"],
+                    "NonKeyAttributes": [
+                        a
+                        for a in LISTING_ATTRIBUTES
+                        if a not in ("conversation_id", "listing_shard", "updated_at")
+                    ],
                 },
             },
         }
@@ -236,6 +632,36 @@ def main():
     parser.add_argument("--region", help="AWS region (defaults to AWS_DEFAULT_REGION or us-east-2)")
     parser.add_argument("--dry-run", action="store_true", help="Simulate migration without changes")
     parser.add_argument("--check-gsi", action="store_true", help="Check for required GSIs")
+    parser.add_argument(
+        "--backfill-participants",
+        action="store_true",
+        help="Seed the conversation_participants index table from existing conversations",
+    )
+    parser.add_argument(
+        "--split-email-history",
+        action="store_true",
+        help="Move inline email_history into the conversation_emails table",
+    )
+    parser.add_argument(
+        "--backfill-listing",
+        action="store_true",
+        help="Set listing_shard so existing conversations appear in ListingIndex",
+    )
+    parser.add_argument(
+        "--backfill-reply-counters",
+        action="store_true",
+        help="Seed pending_reply_count/last_reply_at from existing pending replies",
+    )
+    parser.add_argument(
+        "--backfill-replies",
+        action="store_true",
+        help="Seed the conversation_replies index table from existing pending replies",
+    )
+    parser.add_argument(
+        "--offload-prompts",
+        metavar="BUCKET",
+        help="Move large inline reply prompts to compressed S3 blobs in BUCKET",
+    )
 
     args = parser.parse_args()
 
@@ -244,6 +670,24 @@ def main():
     if args.check_gsi:
         migration.create_gsi_if_needed(args.dry_run)
 
+    if args.split_email_history:
+        migration.split_email_history(dry_run=args.dry_run)
+
+    if args.backfill_participants:
+        migration.backfill_participant_index(dry_run=args.dry_run)
+
+    if args.backfill_listing:
+        migration.backfill_listing_shards(dry_run=args.dry_run)
+
+    if args.backfill_reply_counters:
+        migration.backfill_reply_counters(dry_run=args.dry_run)
+
+    if args.backfill_replies:
+        migration.backfill_reply_index(dry_run=args.dry_run)
+
+    if args.offload_prompts:
+        migration.offload_reply_prompts(args.offload_prompts, dry_run=args.dry_run)
+
     stats = migration.migrate_all_conversations(args.dry_run)
 
     print(f"\nMigration {'simulation' if args.dry_run else 'complete'}:")
@@ -34,21 +34,22 @@ except ImportError:
 class ProposalPDFGenerator:
     """Handles proposal PDF generation for the email intake agent."""
 
-    def __init__(self, pdf_lambda_arn: str, s3_bucket: Optional[str] = None):
+    def __init__(self, pdf_lambda_arn: str, s3_bucket: Optional[str] = None, s3_store=None):
         """
         Initialize the PDF generator.
 
         Args:
             pdf_lambda_arn: ARN of the document generation Lambda
             s3_bucket: S3 bucket name for storing proposals (optional)
+            s3_store: Pre-built S3ProposalStore to reuse (optional)
         """
         self.pdf_lambda_arn = pdf_lambda_arn
         # Prefer unified DOCUMENT_BUCKET; fallback for legacy env var
         self.s3_bucket = s3_bucket or os.environ.get("DOCUMENT_BUCKET") or os.environ.get("ATTACHMENTS_BUCKET")
 
         # Initialize S3 store if available and bucket is configured
-        self.s3_store = None
-        if STORAGE_AVAILABLE and self.s3_bucket:
+        self.s3_store = s3_store
+        if self.s3_store is None and STORAGE_AVAILABLE and self.s3_bucket:
             try:
                 self.s3_store = S3ProposalStore(self.s3_bucket)
                 logger.info(f"S3 storage enabled for bucket: {self.s3_bucket}")
@@ -0,0 +1,187 @@
+"""Line classifier for quoted text and reply headers in email bodies.
+
+Every inbound body goes through both ``EmailThreadingUtils.extract_quoted_text``
+and ``EmailParser._clean_body``, and replies can carry thousands of quoted
+lines. Each line is classified with one precompiled alternation (instead of a
+list of patterns per line) and scanning stops at the first quote boundary.
+
+Recognized boundaries:
+    - ``>`` quoted lines
+    - Gmail/Apple Mail attributions ("On <date>, <name> wrote:"), including
+      Gmail's two-line wrap and common localized forms
+    - Outlook "-----Original Message-----" and underscore separators, and
+      "From:/Sent:/To:/Subject:" header blocks
+    - "Begin forwarded message:" (Apple Mail) and "Forwarded message" (Gmail)
+"""
+
+import re
+from typing import Iterator, List, Sequence, Tuple
+
+# Line kinds
+CONTENT = "content"
+BLANK = "blank"
+QUOTED = "quoted"
+ATTRIBUTION = "attribution"
+HEADER = "header"
+SEPARATOR = "separator"
+SIGNATURE = "signature"
+
+# Kinds that always mark the start of quoted material
+BOUNDARY_KINDS = frozenset((QUOTED, ATTRIBUTION, SEPARATOR))
+# Kinds that introduce a quoted or forwarded message
+REPLY_HEADER_KINDS = frozenset((ATTRIBUTION, HEADER, SEPARATOR))
+
+# "... wrote:" and localized forms; German puts the sender after the verb
+_ATTRIBUTION_TAIL = r"(?:(?:wrote|a\s+écrit|escribió|ha\s+scritto|schreef)\s*|schrieb\b.*):\s*$"
+
+# Matched against the line with leading '>' and spaces removed
+_REPLY_LINE = re.compile(
+    r"""
+    (?P<separator>
+        -{2,}\s*(?:original\s+message|forwarded\s+message)\s*-{2,}
+      | _{3,}\s*$
+      | begin\s+forwarded\s+message:
+    )
+  | (?P<attribution>
+        (?:on|le|am|el|il|op)\s.+"""
+    + _ATTRIBUTION_TAIL
+    + r"""
+    )
+  | (?P<header>(?:from|sent|to|subject|cc):)
+    """,
+    re.IGNORECASE | re.VERBOSE,
+)
+
+# Matched against the stripped, unquoted line
+_SIGNATURE_LINE = re.compile(r"-{2,}\s*$|sent\s+from\s|get\s+outlook", re.IGNORECASE)
+
+# Gmail wraps long attributions: "On Mon, Jan 6, 2025 at 9:14 AM Jane Doe <"
+# followed by "jane@example.com> wrote:"
+_ATTRIBUTION_START = re.compile(r"(?:on|le|am|el|il|op)\s", re.IGNORECASE)
+_ATTRIBUTION_END = re.compile(_ATTRIBUTION_TAIL, re.IGNORECASE)
+
+# Lowercased two-character prefixes _REPLY_LINE can match; most lines skip the regex
+_ATTRIBUTION_PREFIXES = frozenset(("on", "le", "am", "el", "il", "op"))
+_REPLY_LINE_PREFIXES = _ATTRIBUTION_PREFIXES | {"--", "__", "be", "fr", "se", "to", "su", "cc"}
+
+# Outlook puts From/Sent/To/Subject on consecutive lines; look this far for a second field
+_HEADER_BLOCK_LOOKAHEAD = 4
+
+
+def _unquote(line: str) -> str:
+    return line.lstrip("> ").strip()
+
+
+def _classify(line: str) -> Tuple[str, str]:
+    """Classify a line, also returning its unquoted text."""
+    stripped = line.strip()
+    if not stripped:
+        return BLANK, stripped
+
+    unquoted = line.lstrip("> ").strip() if stripped[0] == ">" else stripped
+    if unquoted[:2].lower() in _REPLY_LINE_PREFIXES:
+        match = _REPLY_LINE.match(unquoted)
+        if match:
+            return match.lastgroup, unquoted
+    if stripped[0] == ">":
+        return QUOTED, unquoted
+    if _SIGNATURE_LINE.match(stripped):
+        return SIGNATURE, unquoted
+    return CONTENT, unquoted
+
+
+def classify_line(line: str) -> str:
+    """Classify a single body line.
+
+    Reply headers are recognized inside quoted lines too ("> On ... wrote:"),
+    while signatures only count on unquoted lines.
+
+    Args:
+        line: One line of the body
+
+    Returns:
+        One of the line kind constants
+    """
+    return _classify(line)[0]
+
+
+def iter_line_kinds(lines: Sequence[str]) -> Iterator[Tuple[int, str]]:
+    """Classify lines lazily, resolving two-line attributions.
+
+    Callers that stop at the first boundary never classify the rest of the body.
+
+    Args:
+        lines: Body lines
+
+    Yields:
+        (index, kind) for each line
+    """
+    last = len(lines) - 1
+    pending_attribution = False
+    for i, line in enumerate(lines):
+        if pending_attribution:
+            pending_attribution = False
+            yield i, ATTRIBUTION
+            continue
+
+        kind, unquoted = _classify(line)
+        if (
+            i < last
+            and (kind is CONTENT or kind is QUOTED)
+            and unquoted[:2].lower() in _ATTRIBUTION_PREFIXES
+            and _ATTRIBUTION_START.match(unquoted)
+            and _ATTRIBUTION_END.search(lines[i + 1])
+        ):
+            pending_attribution = True
+            kind = ATTRIBUTION
+        yield i, kind
+
+
+def _starts_header_block(lines: Sequence[str], index: int) -> bool:
+    """Whether a header line opens an Outlook-style From/Sent/To/Subject block."""
+    normalized = _unquote(lines[index]).lower()
+    if not normalized.startswith("from:"):
+        return False
+    if "subject:" in normalized:
+        # Some clients flatten the whole block onto one line
+        return True
+    for line in lines[index + 1 : index + 1 + _HEADER_BLOCK_LOOKAHEAD]:
+        kind = classify_line(line)
+        if kind == HEADER:
+            return True
+        if kind != BLANK:
+            return False
+    return False
+
+
+def find_quote_start(lines: Sequence[str]) -> int:
+    """Index of the first line of quoted material.
+
+    Args:
+        lines: Body lines
+
+    Returns:
+        Index of the first boundary line, or len(lines) when nothing is quoted
+    """
+    for i, kind in iter_line_kinds(lines):
+        if kind in BOUNDARY_KINDS:
+            return i
+        if kind == HEADER and _starts_header_block(lines, i):
+            return i
+    return len(lines)
+
+
+def split_quoted_text(body: str) -> Tuple[str, str]:
+    """Separate new content from quoted text.
+
+    Args:
+        body: Full email body
+
+    Returns:
+        Tuple of (new_content, quoted_content)
+    """
+    lines: List[str] = body.split("\n")
+    quote_start = find_quote_start(lines)
+    new_content = "\n".join(lines[:quote_start]).strip()
+    quoted_content = "\n".join(lines[quote_start:]).strip()
+    return new_content, quoted_content
@@ -0,0 +1,183 @@
+"""Content-addressed S3 storage for large pending reply payloads.
+
+Pending replies carry the full LLM prompt, which can run to tens of kilobytes
+and is rewritten every time the pending_replies list is updated. Payloads above
+a size threshold are gzip-compressed and stored once per SHA-256 digest; the
+conversation item keeps a small reference dict in ``<field>_ref`` instead.
+"""
+
+import gzip
+import hashlib
+import logging
+import os
+from typing import Any, Dict, Iterable, Optional
+
+import boto3
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger(__name__)
+
+REPLY_BLOB_BUCKET = os.environ.get("REPLY_BLOB_BUCKET", "")
+REPLY_BLOB_PREFIX = os.environ.get("REPLY_BLOB_PREFIX", "reply-blobs/")
+REPLY_BLOB_THRESHOLD_BYTES = int(os.environ.get("REPLY_BLOB_THRESHOLD_BYTES", "4096"))
+
+# Reply fields eligible for offload. llm_response stays inline: it is a short
+# email draft that the dashboard renders from the pending replies listing.
+OFFLOADED_REPLY_FIELDS = ("llm_prompt",)
+
+
+class ReplyBlobStore:
+    """Stores large reply payloads as compressed, deduplicated S3 objects."""
+
+    def __init__(
+        self,
+        bucket_name: str = REPLY_BLOB_BUCKET,
+        prefix: str = REPLY_BLOB_PREFIX,
+        threshold_bytes: int = REPLY_BLOB_THRESHOLD_BYTES,
+        s3_client=None,
+    ):
+        """Initialize blob store.
+
+        Args:
+            bucket_name: S3 bucket for blobs
+            prefix: Key prefix for blobs
+            threshold_bytes: Payloads at or below this UTF-8 size stay inline
+            s3_client: Optional S3 client (for testing)
+        """
+        if not bucket_name:
+            raise ValueError("bucket_name is required for ReplyBlobStore")
+
+        self.bucket_name = bucket_name
+        self.prefix = prefix
+        self.threshold_bytes = threshold_bytes
+        self.s3_client = s3_client or boto3.client("s3")
+
+    @classmethod
+    def from_env(cls) -> Optional["ReplyBlobStore"]:
+        """Create a store if REPLY_BLOB_BUCKET is configured, else None (inline storage)."""
+        if not REPLY_BLOB_BUCKET:
+            return None
+        return cls()
+
+    def put_text(self, text: str) -> Dict[str, Any]:
+        """Store text under its content hash, skipping the upload if it already exists.
+
+        Args:
+            text: Payload to store
+
+        Returns:
+            Reference dict with bucket, key, sha256, size and encoding
+        """
+        raw = text.encode("utf-8")
+        digest = hashlib.sha256(raw).hexdigest()
+        key = f"{self.prefix}{digest[:2]}/{digest}.gz"
+
+        if not self._exists(key):
+            # mtime=0 keeps the compressed bytes deterministic for identical payloads
+            self.s3_client.put_object(
+                Bucket=self.bucket_name,
+                Key=key,
+                Body=gzip.compress(raw, mtime=0),
+                ContentType="text/plain; charset=utf-8",
+                ContentEncoding="gzip",
+                Metadata={"sha256": digest},
+            )
+            logger.info(f"Stored reply blob {key} ({len(raw)} bytes)")
+        else:
+            logger.info(f"Reply blob {key} already stored, skipping upload")
+
+        return {
+            "bucket": self.bucket_name,
+            "key": key,
+            "sha256": digest,
+            "size": len(raw),
+            "encoding": "gzip",
+        }
+
+    def get_text(self, ref: Dict[str, Any]) -> str:
+        """Load and decompress a payload from its reference.
+
+        Args:
+            ref: Reference dict returned by put_text
+
+        Returns:
+            The original text
+        """
+        response = self.s3_client.get_object(
+            Bucket=ref.get("bucket", self.bucket_name), Key=ref["key"]
+        )
+        body = response["Body"].read()
+        if ref.get("encoding") == "gzip":
+            body = gzip.decompress(body)
+        return body.decode("utf-8")
+
+    def offload_reply(
+        self, reply: Dict[str, Any], fields: Iterable[str] = OFFLOADED_REPLY_FIELDS
+    ) -> Dict[str, Any]:
+        """Replace large fields on a reply with blob references in place.
+
+        Args:
+            reply: Pending reply dict
+            fields: Fields eligible for offload
+
+        Returns:
+            The same reply dict
+        """
+        for field in fields:
+            value = reply.get(field)
+            if isinstance(value, str) and len(value.encode("utf-8")) > self.threshold_bytes:
+                reply[f"{field}_ref"] = self.put_text(value)
+                reply[field] = None
+        return reply
+
+    def hydrate_reply(
+        self, reply: Dict[str, Any], fields: Iterable[str] = OFFLOADED_REPLY_FIELDS
+    ) -> Dict[str, Any]:
+        """Restore offloaded fields on a reply in place.
+
+        Args:
+            reply: Pending reply dict, possibly holding ``<field>_ref`` entries
+            fields: Fields to restore
+
+        Returns:
+            The same reply dict
+        """
+        return hydrate_reply(reply, fields, store=self)
+
+    def _exists(self, key: str) -> bool:
+        """Check whether a blob is already stored."""
+        try:
+            self.s3_client.head_object(Bucket=self.bucket_name, Key=key)
+            return True
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+
+def hydrate_reply(
+    reply: Dict[str, Any],
+    fields: Iterable[str] = OFFLOADED_REPLY_FIELDS,
+    store: Optional[ReplyBlobStore] = None,
+) -> Dict[str, Any]:
+    """Restore offloaded fields on a reply in place.
+
+    Readers may not have REPLY_BLOB_BUCKET configured; each reference carries its
+    own bucket, so a plain S3 client is enough to read it back.
+
+    Args:
+        reply: Pending reply dict, possibly holding ``<field>_ref`` entries
+        fields: Fields to restore
+        store: Optional store to read through
+
+    Returns:
+        The same reply dict
+    """
+    for field in fields:
+        ref = reply.get(f"{field}_ref")
+        if not ref or reply.get(field):
+            continue
+        if store is None:
+            store = ReplyBlobStore(bucket_name=ref["bucket"])
+        reply[field] = store.get_text(ref)
+    return reply
@@ -7,7 +7,7 @@ import re
 import uuid
 from datetime import datetime
 from decimal import Decimal  # Added for Decimal handling
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 try:
     from src.providers import get_provider
@@ -16,15 +16,19 @@ try:
     USE_AI_PROVIDER = True
 except ImportError:
     # Running in Lambda environment
-    import boto3
-
     USE_AI_PROVIDER = False
 
+from src.common.bedrock_invoker import get_bedrock_invoker
+from src.common.model_router import ModelTier, build_tiers, has_keys, route
+
 logger = logging.getLogger(__name__)
 
 # Get AI provider from environment
 AI_PROVIDER = os.environ.get("AI_PROVIDER", "bedrock")
 
+# Fields an extraction must contain before a cheaper model's answer is accepted
+REQUIRED_FIELDS = ("title", "summary", "project_type", "features")
+
 
 def _clean_json_response(text: Optional[str]) -> str:
     cleaned = (text or "").strip()
@@ -46,6 +50,10 @@ def _parse_json_response(text: Optional[str]) -> Any:
         raise
 
 
+def _is_requirements_response(response_body: Dict[str, Any]) -> bool:
+    return isinstance(_parse_json_response(response_body["content"][0]["text"]), dict)
+
+
 class RequirementEditError(Exception):
     """Raised when requirement edits cannot be applied."""
 
@@ -53,19 +61,22 @@ class RequirementEditError(Exception):
 class RequirementExtractor:
     """Extracts project requirements from email conversations using LLM."""
 
-    def __init__(self):
-        """Initialize with AI provider or Bedrock client."""
+    def __init__(self, bedrock_client=None):
+        """Initialize with AI provider or Bedrock client.
+
+        Args:
+            bedrock_client: Optional shared Bedrock runtime client
+        """
         if USE_AI_PROVIDER:
             self.provider = get_provider(AI_PROVIDER)
         else:
             # Lambda environment - use Bedrock directly
-            self.bedrock_client = boto3.client(
-                "bedrock-runtime", region_name=os.environ.get("AWS_REGION", "us-east-2")
-            )
+            self.invoker = get_bedrock_invoker(bedrock_client)
             self.inference_profile_arn = self._resolve_inference_profile()
             self.model_id = os.environ.get(
                 "BEDROCK_MODEL_ID", "anthropic.claude-haiku-4-5-20251001-v1:0"
             )
+            self.tiers = build_tiers("requirements", self.model_id, self.inference_profile_arn)
 
     def _resolve_inference_profile(self) -> Optional[str]:
         return (
@@ -73,17 +84,22 @@ class RequirementExtractor:
             or os.environ.get("VISION_INFERENCE_PROFILE_ARN")
         )
 
-    def _invoke_bedrock(self, request_body: Dict[str, Any]) -> Dict[str, Any]:
-        payload = json.dumps(request_body)
-        if self.inference_profile_arn:
-            response = self.bedrock_client.invoke_model(
-                modelId=self.inference_profile_arn, body=payload, contentType="application/json"
-            )
-            return json.loads(response["body"].read())
-        response = self.bedrock_client.invoke_model(
-            modelId=self.model_id, body=payload, contentType="application/json"
+    def _invoke_bedrock(
+        self,
+        request_body: Dict[str, Any],
+        cache: bool = False,
+        tier: Optional[ModelTier] = None,
+        validate: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    ) -> Dict[str, Any]:
+        tier = tier or ModelTier(self.model_id, self.inference_profile_arn)
+        return self.invoker.invoke(
+            request_body,
+            model_id=tier.model_id,
+            inference_profile_arn=tier.inference_profile_arn,
+            agent="requirement_extractor",
+            cache=cache,
+            validate=validate,
         )
-        return json.loads(response["body"].read())
 
     def extract(
         self, email_history: List[Dict[str, Any]], existing_requirements: Dict[str, Any]
@@ -187,7 +203,6 @@ Return ONLY valid JSON, no additional text."""
             if USE_AI_PROVIDER:
                 # Use provider to extract requirements
                 response = self.provider.generate_code(prompt, [])
-                llm_response = response
                 # Parse JSON response
                 requirements = _parse_json_response(response)
             else:
@@ -199,11 +214,16 @@ Return ONLY valid JSON, no additional text."""
                     "temperature": 0.3,
                 }
 
-                response_body = self._invoke_bedrock(request_body)
-                llm_response = response_body["content"][0]["text"]
+                def call(tier: ModelTier) -> str:
+                    response_body = self._invoke_bedrock(request_body, tier=tier)
+                    return response_body["content"][0]["text"]
 
-                # Parse JSON response
-                requirements = _parse_json_response(llm_response)
+                def validate(text: str):
+                    parsed = _parse_json_response(text)
+                    return parsed, has_keys(parsed, REQUIRED_FIELDS, "requirements")
+
+                # Cheapest model first; malformed or incomplete JSON escalates
+                requirements = route("requirements", self.tiers, call, validate).value
 
             # Log extracted requirements
             logger.info("=" * 80)
@@ -218,7 +238,7 @@ Return ONLY valid JSON, no additional text."""
 
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse LLM response as JSON: {str(e)}")
-            logger.error(f"LLM Response was: {llm_response if 'llm_response' in locals() else 'Not available'}")
+            logger.error(f"LLM Response was: {e.doc}")
             # Return existing requirements on error
             return existing_requirements
         except Exception as e:
@@ -272,7 +292,11 @@ Return ONLY the updated requirements JSON. Do not include explanations, markdown
                         "temperature": 0.1,
                     }
 
-                    body = self._invoke_bedrock(request_body)
+                    # Deterministic edit; identical replays are served from the LLM cache,
+                    # which only keeps responses that parse to a requirements object
+                    body = self._invoke_bedrock(
+                        request_body, cache=True, validate=_is_requirements_response
+                    )
                     model_text = body["content"][0]["text"]
                     logger.info("Requirement edit model raw response (bedrock): %s", model_text)
                     updated = _parse_json_response(model_text)
@@ -4,7 +4,6 @@ Response Reviser for email intake system.
 Handles revising email responses based on AI feedback using Claude Sonnet 4/5.
 """
 
-import json
 import os
 import logging
 from typing import Dict, Any, Optional
@@ -16,11 +15,9 @@ try:
     USE_AI_PROVIDER = True
 except ImportError:
     USE_AI_PROVIDER = False
-    # Fall back to direct Bedrock
-    import boto3
-    bedrock_client = boto3.client(
-        "bedrock-runtime", region_name=os.environ.get("AWS_REGION", "us-east-2")
-    )
+
+# Fall back to direct Bedrock through the shared invoker
+from src.common.bedrock_invoker import get_bedrock_invoker
 
 logger = logging.getLogger(__name__)
 
@@ -28,8 +25,12 @@ logger = logging.getLogger(__name__)
 class ResponseReviser:
     """Revises email responses using Claude Sonnet 4/5 based on specific feedback."""
     
-    def __init__(self):
-        """Initialize the response reviser with Claude Sonnet 4/5."""
+    def __init__(self, bedrock_client=None):
+        """Initialize the response reviser with Claude Sonnet 4/5.
+
+        Args:
+            bedrock_client: Optional shared Bedrock runtime client
+        """
         # Use Sonnet 4/5 (same model as original response generation)
         self.model_id = os.environ.get(
             "REVISION_MODEL_ID",
@@ -43,18 +44,16 @@ class ResponseReviser:
         
         if USE_AI_PROVIDER:
             self.provider = get_provider(os.environ.get("AI_PROVIDER", "bedrock"))
+        else:
+            self.invoker = get_bedrock_invoker(bedrock_client)
 
     def _invoke_bedrock(self, request_body: Dict[str, Any]) -> Dict[str, Any]:
-        payload = json.dumps(request_body)
-        if self.inference_profile_arn:
-            response = bedrock_client.invoke_model(
-                modelId=self.inference_profile_arn, body=payload, contentType="application/json"
-            )
-            return json.loads(response["body"].read())
-        response = bedrock_client.invoke_model(
-            modelId=self.model_id, body=payload, contentType="application/json"
+        return self.invoker.invoke(
+            request_body,
+            model_id=self.model_id,
+            inference_profile_arn=self.inference_profile_arn,
+            agent="response_reviser",
         )
-        return json.loads(response["body"].read())
     
     def revise_response(
         self, 
@@ -11,7 +11,7 @@ import os
 import re
 from datetime import datetime
 from decimal import Decimal
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -55,27 +55,72 @@ try:
 except ImportError:
     USE_AI_PROVIDER = False
     logger.warning("AI provider framework not available, using Bedrock directly")
-    
-# Use Bedrock in Lambda environment
-if not USE_AI_PROVIDER:
-    import boto3
-    bedrock_client = boto3.client(
-        "bedrock-runtime", 
-        region_name=os.environ.get("AWS_REGION", "us-east-2")
-    )
+
+from src.common.bedrock_invoker import build_cached_request, get_bedrock_invoker
+from src.common.model_router import ModelTier, build_tiers, has_keys, route
+
+# Scores a review must contain before the cheaper model's answer is accepted
+SCORE_KEYS = (
+    "relevance_score",
+    "completeness_score",
+    "accuracy_score",
+    "next_steps_score",
+    "overall_score",
+)
+
+# Static prefix of every review request, sent as a cacheable system block
+REVIEW_INSTRUCTIONS = """You are reviewing an email response before it gets sent to a client. Analyze the response quality and appropriateness.
+The conversation context comes first, followed by the proposed response to review.
+
+Review the response on the following criteria:
+
+1. RELEVANCE (1-5): Does the response directly address what the client asked or needs?
+2. COMPLETENESS (1-5): Are all the client's questions and concerns addressed?
+3. ACCURACY (1-5): Is the technical information correct? No over-promising or false claims?
+4. NEXT STEPS (1-5): Are clear next actions or path forward provided?
+
+Also identify any RED FLAGS:
+- Over-promising capabilities or timelines
+- Incorrect pricing or technical information
+- Commitments beyond reasonable scope
+- Inconsistencies with previous responses
+- Unprofessional tone or language
+
+Provide a 2-3 sentence summary of the response quality and any concerns.
+
+Output a JSON object with your analysis:
+{
+  "relevance_score": 1-5,
+  "completeness_score": 1-5,
+  "accuracy_score": 1-5,
+  "next_steps_score": 1-5,
+  "overall_score": 1-5,
+  "red_flags": ["list", "of", "concerns"],
+  "summary": "Brief 2-3 sentence assessment of response quality and recommendations"
+}
+"""
 
 
 class EmailReviewer:
     """Reviews email responses using Claude 4.5 Haiku for quality assessment."""
     
-    def __init__(self):
-        """Initialize the email reviewer with Claude 4.5 Haiku model."""
+    def __init__(self, bedrock_client=None):
+        """Initialize the email reviewer with Claude 4.5 Haiku model.
+
+        Args:
+            bedrock_client: Optional shared Bedrock runtime client
+        """
         # Use Haiku for fast, cost-effective review
         self.model = "anthropic.claude-haiku-4-5-20251001-v1:0"  # Bedrock model ID
         self.anthropic_model = "claude-4-5-haiku-20241022"  # For AI provider
         
         if USE_AI_PROVIDER:
             self.provider = get_provider(os.environ.get("AI_PROVIDER", "bedrock"))
+            self.tiers = [ModelTier(self.model)]
+        else:
+            self.invoker = get_bedrock_invoker(bedrock_client)
+            # Haiku first; reviews missing scores escalate
+            self.tiers = build_tiers("review", self.model)
         
     def review_response(self, conversation: Dict[str, Any], response_text: str, metadata: Dict[str, Any] = None) -> Dict[str, Any]:
         """
@@ -91,14 +136,20 @@ class EmailReviewer:
         """
         try:
             # Build the review prompt
-            prompt = self._build_review_prompt(conversation, response_text, metadata)
-            
-            # Call Haiku for review
-            response = self._call_haiku(prompt)
+            context, prompt = self._build_review_prompt(conversation, response_text, metadata)
             
-            # Parse and validate the response
-            review = _parse_json_response(response)
-            validated_review = self._validate_review(review)
+            def validate(response: str):
+                review = _parse_json_response(response)
+                complete = has_keys(review, SCORE_KEYS, "review")
+                return self._validate_review(review), complete
+
+            # Call the cheapest model, escalating until every score is present
+            validated_review = route(
+                "review",
+                self.tiers,
+                lambda tier: self._call_haiku(prompt, context=context, tier=tier),
+                validate,
+            ).value
             
             # Log successful review
             logger.info(f"Successfully reviewed response with overall score: {validated_review.get('overall_score', 0)}")
@@ -107,7 +158,7 @@ class EmailReviewer:
             
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse review JSON: {str(e)}")
-            logger.error(f"Raw response: {response[:500]}...")
+            logger.error(f"Raw response: {e.doc[:500]}...")
             return self._get_default_review()
             
         except Exception as e:
@@ -286,8 +337,17 @@ IMPORTANT INSTRUCTIONS:
         
         return ""
     
-    def _build_review_prompt(self, conversation: Dict[str, Any], response_text: str, metadata: Dict[str, Any] = None) -> str:
-        """Build the review prompt with conversation context and response."""
+    def _build_review_prompt(
+        self, conversation: Dict[str, Any], response_text: str, metadata: Dict[str, Any] = None
+    ) -> Tuple[str, str]:
+        """Build the per-call parts of the review prompt.
+
+        The conversation context is cached after REVIEW_INSTRUCTIONS, so re-reviewing
+        a revised response in the same conversation only pays for the response part.
+
+        Returns:
+            Tuple of (conversation_context, response_prompt)
+        """
         # Convert Decimals in conversation data
         conversation = decimal_to_json_serializable(conversation)
         if metadata:
@@ -314,75 +374,51 @@ IMPORTANT INSTRUCTIONS:
         if metadata:
             metadata_text = f"\n\nRESPONSE METADATA:\n{json.dumps(metadata, indent=2)}"
         
-        prompt = f"""
-You are reviewing an email response before it gets sent to a client. Analyze the response quality and appropriateness.
-
-CLIENT: {client_email}
+        context = f"""CLIENT: {client_email}
 CONVERSATION PHASE: {phase}
 
 CONVERSATION CONTEXT (recent emails):
 {context_text}
+"""
 
-PROPOSED RESPONSE TO REVIEW:
+        prompt = f"""PROPOSED RESPONSE TO REVIEW:
 {response_text}
 {metadata_text}
 
-Please review this response on the following criteria:
-
-1. RELEVANCE (1-5): Does the response directly address what the client asked or needs?
-2. COMPLETENESS (1-5): Are all the client's questions and concerns addressed?
-3. ACCURACY (1-5): Is the technical information correct? No over-promising or false claims?
-4. NEXT STEPS (1-5): Are clear next actions or path forward provided?
-
-Also identify any RED FLAGS:
-- Over-promising capabilities or timelines
-- Incorrect pricing or technical information
-- Commitments beyond reasonable scope
-- Inconsistencies with previous responses
-- Unprofessional tone or language
-
-Provide a 2-3 sentence summary of the response quality and any concerns.
-
-Output a JSON object with your analysis:
-{{
-  "relevance_score": 1-5,
-  "completeness_score": 1-5,
-  "accuracy_score": 1-5,
-  "next_steps_score": 1-5,
-  "overall_score": 1-5,
-  "red_flags": ["list", "of", "concerns"],
-  "summary": "Brief 2-3 sentence assessment of response quality and recommendations",
-  "reviewed_at": "{datetime.now().isoformat()}"
-}}
-
 Provide ONLY the JSON object:
 """
         
-        return prompt
+        return context, prompt
     
-    def _call_haiku(self, prompt: str) -> str:
-        """Call Claude 4.5 Haiku model for review."""
+    def _call_haiku(
+        self, prompt: str, context: str = "", tier: Optional[ModelTier] = None
+    ) -> str:
+        """Call the review model (Claude 4.5 Haiku unless escalated to ``tier``)."""
         try:
             if USE_AI_PROVIDER:
                 # Use the AI provider framework
-                response = self.provider.generate_code(prompt, [])
+                response = self.provider.generate_code(
+                    f"{REVIEW_INSTRUCTIONS}\n{context}\n{prompt}", []
+                )
                 return response
             else:
                 # Use Bedrock directly in Lambda
-                request_body = {
-                    "anthropic_version": "bedrock-2023-05-31",
-                    "max_tokens": 1000,
-                    "messages": [{"role": "user", "content": prompt}],
-                    "temperature": 0.2,  # Low temperature for consistent review
-                }
-                
-                response = bedrock_client.invoke_model(
-                    modelId=self.model,
-                    body=json.dumps(request_body)
+                tier = tier or self.tiers[0]
+                request_body = build_cached_request(
+                    REVIEW_INSTRUCTIONS,
+                    prompt,
+                    max_tokens=1000,
+                    temperature=0.2,  # Low temperature for consistent review
+                    cached_context=context,
+                    model_id=tier.model_id,
                 )
                 
-                response_body = json.loads(response['body'].read())
-                return response_body['content'][0]['text']
+                return self.invoker.invoke_text(
+                    request_body,
+                    model_id=tier.model_id,
+                    inference_profile_arn=tier.inference_profile_arn,
+                    agent="email_reviewer",
+                )
                 
         except Exception as e:
             logger.error(f"Error calling Haiku model: {str(e)}")
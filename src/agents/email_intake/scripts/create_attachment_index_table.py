@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Create conversation_attachments DynamoDB table for attachment deduplication.
+
+Each item counts the references a conversation holds to one attachment, keyed by
+(sha256, conversation_id). Items are deleted when their last reference is
+released (see AttachmentIndex.release_reference).
+"""
+
+import sys
+
+import boto3
+
+
+def create_attachment_index_table(region="us-east-2", table_name="conversation_attachments"):
+    """Create the conversation_attachments DynamoDB table."""
+    dynamodb = boto3.resource("dynamodb", region_name=region)
+
+    try:
+        # Check if table already exists
+        existing_tables = [table.name for table in dynamodb.tables.all()]
+        if table_name in existing_tables:
+            print(f"Table {table_name} already exists")
+            return dynamodb.Table(table_name)
+
+        # Create table
+        print(f"Creating table {table_name}...")
+        table = dynamodb.create_table(
+            TableName=table_name,
+            KeySchema=[
+                {"AttributeName": "sha256", "KeyType": "HASH"},  # Partition key
+                {"AttributeName": "conversation_id", "KeyType": "RANGE"},  # Sort key
+            ],
+            AttributeDefinitions=[
+                {"AttributeName": "sha256", "AttributeType": "S"},
+                {"AttributeName": "conversation_id", "AttributeType": "S"},
+            ],
+            BillingMode="PAY_PER_REQUEST",  # On-demand pricing
+            Tags=[
+                {"Key": "Project", "Value": "SoloPilot"},
+                {"Key": "Component", "Value": "EmailIntake"},
+                {"Key": "Environment", "Value": "Production"},
+            ],
+        )
+
+        # Wait for table to be created
+        print("Waiting for table to be created...")
+        table.wait_until_exists()
+
+        print(f"Table {table_name} created successfully!")
+        print(f"Table ARN: {table.table_arn}")
+
+        return table
+
+    except Exception as e:
+        print(f"Error creating table: {str(e)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Create conversation_attachments DynamoDB table")
+    parser.add_argument("--region", default="us-east-2", help="AWS region")
+    parser.add_argument("--table", default="conversation_attachments", help="Table name")
+
+    args = parser.parse_args()
+
+    create_attachment_index_table(args.region, args.table)
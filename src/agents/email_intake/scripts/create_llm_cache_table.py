@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Create llm_response_cache DynamoDB table for the shared LLM response cache.
+
+Each item holds one cached model response keyed by cache_key (SHA-256 of the
+model ID and request body, see src/common/llm_cache.py). Items expire through
+DynamoDB TTL on the "ttl" attribute.
+"""
+
+import sys
+
+import boto3
+
+
+def create_llm_cache_table(region="us-east-2", table_name="llm_response_cache"):
+    """Create the llm_response_cache DynamoDB table."""
+    dynamodb = boto3.resource("dynamodb", region_name=region)
+
+    try:
+        # Check if table already exists
+        existing_tables = [table.name for table in dynamodb.tables.all()]
+        if table_name in existing_tables:
+            print(f"Table {table_name} already exists")
+            return dynamodb.Table(table_name)
+
+        # Create table
+        print(f"Creating table {table_name}...")
+        table = dynamodb.create_table(
+            TableName=table_name,
+            KeySchema=[{"AttributeName": "cache_key", "KeyType": "HASH"}],  # Partition key
+            AttributeDefinitions=[{"AttributeName": "cache_key", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",  # On-demand pricing
+            Tags=[
+                {"Key": "Project", "Value": "SoloPilot"},
+                {"Key": "Component", "Value": "EmailIntake"},
+                {"Key": "Environment", "Value": "Production"},
+            ],
+        )
+
+        # Wait for table to be created
+        print("Waiting for table to be created...")
+        table.wait_until_exists()
+
+        print(f"Table {table_name} created successfully!")
+        print(f"Table ARN: {table.table_arn}")
+
+        # Enable TTL on the table
+        client = boto3.client("dynamodb", region_name=region)
+        try:
+            client.update_time_to_live(
+                TableName=table_name,
+                TimeToLiveSpecification={"Enabled": True, "AttributeName": "ttl"},
+            )
+            print("TTL enabled on 'ttl' attribute")
+        except Exception as e:
+            print(f"Warning: Could not enable TTL: {str(e)}")
+
+        return table
+
+    except Exception as e:
+        print(f"Error creating table: {str(e)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Create llm_response_cache DynamoDB table")
+    parser.add_argument("--region", default="us-east-2", help="AWS region")
+    parser.add_argument("--table", default="llm_response_cache", help="Table name")
+
+    args = parser.parse_args()
+
+    create_llm_cache_table(args.region, args.table)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Create conversation_participants DynamoDB table for participant lookups.
+
+Each item maps a (participant, conversation_id) pair to a small header snapshot.
+The UpdatedAtIndex LSI sorts a participant's conversations by updated_at so
+they can be queried newest-first instead of scanning the conversations table.
+"""
+
+import sys
+
+import boto3
+
+
+def create_participant_index_table(region="us-east-2", table_name="conversation_participants"):
+    """Create the conversation_participants DynamoDB table."""
+    dynamodb = boto3.resource("dynamodb", region_name=region)
+
+    try:
+        # Check if table already exists
+        existing_tables = [table.name for table in dynamodb.tables.all()]
+        if table_name in existing_tables:
+            print(f"Table {table_name} already exists")
+            return dynamodb.Table(table_name)
+
+        # Create table
+        print(f"Creating table {table_name}...")
+        table = dynamodb.create_table(
+            TableName=table_name,
+            KeySchema=[
+                {"AttributeName": "participant", "KeyType": "HASH"},  # Partition key
+                {"AttributeName": "conversation_id", "KeyType": "RANGE"},  # Sort key
+            ],
+            AttributeDefinitions=[
+                {"AttributeName": "participant", "AttributeType": "S"},
+                {"AttributeName": "conversation_id", "AttributeType": "S"},
+                {"AttributeName": "updated_at", "AttributeType": "S"},
+            ],
+            LocalSecondaryIndexes=[
+                {
+                    "IndexName": "UpdatedAtIndex",
+                    "KeySchema": [
+                        {"AttributeName": "participant", "KeyType": "HASH"},
+                        {"AttributeName": "updated_at", "KeyType": "RANGE"},
+                    ],
+                    "Projection": {"ProjectionType": "ALL"},
+                }
+            ],
+            BillingMode="PAY_PER_REQUEST",  # On-demand pricing
+            Tags=[
+                {"Key": "Project", "Value": "SoloPilot"},
+                {"Key": "Component", "Value": "EmailIntake"},
+                {"Key": "Environment", "Value": "Production"},
+            ],
+        )
+
+        # Wait for table to be created
+        print("Waiting for table to be created...")
+        table.wait_until_exists()
+
+        print(f"Table {table_name} created successfully!")
+        print(f"Table ARN: {table.table_arn}")
+
+        # Enable TTL on the table
+        client = boto3.client("dynamodb", region_name=region)
+        try:
+            client.update_time_to_live(
+                TableName=table_name,
+                TimeToLiveSpecification={"Enabled": True, "AttributeName": "ttl"},
+            )
+            print("TTL enabled on 'ttl' attribute")
+        except Exception as e:
+            print(f"Warning: Could not enable TTL: {str(e)}")
+
+        return table
+
+    except Exception as e:
+        print(f"Error creating table: {str(e)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Create conversation_participants DynamoDB table")
+    parser.add_argument("--region", default="us-east-2", help="AWS region")
+    parser.add_argument("--table", default="conversation_participants", help="Table name")
+
+    args = parser.parse_args()
+
+    create_participant_index_table(args.region, args.table)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Create conversation_replies DynamoDB table for reply lookups.
+
+Each item maps a pending reply's reply_id to the conversation that holds it, so
+API routes that only receive a reply ID can load the conversation with one key
+read instead of scanning the conversations table. Items have no TTL; they are
+deleted together with their conversation.
+"""
+
+import sys
+
+import boto3
+
+
+def create_reply_index_table(region="us-east-2", table_name="conversation_replies"):
+    """Create the conversation_replies DynamoDB table."""
+    dynamodb = boto3.resource("dynamodb", region_name=region)
+
+    try:
+        # Check if table already exists
+        existing_tables = [table.name for table in dynamodb.tables.all()]
+        if table_name in existing_tables:
+            print(f"Table {table_name} already exists")
+            return dynamodb.Table(table_name)
+
+        # Create table
+        print(f"Creating table {table_name}...")
+        table = dynamodb.create_table(
+            TableName=table_name,
+            KeySchema=[{"AttributeName": "reply_id", "KeyType": "HASH"}],  # Partition key
+            AttributeDefinitions=[{"AttributeName": "reply_id", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",  # On-demand pricing
+            Tags=[
+                {"Key": "Project", "Value": "SoloPilot"},
+                {"Key": "Component", "Value": "EmailIntake"},
+                {"Key": "Environment", "Value": "Production"},
+            ],
+        )
+
+        # Wait for table to be created
+        print("Waiting for table to be created...")
+        table.wait_until_exists()
+
+        print(f"Table {table_name} created successfully!")
+        print(f"Table ARN: {table.table_arn}")
+
+        return table
+
+    except Exception as e:
+        print(f"Error creating table: {str(e)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Create conversation_replies DynamoDB table")
+    parser.add_argument("--region", default="us-east-2", help="AWS region")
+    parser.add_argument("--table", default="conversation_replies", help="Table name")
+
+    args = parser.parse_args()
+
+    create_reply_index_table(args.region, args.table)
@@ -17,6 +17,7 @@ echo "📦 Creating deployment package..."
 rm -rf /tmp/lambda_deploy
 mkdir -p /tmp/lambda_deploy/src/agents/email_intake
 mkdir -p /tmp/lambda_deploy/src/storage
+mkdir -p /tmp/lambda_deploy/src/common
 
 # Copy all Python files to preserve src structure
 cp "$EMAIL_INTAKE_DIR"/*.py /tmp/lambda_deploy/src/agents/email_intake/
@@ -41,6 +42,9 @@ else
     echo "⚠️  WARNING: src/storage not found at $REPO_ROOT/src/storage"
 fi
 
+# Include common module (shared Bedrock invoker used by every agent)
+cp "$REPO_ROOT/src/common/"*.py /tmp/lambda_deploy/src/common/
+
 # List files to verify all modules are included
 echo "📋 Verifying deployment package contents..."
 ls -la /tmp/lambda_deploy/src/storage/ 2>/dev/null || echo "storage module directory not found in package"
@@ -0,0 +1,275 @@
+"""Module-scoped service container shared across warm Lambda invocations.
+
+Building a boto3 resource or client costs tens of milliseconds (endpoint and
+model loading), and the intake handler used to build several per event. The
+container creates each AWS client and each collaborator once per execution
+environment, on first use, and hands out the same instance afterwards. All
+clients share one boto3 session with pooled keep-alive connections.
+"""
+
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+import boto3
+from botocore.config import Config
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Connection pooling for every AWS client created by the container
+AWS_MAX_POOL_CONNECTIONS = int(os.environ.get("AWS_MAX_POOL_CONNECTIONS", "25"))
+AWS_CONNECT_TIMEOUT = float(os.environ.get("AWS_CONNECT_TIMEOUT", "5"))
+AWS_READ_TIMEOUT = float(os.environ.get("AWS_READ_TIMEOUT", "30"))
+# LLM calls stream long responses; keep their read timeout separate
+BEDROCK_READ_TIMEOUT = float(os.environ.get("BEDROCK_READ_TIMEOUT", "300"))
+
+AWS_CLIENT_CONFIG = Config(
+    max_pool_connections=AWS_MAX_POOL_CONNECTIONS,
+    tcp_keepalive=True,
+    connect_timeout=AWS_CONNECT_TIMEOUT,
+    read_timeout=AWS_READ_TIMEOUT,
+    retries={"max_attempts": 3, "mode": "standard"},
+)
+# BedrockInvoker (src/common/bedrock_invoker.py) retries with jitter and throttling
+# backoff; a single botocore attempt keeps the two retry loops from multiplying
+BEDROCK_CLIENT_CONFIG = AWS_CLIENT_CONFIG.merge(
+    Config(read_timeout=BEDROCK_READ_TIMEOUT, retries={"total_max_attempts": 1, "mode": "standard"})
+)
+
+
+class ServiceContainer:
+    """Lazily builds and caches AWS clients and intake/API collaborators."""
+
+    def __init__(self, session: Optional[boto3.session.Session] = None):
+        """Initialize an empty container.
+
+        Args:
+            session: Optional boto3 session (for testing); created on first use otherwise
+        """
+        self._session = session
+        self._instances: Dict[Any, Any] = {}
+        self._lock = threading.RLock()
+
+    @property
+    def session(self) -> boto3.session.Session:
+        """Shared boto3 session for every client and resource."""
+        with self._lock:
+            if self._session is None:
+                self._session = boto3.session.Session()
+            return self._session
+
+    def _get(self, key: Any, factory: Callable[[], T]) -> T:
+        """Return the cached instance for key, building it on first use."""
+        with self._lock:
+            if key not in self._instances:
+                self._instances[key] = factory()
+                logger.info(f"Initialized shared service: {key}")
+            return self._instances[key]
+
+    def client(self, service_name: str, region_name: Optional[str] = None):
+        """Shared low-level client with pooled keep-alive connections."""
+        config = BEDROCK_CLIENT_CONFIG if service_name == "bedrock-runtime" else AWS_CLIENT_CONFIG
+        return self._get(
+            ("client", service_name, region_name),
+            lambda: self.session.client(service_name, region_name=region_name, config=config),
+        )
+
+    def resource(self, service_name: str, region_name: Optional[str] = None):
+        """Shared resource with pooled keep-alive connections."""
+        return self._get(
+            ("resource", service_name, region_name),
+            lambda: self.session.resource(
+                service_name, region_name=region_name, config=AWS_CLIENT_CONFIG
+            ),
+        )
+
+    def lazy_client(self, service_name: str, region_name: Optional[str] = None) -> "LazyService":
+        """Module-level handle for a shared client, created on first use."""
+        return LazyService(lambda: self.client(service_name, region_name), service_name)
+
+    def lazy_resource(self, service_name: str, region_name: Optional[str] = None) -> "LazyService":
+        """Module-level handle for a shared resource, created on first use."""
+        return LazyService(lambda: self.resource(service_name, region_name), service_name)
+
+    def bedrock_client(self):
+        """Shared Bedrock runtime client in the Lambda's configured region."""
+        return self.client("bedrock-runtime", os.environ.get("AWS_REGION", "us-east-2"))
+
+    def state_manager(self, table_name: str = "conversations"):
+        """Shared ConversationStateManager for a conversations table."""
+
+        def build():
+            from src.agents.email_intake.conversation_state import ConversationStateManager
+            from src.agents.email_intake.reply_blob_store import REPLY_BLOB_BUCKET, ReplyBlobStore
+
+            blob_store = (
+                ReplyBlobStore(s3_client=self.client("s3")) if REPLY_BLOB_BUCKET else None
+            )
+            return ConversationStateManager(
+                table_name=table_name,
+                blob_store=blob_store,
+                dynamodb_resource=self.resource("dynamodb"),
+            )
+
+        return self._get(("state_manager", table_name), build)
+
+    def attachment_store(self):
+        """Shared AttachmentStore, or None when EMAIL_ATTACHMENT_BUCKET is unset."""
+
+        def build():
+            from src.agents.email_intake.attachment_store import AttachmentStore
+
+            return AttachmentStore.from_env(s3_client=self.client("s3"))
+
+        return self._get("attachment_store", build)
+
+    def attachment_index(self):
+        """Shared AttachmentIndex, or None when attachments are not stored in S3."""
+
+        def build():
+            from src.agents.email_intake.attachment_store import AttachmentIndex
+
+            if self.attachment_store() is None:
+                return None
+            return AttachmentIndex(dynamodb_resource=self.resource("dynamodb"))
+
+        return self._get("attachment_index", build)
+
+    def email_parser(self, table_name: str = "conversations"):
+        """Shared EmailParser bound to the shared state manager."""
+
+        def build():
+            from src.agents.email_intake.email_parser import EmailParser
+
+            return EmailParser(
+                state_manager=self.state_manager(table_name),
+                attachment_store=self.attachment_store(),
+            )
+
+        return self._get(("email_parser", table_name), build)
+
+    def requirement_extractor(self):
+        """Shared RequirementExtractor."""
+
+        def build():
+            from src.agents.email_intake.requirement_extractor import RequirementExtractor
+
+            return RequirementExtractor(bedrock_client=self._optional_bedrock_client())
+
+        return self._get("requirement_extractor", build)
+
+    def metadata_extractor(self):
+        """Shared MetadataExtractor."""
+
+        def build():
+            from src.agents.email_intake.metadata_extractor import MetadataExtractor
+
+            return MetadataExtractor(bedrock_client=self._optional_bedrock_client())
+
+        return self._get("metadata_extractor", build)
+
+    def conversational_responder(self, calendly_link: str = "[CALENDLY_LINK]"):
+        """Shared ConversationalResponder reusing the shared metadata extractor."""
+
+        def build():
+            from src.agents.email_intake.conversational_responder import ConversationalResponder
+
+            return ConversationalResponder(
+                calendly_link=calendly_link,
+                bedrock_client=self._optional_bedrock_client(),
+                metadata_extractor=self.metadata_extractor(),
+            )
+
+        return self._get(("conversational_responder", calendly_link), build)
+
+    def version_index(self):
+        """Shared ProposalVersionIndex."""
+
+        def build():
+            from src.storage import ProposalVersionIndex
+
+            return ProposalVersionIndex(dynamodb=self.resource("dynamodb"))
+
+        return self._get("version_index", build)
+
+    def proposal_store(self, bucket_name: str):
+        """Shared S3ProposalStore for a bucket."""
+
+        def build():
+            from src.storage import S3ProposalStore
+
+            return S3ProposalStore(
+                bucket_name, version_index=self.version_index(), s3_client=self.client("s3")
+            )
+
+        return self._get(("proposal_store", bucket_name), build)
+
+    def pdf_generator(self, pdf_lambda_arn: str, s3_bucket: Optional[str] = None):
+        """Shared ProposalPDFGenerator for a document Lambda and bucket."""
+
+        def build():
+            try:
+                from pdf_generator import ProposalPDFGenerator
+            except ImportError:
+                from src.agents.email_intake.pdf_generator import ProposalPDFGenerator
+
+            bucket = (
+                s3_bucket
+                or os.environ.get("DOCUMENT_BUCKET")
+                or os.environ.get("ATTACHMENTS_BUCKET")
+            )
+            return ProposalPDFGenerator(
+                pdf_lambda_arn,
+                s3_bucket=bucket,
+                s3_store=self.proposal_store(bucket) if bucket else None,
+            )
+
+        return self._get(("pdf_generator", pdf_lambda_arn, s3_bucket), build)
+
+    def reset(self) -> None:
+        """Drop every cached instance (tests, or after credentials rotate)."""
+        with self._lock:
+            self._instances.clear()
+            self._session = None
+
+    def _optional_bedrock_client(self):
+        """Bedrock client for components that call Bedrock directly (not via providers)."""
+        if os.environ.get("USE_AI_PROVIDER", "").lower() == "true":
+            return None
+        return self.bedrock_client()
+
+
+class LazyService:
+    """Stand-in for a module-level AWS client that defers creation to first use.
+
+    Creating a client loads its service model and endpoint data, which is a large
+    share of Lambda init time for routes that never call that service.
+    """
+
+    def __init__(self, factory: Callable[[], Any], service_name: str):
+        self._factory = factory
+        self._service_name = service_name
+
+    def __getattr__(self, attr: str) -> Any:
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        return getattr(self._factory(), attr)
+
+    def __repr__(self) -> str:
+        return f"<LazyService {self._service_name}>"
+
+
+_services: Optional[ServiceContainer] = None
+_services_lock = threading.Lock()
+
+
+def get_services() -> ServiceContainer:
+    """Return the process-wide service container, creating it on first call."""
+    global _services
+    with _services_lock:
+        if _services is None:
+            _services = ServiceContainer()
+        return _services
@@ -2,11 +2,17 @@
 
 import hashlib
 import logging
-import re
 from datetime import datetime, timezone
 from decimal import Decimal
 from typing import Any, Dict, List, Optional, Set, Tuple
 
+try:
+    # For Lambda runtime
+    from quote_detector import split_quoted_text
+except ImportError:
+    # For local development/testing
+    from .quote_detector import split_quoted_text
+
 logger = logging.getLogger(__name__)
 
 
@@ -286,30 +292,7 @@ class EmailThreadingUtils:
         Returns:
             Tuple of (new_content, quoted_content)
         """
-        # Common quote markers
-        quote_patterns = [
-            r"On .+ wrote:",  # Gmail/Outlook style
-            r"From:.*Sent:.*To:.*Subject:",  # Outlook forward
-            r"-{3,} Original Message -{3,}",  # Various clients
-            r"_{3,}",  # Underscores
-            r">{1,}",  # Traditional email quotes
-        ]
-
-        lines = email_body.split("\n")
-        quote_start = len(lines)
-
-        for i, line in enumerate(lines):
-            for pattern in quote_patterns:
-                if re.search(pattern, line):
-                    quote_start = i
-                    break
-            if quote_start != len(lines):
-                break
-
-        new_content = "\n".join(lines[:quote_start]).strip()
-        quoted_content = "\n".join(lines[quote_start:]).strip() if quote_start < len(lines) else ""
-
-        return new_content, quoted_content
+        return split_quoted_text(email_body)
 
 
 class DynamoDBUtils:
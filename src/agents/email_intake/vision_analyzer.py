@@ -15,21 +15,18 @@ import base64
 import json
 import os
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
-from botocore.exceptions import BotoCoreError, ClientError, ParamValidationError
+from src.common.bedrock_client import BedrockError
+from src.common.bedrock_invoker import get_bedrock_invoker
 
 logger = logging.getLogger(__name__)
 
 try:
     import boto3
 
-    bedrock_client = boto3.client(
-        "bedrock-runtime", region_name=os.environ.get("AWS_REGION", "us-east-2")
-    )
     s3_client = boto3.client("s3", region_name=os.environ.get("AWS_REGION", "us-east-2"))
 except Exception:  # pragma: no cover
-    bedrock_client = None
     s3_client = None
 
 
@@ -50,8 +47,17 @@ class VisionModelError(Exception):
     """Raised when the vision model cannot be invoked successfully."""
 
 
+def _is_patch_list(response_body: Dict[str, Any]) -> bool:
+    return isinstance(json.loads(response_body["content"][0]["text"]), list)
+
+
+def _has_text(response_body: Dict[str, Any]) -> bool:
+    return bool(response_body["content"][0]["text"].strip())
+
+
 class VisionAnalyzer:
-    def __init__(self, model_id: Optional[str] = None):
+    def __init__(self, model_id: Optional[str] = None, bedrock_client=None):
+        self.invoker = get_bedrock_invoker(bedrock_client)
         env_inference_profile = os.environ.get("VISION_INFERENCE_PROFILE_ARN") or os.environ.get(
             "BEDROCK_IP_ARN"
         )
@@ -68,42 +74,27 @@ class VisionAnalyzer:
             or os.environ.get("BEDROCK_MODEL_ID")
         )
 
-    def _invoke_bedrock(self, request_body: Dict[str, Any]) -> Dict[str, Any]:
-        if bedrock_client is None:
-            raise VisionModelError(
-                "Bedrock runtime client unavailable. Verify AWS credentials and region configuration."
-            )
-
+    def _invoke_bedrock(
+        self,
+        request_body: Dict[str, Any],
+        cache: bool = False,
+        validate: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    ) -> Dict[str, Any]:
         if not (self.inference_profile_arn or self.model_id):
             raise VisionModelError(
                 "Vision model not configured. Set VISION_INFERENCE_PROFILE_ARN or VISION_MODEL_ID."
             )
 
-        payload = json.dumps(request_body)
-
-        def _call(model_id: str, *, inference_arn: Optional[str] = None):
-            kwargs = {
-                "modelId": model_id,
-                "body": payload,
-                "contentType": "application/json",
-            }
-            if inference_arn:
-                kwargs["inferenceProfileArn"] = inference_arn
-            return bedrock_client.invoke_model(**kwargs)
-
         try:
-            if self.inference_profile_arn:
-                profile_model_id = self.inference_profile_arn.split("/")[-1]
-                try:
-                    response = _call(self.inference_profile_arn)
-                except ParamValidationError:
-                    response = _call(profile_model_id, inference_arn=self.inference_profile_arn)
-            else:
-                response = _call(self.model_id)
-
-            return json.loads(response["body"].read())
-
-        except (ClientError, BotoCoreError, ParamValidationError) as e:
+            return self.invoker.invoke(
+                request_body,
+                model_id=self.model_id,
+                inference_profile_arn=self.inference_profile_arn,
+                agent="vision_analyzer",
+                cache=cache,
+                validate=validate,
+            )
+        except BedrockError as e:
             raise VisionModelError(
                 f"Vision model invocation failed: {e}."
             ) from e
@@ -391,7 +382,7 @@ class VisionAnalyzer:
                 "messages": messages,
             }
 
-            body = self._invoke_bedrock(request_body)
+            body = self._invoke_bedrock(request_body, cache=True, validate=_is_patch_list)
             text = body["content"][0]["text"] if body.get("content") else "[]"
             patches = json.loads(text)
             if isinstance(patches, list):
@@ -468,7 +459,7 @@ class VisionAnalyzer:
                 "temperature": 0.0,
                 "messages": messages,
             }
-            body = self._invoke_bedrock(request_body)
+            body = self._invoke_bedrock(request_body, cache=True, validate=_has_text)
             text = body["content"][0]["text"] if body.get("content") else ""
             self._emit_debug_output(
                 debug_dir=debug_dir,
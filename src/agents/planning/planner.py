@@ -6,14 +6,13 @@ tech stack recommendations, and open questions.
 """
 
 import json
-import os
 import random
 import time
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, Optional
 
-import yaml
+from src.common.config_loader import load_config
 
 # Load environment variables from .env file
 try:
@@ -57,10 +56,7 @@ class ProjectPlanner:
 
     def _load_config(self, config_path: Optional[str]) -> Dict[str, Any]:
         """Load model configuration."""
-        if config_path and os.path.exists(config_path):
-            with open(config_path) as f:
-                return yaml.safe_load(f)
-        return {
+        default = {
             "llm": {
                 "primary": "bedrock",
                 "fallback": "openai",
@@ -71,6 +67,9 @@ class ProjectPlanner:
                 "openai": {"model": "gpt-4o-mini"},
             }
         }
+        if not config_path:
+            return default
+        return load_config(config_path, default=default)
 
     def _setup_llm(self):
         """Initialize LLM instances."""
@@ -11,37 +11,46 @@ import os
 import subprocess
 import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional
-
-import yaml
+from typing import Any, Callable, Dict, List, Optional
 
+from src.common.config_loader import load_config
 from src.providers import get_provider
-from src.providers.base import BaseProvider, ProviderError
+from src.providers.base import BaseProvider, ProviderError, agent_scope, consume_stream
 from src.utils.sonarcloud_integration import SonarCloudClient
 
 
 class ReviewerAgent:
     """AI-powered code reviewer with static analysis integration."""
 
-    def __init__(self, config_path: Optional[str] = None):
+    def __init__(
+        self,
+        config_path: Optional[str] = None,
+        on_delta: Optional[Callable[[str], None]] = None,
+    ):
         """
         Initialize the ReviewerAgent.
 
         Args:
             config_path: Path to configuration file
+            on_delta: Optional callback receiving the AI review as it streams in
+                (REVIEW_STREAM=1 echoes it to the console)
         """
         self.config = self._load_config(config_path)
+        if on_delta is None and os.getenv("REVIEW_STREAM", "0") == "1":
+            on_delta = self._print_delta
+        self.on_delta = on_delta
         self.provider = self._initialize_provider()
         self.sonarcloud = SonarCloudClient()
 
+    @staticmethod
+    def _print_delta(delta: str) -> None:
+        """Echo a streamed review delta to the console."""
+        print(delta, end="", flush=True)
+
     def _load_config(self, config_path: Optional[str] = None) -> Dict[str, Any]:
         """Load configuration from file or use defaults."""
-        if config_path and Path(config_path).exists():
-            with open(config_path) as f:
-                return yaml.safe_load(f)
-
         # Default configuration
-        return {
+        default = {
             "llm": {
                 "primary": "bedrock",
                 "bedrock": {
@@ -60,6 +69,9 @@ class ReviewerAgent:
                 "fail_on_warnings": False,
             },
         }
+        if not config_path:
+            return default
+        return load_config(config_path, default=default)
 
     def _initialize_provider(self) -> BaseProvider:
         """Initialize AI provider for code review."""
@@ -361,8 +373,14 @@ class ReviewerAgent:
             # Build review prompt with SonarCloud integration
             prompt = self._build_review_prompt(code_files, static_results, sonarcloud_results)
 
-            # Get AI review
-            ai_response = self.provider.generate_code(prompt)
+            # Get AI review, streaming partial output to the caller when requested
+            with agent_scope("reviewer_agent"):
+                if self.on_delta:
+                    ai_response, _ = consume_stream(
+                        self.provider.stream_code(prompt), self.on_delta
+                    )
+                else:
+                    ai_response = self.provider.generate_code(prompt)
 
             # Parse AI response
             return self._parse_ai_response(ai_response)
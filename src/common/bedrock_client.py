@@ -7,12 +7,16 @@ Provides consistent retry logic, error messages, and debugging across all agents
 import json
 import os
 import random
+import threading
 import time
-from typing import Any, Dict, Optional
+from functools import partial
+from typing import Any, Dict, Iterator, Optional
 
 import boto3
 from botocore.exceptions import BotoCoreError, ClientError, ParamValidationError
 
+from src.common.provider_health import ProviderHealth, get_provider_health, hedged_call
+
 
 class BedrockError(Exception):
     """Base exception for Bedrock-related errors."""
@@ -38,14 +42,69 @@ class BedrockNetworkError(BedrockError):
     pass
 
 
+class BedrockCircuitOpenError(BedrockNetworkError):
+    """Raised when every configured endpoint's circuit breaker is open."""
+
+    pass
+
+
+# Errors caused by the request or account rather than the endpoint's health
+_CALLER_ERRORS = ("AccessDeniedException", "ValidationException")
+
+_runtime_clients: Dict[str, Any] = {}
+_runtime_clients_lock = threading.Lock()
+
+
+def get_bedrock_runtime_client(region: str):
+    """Process-wide bedrock-runtime client for a region (boto3 clients are thread-safe)."""
+    with _runtime_clients_lock:
+        client = _runtime_clients.get(region)
+        if client is None:
+            client = _runtime_clients[region] = boto3.client("bedrock-runtime", region_name=region)
+        return client
+
+
+def clear_bedrock_runtime_clients() -> None:
+    """Drop the shared bedrock-runtime clients (the next call builds new ones)."""
+    with _runtime_clients_lock:
+        _runtime_clients.clear()
+
+
 class StandardizedBedrockClient:
     """Standardized Bedrock client with consistent error handling and retry logic."""
 
-    def __init__(self, inference_profile_arn: str, region: str = "us-east-2"):
-        """Initialize the standardized Bedrock client."""
+    def __init__(
+        self,
+        inference_profile_arn: str,
+        region: str = "us-east-2",
+        secondary_inference_profile_arn: Optional[str] = None,
+        secondary_region: Optional[str] = None,
+        health: Optional[Dict[str, Any]] = None,
+    ):
+        """Initialize the standardized Bedrock client.
+
+        Args:
+            inference_profile_arn: Primary inference profile ARN
+            region: Region of the primary profile
+            secondary_inference_profile_arn: Optional profile (e.g. in another region) used
+                while the primary's circuit is open, and for hedged requests
+            secondary_region: Region of the secondary profile (defaults to ``region``)
+            health: ``health`` config section for the circuit breaker and hedging
+        """
         self.inference_profile_arn = inference_profile_arn
         self.region = region
         self.client = None
+        self.secondary_inference_profile_arn = secondary_inference_profile_arn
+        self.secondary_region = secondary_region or region
+        self.secondary_client = None
+
+        # Shared per-endpoint health, so every client of a degraded profile fails fast
+        self.health = get_provider_health(f"bedrock:{inference_profile_arn}", health)
+        self.secondary_health = (
+            get_provider_health(f"bedrock:{secondary_inference_profile_arn}", health)
+            if secondary_inference_profile_arn
+            else None
+        )
 
         # Check for offline mode
         if os.getenv("NO_NETWORK") == "1":
@@ -62,7 +121,9 @@ class StandardizedBedrockClient:
             self._validate_credentials()
 
             # Initialize client
-            self.client = boto3.client("bedrock-runtime", region_name=self.region)
+            self.client = get_bedrock_runtime_client(self.region)
+            if self.secondary_inference_profile_arn:
+                self.secondary_client = get_bedrock_runtime_client(self.secondary_region)
 
             # Validate inference profile access
             self._validate_inference_profile()
@@ -97,7 +158,7 @@ class StandardizedBedrockClient:
         return self.inference_profile_arn.split("/")[-1]
 
     def _invoke_with_signature(
-        self, model_id: str, inference_profile_arn: Optional[str], body: dict
+        self, model_id: str, inference_profile_arn: Optional[str], body: dict, client=None
     ) -> tuple[str, dict]:
         """Helper to invoke Bedrock with conditional parameters.
 
@@ -112,32 +173,151 @@ class StandardizedBedrockClient:
         if inference_profile_arn:
             kwargs["inferenceProfileArn"] = inference_profile_arn
 
-        response = self.client.invoke_model(**kwargs)
+        response = (client or self.client).invoke_model(**kwargs)
         response_body = json.loads(response["body"].read())
 
-        # Extract cost-related headers
+        # Extract cost-related headers and the body's token usage (incl. prompt cache tokens)
         response_metadata = {
             "ResponseMetadata": response.get("ResponseMetadata", {}),
             "model_id": model_id,
             "inference_profile_arn": inference_profile_arn,
+            "usage": response_body.get("usage", {}),
         }
 
         return response_body["content"][0]["text"], response_metadata
 
-    def invoke_model(
-        self, messages: list, max_tokens: int = 2048, temperature: float = 0.1, max_retries: int = 3
-    ) -> str:
+    def _invoke_endpoint(
+        self, health: ProviderHealth, client, inference_profile_arn: str, body: dict
+    ) -> tuple[str, dict]:
+        """One call to an endpoint, gated by and recorded against its circuit breaker.
+
+        Raises:
+            BedrockCircuitOpenError: If the endpoint's circuit is open
         """
-        Invoke Bedrock model with standardized retry logic and error handling.
+        if not health.allow():
+            raise BedrockCircuitOpenError(
+                f"⚡ Bedrock circuit open for {inference_profile_arn}; failing fast"
+            )
+
+        start = time.monotonic()
+        try:
+            try:
+                # Try modern signature first (ARN as modelId)
+                result = self._invoke_with_signature(inference_profile_arn, None, body, client)
+            except ParamValidationError as e:
+                if "inferenceProfileArn" not in str(e):
+                    raise BedrockValidationError(f"Parameter validation failed: {e}") from e
+                # Try legacy signature (modelId + inferenceProfileArn)
+                result = self._invoke_with_signature(
+                    inference_profile_arn.split("/")[-1], inference_profile_arn, body, client
+                )
+        except (ClientError, BotoCoreError) as e:
+            if any(err in str(e) for err in _CALLER_ERRORS):
+                health.release()
+            else:
+                health.record_failure(time.monotonic() - start)
+            raise
+        except Exception:
+            health.release()
+            raise
+
+        health.record_success(time.monotonic() - start)
+        return result
+
+    def _invoke_once(self, body: dict) -> tuple[str, dict]:
+        """One attempt: primary endpoint, secondary while the primary's circuit is open,
+        or both when the primary is slower than its hedge delay."""
+        primary = partial(
+            self._invoke_endpoint, self.health, self.client, self.inference_profile_arn, body
+        )
+        if not (self.secondary_inference_profile_arn and self.secondary_client):
+            return primary()
+
+        secondary = partial(
+            self._invoke_endpoint,
+            self.secondary_health,
+            self.secondary_client,
+            self.secondary_inference_profile_arn,
+            body,
+        )
+        if self.health.is_open():
+            return secondary()
+
+        hedge_after = self.health.hedge_delay()
+        if hedge_after is None:
+            try:
+                return primary()
+            except BedrockCircuitOpenError:
+                return secondary()
+        return hedged_call(primary, secondary, hedge_after)
+
+    def _open_stream_with_signature(
+        self, model_id: str, inference_profile_arn: Optional[str], body: dict
+    ) -> dict:
+        """Helper to start a streaming invocation with conditional parameters.
+
+        Returns:
+            Raw invoke_model_with_response_stream response (``body`` is the event stream).
+        """
+        kwargs = {
+            "modelId": model_id,
+            "body": json.dumps(body),
+            "contentType": "application/json",
+        }
+        if inference_profile_arn:
+            kwargs["inferenceProfileArn"] = inference_profile_arn
+
+        return self.client.invoke_model_with_response_stream(**kwargs)
+
+    @staticmethod
+    def _iter_stream_text(response: dict, metadata: dict) -> Iterator[str]:
+        """Yield text deltas from a response stream, recording token usage in metadata."""
+        usage = metadata.setdefault("usage", {})
+        for event in response["body"]:
+            chunk = event.get("chunk")
+            if not chunk:
+                continue
+            payload = json.loads(chunk["bytes"])
+            event_type = payload.get("type")
+
+            if event_type == "content_block_delta":
+                text = payload.get("delta", {}).get("text")
+                if text:
+                    yield text
+            elif event_type == "message_start":
+                usage.update(payload.get("message", {}).get("usage", {}))
+            elif event_type == "message_delta":
+                usage.update(payload.get("usage", {}))
+                metadata["stop_reason"] = payload.get("delta", {}).get("stop_reason")
+
+            # The final chunk carries Bedrock's own token counts and latency
+            invocation_metrics = payload.get("amazon-bedrock-invocationMetrics")
+            if invocation_metrics:
+                metadata["invocation_metrics"] = invocation_metrics
+
+    def invoke_model_stream(
+        self,
+        messages: list,
+        max_tokens: int = 2048,
+        temperature: float = 0.1,
+        max_retries: int = 3,
+        metadata: Optional[dict] = None,
+    ) -> Iterator[str]:
+        """
+        Invoke Bedrock model with response streaming and yield text deltas as they arrive.
+
+        Opening the stream is retried like invoke_model; once text has been yielded a
+        failure is raised to the caller, since the partial output has already been consumed.
 
         Args:
             messages: List of message objects in Anthropic format
             max_tokens: Maximum tokens to generate
             temperature: Temperature for response generation
-            max_retries: Maximum number of retry attempts
+            max_retries: Maximum number of attempts to open the stream
+            metadata: Optional dict filled with model_id, usage and invocation metrics
 
-        Returns:
-            Generated text response
+        Yields:
+            Text deltas in order
 
         Raises:
             BedrockError: For various Bedrock-related failures
@@ -145,6 +325,12 @@ class StandardizedBedrockClient:
         if not self.client:
             raise BedrockError("Bedrock client not initialized")
 
+        if self.health.is_open():
+            raise BedrockCircuitOpenError(
+                f"⚡ Bedrock circuit open for {self.inference_profile_arn}; failing fast"
+            )
+
+        metadata = metadata if metadata is not None else {}
         model_id = self._model_id_from_arn()
         body = {
             "anthropic_version": "bedrock-2023-05-31",
@@ -153,72 +339,102 @@ class StandardizedBedrockClient:
             "messages": messages,
         }
 
+        signature = (self.inference_profile_arn, None)
+        response = None
         last_exception = None
 
         for attempt in range(max_retries):
             try:
                 # Try modern signature first (ARN as modelId)
-                response_text, _ = self._invoke_with_signature(
-                    self.inference_profile_arn, None, body
-                )
-                return response_text
+                response = self._open_stream_with_signature(*signature, body)
+                break
 
             except ParamValidationError as e:
                 if "inferenceProfileArn" not in str(e):
                     raise BedrockValidationError(f"Parameter validation failed: {e}") from e
 
                 # Try legacy signature (modelId + inferenceProfileArn)
+                signature = (model_id, self.inference_profile_arn)
                 try:
-                    response_text, _ = self._invoke_with_signature(
-                        model_id, self.inference_profile_arn, body
-                    )
-                    return response_text
+                    response = self._open_stream_with_signature(*signature, body)
+                    break
                 except (ClientError, BotoCoreError) as legacy_e:
                     last_exception = legacy_e
 
             except (ClientError, BotoCoreError) as e:
                 last_exception = e
 
-            # Handle retry logic
             if attempt < max_retries - 1:
-                # Determine if this is a retryable error
                 error_str = str(last_exception)
                 if any(
                     err in error_str for err in ["AccessDeniedException", "ValidationException"]
                 ):
-                    # Don't retry access/validation errors
                     break
 
-                # Exponential backoff with jitter
                 wait_time = (2**attempt) + random.uniform(0, 1)
                 print(
-                    f"🔄 Bedrock call failed (attempt {attempt + 1}/{max_retries}): {last_exception}"
+                    f"🔄 Bedrock stream failed (attempt {attempt + 1}/{max_retries}): {last_exception}"
                 )
                 print(f"   Retrying in {wait_time:.1f} seconds...")
                 time.sleep(wait_time)
             else:
-                print(f"❌ Final Bedrock attempt failed: {last_exception}")
+                print(f"❌ Final Bedrock stream attempt failed: {last_exception}")
 
-        # Classify and re-raise the final exception
-        error_str = str(last_exception)
+        if response is None:
+            raise self._classify_error(last_exception) from last_exception
+
+        metadata.update(
+            {
+                "ResponseMetadata": response.get("ResponseMetadata", {}),
+                "model_id": signature[0],
+                "inference_profile_arn": signature[1],
+            }
+        )
+        try:
+            yield from self._iter_stream_text(response, metadata)
+        except (ClientError, BotoCoreError) as e:
+            raise self._classify_error(e) from e
+
+    def _classify_error(self, error: Exception) -> BedrockError:
+        """Map a botocore error to the matching BedrockError subclass."""
+        error_str = str(error)
         if "AccessDeniedException" in error_str:
-            raise BedrockAccessError(
+            return BedrockAccessError(
                 f"❌ Bedrock access denied. ARN: {self.inference_profile_arn}. "
-                "Verify you have bedrock:InvokeModel permissions and profile access."
-            ) from last_exception
+                "Verify bedrock:InvokeModelWithResponseStream permissions and profile access."
+            )
         elif "ValidationException" in error_str:
-            raise BedrockValidationError(
-                f"❌ Bedrock validation error: {last_exception}"
-            ) from last_exception
+            return BedrockValidationError(f"❌ Bedrock validation error: {error}")
         elif any(
             network_err in error_str
             for network_err in ["ConnectionError", "TimeoutError", "EndpointConnectionError"]
         ):
-            raise BedrockNetworkError(
-                f"❌ Bedrock network error: {last_exception}"
-            ) from last_exception
+            return BedrockNetworkError(f"❌ Bedrock network error: {error}")
         else:
-            raise BedrockError(f"❌ Bedrock API error: {last_exception}") from last_exception
+            return BedrockError(f"❌ Bedrock API error: {error}")
+
+    def invoke_model(
+        self, messages: list, max_tokens: int = 2048, temperature: float = 0.1, max_retries: int = 3
+    ) -> str:
+        """
+        Invoke Bedrock model with standardized retry logic and error handling.
+
+        Args:
+            messages: List of message objects in Anthropic format
+            max_tokens: Maximum tokens to generate
+            temperature: Temperature for response generation
+            max_retries: Maximum number of retry attempts
+
+        Returns:
+            Generated text response
+
+        Raises:
+            BedrockError: For various Bedrock-related failures
+        """
+        response_text, _ = self.invoke_model_with_metadata(
+            messages, max_tokens, temperature, max_retries
+        )
+        return response_text
 
     def invoke_model_with_metadata(
         self,
@@ -246,7 +462,6 @@ class StandardizedBedrockClient:
         if not self.client:
             raise BedrockError("Bedrock client not initialized")
 
-        model_id = self._model_id_from_arn()
         body = {
             "anthropic_version": "bedrock-2023-05-31",
             "max_tokens": max_tokens,
@@ -258,23 +473,11 @@ class StandardizedBedrockClient:
 
         for attempt in range(max_retries):
             try:
-                # Try modern signature first (ARN as modelId)
-                return self._invoke_with_signature(self.inference_profile_arn, None, body)
-
-            except ParamValidationError as e:
-                if "inferenceProfileArn" not in str(e):
-                    raise BedrockValidationError(f"Parameter validation failed: {e}") from e
-
-                # Try legacy signature (modelId + inferenceProfileArn)
-                try:
-                    return self._invoke_with_signature(model_id, self.inference_profile_arn, body)
-                except (ClientError, BotoCoreError) as legacy_e:
-                    last_exception = legacy_e
-
+                # Circuit-open errors are raised as-is: retrying would only stall the caller
+                return self._invoke_once(body)
             except (ClientError, BotoCoreError) as e:
                 last_exception = e
 
-            # Handle retry logic (same as invoke_model)
             if attempt < max_retries - 1:
                 error_str = str(last_exception)
                 if any(
@@ -291,7 +494,7 @@ class StandardizedBedrockClient:
             else:
                 print(f"❌ Final Bedrock attempt failed: {last_exception}")
 
-        # Same error handling as invoke_model
+        # Classify and re-raise the final exception
         error_str = str(last_exception)
         if "AccessDeniedException" in error_str:
             raise BedrockAccessError(
@@ -328,6 +531,17 @@ class StandardizedBedrockClient:
         messages = [{"role": "user", "content": prompt}]
         return self.invoke_model_with_metadata(messages, max_tokens, temperature, timeout=timeout)
 
+    def simple_stream(
+        self,
+        prompt: str,
+        max_tokens: int = 2048,
+        temperature: float = 0.1,
+        metadata: Optional[dict] = None,
+    ) -> Iterator[str]:
+        """Simple single-message streaming invoke; yields text deltas."""
+        messages = [{"role": "user", "content": prompt}]
+        return self.invoke_model_stream(messages, max_tokens, temperature, metadata=metadata)
+
 
 def create_bedrock_client(config: Dict[str, Any]) -> StandardizedBedrockClient:
     """
@@ -353,7 +567,13 @@ def create_bedrock_client(config: Dict[str, Any]) -> StandardizedBedrockClient:
             "Update config/model_config.yaml with a valid ARN."
         )
 
-    return StandardizedBedrockClient(inference_profile_arn, region)
+    return StandardizedBedrockClient(
+        inference_profile_arn,
+        region,
+        secondary_inference_profile_arn=bedrock_config.get("secondary_inference_profile_arn"),
+        secondary_region=bedrock_config.get("secondary_region"),
+        health=bedrock_config.get("health"),
+    )
 
 
 def get_standardized_error_message(error: Exception, context: str = "") -> str:
@@ -0,0 +1,601 @@
+"""
+Shared Bedrock runtime invoker for the email intake agents.
+
+Every intake agent used to build its own ``bedrock-runtime`` client and call
+``invoke_model`` with no retries, so one throttled request failed the whole
+conversation turn. ``BedrockInvoker`` builds on ``StandardizedBedrockClient``
+(same error classes, same modern/legacy inference-profile signature fallback)
+and adds:
+
+    - one pooled keep-alive client per execution environment
+    - retries with full-jitter exponential backoff
+    - throttling backoff shared by every caller of the same model
+    - a per-call deadline covering all attempts and backoff sleeps
+    - per-agent token and latency metrics
+    - opt-in response caching for deterministic calls (``src/common/llm_cache.py``)
+    - request bodies with cacheable static prefixes (``build_cached_request``)
+    - a warning when a repeated cacheable prefix is not read from the prompt cache
+"""
+
+import json
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import (
+    BotoCoreError,
+    ClientError,
+    ConnectionClosedError,
+    ConnectTimeoutError,
+    EndpointConnectionError,
+    ParamValidationError,
+    ReadTimeoutError,
+)
+
+from src.common.bedrock_client import (
+    BedrockAccessError,
+    BedrockError,
+    BedrockNetworkError,
+    BedrockValidationError,
+)
+from src.common.llm_cache import cache_key, get_llm_cache
+from src.common.model_pricing import cost_usd, min_cacheable_tokens
+
+logger = logging.getLogger(__name__)
+
+BEDROCK_MAX_ATTEMPTS = int(os.environ.get("BEDROCK_MAX_ATTEMPTS", "4"))
+# Total time budget for one call, including retries and backoff. It is checked between
+# attempts; an attempt in flight is bounded by the read timeout, capped at this budget
+BEDROCK_CALL_DEADLINE = float(os.environ.get("BEDROCK_CALL_DEADLINE", "240"))
+BEDROCK_BACKOFF_BASE = float(os.environ.get("BEDROCK_BACKOFF_BASE", "0.5"))
+BEDROCK_BACKOFF_MAX = float(os.environ.get("BEDROCK_BACKOFF_MAX", "20"))
+# Throttled calls back off from a larger base than transient errors
+BEDROCK_THROTTLE_BACKOFF_BASE = float(os.environ.get("BEDROCK_THROTTLE_BACKOFF_BASE", "2"))
+
+ANTHROPIC_VERSION = "bedrock-2023-05-31"
+# Mark static prompt prefixes with cache_control so Bedrock reuses their KV cache
+BEDROCK_PROMPT_CACHING = os.environ.get("BEDROCK_PROMPT_CACHING", "true").lower() == "true"
+CACHE_CONTROL = {"type": "ephemeral"}
+# Lifetime of an ephemeral prompt cache entry; repeats within it should read the cache
+PROMPT_CACHE_TTL_SECONDS = 300
+
+# Retries are done by the invoker; botocore gets a single attempt so they don't multiply
+BEDROCK_INVOKER_CONFIG = Config(
+    max_pool_connections=int(os.environ.get("AWS_MAX_POOL_CONNECTIONS", "25")),
+    tcp_keepalive=True,
+    connect_timeout=float(os.environ.get("AWS_CONNECT_TIMEOUT", "5")),
+    read_timeout=min(float(os.environ.get("BEDROCK_READ_TIMEOUT", "300")), BEDROCK_CALL_DEADLINE),
+    retries={"total_max_attempts": 1, "mode": "standard"},
+)
+
+THROTTLING_ERROR_CODES = frozenset(
+    (
+        "ThrottlingException",
+        "TooManyRequestsException",
+        "ServiceQuotaExceededException",
+    )
+)
+TRANSIENT_ERROR_CODES = frozenset(
+    (
+        "ServiceUnavailableException",
+        "InternalServerException",
+        "ModelNotReadyException",
+        "ModelTimeoutException",
+    )
+)
+NETWORK_ERRORS = (
+    EndpointConnectionError,
+    ConnectionClosedError,
+    ConnectTimeoutError,
+    ReadTimeoutError,
+)
+
+
+class BedrockDeadlineExceeded(BedrockNetworkError):
+    """Raised when a call runs out of its deadline before a successful attempt."""
+
+
+class _ThrottleState:
+    """Adaptive pre-call delay per model, grown on throttles and decayed on success."""
+
+    FLOOR = 0.05
+
+    def __init__(self):
+        self._delays: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def delay(self, model_id: str) -> float:
+        with self._lock:
+            return self._delays.get(model_id, 0.0)
+
+    def throttled(self, model_id: str) -> None:
+        with self._lock:
+            current = self._delays.get(model_id, 0.0)
+            self._delays[model_id] = min(
+                BEDROCK_BACKOFF_MAX, max(BEDROCK_THROTTLE_BACKOFF_BASE, current * 2)
+            )
+
+    def succeeded(self, model_id: str) -> None:
+        with self._lock:
+            current = self._delays.get(model_id)
+            if current is None:
+                return
+            if current / 2 < self.FLOOR:
+                del self._delays[model_id]
+            else:
+                self._delays[model_id] = current / 2
+
+    def reset(self) -> None:
+        with self._lock:
+            self._delays.clear()
+
+
+class BedrockMetrics:
+    """Thread-safe per-agent counters for Bedrock calls."""
+
+    def __init__(self):
+        self._agents: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def _totals(self, agent: str) -> Dict[str, float]:
+        return self._agents.setdefault(
+            agent,
+            {
+                "calls": 0,
+                "cache_hits": 0,
+                "errors": 0,
+                "retries": 0,
+                "throttles": 0,
+                "input_tokens": 0,
+                "output_tokens": 0,
+                "cache_read_input_tokens": 0,
+                "cache_write_input_tokens": 0,
+                "prompt_cache_misses": 0,
+                "cost_usd": 0.0,
+                "latency_ms_total": 0.0,
+                "latency_ms_max": 0.0,
+            },
+        )
+
+    def record_cache_hit(self, agent: str) -> None:
+        """Count a call answered from the response cache (no model call, no tokens)."""
+        with self._lock:
+            self._totals(agent)["cache_hits"] += 1
+
+    def record_prompt_cache_miss(self, agent: str) -> None:
+        """Count a repeated cacheable prefix that read no cached tokens."""
+        with self._lock:
+            self._totals(agent)["prompt_cache_misses"] += 1
+
+    def record(self, agent: str, call: Dict[str, Any]) -> None:
+        """Fold one call record into the agent's totals.
+
+        Args:
+            agent: Agent name the call was made for
+            call: Call record built by BedrockInvoker.invoke
+        """
+        with self._lock:
+            totals = self._totals(agent)
+            totals["calls"] += 1
+            totals["errors"] += 0 if call["success"] else 1
+            totals["retries"] += call["attempts"] - 1
+            totals["throttles"] += call["throttles"]
+            totals["input_tokens"] += call["input_tokens"]
+            totals["output_tokens"] += call["output_tokens"]
+            totals["cache_read_input_tokens"] += call["cache_read_input_tokens"]
+            totals["cache_write_input_tokens"] += call["cache_write_input_tokens"]
+            totals["cost_usd"] = round(totals["cost_usd"] + (call.get("cost_usd") or 0.0), 6)
+            totals["latency_ms_total"] += call["latency_ms"]
+            totals["latency_ms_max"] = max(totals["latency_ms_max"], call["latency_ms"])
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Copy of the per-agent totals, with average latency added."""
+        with self._lock:
+            snapshot = {agent: dict(totals) for agent, totals in self._agents.items()}
+        for totals in snapshot.values():
+            calls = totals["calls"] or 1
+            totals["latency_ms_avg"] = round(totals["latency_ms_total"] / calls, 1)
+        return snapshot
+
+    def reset(self) -> None:
+        with self._lock:
+            self._agents.clear()
+
+
+class _PromptCachePrefixes:
+    """Cacheable prefixes sent recently, to spot repeats that miss the prompt cache."""
+
+    MAX_ENTRIES = 1024
+
+    def __init__(self):
+        self._sent: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def repeated(self, key: str) -> bool:
+        """Record a prefix; True if it was already sent within the cache lifetime."""
+        now = time.monotonic()
+        with self._lock:
+            last = self._sent.pop(key, None)
+            if len(self._sent) >= self.MAX_ENTRIES:
+                self._sent.pop(next(iter(self._sent)))
+            self._sent[key] = now
+        return last is not None and now - last < PROMPT_CACHE_TTL_SECONDS
+
+    def reset(self) -> None:
+        with self._lock:
+            self._sent.clear()
+
+
+# Shared by every invoker in the process: quotas and dashboards are per model/agent,
+# not per client instance
+throttle_state = _ThrottleState()
+metrics = BedrockMetrics()
+prompt_cache_prefixes = _PromptCachePrefixes()
+
+
+def _text_block(text: str, cached: bool = False) -> Dict[str, Any]:
+    block: Dict[str, Any] = {"type": "text", "text": text}
+    if cached and BEDROCK_PROMPT_CACHING:
+        block["cache_control"] = CACHE_CONTROL
+    return block
+
+
+def _estimated_tokens(text: str) -> int:
+    return len(text) // 4
+
+
+def build_cached_request(
+    system_prompt: str,
+    prompt: str,
+    max_tokens: int,
+    temperature: float,
+    cached_context: Optional[str] = None,
+    model_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Messages request with the static prefix laid out for prompt caching.
+
+    The prefix is everything up to the last cache_control breakpoint, so static
+    instructions go first (system) and per-call content last. Context shared by
+    several calls (stage guidance and conversation history, or the thread being
+    reviewed and then re-reviewed after a revision) sits between them.
+
+    Bedrock ignores a breakpoint whose prefix is shorter than the model's
+    minimum (1024 tokens for Sonnet, 4096 for Haiku 4.5), so each block is only
+    marked once the estimated prefix up to it reaches that length.
+
+    Args:
+        system_prompt: Static instructions
+        prompt: Per-call content
+        max_tokens: Response token limit
+        temperature: Sampling temperature
+        cached_context: Optional per-conversation block cached after the instructions
+        model_id: Model the request is for, which sets the minimum cacheable prefix
+
+    Returns:
+        Request body for invoke()
+    """
+    minimum = min_cacheable_tokens(model_id)
+    prefix_tokens = _estimated_tokens(system_prompt)
+    system = [_text_block(system_prompt, cached=prefix_tokens >= minimum)]
+    content: List[Dict[str, Any]] = []
+    if cached_context:
+        prefix_tokens += _estimated_tokens(cached_context)
+        content.append(_text_block(cached_context, cached=prefix_tokens >= minimum))
+    content.append(_text_block(prompt))
+    return {
+        "anthropic_version": ANTHROPIC_VERSION,
+        "max_tokens": max_tokens,
+        "temperature": temperature,
+        "system": system,
+        "messages": [{"role": "user", "content": content}],
+    }
+
+
+def usage_summary(response_body: Dict[str, Any]) -> Dict[str, int]:
+    """Token counts from a response's usage block, including prompt cache reads/writes."""
+    usage = response_body.get("usage") or {}
+    return {
+        "input_tokens": usage.get("input_tokens", 0),
+        "output_tokens": usage.get("output_tokens", 0),
+        "cache_read_input_tokens": usage.get("cache_read_input_tokens", 0),
+        "cache_write_input_tokens": usage.get("cache_creation_input_tokens", 0),
+    }
+
+
+def _cache_prefix_key(target: str, request_body: Dict[str, Any]) -> Optional[str]:
+    """Hash of the request up to its last cache_control breakpoint, or None without one."""
+    system = request_body.get("system")
+    blocks = list(system) if isinstance(system, list) else []
+    for message in request_body.get("messages") or []:
+        if isinstance(message.get("content"), list):
+            blocks.extend(message["content"])
+    marked = [i for i, block in enumerate(blocks) if "cache_control" in block]
+    if not marked:
+        return None
+    return cache_key(target, {"prefix": blocks[: marked[-1] + 1]})
+
+
+def _cacheable(
+    response_body: Dict[str, Any],
+    validate: Optional[Callable[[Dict[str, Any]], bool]],
+    agent: str,
+) -> bool:
+    """Whether a fresh response passes the caller's check and may be cached."""
+    if validate is None:
+        return True
+    try:
+        if validate(response_body):
+            return True
+    except Exception as e:
+        logger.info(f"bedrock_invoke response for {agent} not cached: {e}")
+        return False
+    logger.info(f"bedrock_invoke response for {agent} not cached: rejected by validator")
+    return False
+
+
+def _error_code(error: Exception) -> str:
+    if isinstance(error, ClientError):
+        return error.response.get("Error", {}).get("Code", "")
+    return ""
+
+
+def _backoff(attempt: int, base: float) -> float:
+    """Full-jitter exponential backoff for the given 0-based attempt."""
+    return random.uniform(0, min(BEDROCK_BACKOFF_MAX, base * (2**attempt)))
+
+
+class BedrockInvoker:
+    """Invokes Bedrock models with pooled connections, retries and metrics."""
+
+    def __init__(
+        self,
+        client=None,
+        region: Optional[str] = None,
+        max_attempts: int = BEDROCK_MAX_ATTEMPTS,
+        deadline_s: float = BEDROCK_CALL_DEADLINE,
+    ):
+        """Initialize the invoker.
+
+        Args:
+            client: Optional bedrock-runtime client; a pooled one is built on first use
+            region: Region for the pooled client (defaults to AWS_REGION)
+            max_attempts: Attempts per call, including the first
+            deadline_s: Default time budget per call in seconds
+        """
+        self._client = client
+        self.region = region or os.environ.get("AWS_REGION", "us-east-2")
+        self.max_attempts = max(1, max_attempts)
+        self.deadline_s = deadline_s
+        self._legacy_signature = False
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        """bedrock-runtime client, created once with the pooled config."""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = boto3.client(
+                        "bedrock-runtime", region_name=self.region, config=BEDROCK_INVOKER_CONFIG
+                    )
+        return self._client
+
+    def _invoke_once(
+        self, payload: str, model_id: Optional[str], inference_profile_arn: Optional[str]
+    ) -> Dict[str, Any]:
+        """One invoke_model call, trying the ARN-as-modelId signature first."""
+        kwargs = {"body": payload, "contentType": "application/json"}
+        if not inference_profile_arn:
+            response = self.client.invoke_model(modelId=model_id, **kwargs)
+        elif self._legacy_signature:
+            response = self.client.invoke_model(
+                modelId=inference_profile_arn.split("/")[-1],
+                inferenceProfileArn=inference_profile_arn,
+                **kwargs,
+            )
+        else:
+            try:
+                response = self.client.invoke_model(modelId=inference_profile_arn, **kwargs)
+            except ParamValidationError:
+                # Older botocore models reject ARNs as modelId
+                self._legacy_signature = True
+                return self._invoke_once(payload, model_id, inference_profile_arn)
+        return json.loads(response["body"].read())
+
+    def invoke(
+        self,
+        request_body: Dict[str, Any],
+        model_id: Optional[str] = None,
+        inference_profile_arn: Optional[str] = None,
+        agent: str = "unknown",
+        deadline_s: Optional[float] = None,
+        cache: bool = False,
+        validate: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    ) -> Dict[str, Any]:
+        """Invoke a model and return the parsed response body.
+
+        Args:
+            request_body: Anthropic messages request body
+            model_id: Bedrock model ID, used when no inference profile is given
+            inference_profile_arn: Inference profile ARN (takes precedence over model_id)
+            agent: Agent name for metrics and logs
+            deadline_s: Time budget for this call (defaults to the invoker's)
+            cache: Serve identical requests from the LLM response cache. Only for
+                deterministic (low-temperature) call sites.
+            validate: With cache, check a fresh response before storing it; responses
+                it rejects (returns False or raises) are returned but not cached, so a
+                malformed answer is not replayed for the cache's lifetime
+
+        Returns:
+            Parsed JSON response body
+
+        Raises:
+            BedrockAccessError: Access denied
+            BedrockValidationError: Invalid request
+            BedrockDeadlineExceeded: No successful attempt within the deadline
+            BedrockNetworkError: Connection failures after all attempts
+            BedrockError: Any other Bedrock failure after all attempts
+        """
+        target = inference_profile_arn or model_id
+        if not target:
+            raise BedrockValidationError("Bedrock model not configured: no model ID or profile ARN")
+
+        key = None
+        if cache:
+            llm_cache = get_llm_cache()
+            key = cache_key(target, request_body)
+            cached = llm_cache.get(key)
+            if cached is not None:
+                metrics.record_cache_hit(agent)
+                logger.info(f"bedrock_invoke cache hit for {agent} ({key[:12]})")
+                return cached
+
+        payload = json.dumps(request_body)
+        started = time.monotonic()
+        deadline = started + (self.deadline_s if deadline_s is None else deadline_s)
+        call = {
+            "agent": agent,
+            "model": target,
+            "attempts": 0,
+            "throttles": 0,
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "cache_read_input_tokens": 0,
+            "cache_write_input_tokens": 0,
+            "success": False,
+        }
+        try:
+            response_body = self._invoke_with_retries(
+                payload, model_id, inference_profile_arn, deadline, call
+            )
+            call.update(usage_summary(response_body))
+            call["cost_usd"] = cost_usd(target, call)
+            prefix_key = _cache_prefix_key(target, request_body)
+            if (
+                prefix_key
+                and prompt_cache_prefixes.repeated(prefix_key)
+                and not call["cache_read_input_tokens"]
+            ):
+                metrics.record_prompt_cache_miss(agent)
+                logger.warning(
+                    f"bedrock_invoke {agent}: repeated cacheable prefix read no cached tokens "
+                    f"(prefix below the {target} minimum, or evicted)"
+                )
+            call["success"] = True
+            if key and _cacheable(response_body, validate, agent):
+                llm_cache.put(key, response_body)
+            return response_body
+        finally:
+            call["latency_ms"] = round((time.monotonic() - started) * 1000, 1)
+            metrics.record(agent, call)
+            logger.info(f"bedrock_invoke {json.dumps(call)}")
+
+    def _invoke_with_retries(
+        self,
+        payload: str,
+        model_id: Optional[str],
+        inference_profile_arn: Optional[str],
+        deadline: float,
+        call: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        target = call["model"]
+        for attempt in range(self.max_attempts):
+            self._sleep_until(throttle_state.delay(target) * random.random(), deadline, call)
+            call["attempts"] += 1
+            try:
+                response_body = self._invoke_once(payload, model_id, inference_profile_arn)
+                throttle_state.succeeded(target)
+                return response_body
+            except ClientError as e:
+                code = _error_code(e)
+                if code == "AccessDeniedException":
+                    raise BedrockAccessError(
+                        f"Bedrock access denied for {target}. "
+                        "Verify bedrock:InvokeModel permissions and profile access."
+                    ) from e
+                if code == "ValidationException":
+                    raise BedrockValidationError(f"Bedrock validation error: {e}") from e
+                if code in THROTTLING_ERROR_CODES:
+                    call["throttles"] += 1
+                    throttle_state.throttled(target)
+                    base = BEDROCK_THROTTLE_BACKOFF_BASE
+                elif code in TRANSIENT_ERROR_CODES:
+                    base = BEDROCK_BACKOFF_BASE
+                else:
+                    raise BedrockError(f"Bedrock API error: {e}") from e
+                error: Exception = e
+            except ParamValidationError as e:
+                raise BedrockValidationError(f"Parameter validation failed: {e}") from e
+            except NETWORK_ERRORS as e:
+                base = BEDROCK_BACKOFF_BASE
+                error = e
+            except BotoCoreError as e:
+                raise BedrockError(f"Bedrock API error: {e}") from e
+
+            if attempt == self.max_attempts - 1:
+                break
+            logger.warning(
+                f"Bedrock call for {call['agent']} failed "
+                f"(attempt {attempt + 1}/{self.max_attempts}): {error}"
+            )
+            self._sleep_until(_backoff(attempt, base), deadline, call, error)
+
+        if isinstance(error, NETWORK_ERRORS):
+            raise BedrockNetworkError(f"Bedrock network error: {error}") from error
+        raise BedrockError(
+            f"Bedrock API error after {call['attempts']} attempts: {error}"
+        ) from error
+
+    @staticmethod
+    def _sleep_until(
+        delay: float, deadline: float, call: Dict[str, Any], error: Optional[Exception] = None
+    ) -> None:
+        """Sleep for delay, failing the call if that would pass the deadline."""
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or delay >= remaining:
+            raise BedrockDeadlineExceeded(
+                f"Bedrock call for {call['agent']} exceeded its deadline "
+                f"after {call['attempts']} attempts" + (f": {error}" if error else "")
+            ) from error
+        if delay > 0:
+            time.sleep(delay)
+
+    def invoke_text(self, request_body: Dict[str, Any], **kwargs) -> str:
+        """Invoke a model and return the first text block of the response.
+
+        Args:
+            request_body: Anthropic messages request body
+            **kwargs: Passed to invoke()
+
+        Returns:
+            Text of the first content block
+        """
+        return self.invoke(request_body, **kwargs)["content"][0]["text"]
+
+
+_shared_invoker: Optional[BedrockInvoker] = None
+_shared_lock = threading.Lock()
+
+
+def get_bedrock_invoker(client=None) -> BedrockInvoker:
+    """Invoker for an agent.
+
+    Args:
+        client: Optional injected bedrock-runtime client (e.g. from the service container)
+
+    Returns:
+        An invoker wrapping client, or the process-wide pooled invoker when None
+    """
+    global _shared_invoker
+    if client is not None:
+        return BedrockInvoker(client=client)
+    if _shared_invoker is None:
+        with _shared_lock:
+            if _shared_invoker is None:
+                _shared_invoker = BedrockInvoker()
+    return _shared_invoker
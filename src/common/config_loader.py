@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Shared YAML config loading for SoloPilot agents.
+
+Every agent used to read and re-parse ``config/model_config.yaml`` on
+construction. ``load_config`` parses each file once per process and reuses the
+result until the file's mtime or size changes, or until an environment
+variable it references via ``${VAR:-default}`` changes value.
+"""
+
+import copy
+import os
+import re
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import yaml
+
+_ENV_PATTERN = re.compile(r"\$\{([^}]+)\}")
+
+
+def _env_value(var_spec: str) -> str:
+    if ":-" in var_spec:
+        var_name, default = var_spec.split(":-", 1)
+        return os.getenv(var_name, default)
+    return os.getenv(var_spec, "")
+
+
+def substitute_env(content: str) -> str:
+    """Replace ``${VAR}`` and ``${VAR:-default}`` with environment values."""
+    return _ENV_PATTERN.sub(lambda match: _env_value(match.group(1)), content)
+
+
+class _CachedConfig:
+    def __init__(self, stamp: Tuple[int, int], content: str):
+        self.stamp = stamp
+        self.content = content
+        self.var_specs = tuple(sorted(set(_ENV_PATTERN.findall(content))))
+        self.env: Optional[Tuple[str, ...]] = None
+        self.parsed: Any = None
+
+    def current_env(self) -> Tuple[str, ...]:
+        return tuple(_env_value(spec) for spec in self.var_specs)
+
+
+_configs: Dict[str, _CachedConfig] = {}
+_configs_lock = threading.Lock()
+
+
+def load_config(path: str, default: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Load a YAML config file with environment variable substitution.
+
+    Args:
+        path: Config file path
+        default: Returned (as a copy) when the file does not exist
+
+    Returns:
+        Parsed config; a fresh copy each call, so callers may modify it
+    """
+    abs_path = os.path.abspath(path)
+    try:
+        stat = os.stat(abs_path)
+    except FileNotFoundError:
+        if default is None:
+            raise
+        return copy.deepcopy(default)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+
+    with _configs_lock:
+        cached = _configs.get(abs_path)
+        if cached is None or cached.stamp != stamp:
+            with open(abs_path) as f:
+                cached = _configs[abs_path] = _CachedConfig(stamp, f.read())
+
+        env = cached.current_env()
+        if cached.env != env:
+            cached.parsed = yaml.safe_load(substitute_env(cached.content))
+            cached.env = env
+        return copy.deepcopy(cached.parsed)
+
+
+def clear_config_cache() -> None:
+    """Forget every parsed config (the next load re-reads the file)."""
+    with _configs_lock:
+        _configs.clear()
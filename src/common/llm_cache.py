@@ -0,0 +1,237 @@
+"""
+Response cache for deterministic LLM calls.
+
+Metadata extraction, vision intent and requirement edits run at temperature
+0.0-0.1 and are often re-sent with byte-identical prompts (retries,
+``annotate_vision`` replays, simulation runs). Call sites that opt in look up
+the response here before invoking the model.
+
+Entries are keyed by model ID plus a SHA-256 of the full request body, which
+covers the prompt and every sampling parameter. Two tiers:
+
+    - an in-process LRU (``LLM_CACHE_MAX_ENTRIES``, default 256)
+    - an optional shared tier with TTL: a DynamoDB table (``LLM_CACHE_TABLE``)
+      or, for local runs, a directory (``LLM_CACHE_DIR``)
+
+Both tiers expire entries after ``LLM_CACHE_TTL_SECONDS`` (default one day).
+Cache failures are logged and treated as misses; they never fail the call.
+Callers get their own copy of a cached response, so mutating it does not
+change what later hits see.
+"""
+
+import copy
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "256"))
+LLM_CACHE_TTL_SECONDS = int(os.environ.get("LLM_CACHE_TTL_SECONDS", "86400"))
+LLM_CACHE_TABLE = os.environ.get("LLM_CACHE_TABLE", "")
+LLM_CACHE_DIR = os.environ.get("LLM_CACHE_DIR", "")
+
+# DynamoDB items are capped at 400 KB; larger responses stay in memory only
+MAX_SHARED_ENTRY_BYTES = 350 * 1024
+
+
+def cache_key(model_id: str, request_body: Dict[str, Any]) -> str:
+    """Cache key for a model request.
+
+    Args:
+        model_id: Model ID or inference profile ARN the request is sent to
+        request_body: Full request body (messages, max_tokens, temperature, ...)
+
+    Returns:
+        Hex SHA-256 of the model ID and canonical request JSON
+    """
+    canonical = json.dumps(
+        {"model": model_id, "request": request_body},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class DynamoDBCacheTier:
+    """Shared cache tier in a DynamoDB table keyed by ``cache_key`` with TTL on ``ttl``."""
+
+    def __init__(self, table_name: str, dynamodb_resource=None):
+        """Initialize the tier.
+
+        Args:
+            table_name: Cache table name
+            dynamodb_resource: Optional boto3 DynamoDB resource (for testing)
+        """
+        if dynamodb_resource is None:
+            import boto3
+
+            dynamodb_resource = boto3.resource(
+                "dynamodb", region_name=os.environ.get("AWS_REGION", "us-east-2")
+            )
+        self.table = dynamodb_resource.Table(table_name)
+
+    def get(self, key: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        item = self.table.get_item(Key={"cache_key": key}).get("Item")
+        if not item:
+            return None
+        # DynamoDB deletes expired items lazily, so check the TTL here too
+        expires_at = float(item.get("ttl", 0))
+        if expires_at <= time.time():
+            return None
+        return json.loads(item["response"]), expires_at
+
+    def put(self, key: str, encoded: str, expires_at: float) -> None:
+        self.table.put_item(Item={"cache_key": key, "response": encoded, "ttl": int(expires_at)})
+
+
+class DiskCacheTier:
+    """Shared cache tier on local disk, one JSON file per key."""
+
+    def __init__(self, directory: str):
+        """Initialize the tier.
+
+        Args:
+            directory: Cache directory (created on first write)
+        """
+        self.directory = directory
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        try:
+            with open(self._path(key), encoding="utf-8") as handle:
+                entry = json.load(handle)
+        except FileNotFoundError:
+            return None
+        if entry["expires_at"] <= time.time():
+            return None
+        return json.loads(entry["response"]), entry["expires_at"]
+
+    def put(self, key: str, encoded: str, expires_at: float) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so concurrent readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump({"expires_at": expires_at, "response": encoded}, handle)
+        os.replace(tmp_path, path)
+
+
+class LLMResponseCache:
+    """In-memory LRU with an optional shared tier, both with TTL."""
+
+    def __init__(
+        self,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+        ttl_seconds: int = LLM_CACHE_TTL_SECONDS,
+        shared_tier=None,
+    ):
+        """Initialize the cache.
+
+        Args:
+            max_entries: In-memory LRU capacity (0 keeps nothing in memory)
+            ttl_seconds: Lifetime of an entry in both tiers
+            shared_tier: Optional DynamoDBCacheTier/DiskCacheTier
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.shared_tier = shared_tier
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, dynamodb_resource=None) -> "LLMResponseCache":
+        """Build from environment, with DynamoDB taking precedence over disk."""
+        shared_tier = None
+        if LLM_CACHE_TABLE:
+            shared_tier = DynamoDBCacheTier(LLM_CACHE_TABLE, dynamodb_resource)
+        elif LLM_CACHE_DIR:
+            shared_tier = DiskCacheTier(LLM_CACHE_DIR)
+        return cls(shared_tier=shared_tier)
+
+    def _remember(self, key: str, response: Dict[str, Any], expires_at: float) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (copy.deepcopy(response), expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Cached response for key, or None on a miss.
+
+        Args:
+            key: Key from cache_key()
+
+        Returns:
+            A copy of the cached response body, or None
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._entries.move_to_end(key)
+                    return copy.deepcopy(entry[0])
+                del self._entries[key]
+
+        if self.shared_tier is None:
+            return None
+        try:
+            entry = self.shared_tier.get(key)
+        except Exception as e:
+            logger.warning(f"LLM cache read failed for {key[:12]}: {e}")
+            return None
+        if entry is None:
+            return None
+        self._remember(key, *entry)
+        return entry[0]
+
+    def put(self, key: str, response: Dict[str, Any]) -> None:
+        """Store a response in both tiers.
+
+        Args:
+            key: Key from cache_key()
+            response: Parsed response body
+        """
+        expires_at = time.time() + self.ttl_seconds
+        self._remember(key, response, expires_at)
+        if self.shared_tier is None:
+            return
+        encoded = json.dumps(response, ensure_ascii=False)
+        if len(encoded.encode("utf-8")) > MAX_SHARED_ENTRY_BYTES:
+            return
+        try:
+            self.shared_tier.put(key, encoded, expires_at)
+        except Exception as e:
+            logger.warning(f"LLM cache write failed for {key[:12]}: {e}")
+
+    def clear(self) -> None:
+        """Drop the in-memory tier."""
+        with self._lock:
+            self._entries.clear()
+
+
+_shared_cache: Optional[LLMResponseCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """Process-wide response cache, built from the environment on first use."""
+    global _shared_cache
+    if _shared_cache is None:
+        with _shared_lock:
+            if _shared_cache is None:
+                _shared_cache = LLMResponseCache.from_env()
+    return _shared_cache
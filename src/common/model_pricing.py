@@ -0,0 +1,85 @@
+"""
+Per-model Bedrock pricing for cost accounting.
+
+Prices are on-demand USD per million tokens. Models are matched by the first
+pattern contained in the model ID or inference profile ARN, so regional and
+cross-region profiles (``us.anthropic...``) resolve to the same entry. Cache
+writes are billed at the 5-minute ephemeral rate.
+
+The same matching gives each model's minimum cacheable prompt length: a prompt
+cache breakpoint whose prefix is shorter is ignored without an error.
+"""
+
+from typing import Any, Dict, Optional, Tuple
+
+# (pattern, {input, output, cache_read, cache_write}) - most specific patterns first
+MODEL_PRICING: Tuple[Tuple[str, Dict[str, float]], ...] = (
+    ("claude-opus-4", {"input": 15.0, "output": 75.0, "cache_read": 1.5, "cache_write": 18.75}),
+    ("claude-sonnet-4", {"input": 3.0, "output": 15.0, "cache_read": 0.3, "cache_write": 3.75}),
+    ("claude-3-7-sonnet", {"input": 3.0, "output": 15.0, "cache_read": 0.3, "cache_write": 3.75}),
+    ("claude-3-5-sonnet", {"input": 3.0, "output": 15.0, "cache_read": 0.3, "cache_write": 3.75}),
+    ("claude-haiku-4-5", {"input": 1.0, "output": 5.0, "cache_read": 0.1, "cache_write": 1.25}),
+    ("claude-4-5-haiku", {"input": 1.0, "output": 5.0, "cache_read": 0.1, "cache_write": 1.25}),
+    ("claude-3-5-haiku", {"input": 0.8, "output": 4.0, "cache_read": 0.08, "cache_write": 1.0}),
+    ("claude-3-haiku", {"input": 0.25, "output": 1.25, "cache_read": 0.03, "cache_write": 0.3}),
+)
+
+# (pattern, minimum prefix tokens for a prompt cache breakpoint) - most specific first
+PROMPT_CACHE_MIN_TOKENS: Tuple[Tuple[str, int], ...] = (
+    ("claude-opus-4-5", 4096),
+    ("claude-opus-4", 1024),
+    ("claude-sonnet-4", 1024),
+    ("claude-3-7-sonnet", 1024),
+    ("claude-3-5-sonnet", 1024),
+    ("claude-haiku-4-5", 4096),
+    ("claude-4-5-haiku", 4096),
+    ("claude-3-5-haiku", 2048),
+    ("claude-3-haiku", 2048),
+)
+DEFAULT_PROMPT_CACHE_MIN_TOKENS = 1024
+
+
+def model_pricing(model_id: Optional[str]) -> Optional[Dict[str, float]]:
+    """Pricing entry for a model ID or inference profile ARN, or None if unknown."""
+    if not model_id:
+        return None
+    for pattern, prices in MODEL_PRICING:
+        if pattern in model_id:
+            return prices
+    return None
+
+
+def cost_usd(model_id: Optional[str], usage: Dict[str, Any]) -> Optional[float]:
+    """Cost of one call.
+
+    Args:
+        model_id: Model ID or inference profile ARN the call was made against
+        usage: Token counts: input_tokens, output_tokens and optionally
+            cache_read_input_tokens and cache_write_input_tokens
+            (or Bedrock's cache_creation_input_tokens)
+
+    Returns:
+        Cost in USD rounded to 6 places, or None if the model is not in the table
+    """
+    prices = model_pricing(model_id)
+    if prices is None:
+        return None
+    cache_write = usage.get("cache_write_input_tokens")
+    if cache_write is None:
+        cache_write = usage.get("cache_creation_input_tokens")
+    total = (
+        (usage.get("input_tokens") or 0) * prices["input"]
+        + (usage.get("output_tokens") or 0) * prices["output"]
+        + (usage.get("cache_read_input_tokens") or 0) * prices["cache_read"]
+        + (cache_write or 0) * prices["cache_write"]
+    )
+    return round(total / 1_000_000, 6)
+
+
+def min_cacheable_tokens(model_id: Optional[str]) -> int:
+    """Minimum prefix length, in tokens, for a prompt cache breakpoint to take effect."""
+    if model_id:
+        for pattern, minimum in PROMPT_CACHE_MIN_TOKENS:
+            if pattern in model_id:
+                return minimum
+    return DEFAULT_PROMPT_CACHE_MIN_TOKENS
@@ -0,0 +1,218 @@
+"""
+Cheapest-first model routing with escalation.
+
+Metadata extraction, review scoring and requirement updates run on a small
+model. The caller validates each answer (schema, confidence); only answers
+that fail go to the next, larger model. Most calls therefore pay Haiku
+latency and price, and quality is held by the validator rather than by
+always using Sonnet.
+
+Tiers for a task are the caller's configured model followed by the escalation
+model:
+
+    - ``ESCALATION_INFERENCE_PROFILE_ARN``: inference profile for the escalation
+      model. Sonnet 4.5 cannot be invoked on demand, so without it the chain is
+      the caller's model only
+    - ``ESCALATION_MODEL_ID`` (default Claude Sonnet 4.5)
+    - ``MODEL_ROUTER_<TASK>_MODELS``: comma-separated model IDs replacing the
+      tiers for one task, cheapest first (e.g. ``MODEL_ROUTER_REVIEW_MODELS``)
+    - ``MODEL_ROUTING=false`` disables escalation (first tier only)
+    - ``MODEL_ROUTER_MIN_CONFIDENCE``: self-reported confidence below which an
+      answer is escalated (default 0.6)
+
+Only answers escalate. Invocation failures (throttling, deadlines, access
+errors) are raised to the caller; retrying them on a larger model would move
+load to a more expensive model without fixing anything. When an escalation
+tier itself fails to invoke, the cheaper tier's usable answer is returned
+instead of the error.
+"""
+
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.common.bedrock_client import BedrockError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ESCALATION_MODEL_ID = "anthropic.claude-sonnet-4-5-20250929-v1:0"
+MIN_CONFIDENCE = float(os.environ.get("MODEL_ROUTER_MIN_CONFIDENCE", "0.6"))
+
+
+class RoutingRejected(Exception):
+    """Raised by a validator when an answer is unusable and the next tier should run."""
+
+    pass
+
+
+@dataclass(frozen=True)
+class ModelTier:
+    """One model a task can run on."""
+
+    model_id: str
+    inference_profile_arn: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        return self.inference_profile_arn or self.model_id
+
+
+@dataclass
+class RoutedResult:
+    """Validated answer and the tier that produced it."""
+
+    value: Any
+    tier: ModelTier
+    escalations: int
+    accepted: bool
+
+
+class RouterMetrics:
+    """Thread-safe per-task counts of calls, escalations and the tier that answered."""
+
+    def __init__(self):
+        self._tasks: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, task: str, result: Optional[RoutedResult], attempts: int) -> None:
+        with self._lock:
+            totals = self._tasks.setdefault(
+                task, {"calls": 0, "escalations": 0, "failures": 0, "answered_by": {}}
+            )
+            totals["calls"] += 1
+            totals["escalations"] += max(0, attempts - 1)
+            if result is None:
+                totals["failures"] += 1
+                return
+            answered_by = totals["answered_by"]
+            answered_by[result.tier.name] = answered_by.get(result.tier.name, 0) + 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                task: dict(totals, answered_by=dict(totals["answered_by"]))
+                for task, totals in self._tasks.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._tasks.clear()
+
+
+router_metrics = RouterMetrics()
+
+
+def has_keys(value: Any, keys: Tuple[str, ...], task: str) -> bool:
+    """Whether a parsed answer has every expected key.
+
+    A partial object is still usable as a fallback, so missing keys only
+    return False; an answer that is not an object at all is rejected.
+
+    Raises:
+        RoutingRejected: If the answer is not a JSON object
+    """
+    if not isinstance(value, dict):
+        raise RoutingRejected(f"{task} answer is not a JSON object")
+    return all(key in value for key in keys)
+
+
+def build_tiers(
+    task: str, model_id: str, inference_profile_arn: Optional[str] = None
+) -> List[ModelTier]:
+    """Tiers for a task, cheapest first.
+
+    Args:
+        task: Task name, used for the MODEL_ROUTER_<TASK>_MODELS override
+        model_id: The caller's configured (cheap) model
+        inference_profile_arn: Inference profile for the caller's model, if any
+
+    Returns:
+        List of tiers to try in order
+    """
+    override = os.environ.get(f"MODEL_ROUTER_{task.upper()}_MODELS", "").strip()
+    if override:
+        tiers = [ModelTier(m.strip()) for m in override.split(",") if m.strip()]
+    else:
+        tiers = [ModelTier(model_id, inference_profile_arn)]
+        escalation_arn = os.environ.get("ESCALATION_INFERENCE_PROFILE_ARN")
+        if escalation_arn:
+            tiers.append(
+                ModelTier(
+                    os.environ.get("ESCALATION_MODEL_ID", DEFAULT_ESCALATION_MODEL_ID),
+                    escalation_arn,
+                )
+            )
+    if os.environ.get("MODEL_ROUTING", "true").lower() == "false":
+        return tiers[:1]
+    # Drop repeats (e.g. the caller is already configured with the escalation model)
+    unique: List[ModelTier] = []
+    for tier in tiers:
+        if tier.name not in {t.name for t in unique}:
+            unique.append(tier)
+    return unique
+
+
+def route(
+    task: str,
+    tiers: List[ModelTier],
+    call: Callable[[ModelTier], str],
+    validate: Callable[[str], Tuple[Any, bool]],
+) -> RoutedResult:
+    """Run a task on the cheapest tier whose answer passes validation.
+
+    Args:
+        task: Task name for logs and metrics
+        tiers: Tiers to try, cheapest first
+        call: Invokes one tier and returns the model's text
+        validate: Parses the text and returns (value, accepted). Raise
+            RoutingRejected or ValueError (e.g. json.JSONDecodeError) if the
+            value is unusable.
+
+    Returns:
+        The first accepted result; if none is accepted, the last usable one
+        (from the largest model that produced one) with accepted=False
+
+    Raises:
+        Any error from ``call`` (e.g. BedrockError), without escalating. A
+        BedrockError from a later tier returns the fallback instead, if any
+        The last tier's validation error if no tier produced a usable value
+    """
+    fallback: Optional[RoutedResult] = None
+    last_error: Optional[Exception] = None
+    attempts = 0
+
+    for index, tier in enumerate(tiers):
+        attempts += 1
+        try:
+            text = call(tier)
+        except BedrockError as e:
+            if fallback is None:
+                raise
+            logger.warning(
+                f"model_router {task}: {tier.name} failed ({e}), using {fallback.tier.name} answer"
+            )
+            break
+        try:
+            value, accepted = validate(text)
+        except (RoutingRejected, ValueError) as e:
+            last_error = e
+            logger.warning(f"model_router {task}: {tier.name} unusable ({e})")
+            continue
+
+        result = RoutedResult(value=value, tier=tier, escalations=index, accepted=accepted)
+        if accepted:
+            router_metrics.record(task, result, attempts)
+            if index:
+                logger.info(
+                    f"model_router {task}: answered by {tier.name} after {index} escalation(s)"
+                )
+            return result
+        fallback = result
+        logger.info(f"model_router {task}: {tier.name} below threshold, escalating")
+
+    router_metrics.record(task, fallback, attempts)
+    if fallback is not None:
+        return fallback
+    raise last_error if last_error else RoutingRejected(f"No model tiers configured for {task}")
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Provider Health Tracking for SoloPilot
+
+Rolling latency and error tracking per LLM endpoint (an inference profile in a
+region), a circuit breaker on top of it, and hedged requests. Configured under
+``llm.<provider>.health`` in config/model_config.yaml:
+
+    health:
+      window: 50             # recent calls kept per endpoint
+      min_calls: 10          # calls needed before the breaker or hedging act
+      error_threshold: 0.5   # error rate over the window that opens the circuit
+      open_seconds: 30       # how long an open circuit fails fast
+      hedge: false           # duplicate slow calls to the secondary endpoint
+      hedge_after_seconds:   # fixed hedge delay (default: the window's p95 latency)
+
+While a circuit is open, calls fail fast (or go straight to a secondary
+endpoint) instead of sitting through retries against a degraded region. After
+``open_seconds`` a single trial call is let through; its outcome closes or
+re-opens the circuit.
+
+A hedged call that has not returned within the hedge delay is duplicated to
+the secondary endpoint and the first successful answer wins, bounding tail
+latency at roughly p95 plus the secondary's own latency.
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Deque, Dict, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Worker threads shared by every hedged call in the process
+HEDGE_MAX_WORKERS = 8
+
+
+def _percentile(sorted_values, pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class ProviderHealth:
+    """Thread-safe rolling outcomes and circuit state for one endpoint."""
+
+    def __init__(
+        self,
+        window: int = 50,
+        min_calls: int = 10,
+        error_threshold: float = 0.5,
+        open_seconds: float = 30.0,
+        hedge: bool = False,
+        hedge_after_seconds: Optional[float] = None,
+    ):
+        """
+        Initialize a closed circuit with no history.
+
+        Args:
+            window: Number of recent calls kept
+            min_calls: Calls in the window before the breaker can open or p95 is reported
+            error_threshold: Error rate (0-1) over the window that opens the circuit
+            open_seconds: Seconds an open circuit rejects calls before a trial call
+            hedge: Whether callers with a secondary endpoint should hedge
+            hedge_after_seconds: Fixed hedge delay instead of the rolling p95
+        """
+        self.window = window
+        self.min_calls = min_calls
+        self.error_threshold = error_threshold
+        self.open_seconds = open_seconds
+        self.hedge = hedge
+        self.hedge_after_seconds = hedge_after_seconds
+        self.state = CLOSED
+        self._samples: Deque[Tuple[float, bool]] = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, health: Optional[Dict[str, Any]]) -> "ProviderHealth":
+        """Build from a ``health`` config section (missing keys use the defaults)."""
+        health = health or {}
+        return cls(
+            window=health.get("window", 50),
+            min_calls=health.get("min_calls", 10),
+            error_threshold=health.get("error_threshold", 0.5),
+            open_seconds=health.get("open_seconds", 30.0),
+            hedge=bool(health.get("hedge", False)),
+            hedge_after_seconds=health.get("hedge_after_seconds"),
+        )
+
+    def allow(self) -> bool:
+        """Whether a call may go to this endpoint now (claims the trial call when half-open)."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                if time.monotonic() - self._opened_at < self.open_seconds:
+                    return False
+                self.state = HALF_OPEN
+                self._trial_in_flight = False
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def is_open(self) -> bool:
+        """Whether calls are currently being rejected (without claiming a trial call)."""
+        with self._lock:
+            if self.state == OPEN:
+                return time.monotonic() - self._opened_at < self.open_seconds
+            return self.state == HALF_OPEN and self._trial_in_flight
+
+    def record_success(self, latency: float) -> None:
+        """Record a successful call; a successful trial call closes the circuit."""
+        with self._lock:
+            if self.state != CLOSED:
+                # Start the window afresh so old errors don't re-open it immediately
+                self.state = CLOSED
+                self._trial_in_flight = False
+                self._samples.clear()
+            self._samples.append((latency, True))
+
+    def record_failure(self, latency: float) -> None:
+        """Record a failed call, opening the circuit if the error rate crosses the threshold."""
+        with self._lock:
+            self._samples.append((latency, False))
+            if self.state == HALF_OPEN:
+                self._open()
+            elif self.state == CLOSED and len(self._samples) >= self.min_calls:
+                if self._error_rate() >= self.error_threshold:
+                    self._open()
+
+    def release(self) -> None:
+        """Give back a claimed trial call whose outcome says nothing about endpoint health."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self._trial_in_flight = False
+        print(
+            f"⚡ Circuit opened after {self._error_rate():.0%} errors over "
+            f"{len(self._samples)} calls; failing fast for {self.open_seconds:.0f}s"
+        )
+
+    def _error_rate(self) -> float:
+        if not self._samples:
+            return 0.0
+        return sum(1 for _, ok in self._samples if not ok) / len(self._samples)
+
+    def _latency_percentile(self, pct: float) -> Optional[float]:
+        latencies = sorted(latency for latency, ok in self._samples if ok)
+        if len(latencies) < self.min_calls:
+            return None
+        return _percentile(latencies, pct)
+
+    def p95_latency(self) -> Optional[float]:
+        """p95 latency of successful calls in seconds, or None with too few samples."""
+        with self._lock:
+            return self._latency_percentile(95)
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None if hedging is off or p95 is unknown."""
+        if not self.hedge:
+            return None
+        if self.hedge_after_seconds is not None:
+            return float(self.hedge_after_seconds)
+        return self.p95_latency()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current state, call count, error rate and latency percentiles."""
+        with self._lock:
+            return {
+                "state": self.state,
+                "calls": len(self._samples),
+                "error_rate": round(self._error_rate(), 4),
+                "latency_p50": self._latency_percentile(50),
+                "latency_p95": self._latency_percentile(95),
+            }
+
+
+_hedge_executor: Optional[ThreadPoolExecutor] = None
+_hedge_executor_lock = threading.Lock()
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _hedge_executor
+    with _hedge_executor_lock:
+        if _hedge_executor is None:
+            _hedge_executor = ThreadPoolExecutor(
+                max_workers=HEDGE_MAX_WORKERS, thread_name_prefix="llm-hedge"
+            )
+        return _hedge_executor
+
+
+def hedged_call(primary: Callable[[], T], secondary: Callable[[], T], hedge_after: float) -> T:
+    """
+    Run ``primary``; if it has not finished after ``hedge_after`` seconds, also run
+    ``secondary`` and return whichever succeeds first.
+
+    The slower call is not cancelled (botocore calls cannot be interrupted); it
+    finishes in the background and still updates its endpoint's health.
+
+    Args:
+        primary: Call to the primary endpoint
+        secondary: Equivalent call to the secondary endpoint
+        hedge_after: Seconds to wait on the primary before hedging
+
+    Returns:
+        The first successful result
+
+    Raises:
+        The primary's error if it fails before the hedge delay, otherwise the
+        primary's error if both calls fail
+    """
+    first = _executor().submit(primary)
+    try:
+        return first.result(timeout=hedge_after)
+    except FutureTimeoutError:
+        pass
+
+    second = _executor().submit(secondary)
+    pending = {first, second}
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                return future.result()
+    raise first.exception() or second.exception()
+
+
+_health: Dict[str, ProviderHealth] = {}
+_health_lock = threading.Lock()
+
+
+def get_provider_health(key: str, health: Optional[Dict[str, Any]] = None) -> ProviderHealth:
+    """
+    Get the process-wide health tracker for an endpoint, creating it on first use.
+
+    Args:
+        key: Endpoint key, e.g. ``bedrock:<inference profile ARN>``
+        health: ``health`` config section used when the tracker is created
+
+    Returns:
+        Shared ProviderHealth instance
+    """
+    with _health_lock:
+        tracker = _health.get(key)
+        if tracker is None:
+            tracker = _health[key] = ProviderHealth.from_config(health)
+        return tracker
+
+
+def health_snapshot() -> Dict[str, Dict[str, Any]]:
+    """Snapshot of every tracked endpoint, keyed like get_provider_health()."""
+    with _health_lock:
+        trackers = dict(_health)
+    return {key: tracker.snapshot() for key, tracker in trackers.items()}
@@ -1,6 +1,13 @@
 # AI Providers package
 
-from .base import BaseProvider, ProviderError
-from .factory import create_ai_provider, get_provider
+from .base import BaseProvider, ProviderError, consume_stream
+from .factory import clear_provider_cache, create_ai_provider, get_provider
 
-__all__ = ["get_provider", "create_ai_provider", "BaseProvider", "ProviderError"]
+__all__ = [
+    "get_provider",
+    "create_ai_provider",
+    "clear_provider_cache",
+    "BaseProvider",
+    "ProviderError",
+    "consume_stream",
+]
@@ -6,106 +6,237 @@ Defines the standard interface that all AI providers must implement.
 Enables swapping between different LLM providers (Bedrock, OpenAI, CodeWhisperer, etc.)
 """
 
-import json
-import os
+import asyncio
+import inspect
 import time
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
 from datetime import datetime
-from functools import wraps
+from functools import partial, wraps
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.providers.log_writer import get_log_writer
+
+# Per-call usage reported by the provider (see report_usage) and the agent making the call.
+# The usage holder is a dict so reports from worker threads (agenerate_code copies the
+# context into the executor) reach the log_call wrapper that created it.
+_call_usage: ContextVar[Optional[Dict[str, Any]]] = ContextVar("llm_call_usage", default=None)
+_current_agent: ContextVar[Optional[str]] = ContextVar("llm_agent", default=None)
+
+# Cost and cache fields copied from provider metadata into log entries
+_USAGE_LOG_FIELDS = ("model", "cost_usd", "cache_read_input_tokens", "cache_write_input_tokens")
+
+
+def report_usage(usage: Dict[str, Any]) -> None:
+    """
+    Attach real usage to the log_call entry of the provider call in progress.
+
+    Args:
+        usage: Cost info with tokens_in/tokens_out and optionally model, cost_usd
+            and cache_read_input_tokens/cache_write_input_tokens
+    """
+    holder = _call_usage.get()
+    if holder is not None:
+        holder.update(usage)
+
+
+@contextmanager
+def agent_scope(agent: str) -> Iterator[None]:
+    """Attribute provider calls made inside the block to an agent in logs and metrics."""
+    token = _current_agent.set(agent)
+    try:
+        yield
+    finally:
+        _current_agent.reset(token)
+
+
+def _write_log_entry(log_entry: Dict[str, Any]) -> None:
+    """Queue a JSON log entry for llm_calls.log; the background writer does the file I/O."""
+    agent = _current_agent.get()
+    if agent:
+        log_entry["agent"] = agent
+    get_log_writer().submit(log_entry)
+
+
+def _usage_fields(metadata: Dict[str, Any], args: tuple, text: Any) -> Dict[str, Any]:
+    """Token, cost and cache fields for a log entry.
+
+    Uses the provider's reported usage; when it reported none, tokens are estimated
+    from word counts and the entry is marked tokens_estimated.
+    """
+    tokens_in = metadata.get("tokens_in")
+    tokens_out = metadata.get("tokens_out")
+    fields: Dict[str, Any] = {}
+    if tokens_in is None or tokens_out is None:
+        fields["tokens_estimated"] = True
+    fields["tokens_in"] = (
+        tokens_in if tokens_in is not None else (len(args[0].split()) if args else 50)
+    )
+    fields["tokens_out"] = (
+        tokens_out if tokens_out is not None else (len(str(text).split()) if text else 100)
+    )
+    for key in _USAGE_LOG_FIELDS:
+        if metadata.get(key) is not None:
+            fields[key] = metadata[key]
+    return fields
+
+
+def _log_success(
+    provider: Any,
+    args: tuple,
+    result: Any,
+    start_time: float,
+    reported: Optional[Dict[str, Any]] = None,
+) -> None:
+    """Log a completed provider call."""
+    end_time = time.time()
+
+    # Extract metadata if method returns tuple (code, meta)
+    if isinstance(result, tuple) and len(result) == 2:
+        code, meta = result
+        metadata = meta or {}
+    else:
+        code = result
+        metadata = reported or {}
+
+    # Get provider info
+    provider_info = provider.get_provider_info() if hasattr(provider, "get_provider_info") else {}
+    provider_name = provider_info.get("name", "unknown")
+
+    # Calculate latency
+    latency_ms = int((end_time - start_time) * 1000)
+
+    log_entry = {
+        "ts": datetime.now().isoformat(),
+        "provider": provider_name,
+        "latency_ms": latency_ms,
+        **_usage_fields(metadata, args, code),
+    }
+
+    _write_log_entry(log_entry)
+
+
+def _log_failure(provider: Any, error: Exception, start_time: float, **extra: Any) -> None:
+    """Log a failed provider call."""
+    latency_ms = int((time.time() - start_time) * 1000)
+    provider_info = provider.get_provider_info() if hasattr(provider, "get_provider_info") else {}
+
+    _write_log_entry(
+        {
+            "ts": datetime.now().isoformat(),
+            "provider": provider_info.get("name", "unknown"),
+            "latency_ms": latency_ms,
+            "tokens_in": None,
+            "tokens_out": None,
+            "error": str(error),
+            "status": "failed",
+            **extra,
+        }
+    )
+
+
+def _log_stream_call(func):
+    """log_call for generator methods: logs once the stream is exhausted, with ttft_ms."""
+
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        start_time = time.time()
+        first_chunk_time = None
+        chunks = []
+        provider_info = self.get_provider_info() if hasattr(self, "get_provider_info") else {}
+        # Owned by this stream, not the (shared) provider, so concurrent streams on one
+        # provider cannot log each other's usage
+        reported: Dict[str, Any] = {}
+        stream = func(self, *args, **kwargs)
+
+        try:
+            while True:
+                # The context cannot be held across yields, so install the holder
+                # around each step of the wrapped generator
+                token = _call_usage.set(reported)
+                try:
+                    chunk = next(stream)
+                except StopIteration:
+                    break
+                finally:
+                    _call_usage.reset(token)
+                if first_chunk_time is None:
+                    first_chunk_time = time.time()
+                chunks.append(chunk)
+                yield chunk
+        except Exception as e:
+            _log_failure(self, e, start_time, stream=True)
+            raise
+        finally:
+            stream.close()
+
+        log_entry = {
+            "ts": datetime.now().isoformat(),
+            "provider": provider_info.get("name", "unknown"),
+            "latency_ms": int((time.time() - start_time) * 1000),
+            "ttft_ms": (int((first_chunk_time - start_time) * 1000) if first_chunk_time else None),
+            **_usage_fields(reported, args, "".join(chunks)),
+            "stream": True,
+        }
+        _write_log_entry(log_entry)
+
+    return wrapper
 
 
 def log_call(func):
     """
     Decorator to log AI provider calls with timing and token usage.
 
-    Logs to logs/llm_calls.log in JSON format:
+    Logs to logs/llm_calls.log (via the background writer in log_writer.py) in JSON format:
     {"ts": timestamp, "provider": name, "latency_ms": X, "tokens_in": Y, "tokens_out": Z, ...}
+
+    Token counts, cost and cache tokens come from the provider's report_usage() call
+    (or a (code, meta) return value); calls without either are logged with word-count
+    estimates and tokens_estimated. Calls inside agent_scope() carry the agent name.
+
+    Generator methods (stream_code) are logged when the stream ends, with the
+    time to the first chunk as ttft_ms; coroutine methods (agenerate_code) are
+    logged when awaited.
     """
+    if inspect.isgeneratorfunction(func):
+        return _log_stream_call(func)
+
+    if inspect.iscoroutinefunction(func):
+
+        @wraps(func)
+        async def async_wrapper(self, *args, **kwargs):
+            start_time = time.time()
+            reported: Dict[str, Any] = {}
+            token = _call_usage.set(reported)
+            try:
+                result = await func(self, *args, **kwargs)
+            except Exception as e:
+                _log_failure(self, e, start_time)
+                raise
+            finally:
+                _call_usage.reset(token)
+            _log_success(self, args, result, start_time, reported)
+            return result
+
+        return async_wrapper
 
     @wraps(func)
     def wrapper(self, *args, **kwargs):
         start_time = time.time()
-
+        reported: Dict[str, Any] = {}
+        token = _call_usage.set(reported)
         try:
             # Call the wrapped method
             result = func(self, *args, **kwargs)
-            end_time = time.time()
-
-            # Extract metadata if method returns tuple (code, meta)
-            if isinstance(result, tuple) and len(result) == 2:
-                code, meta = result
-                metadata = meta or {}
-            else:
-                code = result
-                metadata = {}
-
-            # Get provider info
-            provider_info = self.get_provider_info() if hasattr(self, "get_provider_info") else {}
-            provider_name = provider_info.get("name", "unknown")
-
-            # Calculate latency
-            latency_ms = int((end_time - start_time) * 1000)
-
-            # Extract token counts with defaults
-            tokens_in = metadata.get("tokens_in", len(args[0].split()) if args else 50)
-            tokens_out = metadata.get("tokens_out", len(str(code).split()) if code else 100)
-
-            # Create log entry
-            log_entry = {
-                "ts": datetime.now().isoformat(),
-                "provider": provider_name,
-                "latency_ms": latency_ms,
-                "tokens_in": tokens_in,
-                "tokens_out": tokens_out,
-            }
-
-            # Add additional metadata
-            if "model" in metadata:
-                log_entry["model"] = metadata["model"]
-            if "cost_usd" in metadata:
-                log_entry["cost_usd"] = metadata["cost_usd"]
-
-            log_dir = os.path.join(os.getenv("LLM_LOG_DIR", "logs"))
-            if not os.access(log_dir, os.W_OK):
-                log_dir = "/tmp/logs"
-            os.makedirs(log_dir, exist_ok=True)
-            log_path = os.path.join(log_dir, "llm_calls.log")
-
-            with open(log_path, "a") as f:
-                f.write(json.dumps(log_entry) + "\n")
-
-            return result
-
         except Exception as e:
-            end_time = time.time()
-            latency_ms = int((end_time - start_time) * 1000)
-
-            # Log failed calls too
-            provider_info = self.get_provider_info() if hasattr(self, "get_provider_info") else {}
-            provider_name = provider_info.get("name", "unknown")
-
-            log_entry = {
-                "ts": datetime.now().isoformat(),
-                "provider": provider_name,
-                "latency_ms": latency_ms,
-                "tokens_in": None,
-                "tokens_out": None,
-                "error": str(e),
-                "status": "failed",
-            }
-
-            log_dir = os.path.join(os.getenv("LLM_LOG_DIR", "logs"))
-            if not os.access(log_dir, os.W_OK):
-                log_dir = "/tmp/logs"
-            os.makedirs(log_dir, exist_ok=True)
-            log_path = os.path.join(log_dir, "llm_calls.log")
-
-            with open(log_path, "a") as f:
-                f.write(json.dumps(log_entry) + "\n")
-
+            _log_failure(self, e, start_time)
             raise
+        finally:
+            _call_usage.reset(token)
+        _log_success(self, args, result, start_time, reported)
+        return result
 
     return wrapper
 
@@ -135,6 +266,59 @@ class BaseProvider(ABC):
         """
         pass
 
+    async def agenerate_code(
+        self, prompt: str, files: Optional[List[Path]] = None, timeout: Optional[int] = None
+    ) -> str:
+        """
+        Async generate_code() for running many generations concurrently.
+
+        The default runs generate_code() in a worker thread; providers with a
+        rate limiter override this to wait on it without blocking the event loop.
+
+        Args:
+            prompt: The instruction prompt for code generation
+            files: Optional list of file paths to include as context
+            timeout: Optional timeout in seconds (overrides provider default)
+
+        Returns:
+            Generated code as a string
+
+        Raises:
+            ProviderError: If code generation fails
+            ProviderTimeoutError: If request times out
+        """
+        call = partial(self.generate_code, prompt, files)
+        if timeout is not None:
+            call = partial(call, timeout=timeout)
+        # run_in_executor does not copy contextvars (and asyncio.to_thread is 3.9+)
+        context = copy_context()
+        return await asyncio.get_running_loop().run_in_executor(None, context.run, call)
+
+    def stream_code(
+        self, prompt: str, files: Optional[List[Path]] = None, timeout: Optional[int] = None
+    ) -> Iterator[str]:
+        """
+        Generate code, yielding text deltas as the provider produces them.
+
+        Providers without a streaming API yield the complete response as one chunk.
+
+        Args:
+            prompt: The instruction prompt for code generation
+            files: Optional list of file paths to include as context
+            timeout: Optional timeout in seconds (overrides provider default)
+
+        Yields:
+            Generated text in order; joining the chunks gives the full response
+
+        Raises:
+            ProviderError: If code generation fails
+            ProviderTimeoutError: If request times out
+        """
+        if timeout is None:
+            yield self.generate_code(prompt, files)
+        else:
+            yield self.generate_code(prompt, files, timeout=timeout)
+
     @abstractmethod
     def is_available(self) -> bool:
         """
@@ -165,6 +349,31 @@ class BaseProvider(ABC):
         return None
 
 
+def consume_stream(
+    chunks: Iterable[str], on_delta: Optional[Callable[[str], None]] = None
+) -> Tuple[str, Optional[float]]:
+    """
+    Collect a stream_code() generator, passing each delta to on_delta as it arrives.
+
+    Args:
+        chunks: Iterable of text deltas
+        on_delta: Optional callback for partial output (e.g. printing to a console)
+
+    Returns:
+        Tuple of (full_text, seconds_to_first_delta or None if nothing was yielded)
+    """
+    start_time = time.time()
+    first_delta = None
+    parts = []
+    for chunk in chunks:
+        if first_delta is None:
+            first_delta = time.time() - start_time
+        parts.append(chunk)
+        if on_delta:
+            on_delta(chunk)
+    return "".join(parts), first_delta
+
+
 class ProviderError(Exception):
     """Base exception for AI provider errors."""
 
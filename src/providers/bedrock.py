@@ -8,21 +8,25 @@ Provides standardized code generation with retry logic and cost tracking.
 
 import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from src.agents.dev.context_packer import build_context
 from src.common.bedrock_client import (
+    BedrockCircuitOpenError,
     BedrockError,
     create_bedrock_client,
     get_standardized_error_message,
 )
+from src.common.model_pricing import cost_usd
 from src.providers.base import (
     BaseProvider,
     ProviderError,
     ProviderTimeoutError,
     ProviderUnavailableError,
     log_call,
+    report_usage,
 )
+from src.providers.rate_limiter import estimate_tokens, get_rate_limiter
 
 
 class BedrockProvider(BaseProvider):
@@ -39,6 +43,13 @@ class BedrockProvider(BaseProvider):
         self.client = None
         self.last_cost_info = None
 
+        # Shared per-model limiter (requests/min, tokens/min, max in-flight calls)
+        bedrock_config = config.get("llm", {}).get("bedrock", {})
+        self.rate_limiter = get_rate_limiter(
+            f"bedrock:{bedrock_config.get('inference_profile_arn', '')}",
+            bedrock_config.get("rate_limits"),
+        )
+
         # Try to initialize the client
         try:
             self.client = create_bedrock_client(config)
@@ -73,12 +84,89 @@ class BedrockProvider(BaseProvider):
 
         # Build enhanced prompt with file context
         enhanced_prompt = self._build_enhanced_prompt(prompt, files)
+        max_tokens, temperature = self._model_kwargs()
+
+        with self.rate_limiter.limit(estimate_tokens(enhanced_prompt, max_tokens)) as usage:
+            response_text, cost_info = self._invoke(
+                enhanced_prompt, max_tokens, temperature, timeout
+            )
+            usage["tokens"] = self._tokens_used(cost_info)
+
+        return response_text
+
+    @log_call
+    async def agenerate_code(
+        self, prompt: str, files: Optional[List[Path]] = None, timeout: Optional[int] = None
+    ) -> str:
+        """
+        Async generate_code(): waits on the shared rate limiter without blocking the
+        event loop, then runs the Bedrock call in a worker thread.
+
+        Args:
+            prompt: The instruction prompt for code generation
+            files: Optional list of file paths to include as context
+            timeout: Optional timeout in seconds (default: 30s)
+
+        Returns:
+            Generated code as a string
+
+        Raises:
+            ProviderError: If code generation fails
+            ProviderTimeoutError: If request times out
+        """
+        if not self.is_available():
+            raise ProviderUnavailableError(
+                "Bedrock provider is not available. Check configuration and credentials.",
+                provider_name="bedrock",
+            )
+
+        enhanced_prompt = self._build_enhanced_prompt(prompt, files)
+        max_tokens, temperature = self._model_kwargs()
+
+        # The limiter holds the slot until the worker thread returns, even if this
+        # task is cancelled while Bedrock is still answering
+        response_text, _ = await self.rate_limiter.arun(
+            estimate_tokens(enhanced_prompt, max_tokens),
+            self._invoke,
+            enhanced_prompt,
+            max_tokens,
+            temperature,
+            timeout,
+            tokens_used=lambda result: self._tokens_used(result[1]),
+        )
+        return response_text
+
+    def _model_kwargs(self) -> Tuple[int, float]:
+        """Return (max_tokens, temperature) from model_kwargs."""
+        model_config = self.config.get("llm", {}).get("bedrock", {}).get("model_kwargs", {})
+        return model_config.get("max_tokens", 2048), model_config.get("temperature", 0.1)
+
+    @staticmethod
+    def _tokens_used(cost_info: Optional[Dict[str, Any]]) -> Optional[int]:
+        """Total tokens from cost info, or None if Bedrock did not report them."""
+        if not cost_info or cost_info.get("tokens_in") is None:
+            return None
+        return cost_info["tokens_in"] + (cost_info.get("tokens_out") or 0)
+
+    def _invoke(
+        self,
+        enhanced_prompt: str,
+        max_tokens: int,
+        temperature: float,
+        timeout: Optional[int] = None,
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Invoke Bedrock once and record cost information.
+
+        Returns:
+            Tuple of (response_text, cost_info)
 
+        Raises:
+            ProviderError: If code generation fails
+            ProviderTimeoutError: If request times out
+        """
         try:
-            # Get model configuration
             model_config = self.config.get("llm", {}).get("bedrock", {}).get("model_kwargs", {})
-            max_tokens = model_config.get("max_tokens", 2048)
-            temperature = model_config.get("temperature", 0.1)
 
             # Set timeout (default 30s, fail fast at 15s for validation)
             request_timeout = timeout or model_config.get("timeout", 120)
@@ -107,10 +195,14 @@ class BedrockProvider(BaseProvider):
             end_time = time.time()
 
             # Store cost information
-            self._extract_cost_info(start_time, end_time, metadata)
+            cost_info = self._extract_cost_info(start_time, end_time, metadata)
 
-            return response_text
+            return response_text, cost_info
 
+        except ProviderError:
+            raise
+        except BedrockCircuitOpenError as e:
+            raise ProviderUnavailableError(str(e), provider_name="bedrock", original_error=e)
         except BedrockError as e:
             error_msg = get_standardized_error_message(e, "bedrock-provider")
             raise ProviderError(error_msg, provider_name="bedrock", original_error=e)
@@ -121,6 +213,72 @@ class BedrockProvider(BaseProvider):
                 original_error=e,
             )
 
+    @log_call
+    def stream_code(
+        self, prompt: str, files: Optional[List[Path]] = None, timeout: Optional[int] = None
+    ) -> Iterator[str]:
+        """
+        Stream code from AWS Bedrock Claude models, yielding text deltas as they arrive.
+
+        Uses invoke_model_with_response_stream, so callers see output after the
+        time to first token instead of after the full generation.
+
+        Args:
+            prompt: The instruction prompt for code generation
+            files: Optional list of file paths to include as context
+            timeout: Optional timeout in seconds (reported if the stream times out)
+
+        Yields:
+            Generated text deltas in order
+
+        Raises:
+            ProviderError: If code generation fails
+            ProviderTimeoutError: If request times out
+        """
+        if not self.is_available():
+            raise ProviderUnavailableError(
+                "Bedrock provider is not available. Check configuration and credentials.",
+                provider_name="bedrock",
+            )
+
+        enhanced_prompt = self._build_enhanced_prompt(prompt, files)
+        max_tokens, temperature = self._model_kwargs()
+
+        metadata: Dict[str, Any] = {}
+        first_token_time = None
+        try:
+            with self.rate_limiter.limit(estimate_tokens(enhanced_prompt, max_tokens)) as usage:
+                start_time = time.time()
+                for delta in self.client.simple_stream(
+                    enhanced_prompt, max_tokens, temperature, metadata=metadata
+                ):
+                    if first_token_time is None:
+                        first_token_time = time.time()
+                    yield delta
+                cost_info = self._extract_cost_info(start_time, time.time(), metadata)
+                usage["tokens"] = self._tokens_used(cost_info)
+        except BedrockCircuitOpenError as e:
+            raise ProviderUnavailableError(str(e), provider_name="bedrock", original_error=e)
+        except BedrockError as e:
+            error_msg = get_standardized_error_message(e, "bedrock-provider")
+            raise ProviderError(error_msg, provider_name="bedrock", original_error=e)
+        except Exception as e:
+            if "timeout" in str(e).lower() or "timed out" in str(e).lower():
+                raise ProviderTimeoutError(
+                    f"Bedrock stream timed out (prompt: {len(enhanced_prompt)} chars)",
+                    provider_name="bedrock",
+                    timeout_seconds=timeout or 0,
+                    original_error=e,
+                )
+            raise ProviderError(
+                f"Unexpected error during code streaming: {e}",
+                provider_name="bedrock",
+                original_error=e,
+            )
+
+        if first_token_time is not None:
+            cost_info["ttft_ms"] = int((first_token_time - start_time) * 1000)
+
     def is_available(self) -> bool:
         """
         Check if Bedrock provider is available and properly configured.
@@ -206,7 +364,7 @@ class BedrockProvider(BaseProvider):
 
     def _extract_cost_info(
         self, start_time: float, end_time: float, metadata: Dict[str, Any]
-    ) -> None:
+    ) -> Dict[str, Any]:
         """
         Extract and store cost information from response metadata.
 
@@ -214,11 +372,19 @@ class BedrockProvider(BaseProvider):
             start_time: Request start time
             end_time: Request end time
             metadata: Response metadata from Bedrock
+
+        Returns:
+            The cost information (also stored as last_cost_info)
         """
-        # Extract token counts from headers
+        # Token usage from the response body (or stream events), falling back to headers
+        usage = metadata.get("usage") or {}
         headers = metadata.get("ResponseMetadata", {}).get("HTTPHeaders", {})
-        tokens_in = headers.get("x-amzn-bedrock-tokens-in")
-        tokens_out = headers.get("x-amzn-bedrock-tokens-out")
+        tokens_in = usage.get("input_tokens") or headers.get(
+            "x-amzn-bedrock-input-token-count", headers.get("x-amzn-bedrock-tokens-in")
+        )
+        tokens_out = usage.get("output_tokens") or headers.get(
+            "x-amzn-bedrock-output-token-count", headers.get("x-amzn-bedrock-tokens-out")
+        )
 
         # Convert to int if available
         try:
@@ -228,11 +394,24 @@ class BedrockProvider(BaseProvider):
             tokens_in = None
             tokens_out = None
 
+        token_usage = {
+            "input_tokens": tokens_in,
+            "output_tokens": tokens_out,
+            "cache_read_input_tokens": usage.get("cache_read_input_tokens", 0),
+            "cache_write_input_tokens": usage.get("cache_creation_input_tokens", 0),
+        }
+        model = metadata.get("model_id", "unknown")
+
         self.last_cost_info = {
             "timestamp": time.time(),
-            "model": metadata.get("model_id", "unknown"),
+            "model": model,
             "tokens_in": tokens_in,
             "tokens_out": tokens_out,
+            "cache_read_input_tokens": token_usage["cache_read_input_tokens"],
+            "cache_write_input_tokens": token_usage["cache_write_input_tokens"],
+            "cost_usd": cost_usd(model, token_usage) if tokens_in is not None else None,
             "latency_ms": int((end_time - start_time) * 1000),
             "inference_profile_arn": metadata.get("inference_profile_arn"),
         }
+        report_usage(self.last_cost_info)
+        return self.last_cost_info
@@ -6,9 +6,13 @@ Creates and manages AI provider instances based on configuration and environment
 Supports switching between providers via AI_PROVIDER environment variable.
 """
 
+import json
 import os
+import threading
 from typing import Any, Dict, Optional
 
+from src.common.bedrock_client import clear_bedrock_runtime_clients
+from src.common.provider_health import get_provider_health, health_snapshot
 from src.providers.base import BaseProvider, ProviderError, ProviderUnavailableError
 from src.providers.bedrock import BedrockProvider
 from src.providers.fake import FakeProvider
@@ -34,17 +38,7 @@ class ProviderFactory:
         Raises:
             ProviderError: If provider creation fails
         """
-        # Determine provider to use (priority: override > env var > config > default)
-        provider_name = (
-            provider_override
-            or os.getenv("AI_PROVIDER")
-            or config.get("llm", {}).get("primary", "bedrock")
-        ).lower()
-
-        # Handle offline mode
-        if os.getenv("NO_NETWORK") == "1":
-            print("🚫 NO_NETWORK=1 detected, forcing fake provider for offline mode")
-            provider_name = "fake"
+        provider_name = ProviderFactory.resolve_provider_name(config, provider_override)
 
         # Create provider based on name
         if provider_name == "bedrock":
@@ -59,6 +53,40 @@ class ProviderFactory:
                 f"Supported providers: bedrock, fake, codewhisperer"
             )
 
+    @staticmethod
+    def resolve_provider_name(
+        config: Dict[str, Any], provider_override: Optional[str] = None
+    ) -> str:
+        """
+        Determine which provider create_provider() would build.
+
+        Args:
+            config: Configuration dictionary
+            provider_override: Optional provider name to override environment/config
+
+        Returns:
+            Lower-case provider name
+        """
+        # Determine provider to use (priority: override > env var > config > default)
+        provider_name = (
+            provider_override
+            or os.getenv("AI_PROVIDER")
+            or config.get("llm", {}).get("primary", "bedrock")
+        ).lower()
+
+        # Handle offline mode
+        if os.getenv("NO_NETWORK") == "1":
+            print("🚫 NO_NETWORK=1 detected, forcing fake provider for offline mode")
+            return "fake"
+
+        # Route around a provider whose circuit breaker is open
+        fallback = config.get("llm", {}).get("fallback")
+        if fallback and not ProviderFactory.is_healthy(provider_name, config):
+            print(f"⚡ {provider_name} circuit open, using fallback provider {fallback}")
+            return fallback.lower()
+
+        return provider_name
+
     @staticmethod
     def _create_bedrock_provider(config: Dict[str, Any]) -> BedrockProvider:
         """Create Bedrock provider instance."""
@@ -101,6 +129,47 @@ class ProviderFactory:
                 provider_name="codewhisperer",
             )
 
+    @staticmethod
+    def is_healthy(provider_name: str, config: Dict[str, Any]) -> bool:
+        """
+        Check whether a provider has an endpoint whose circuit breaker admits calls.
+
+        Args:
+            provider_name: Provider name
+            config: Configuration dictionary
+
+        Returns:
+            False if every configured endpoint's circuit is open, True otherwise
+        """
+        if provider_name != "bedrock":
+            return True
+
+        bedrock_config = config.get("llm", {}).get("bedrock", {})
+        arns = [
+            arn
+            for arn in (
+                bedrock_config.get("inference_profile_arn"),
+                bedrock_config.get("secondary_inference_profile_arn"),
+            )
+            if arn
+        ]
+        if not arns:
+            return True
+        return any(
+            not get_provider_health(f"bedrock:{arn}", bedrock_config.get("health")).is_open()
+            for arn in arns
+        )
+
+    @staticmethod
+    def get_provider_health() -> Dict[str, Dict[str, Any]]:
+        """
+        Get rolling health of every provider endpoint used in this process.
+
+        Returns:
+            Dictionary mapping endpoint keys to circuit state, error rate and latency p50/p95
+        """
+        return health_snapshot()
+
     @staticmethod
     def get_available_providers() -> Dict[str, bool]:
         """
@@ -178,10 +247,18 @@ def create_ai_provider(
     return ProviderFactory.create_provider(config, provider_override)
 
 
+_providers: Dict[str, BaseProvider] = {}
+_providers_lock = threading.Lock()
+
+
 def get_provider(provider_name: Optional[str] = None, **config_kwargs) -> BaseProvider:
     """
     Get an AI provider instance with simplified interface for dev agent.
 
+    Providers are shared process-wide per resolved provider name and config, so
+    constructing agents repeatedly reuses one provider (and its Bedrock client,
+    rate limiter and health tracker) instead of building a new one each time.
+
     Args:
         provider_name: Optional provider name (falls back to AI_PROVIDER env var)
         **config_kwargs: Configuration parameters
@@ -196,9 +273,24 @@ def get_provider(provider_name: Optional[str] = None, **config_kwargs) -> BasePr
             "bedrock": {
                 "inference_profile_arn": os.getenv("BEDROCK_IP_ARN", ""),
                 "region": "us-east-2",
+                "secondary_inference_profile_arn": os.getenv("BEDROCK_SECONDARY_IP_ARN") or None,
+                "secondary_region": os.getenv("BEDROCK_SECONDARY_REGION") or None,
                 "model_kwargs": {"temperature": 0.1, "max_tokens": 10000},
             },
         }
     }
 
-    return ProviderFactory.create_provider(config, provider_name)
+    resolved_name = ProviderFactory.resolve_provider_name(config, provider_name)
+    key = json.dumps([resolved_name, config], sort_keys=True, default=str)
+    with _providers_lock:
+        provider = _providers.get(key)
+        if provider is None:
+            provider = _providers[key] = ProviderFactory.create_provider(config, resolved_name)
+        return provider
+
+
+def clear_provider_cache() -> None:
+    """Drop cached providers and the shared boto3 clients behind them."""
+    with _providers_lock:
+        _providers.clear()
+    clear_bedrock_runtime_clients()
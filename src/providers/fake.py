@@ -8,7 +8,7 @@ Used for offline testing and CI environments without requiring real LLM access.
 
 import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
 from src.providers.base import BaseProvider, log_call
 
@@ -65,6 +65,22 @@ class FakeProvider(BaseProvider):
         else:
             return self._generate_generic_response(prompt, language)
 
+    def stream_code(
+        self, prompt: str, files: Optional[List[Path]] = None, timeout: Optional[int] = None
+    ) -> Iterator[str]:
+        """
+        Stream fake code line by line, so streaming consumers can be exercised offline.
+
+        Args:
+            prompt: The instruction prompt for code generation
+            files: Optional list of file paths (used for context awareness)
+            timeout: Optional timeout in seconds (ignored for fake provider)
+
+        Yields:
+            Lines of the generate_code() response, including line endings
+        """
+        yield from self.generate_code(prompt, files, timeout=timeout).splitlines(keepends=True)
+
     def is_available(self) -> bool:
         """
         Fake provider is always available.
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Background Writer for LLM Call Logs
+
+log_call hands each entry to a queue and returns; a daemon thread drains the
+queue in batches, appends them to ``llm_calls.log`` and rotates the file. The
+request path never touches the filesystem.
+
+Environment:
+    LLM_LOG_DIR: Log directory (default "logs", falls back to /tmp/logs)
+    LLM_LOG_MODE: "background" (default) or "sync" to write inline (tests, debugging)
+    LLM_LOG_MAX_BYTES: Rotate llm_calls.log past this size (default 10 MB, 0 disables)
+    LLM_LOG_BACKUP_COUNT: Rotated files kept as llm_calls.log.1..N (default 5)
+    LLM_METRICS_FILE: Optional path for a JSON snapshot of per provider/model and per agent
+        metrics (p50/p95 latency, tokens, cost, errors), rewritten every LLM_METRICS_INTERVAL
+        seconds
+"""
+
+import atexit
+import json
+import math
+import os
+import queue
+import tempfile
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+LOG_FILENAME = "llm_calls.log"
+FALLBACK_LOG_DIR = "/tmp/logs"
+
+LLM_LOG_MAX_BYTES = int(os.getenv("LLM_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LLM_LOG_BACKUP_COUNT = int(os.getenv("LLM_LOG_BACKUP_COUNT", "5"))
+LLM_METRICS_INTERVAL = float(os.getenv("LLM_METRICS_INTERVAL", "60"))
+
+# Entries written per batch, and how long the writer waits to fill one
+BATCH_SIZE = 200
+FLUSH_INTERVAL = 0.5
+# Entries beyond this are dropped (and counted) rather than blocking the caller
+MAX_QUEUE_SIZE = 10000
+# Latency samples kept per provider/model for percentiles
+MAX_LATENCY_SAMPLES = 1000
+
+
+def _percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class LLMCallMetrics:
+    """Call counts, tokens, cost and latency percentiles per provider/model and per agent."""
+
+    def __init__(self, max_samples: int = MAX_LATENCY_SAMPLES):
+        self.max_samples = max_samples
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._agents: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _add(self, table: Dict[str, Dict[str, Any]], key: str, entry: Dict[str, Any]) -> None:
+        stats = table.get(key)
+        if stats is None:
+            stats = table[key] = {
+                "calls": 0,
+                "errors": 0,
+                "tokens_in": 0,
+                "tokens_out": 0,
+                "cache_read_input_tokens": 0,
+                "cache_write_input_tokens": 0,
+                "estimated_calls": 0,
+                "cost_usd": 0.0,
+                "latencies": deque(maxlen=self.max_samples),
+            }
+        stats["calls"] += 1
+        if entry.get("status") == "failed":
+            stats["errors"] += 1
+        if entry.get("tokens_estimated"):
+            stats["estimated_calls"] += 1
+        for field in (
+            "tokens_in",
+            "tokens_out",
+            "cache_read_input_tokens",
+            "cache_write_input_tokens",
+        ):
+            stats[field] += entry.get(field) or 0
+        stats["cost_usd"] = round(stats["cost_usd"] + (entry.get("cost_usd") or 0.0), 6)
+        if entry.get("latency_ms") is not None:
+            stats["latencies"].append(entry["latency_ms"])
+
+    def record(self, entry: Dict[str, Any]) -> None:
+        """Add one log_call entry."""
+        key = f"{entry.get('provider', 'unknown')}/{entry.get('model', 'default')}"
+        with self._lock:
+            self._add(self._stats, key, entry)
+            if entry.get("agent"):
+                self._add(self._agents, entry["agent"], entry)
+
+    @staticmethod
+    def _summarize(table: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        result = {}
+        for key, stats in table.items():
+            stats = dict(stats)
+            ordered = sorted(stats.pop("latencies"))
+            stats["latency_ms_p50"] = _percentile(ordered, 50)
+            stats["latency_ms_p95"] = _percentile(ordered, 95)
+            result[key] = stats
+        return result
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Metrics keyed by "provider/model"."""
+        with self._lock:
+            return self._summarize(self._stats)
+
+    def agent_snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Metrics keyed by agent (calls made inside providers.base.agent_scope)."""
+        with self._lock:
+            return self._summarize(self._agents)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self._agents.clear()
+
+
+class LLMCallLogWriter:
+    """Queue-backed writer that batches log lines and rotates the log file."""
+
+    def __init__(
+        self,
+        max_bytes: int = LLM_LOG_MAX_BYTES,
+        backup_count: int = LLM_LOG_BACKUP_COUNT,
+        metrics_file: Optional[str] = None,
+        metrics_interval: float = LLM_METRICS_INTERVAL,
+    ):
+        """
+        Initialize the writer (the thread starts on the first background entry).
+
+        Args:
+            max_bytes: Rotate when the log would grow past this size (0 disables)
+            backup_count: Number of rotated files to keep
+            metrics_file: Optional path for periodic metrics snapshots
+            metrics_interval: Seconds between metrics snapshots
+        """
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.metrics_file = metrics_file
+        self.metrics_interval = metrics_interval
+        self.metrics = LLMCallMetrics()
+        self.dropped = 0
+        self._queue: "queue.Queue[Tuple[str, Dict[str, Any]]]" = queue.Queue(MAX_QUEUE_SIZE)
+        self._resolved_paths: Dict[str, str] = {}
+        self._write_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+        self._last_metrics_export = time.monotonic()
+
+    @staticmethod
+    def _log_path() -> str:
+        """Log file path for the current LLM_LOG_DIR and working directory."""
+        log_dir = os.path.abspath(os.getenv("LLM_LOG_DIR", "logs"))
+        return os.path.join(log_dir, LOG_FILENAME)
+
+    def submit(self, entry: Dict[str, Any]) -> None:
+        """
+        Queue a log entry; never blocks on file I/O.
+
+        Args:
+            entry: JSON-serializable log_call entry
+        """
+        path = self._log_path()
+        if os.getenv("LLM_LOG_MODE", "background") == "sync":
+            self._write_batch([(path, entry)])
+            return
+
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait((path, entry))
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self) -> None:
+        """Block until every queued entry has been written."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="llm-call-log-writer", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + FLUSH_INTERVAL
+            while len(batch) < BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self._write_batch(batch)
+            except Exception as e:
+                print(f"⚠️ Failed to write {len(batch)} LLM call log entries: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write_batch(self, batch: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """Append entries to their log files, rotating first if needed."""
+        lines_by_path: Dict[str, List[str]] = {}
+        for path, entry in batch:
+            self.metrics.record(entry)
+            lines_by_path.setdefault(path, []).append(json.dumps(entry) + "\n")
+
+        with self._write_lock:
+            for path, lines in lines_by_path.items():
+                data = "".join(lines)
+                try:
+                    self._append(self._prepare(path), data)
+                except FileNotFoundError:
+                    # Directory removed since it was prepared; create it again
+                    self._resolved_paths.pop(path, None)
+                    self._append(self._prepare(path), data)
+            self._maybe_export_metrics()
+
+    def _append(self, path: str, data: str) -> None:
+        self._rotate_if_needed(path, len(data.encode("utf-8")))
+        with open(path, "a") as f:
+            f.write(data)
+
+    def _prepare(self, path: str) -> str:
+        """Create the log directory once, falling back to /tmp/logs if it is not writable."""
+        resolved = self._resolved_paths.get(path)
+        if resolved:
+            return resolved
+
+        log_dir = os.path.dirname(path)
+        resolved = path
+        try:
+            os.makedirs(log_dir, exist_ok=True)
+            if not os.access(log_dir, os.W_OK):
+                raise PermissionError(log_dir)
+        except OSError:
+            os.makedirs(FALLBACK_LOG_DIR, exist_ok=True)
+            resolved = os.path.join(FALLBACK_LOG_DIR, LOG_FILENAME)
+        self._resolved_paths[path] = resolved
+        return resolved
+
+    def _rotate_if_needed(self, path: str, incoming: int) -> None:
+        if self.max_bytes <= 0:
+            return
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        if size == 0 or size + incoming <= self.max_bytes:
+            return
+
+        if self.backup_count <= 0:
+            os.remove(path)
+            return
+        for index in range(self.backup_count - 1, 0, -1):
+            source = f"{path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{path}.{index + 1}")
+        os.replace(path, f"{path}.1")
+
+    def _maybe_export_metrics(self) -> None:
+        if not self.metrics_file:
+            return
+        if time.monotonic() - self._last_metrics_export < self.metrics_interval:
+            return
+        self.export_metrics(self.metrics_file)
+
+    def export_metrics(self, path: str) -> Dict[str, Any]:
+        """
+        Write a metrics snapshot as JSON (atomically) and return it.
+
+        Args:
+            path: Destination file
+
+        Returns:
+            The snapshot that was written
+        """
+        snapshot = {
+            "ts": time.time(),
+            "dropped_entries": self.dropped,
+            "providers": self.metrics.snapshot(),
+            "agents": self.metrics.agent_snapshot(),
+        }
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(snapshot, f, indent=2)
+        os.replace(tmp_path, path)
+        self._last_metrics_export = time.monotonic()
+        return snapshot
+
+
+_writer: Optional[LLMCallLogWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_log_writer() -> LLMCallLogWriter:
+    """Process-wide log writer, created on first use."""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = LLMCallLogWriter(metrics_file=os.getenv("LLM_METRICS_FILE") or None)
+                atexit.register(_shutdown)
+    return _writer
+
+
+def flush_llm_logs() -> None:
+    """Write out any queued LLM call log entries."""
+    if _writer is not None:
+        _writer.flush()
+
+
+def _shutdown() -> None:
+    if _writer is None:
+        return
+    _writer.flush()
+    if _writer.metrics_file:
+        _writer.export_metrics(_writer.metrics_file)
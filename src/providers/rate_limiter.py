@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Rate Limiting for SoloPilot AI Providers
+
+Token buckets for requests/min and tokens/min plus a bounded semaphore on
+in-flight calls, shared by every provider instance that targets the same model.
+Configured under ``llm.<provider>.rate_limits`` in config/model_config.yaml:
+
+    rate_limits:
+      requests_per_minute: 50
+      tokens_per_minute: 200000
+      max_concurrency: 4
+
+Bedrock debits a request's input tokens plus its ``max_tokens`` against the
+tokens/min quota when the call starts, so the limiter reserves the same amount
+up front and refunds the unused output budget once real usage is known.
+
+Async callers run their blocking call through ``arun()``, which holds the
+concurrency slot until the worker thread finishes. A cancelled task cannot stop
+a botocore call already running in a thread, so releasing the slot when the
+task is cancelled would let more than ``max_concurrency`` calls run at once.
+"""
+
+import asyncio
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at a per-minute rate."""
+
+    def __init__(self, per_minute: float):
+        """
+        Initialize a full bucket.
+
+        Args:
+            per_minute: Refill rate, which is also the burst capacity
+        """
+        self.capacity = float(per_minute)
+        self.refill_per_second = self.capacity / 60.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.refill_per_second
+        )
+        self._updated = now
+
+    def try_acquire(self, amount: float) -> float:
+        """
+        Take amount tokens if available.
+
+        Args:
+            amount: Tokens to take (capped at the bucket capacity)
+
+        Returns:
+            0.0 if the tokens were taken, otherwise seconds until they will be available
+        """
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill()
+            if self._tokens >= amount:
+                self._tokens -= amount
+                return 0.0
+            return (amount - self._tokens) / self.refill_per_second
+
+    def refund(self, amount: float) -> None:
+        """Return unused tokens (a negative amount debits extra usage)."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens + amount)
+
+    def available(self) -> float:
+        """Tokens currently in the bucket."""
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+
+class RateLimiter:
+    """Requests/min and tokens/min buckets plus a cap on concurrent calls."""
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+    ):
+        """
+        Initialize the limiter; any limit left as None is not enforced.
+
+        Args:
+            requests_per_minute: Sustained request rate
+            tokens_per_minute: Sustained input + output token rate
+            max_concurrency: Maximum calls in flight at once
+        """
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_concurrency = max_concurrency
+        self._semaphore = threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+        # Event-loop futures of async callers waiting for a slot, woken on release
+        self._async_waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self._waiters_lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, rate_limits: Optional[Dict[str, Any]]) -> "RateLimiter":
+        """Build from a ``rate_limits`` config section (missing section = unlimited)."""
+        rate_limits = rate_limits or {}
+        return cls(
+            requests_per_minute=rate_limits.get("requests_per_minute"),
+            tokens_per_minute=rate_limits.get("tokens_per_minute"),
+            max_concurrency=rate_limits.get("max_concurrency"),
+        )
+
+    def _reserve_wait(self, estimated_tokens: int) -> float:
+        """Try to take one request and the estimated tokens; returns seconds to wait if not."""
+        if self.requests:
+            wait = self.requests.try_acquire(1)
+            if wait:
+                return wait
+        if self.tokens:
+            wait = self.tokens.try_acquire(estimated_tokens)
+            if wait:
+                # Give the request slot back so it is not lost while waiting on tokens
+                if self.requests:
+                    self.requests.refund(1)
+                return wait
+        return 0.0
+
+    def acquire(self, estimated_tokens: int = 0) -> None:
+        """Block until the buckets and the semaphore admit one call."""
+        while True:
+            wait = self._reserve_wait(estimated_tokens)
+            if not wait:
+                break
+            time.sleep(wait)
+        if self._semaphore:
+            self._semaphore.acquire()
+
+    async def aacquire(self, estimated_tokens: int = 0) -> None:
+        """Async acquire(): waits without blocking the event loop."""
+        while True:
+            wait = self._reserve_wait(estimated_tokens)
+            if not wait:
+                break
+            await asyncio.sleep(wait)
+        if self._semaphore:
+            await self._aacquire_slot()
+
+    async def _aacquire_slot(self) -> None:
+        """Take a semaphore slot, waiting on a future that release() resolves."""
+        loop = asyncio.get_running_loop()
+        while not self._semaphore.acquire(blocking=False):
+            waiter = (loop, loop.create_future())
+            with self._waiters_lock:
+                self._async_waiters.append(waiter)
+            try:
+                # A release between the failed acquire and registering is not missed
+                if self._semaphore.acquire(blocking=False):
+                    return
+                await waiter[1]
+            finally:
+                with self._waiters_lock:
+                    if waiter in self._async_waiters:
+                        self._async_waiters.remove(waiter)
+
+    def _wake_async_waiters(self) -> None:
+        with self._waiters_lock:
+            waiters, self._async_waiters = self._async_waiters, []
+        for loop, future in waiters:
+            try:
+                loop.call_soon_threadsafe(_resolve, future)
+            except RuntimeError:
+                pass  # Loop already closed; its waiter is gone
+
+    def release(self, estimated_tokens: int = 0, actual_tokens: Optional[int] = None) -> None:
+        """
+        Release the concurrency slot and settle the token reservation.
+
+        Args:
+            estimated_tokens: Tokens reserved by acquire()
+            actual_tokens: Tokens actually used, if known
+        """
+        if self._semaphore:
+            self._semaphore.release()
+            self._wake_async_waiters()
+        if self.tokens and actual_tokens is not None:
+            self.tokens.refund(estimated_tokens - actual_tokens)
+
+    @contextmanager
+    def limit(self, estimated_tokens: int = 0) -> Iterator[Dict[str, Any]]:
+        """
+        Run one call under the limits.
+
+        Yields a dict; set ``usage["tokens"]`` to the real token count to refund
+        (or debit) the difference from the estimate.
+        """
+        usage: Dict[str, Any] = {"tokens": None}
+        self.acquire(estimated_tokens)
+        try:
+            yield usage
+        finally:
+            self.release(estimated_tokens, usage["tokens"])
+
+    async def arun(
+        self,
+        estimated_tokens: int,
+        func: Callable[..., T],
+        *args: Any,
+        tokens_used: Optional[Callable[[T], Optional[int]]] = None,
+    ) -> T:
+        """
+        Run a blocking call in a worker thread under the limits.
+
+        The slot is released by the worker's completion, not by the awaiting
+        task: if the task is cancelled, the call keeps its slot until it returns.
+
+        Args:
+            estimated_tokens: Tokens to reserve
+            func: Blocking callable, run with the caller's context variables
+            *args: Arguments for func
+            tokens_used: Maps func's result to the real token count for the refund
+
+        Returns:
+            func's result
+        """
+        await self.aacquire(estimated_tokens)
+        try:
+            context = contextvars.copy_context()
+            future = asyncio.get_running_loop().run_in_executor(None, context.run, func, *args)
+        except BaseException:
+            self.release(estimated_tokens)
+            raise
+
+        def settle(done: asyncio.Future) -> None:
+            actual = None
+            if tokens_used and not done.cancelled() and done.exception() is None:
+                actual = tokens_used(done.result())
+            self.release(estimated_tokens, actual)
+
+        future.add_done_callback(settle)
+        # Cancelling the caller must not cancel (and so release) the running call
+        return await asyncio.shield(future)
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(key: str, rate_limits: Optional[Dict[str, Any]] = None) -> RateLimiter:
+    """
+    Get the process-wide limiter for a model, creating it on first use.
+
+    Args:
+        key: Limiter key, e.g. the inference profile ARN (quotas are per model)
+        rate_limits: ``rate_limits`` config section used when the limiter is created
+
+    Returns:
+        Shared RateLimiter instance
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = _limiters[key] = RateLimiter.from_config(rate_limits)
+        return limiter
+
+
+def estimate_tokens(text: str, max_tokens: int = 0) -> int:
+    """Rough token estimate for a prompt (~4 chars/token) plus its output budget."""
+    return len(text) // 4 + max_tokens
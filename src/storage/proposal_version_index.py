@@ -16,13 +16,14 @@ logger = logging.getLogger(__name__)
 class ProposalVersionIndex:
     """Manages proposal versions in DynamoDB."""
 
-    def __init__(self, table_name: str = "proposal_versions"):
+    def __init__(self, table_name: str = "proposal_versions", dynamodb=None):
         """Initialize with DynamoDB table.
 
         Args:
             table_name: Name of the DynamoDB table
+            dynamodb: Optional shared DynamoDB resource
         """
-        self.dynamodb = boto3.resource("dynamodb")
+        self.dynamodb = dynamodb or boto3.resource("dynamodb")
         self.table = self.dynamodb.Table(table_name)
         self.table_name = table_name
 
@@ -0,0 +1,80 @@
+"""Tests for the claim-then-send flow of the approve reply route."""
+
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.agents.email_intake.api import lambda_api
+from src.agents.email_intake.conversation_state import ReplyStateError
+
+
+@pytest.fixture
+def state_manager():
+    manager = MagicMock()
+    manager.load_conversation.return_value = {
+        "conversation_id": "conv-1",
+        "phase": "understanding",
+        "pending_replies": [{"reply_id": "r1", "status": "pending"}],
+    }
+    with patch.object(lambda_api.services, "state_manager", return_value=manager):
+        yield manager
+
+
+@pytest.fixture
+def sender():
+    sender = MagicMock()
+    sender.extract_email_metadata.return_value = {
+        "recipient": "client@example.com",
+        "subject": "Re: Website",
+        "body": "Thanks!",
+    }
+    sender.send_reply_email.return_value = (True, None, None)
+    with patch.object(lambda_api, "_email_sender", sender):
+        yield sender
+
+
+def _statuses(manager):
+    return [
+        (c.args[2]["status"], c.kwargs["expected_status"])
+        for c in manager.update_reply.call_args_list
+    ]
+
+
+class TestApproveReply:
+    """The reply is claimed before SES sees it and only one reviewer can send."""
+
+    def test_claims_then_sends_then_finalizes(self, state_manager, sender):
+        response = lambda_api.approve_reply("r1", {"conversation_id": "conv-1"})
+
+        assert response["statusCode"] == 200
+        assert _statuses(state_manager) == [("sending", "pending"), ("approved", "sending")]
+        sender.send_reply_email.assert_called_once()
+        state_manager.add_outbound_reply.assert_called_once()
+
+    def test_lost_claim_returns_409_without_sending(self, state_manager, sender):
+        state_manager.update_reply.side_effect = ReplyStateError("already sending")
+
+        response = lambda_api.approve_reply("r1", {"conversation_id": "conv-1"})
+
+        assert response["statusCode"] == 409
+        assert "concurrently" in json.loads(response["body"])["error"]
+        sender.send_reply_email.assert_not_called()
+        state_manager.add_outbound_reply.assert_not_called()
+
+    def test_failed_send_returns_reply_to_pending(self, state_manager, sender):
+        sender.send_reply_email.return_value = (False, None, "throttled")
+
+        response = lambda_api.approve_reply("r1", {"conversation_id": "conv-1"})
+
+        assert response["statusCode"] == 500
+        assert _statuses(state_manager) == [("sending", "pending"), ("pending", "sending")]
+        state_manager.add_outbound_reply.assert_not_called()
+
+    def test_send_exception_returns_reply_to_pending(self, state_manager, sender):
+        sender.send_reply_email.side_effect = RuntimeError("ses down")
+
+        response = lambda_api.approve_reply("r1", {"conversation_id": "conv-1"})
+
+        assert response["statusCode"] == 500
+        assert _statuses(state_manager)[-1] == ("pending", "sending")
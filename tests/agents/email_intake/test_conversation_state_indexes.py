@@ -0,0 +1,313 @@
+"""Tests for the secondary index items maintained by ConversationStateManager."""
+
+import json
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+from botocore.exceptions import ClientError
+
+from src.agents.email_intake.conversation_state import ConversationStateManager
+
+
+def _make_manager(mock_resource):
+    """Build a manager whose tables are distinct MagicMocks keyed by name."""
+    tables = {}
+
+    def table_for(name):
+        return tables.setdefault(name, MagicMock(name=name))
+
+    mock_resource.return_value.Table.side_effect = table_for
+    manager = ConversationStateManager()
+    return manager, tables
+
+
+class TestParticipantIndex:
+    """Participant index maintenance and query path."""
+
+    @patch("src.agents.email_intake.conversation_state.boto3.resource")
+    def test_append_email_writes_participant_items(self, mock_resource):
+        manager, tables = _make_manager(mock_resource)
+        conversations = tables["conversations"]
+        conversations.get_item.return_value = {
+            "Item": {
+                "conversation_id": "conv-1",
+                "last_seq": Decimal(0),
+                "participants": {"client@example.com"},
+                "thread_references": [],
+            }
+        }
+        conversations.update_item.return_value = {
+            "Attributes": {
+                "conversation_id": "conv-1",
+                "last_seq": Decimal(1),
+                "updated_at": "2025-01-01T00:00:00+00:00",
+                "subject": "Website",
+                "status": "active",
+                "phase": "understanding",
+                "participants": {"client@example.com", "cc@example.com"},
+            }
+        }
+
+        manager.append_email_with_retry(
+            "conv-1",
+            {"from": "Client@Example.com", "cc": ["cc@example.com"], "body": "Hi"},
+        )
+
+        batch = tables["conversation_participants"].batch_writer.return_value.__enter__.return_value
+        written = [c.kwargs["Item"] for c in batch.put_item.call_args_list]
+        assert {item["participant"] for item in written} == {
+            "client@example.com",
+            "cc@example.com",
+        }
+        assert all(item["updated_at"] == "2025-01-01T00:00:00+00:00" for item in written)
+        assert all(item["conversation_id"] == "conv-1" for item in written)
+
+    @patch("src.agents.email_intake.conversation_state.boto3.resource")
+    def test_query_is_newest_first_and_paginated(self, mock_resource):
+        manager, tables = _make_manager(mock_resource)
+        index = tables["conversation_participants"]
+        index.query.return_value = {
+            "Items": [{"conversation_id": "conv-2", "last_seq": Decimal(3)}],
+            "LastEvaluatedKey": {"participant": "a@b.com", "conversation_id": "conv-2"},
+        }
+
+        page = manager.query_conversations_by_participant("A@B.com", limit=1)
+
+        kwargs = index.query.call_args.kwargs
+        assert kwargs["IndexName"] == "UpdatedAtIndex"
+        assert kwargs["ScanIndexForward"] is False
+        assert kwargs["Limit"] == 1
+        assert page["conversations"][0]["last_seq"] == 3
+        assert json.loads(page["next_token"])["conversation_id"] == "conv-2"
+
+        manager.query_conversations_by_participant("a@b.com", next_token=page["next_token"])
+        assert index.query.call_args.kwargs["ExclusiveStartKey"]["conversation_id"] == "conv-2"
+
+    @patch("src.agents.email_intake.conversation_state.boto3.resource")
+    def test_get_conversations_by_participant_uses_index(self, mock_resource):
+        manager, tables = _make_manager(mock_resource)
+        tables["conversation_participants"].query.return_value = {
+            "Items": [{"conversation_id": "new"}, {"conversation_id": "old"}]
+        }
+        manager.dynamodb.batch_get_item.return_value = {
+            "Responses": {
+                "conversations": [
+                    {"conversation_id": "old", "status": "active"},
+                    {"conversation_id": "new", "status": "active"},
+                ]
+            }
+        }
+
+        result = manager.get_conversations_by_participant("a@b.com")
+
+        assert [c["conversation_id"] for c in result] == ["new", "old"]
+        tables["conversations"].scan.assert_not_called()
+
+    @patch("src.agents.email_intake.conversation_state.boto3.resource")
+    def test_missing_index_table_falls_back_to_scan(self, mock_resource):
+        manager, tables = _make_manager(mock_resource)
+        tables["conversation_participants"].query.side_effect = ClientError(
+            {"Error": {"Code": "ResourceNotFoundException"}}, "Query"
+        )
+        tables["conversations"].scan.return_value = {"Items": [{"conversation_id": "conv-1"}]}
+
+        result = manager.get_conversations_by_participant("a@b.com")
+
+        assert result == [{"conversation_id": "conv-1"}]
+
+
+class TestEmailItemStorage:
+    """Per-email item storage (EMAIL_STORAGE_MODE=items)."""
+
+    @patch("src.agents.email_intake.conversation_state.boto3.resource")
+    def test_append_writes_header_and_email_item_in_one_transaction(self, mock_resource):
+        tables = {}
+        mock_resource.return_value.Table.side_effect = lambda n: tables.setdefault(n, MagicMock())
+        manager = ConversationStateManager(email_storage_mode="items")
+        tables["conversations"].get_item.return_value = {
+            "Item": {
+                "conversation_id": "conv-1",
+                "last_seq": Decimal(4),
+                "email_count": Decimal(2),
+                "participants": {"client@example.com"},
+                "thread_references": [],
+            }
+        }
+
+        state = manager.append_email_with_retry(
+            "conv-1", {"from": "client@example.com", "subject": "Hi", "body": "Hello"}
+        )
+
+        tables["conversations"].update_item.assert_not_called()
+        transact = manager.dynamodb.meta.client.transact_write_items.call_args.kwargs
+        update, put = transact["TransactItems"]
+        assert update["Update"]["ConditionExpression"] == "last_seq = :current_seq"
+        assert "email_history" not in update["Update"]["UpdateExpression"]
+        assert put["Put"]["TableName"] == "conversation_emails"
+        assert put["Put"]["Item"]["seq"] == {"N": "5"}
+        assert state["email_count"] == 3
+        assert state["last_email"]["seq"] == 5
+
+    @patch("src.agents.email_intake.conversation_state.boto3.resource")
+    def test_hydrate_keeps_unsplit_inline_history_first(self, mock_resource):
+        tables = {}
+        mock_resource.return_value.Table.side_effect = lambda n: tables.setdefault(n, MagicMock())
+        manager = ConversationStateManager(email_storage_mode="items")
+        tables["conversation_emails"].query.return_value = {
+            "Items": [{"conversation_id": "conv-1", "seq": Decimal(3), "body": "new"}]
+        }
+
+        conversation = manager.hydrate_email_history(
+            {"conversation_id": "conv-1", "email_history": [{"body": "old"}]}
+        )
+
+        assert [e["body"] for e in conversation["email_history"]] == ["old", "new"]
+        assert tables["conversation_emails"].query.call_args.kwargs["ScanIndexForward"] is True
+
+    @patch("src.agents.email_intake.conversation_state.boto3.resource")
+    def test_inline_email_page_uses_offset_tokens(self, mock_resource):
+        manager, tables = _make_manager(mock_resource)
+        tables["conversations"].get_item.return_value = {
+            "Item": {"email_history": [{"body": str(i)} for i in range(5)]}
+        }
+
+        first = manager.get_email_page("conv-1", limit=2, newest_first=True)
+        second = manager.get_email_page("conv-1", limit=2, next_token=first["next_token"], newest_first=True)
+
+        assert [e["body"] for e in first["emails"]] == ["4", "3"]
+        assert [e["body"] for e in second["emails"]] == ["2", "1"]
+        assert manager.get_email_page("conv-1", limit=10)["next_token"] is None
+
+
+class TestReplyIndex:
+    """Reply ID -> conversation mapping."""
+
+    @patch("src.agents.email_intake.conversation_state.boto3.resource")
+    def test_add_pending_reply_writes_mapping(self, mock_resource):
+        manager, tables = _make_manager(mock_resource)
+
+        reply_id = manager.add_pending_reply("conv-1", "prompt", "response", "understanding")
+
+        item = tables["conversation_replies"].put_item.call_args.kwargs["Item"]
+        assert item["reply_id"] == reply_id
+        assert item["conversation_id"] == "conv-1"
+
+    @patch("src.agents.email_intake.conversation_state.boto3.resource")
+    def test_load_reply_uses_one_key_read(self, mock_resource):
+        manager, tables = _make_manager(mock_resource)
+        tables["conversation_replies"].get_item.return_value = {
+            "Item": {"reply_id": "r2", "conversation_id": "conv-1"}
+        }
+        tables["conversations"].get_item.return_value = {
+            "Item": {
+                "conversation_id": "conv-1",
+                "pending_replies": [{"reply_id": "r1"}, {"reply_id": "r2", "status": "pending"}],
+            }
+        }
+
+        conversation, index, reply = manager.load_reply("r2", view="review")
+
+        assert conversation["conversation_id"] == "conv-1"
+        assert index == 1
+        assert reply["status"] == "pending"
+        tables["conversations"].scan.assert_not_called()
+        assert tables["conversations"].get_item.call_args.kwargs["Key"] == {
+            "conversation_id": "conv-1"
+        }
+
+    @patch("src.agents.email_intake.conversation_state.boto3.resource")
+    def test_unindexed_reply_misses_without_scanning(self, mock_resource):
+        manager, tables = _make_manager(mock_resource)
+        tables["conversation_replies"].get_item.return_value = {}
+
+        assert manager.find_conversation_for_reply("r9") is None
+        assert manager.load_reply("r9") is None
+        tables["conversations"].scan.assert_not_called()
+
+    @patch("src.agents.email_intake.conversation_state.boto3.resource")
+    def test_index_entries_have_no_ttl_and_go_with_the_conversation(self, mock_resource):
+        manager, tables = _make_manager(mock_resource)
+        index = tables["conversation_replies"]
+
+        manager.add_pending_reply("conv-1", "prompt", "response", "understanding")
+        manager.delete_reply_index([{"reply_id": "r1"}, {"reply_id": "r2"}, {}])
+
+        assert "ttl" not in index.put_item.call_args.kwargs["Item"]
+        batch = index.batch_writer.return_value.__enter__.return_value
+        assert [c.kwargs["Key"] for c in batch.delete_item.call_args_list] == [
+            {"reply_id": "r1"},
+            {"reply_id": "r2"},
+        ]
+
+
+class TestListingIndex:
+    """Newest-first conversation listing from ListingIndex."""
+
+    @patch("src.agents.email_intake.conversation_state.boto3.resource")
+    def test_single_shard_query_is_newest_first_and_paginated(self, mock_resource):
+        manager, tables = _make_manager(mock_resource)
+        conversations = tables["conversations"]
+        conversations.query.return_value = {
+            "Items": [
+                {"conversation_id": "c3", "listing_shard": "0", "updated_at": "2025-01-03"},
+                {"conversation_id": "c2", "listing_shard": "0", "updated_at": "2025-01-02"},
+                {"conversation_id": "c1", "listing_shard": "0", "updated_at": "2025-01-01"},
+            ]
+        }
+
+        page = manager.list_conversations_page(limit=2, phase="proposal_draft")
+
+        assert [c["conversation_id"] for c in page["conversations"]] == ["c3", "c2"]
+        kwargs = conversations.query.call_args.kwargs
+        assert kwargs["IndexName"] == "ListingIndex"
+        assert kwargs["ScanIndexForward"] is False
+        assert "FilterExpression" in kwargs
+        assert json.loads(page["next_token"])["0"]["conversation_id"] == "c2"
+        conversations.scan.assert_not_called()
+
+    @patch("src.agents.email_intake.conversation_state.LISTING_SHARDS", 2)
+    @patch("src.agents.email_intake.conversation_state.boto3.resource")
+    def test_shards_are_merged_by_updated_at(self, mock_resource):
+        manager, tables = _make_manager(mock_resource)
+        shard_items = {
+            "0": [
+                {"conversation_id": "a", "listing_shard": "0", "updated_at": "2025-01-04"},
+                {"conversation_id": "b", "listing_shard": "0", "updated_at": "2025-01-01"},
+            ],
+            "1": [
+                {"conversation_id": "c", "listing_shard": "1", "updated_at": "2025-01-03"},
+                {"conversation_id": "d", "listing_shard": "1", "updated_at": "2025-01-02"},
+            ],
+        }
+
+        def query(**kwargs):
+            shard = kwargs["KeyConditionExpression"].get_expression()["values"][1]
+            return {"Items": shard_items[shard]}
+
+        tables["conversations"].query.side_effect = query
+
+        page = manager.list_conversations_page(limit=3)
+
+        assert [c["conversation_id"] for c in page["conversations"]] == ["a", "c", "d"]
+        cursors = json.loads(page["next_token"])
+        assert cursors["0"]["conversation_id"] == "a"
+        assert cursors["1"]["conversation_id"] == "d"
+
+    @patch("src.agents.email_intake.conversation_state.boto3.resource")
+    def test_missing_index_falls_back_to_scan(self, mock_resource):
+        manager, tables = _make_manager(mock_resource)
+        conversations = tables["conversations"]
+        conversations.query.side_effect = ClientError(
+            {"Error": {"Code": "ValidationException", "Message": "no such index"}}, "Query"
+        )
+        conversations.scan.return_value = {
+            "Items": [
+                {"conversation_id": "old", "updated_at": "2025-01-01"},
+                {"conversation_id": "new", "updated_at": "2025-01-02"},
+            ]
+        }
+
+        page = manager.list_conversations_page(limit=20)
+
+        assert [c["conversation_id"] for c in page["conversations"]] == ["new", "old"]
+        assert page["next_token"] is None
@@ -0,0 +1,183 @@
+"""Tests for reply-level updates on pending_replies."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from botocore.exceptions import ClientError
+
+from src.agents.email_intake.conversation_state import (
+    ConversationStateManager,
+    ReplyStateError,
+)
+
+
+def _condition_failed():
+    return ClientError(
+        {"Error": {"Code": "ConditionalCheckFailedException", "Message": "failed"}}, "UpdateItem"
+    )
+
+
+def _replies(*statuses):
+    return {
+        "Item": {
+            "conversation_id": "conv-1",
+            "pending_replies": [
+                {"reply_id": f"r{i}", "status": status} for i, status in enumerate(statuses)
+            ],
+        }
+    }
+
+
+@patch("src.agents.email_intake.conversation_state.boto3.resource")
+class TestUpdateReply:
+    """Updates address one list element and are conditioned on it."""
+
+    def _manager(self, mock_resource):
+        table = MagicMock()
+        mock_resource.return_value.Table.return_value = table
+        return ConversationStateManager(), table
+
+    def test_approve_writes_only_the_reply_paths(self, mock_resource):
+        manager, table = self._manager(mock_resource)
+        table.get_item.return_value = _replies("approved", "pending")
+
+        reply = manager.approve_reply("conv-1", "r1", "admin")
+
+        kwargs = table.update_item.call_args.kwargs
+        assert "pending_replies[1].#f0 = :v0" in kwargs["UpdateExpression"]
+        assert ":replies" not in kwargs["ExpressionAttributeValues"]
+        assert kwargs["ConditionExpression"] == (
+            "pending_replies[1].reply_id = :rid AND pending_replies[1].#status = :expected"
+        )
+        assert kwargs["ExpressionAttributeValues"][":expected"] == "pending"
+        assert reply["status"] == "approved"
+        assert reply["reviewed_by"] == "admin"
+
+    def test_non_pending_reply_is_rejected_without_write(self, mock_resource):
+        manager, table = self._manager(mock_resource)
+        table.get_item.return_value = _replies("rejected")
+
+        with pytest.raises(ReplyStateError):
+            manager.approve_reply("conv-1", "r0", "admin")
+        table.update_item.assert_not_called()
+
+    def test_concurrent_status_change_raises(self, mock_resource):
+        manager, table = self._manager(mock_resource)
+        table.update_item.side_effect = _condition_failed()
+        table.get_item.return_value = _replies("approved")
+
+        with pytest.raises(ReplyStateError):
+            manager.update_reply(
+                "conv-1", "r0", {"status": "rejected"}, expected_status="pending", reply_index=0
+            )
+        assert table.update_item.call_count == 1
+
+    def test_stale_index_is_relocated_once(self, mock_resource):
+        manager, table = self._manager(mock_resource)
+        table.update_item.side_effect = [_condition_failed(), {}]
+        table.get_item.return_value = _replies("pending", "pending")
+
+        manager.update_reply("conv-1", "r1", {"review": {"score": 5}}, reply_index=0)
+
+        retry = table.update_item.call_args_list[1].kwargs
+        assert retry["ConditionExpression"] == "pending_replies[1].reply_id = :rid"
+        assert "#status" not in retry["ExpressionAttributeNames"]
+
+    def test_missing_reply_raises_value_error(self, mock_resource):
+        manager, table = self._manager(mock_resource)
+        table.get_item.return_value = _replies("pending")
+
+        with pytest.raises(ValueError, match="not found"):
+            manager.update_reply("conv-1", "missing", {"status": "rejected"})
+
+
+@patch("src.agents.email_intake.conversation_state.boto3.resource")
+class TestReplyCounters:
+    """pending_reply_count and last_reply_at move with reply writes."""
+
+    def _manager(self, mock_resource):
+        table = MagicMock()
+        mock_resource.return_value.Table.return_value = table
+        return ConversationStateManager(), table
+
+    def test_add_pending_reply_increments_counter(self, mock_resource):
+        manager, table = self._manager(mock_resource)
+
+        manager.add_pending_reply("conv-1", "prompt", "response", "understanding")
+
+        expression = table.update_item.call_args.kwargs["UpdateExpression"]
+        assert "ADD pending_reply_count :one" in expression
+        assert "last_reply_at = :updated" in expression
+
+    def test_leaving_pending_decrements_in_same_write(self, mock_resource):
+        manager, table = self._manager(mock_resource)
+        table.get_item.return_value = _replies("pending")
+
+        manager.approve_reply("conv-1", "r0", "admin")
+
+        kwargs = table.update_item.call_args.kwargs
+        assert kwargs["UpdateExpression"].endswith("ADD pending_reply_count :delta")
+        assert kwargs["ExpressionAttributeValues"][":delta"] == -1
+        assert "last_reply_at = :updated" in kwargs["UpdateExpression"]
+        assert "#status = :expected" in kwargs["ConditionExpression"]
+
+    def test_returning_to_pending_increments(self, mock_resource):
+        manager, table = self._manager(mock_resource)
+
+        manager.update_reply(
+            "conv-1", "r0", {"status": "pending"}, expected_status="sending", reply_index=0
+        )
+
+        kwargs = table.update_item.call_args.kwargs
+        assert kwargs["UpdateExpression"].endswith("ADD pending_reply_count :delta")
+        assert kwargs["ExpressionAttributeValues"][":delta"] == 1
+
+    def test_finishing_a_send_leaves_counter_alone(self, mock_resource):
+        manager, table = self._manager(mock_resource)
+
+        manager.update_reply(
+            "conv-1", "r0", {"status": "approved"}, expected_status="sending", reply_index=0
+        )
+
+        assert "pending_reply_count" not in table.update_item.call_args.kwargs["UpdateExpression"]
+
+    def test_cache_updates_leave_counters_alone(self, mock_resource):
+        manager, table = self._manager(mock_resource)
+
+        manager.update_reply("conv-1", "r0", {"review": {"score": 4}}, reply_index=0)
+
+        expression = table.update_item.call_args.kwargs["UpdateExpression"]
+        assert "pending_reply_count" not in expression
+        assert "last_reply_at" not in expression
+
+
+@patch("src.agents.email_intake.conversation_state.boto3.resource")
+class TestResponseDebounce:
+    """Debounce tokens only move forward and are claimed once."""
+
+    def _manager(self, mock_resource):
+        table = MagicMock()
+        mock_resource.return_value.Table.return_value = table
+        return ConversationStateManager(), table
+
+    def test_schedule_only_advances_token(self, mock_resource):
+        manager, table = self._manager(mock_resource)
+
+        assert manager.schedule_response("conv-1", 5)
+        condition = table.update_item.call_args.kwargs["ConditionExpression"]
+        assert "response_due_seq < :seq" in condition
+
+        table.update_item.side_effect = _condition_failed()
+        assert not manager.schedule_response("conv-1", 4)
+
+    def test_claim_returns_state_or_none_when_superseded(self, mock_resource):
+        manager, table = self._manager(mock_resource)
+        table.update_item.return_value = {"Attributes": {"conversation_id": "conv-1"}}
+
+        assert manager.claim_response("conv-1", 5) == {"conversation_id": "conv-1"}
+        kwargs = table.update_item.call_args.kwargs
+        assert kwargs["ConditionExpression"].startswith("response_due_seq = :seq")
+        assert kwargs["ReturnValues"] == "ALL_NEW"
+
+        table.update_item.side_effect = _condition_failed()
+        assert manager.claim_response("conv-1", 5) is None
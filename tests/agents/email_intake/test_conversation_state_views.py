@@ -0,0 +1,76 @@
+"""Tests for projection-aware conversation loads."""
+
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.agents.email_intake.conversation_state import (
+    CONVERSATION_VIEWS,
+    ConversationStateManager,
+)
+
+
+@patch("src.agents.email_intake.conversation_state.boto3.resource")
+class TestConversationViews:
+    """Per-stage views only fetch the attributes they declare."""
+
+    def _manager(self, mock_resource):
+        table = MagicMock()
+        mock_resource.return_value.Table.return_value = table
+        return ConversationStateManager(), table
+
+    def test_load_projects_view_attributes(self, mock_resource):
+        manager, table = self._manager(mock_resource)
+        table.get_item.return_value = {
+            "Item": {"conversation_id": "conv-1", "phase": "understanding", "last_seq": Decimal(3)}
+        }
+
+        conversation = manager.load_header("conv-1")
+
+        kwargs = table.get_item.call_args.kwargs
+        projected = set(kwargs["ExpressionAttributeNames"].values())
+        assert projected == set(CONVERSATION_VIEWS["header"])
+        assert "pending_replies" not in projected
+        assert "email_history" not in projected
+        assert kwargs["ProjectionExpression"] == ", ".join(kwargs["ExpressionAttributeNames"])
+        assert conversation["last_seq"] == 3
+
+    def test_load_returns_none_when_missing(self, mock_resource):
+        manager, table = self._manager(mock_resource)
+        table.get_item.return_value = {}
+
+        assert manager.load_replies_view("missing") is None
+        assert table.get_item.call_args.kwargs["ConsistentRead"] is True
+
+    def test_unknown_view_is_rejected(self, mock_resource):
+        manager, _ = self._manager(mock_resource)
+
+        with pytest.raises(ValueError):
+            manager.load_conversation("conv-1", "everything")
+
+    def test_fetch_existing_with_view_skips_full_read(self, mock_resource):
+        manager, table = self._manager(mock_resource)
+        table.get_item.return_value = {"Item": {"conversation_id": "conv-1"}}
+
+        conversation = manager.fetch_or_create_conversation(
+            "conv-1", "<msg@example.com>", {}, view="header"
+        )
+
+        assert conversation == {"conversation_id": "conv-1"}
+        assert "ProjectionExpression" in table.get_item.call_args.kwargs
+        table.put_item.assert_not_called()
+
+    def test_has_email_matches_canonical_message_id(self, mock_resource):
+        manager, table = self._manager(mock_resource)
+        table.get_item.return_value = {
+            "Item": {
+                "conversation_id": "conv-1",
+                "email_history": [{"message_id": "<Abc@Example.com>"}],
+            }
+        }
+
+        assert manager.has_email("conv-1", "abc@example.com")
+        assert not manager.has_email("conv-1", "<other@example.com>")
+        projected = set(table.get_item.call_args.kwargs["ExpressionAttributeNames"].values())
+        assert projected == set(CONVERSATION_VIEWS["thread"])
@@ -0,0 +1,48 @@
+"""Tests for the cleanup done when a conversation is deleted."""
+
+from unittest.mock import MagicMock, patch
+
+from src.agents.email_intake.api import lambda_api
+from src.agents.email_intake.conversation_state import EMAIL_STORAGE_INLINE
+
+
+class TestDeleteConversation:
+    """Deleting a conversation drops its reply index entries and attachment references."""
+
+    def test_releases_every_attachment_reference(self):
+        table = MagicMock()
+        table.delete_item.return_value = {
+            "Attributes": {
+                "conversation_id": "conv-1",
+                "pending_replies": [{"reply_id": "r1"}],
+                "email_history": [
+                    {"message_id": "<m1>", "attachments": [{"filename": "a", "sha256": "abc"}]},
+                    {
+                        "message_id": "<m2>",
+                        "attachments": [
+                            {"filename": "a", "sha256": "abc", "duplicate_of": "<m1>"},
+                            {"filename": "legacy.txt"},
+                        ],
+                    },
+                    {"message_id": "<m3>"},
+                ],
+            }
+        }
+        state_manager = MagicMock(email_storage_mode=EMAIL_STORAGE_INLINE)
+        state_manager.hydrate_email_history.side_effect = lambda conversation: conversation
+        index = MagicMock()
+        index.release_reference.side_effect = [RuntimeError("throttled"), 0]
+
+        services = lambda_api.services
+        with patch.object(lambda_api, "dynamodb", MagicMock(Table=MagicMock(return_value=table))):
+            with patch.object(services, "state_manager", return_value=state_manager), patch.object(
+                services, "attachment_index", return_value=index
+            ):
+                response = lambda_api.delete_conversation("conv-1")
+
+        assert response["statusCode"] == 200
+        state_manager.delete_reply_index.assert_called_once_with([{"reply_id": "r1"}])
+        assert [c.args for c in index.release_reference.call_args_list] == [
+            ("conv-1", "<m1>", "abc"),
+            ("conv-1", "<m2>", "abc"),
+        ]
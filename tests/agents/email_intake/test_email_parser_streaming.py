@@ -0,0 +1,236 @@
+"""Tests for the streaming MIME parse path and content-addressed attachment storage."""
+
+import hashlib
+import io
+from email.mime.application import MIMEApplication
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from unittest.mock import MagicMock, patch
+
+import pytest
+from botocore.exceptions import ClientError
+
+from src.agents.email_intake import lambda_function
+from src.agents.email_intake.attachment_store import (
+    AttachmentIndex,
+    AttachmentStore,
+    AttachmentUpload,
+)
+from src.agents.email_intake.email_parser import EmailParser, _iter_decoded
+
+
+def _not_found():
+    return ClientError({"Error": {"Code": "404"}}, "HeadObject")
+
+
+def _raw_email(attachment: bytes, filename: str = "brief.pdf") -> bytes:
+    msg = MIMEMultipart()
+    msg["From"] = "Client <client@example.com>"
+    msg["To"] = "abdul@solopilot.com"
+    msg["Subject"] = "Project brief"
+    msg["Message-ID"] = "<brief@example.com>"
+    msg["Date"] = "Wed, 01 Jan 2025 10:00:00 +0000"
+    msg.attach(MIMEText("Brief attached.", "plain"))
+    part = MIMEApplication(attachment, "pdf")
+    part.add_header("Content-Disposition", "attachment", filename=filename)
+    msg.attach(part)
+    return msg.as_bytes()
+
+
+class TestParseBytes:
+    """BytesFeedParser path yields the same fields as the string path."""
+
+    def test_matches_string_parse(self):
+        raw = _raw_email(b"%PDF" + bytes(range(256)) * 40)
+        parser = EmailParser()
+
+        streamed = parser.parse_bytes(iter([raw[i : i + 100] for i in range(0, len(raw), 100)]))
+        parsed = parser.parse(raw.decode("ascii"))
+
+        for field in ("conversation_id", "message_id", "from", "to", "subject", "body"):
+            assert streamed[field] == parsed[field]
+        assert streamed["attachments"] == parsed["attachments"]
+
+    def test_attachment_hashed_without_store(self):
+        payload = b"%PDF" + bytes(range(256)) * 40
+        parsed = EmailParser().parse_bytes(io.BytesIO(_raw_email(payload)))
+
+        assert parsed["attachments"] == [
+            {
+                "filename": "brief.pdf",
+                "content_type": "application/pdf",
+                "size": len(payload),
+                "sha256": hashlib.sha256(payload).hexdigest(),
+            }
+        ]
+
+    def test_attachment_streamed_to_store(self):
+        payload = b"x" * 2000
+        s3 = MagicMock()
+        s3.head_object.side_effect = _not_found()
+        store = AttachmentStore(bucket_name="attachments", s3_client=s3)
+
+        parsed = EmailParser(attachment_store=store).parse_bytes(_raw_email(payload))
+
+        info = parsed["attachments"][0]
+        digest = hashlib.sha256(payload).hexdigest()
+        assert info["s3_bucket"] == "attachments"
+        assert info["s3_key"] == f"email-attachments/{digest[:2]}/{digest}"
+        assert s3.put_object.call_args.kwargs["Body"] == payload
+
+    def test_raw_utf8_headers_are_decoded(self):
+        raw = (
+            "From: José Núñez <Jose@Example.com>\r\n"
+            "To: Zoë <team@solopilot.ai>\r\n"
+            "Subject: Re: Café plans\r\n"
+            "Message-ID: <cafe-1@example.com>\r\n"
+            "\r\n"
+            "Sounds good.\r\n"
+        ).encode("utf-8")
+
+        parsed = EmailParser().parse_bytes(raw)
+
+        assert parsed["from"] == "jose@example.com"
+        assert parsed["to"] == ["team@solopilot.ai"]
+        assert parsed["original_subject"] == "Re: Café plans"
+        assert parsed["subject"] == "Café plans"
+
+    def test_raw_latin1_header_falls_back(self):
+        raw = b"From: a@example.com\r\nSubject: Caf\xe9\r\n\r\nbody\r\n"
+
+        assert EmailParser().parse_bytes(raw)["original_subject"] == "Café"
+
+    @pytest.mark.parametrize("encoding", ["base64", "quoted-printable", "7bit"])
+    def test_sliced_decode_matches_full_decode(self, encoding):
+        payload = ("line with = sign and text\n" * 50).encode()
+        msg = MIMEApplication(payload, "octet-stream")
+        if encoding != "base64":
+            encoded = payload.decode()
+            if encoding == "quoted-printable":
+                encoded = encoded.replace("=", "=3D")
+            msg.set_payload(encoded)
+            msg.replace_header("Content-Transfer-Encoding", encoding)
+
+        decoded = b"".join(_iter_decoded(msg.get_payload(), encoding, chunk_size=7))
+
+        assert decoded == msg.get_payload(decode=True)
+
+
+class TestAttachmentUpload:
+    """Large attachments go to S3 as multipart uploads."""
+
+    def test_multipart_upload_in_parts(self):
+        s3 = MagicMock()
+        s3.create_multipart_upload.return_value = {"UploadId": "u1"}
+        s3.upload_part.side_effect = [{"ETag": "e1"}, {"ETag": "e2"}, {"ETag": "e3"}]
+        s3.head_object.side_effect = _not_found()
+        upload = AttachmentUpload(
+            "a.bin", "application/octet-stream", "b", "p/", part_size=10, s3_client=s3
+        )
+
+        for _ in range(5):
+            upload.write(b"abcdef")
+        info = upload.close()
+
+        digest = hashlib.sha256(b"abcdef" * 5).hexdigest()
+        staging_key = s3.create_multipart_upload.call_args.kwargs["Key"]
+        assert info["size"] == 30
+        assert info["sha256"] == digest
+        assert info["s3_key"] == f"p/{digest[:2]}/{digest}"
+        assert staging_key.startswith("p/staging/")
+        bodies = [call.kwargs["Body"] for call in s3.upload_part.call_args_list]
+        assert [len(body) for body in bodies] == [10, 10, 10]
+        s3.complete_multipart_upload.assert_called_once_with(
+            Bucket="b",
+            Key=staging_key,
+            UploadId="u1",
+            MultipartUpload={
+                "Parts": [
+                    {"ETag": "e1", "PartNumber": 1},
+                    {"ETag": "e2", "PartNumber": 2},
+                    {"ETag": "e3", "PartNumber": 3},
+                ]
+            },
+        )
+        assert s3.copy_object.call_args.kwargs["CopySource"] == {"Bucket": "b", "Key": staging_key}
+        s3.delete_object.assert_called_once_with(Bucket="b", Key=staging_key)
+        s3.put_object.assert_not_called()
+
+    def test_failed_part_aborts_upload(self):
+        s3 = MagicMock()
+        s3.create_multipart_upload.return_value = {"UploadId": "u1"}
+        s3.upload_part.side_effect = RuntimeError("SlowDown")
+        upload = AttachmentUpload("a.bin", "application/octet-stream", "b", "p/", 4, s3)
+
+        with pytest.raises(RuntimeError):
+            upload.write(b"abcdefgh")
+
+        s3.abort_multipart_upload.assert_called_once_with(
+            Bucket="b", Key=upload._staging_key, UploadId="u1"
+        )
+
+
+class TestContentAddressing:
+    """Identical content is stored once and counted per conversation."""
+
+    def test_existing_content_skips_upload(self):
+        s3 = MagicMock()
+        upload = AttachmentUpload("a.pdf", "application/pdf", "b", "p/", s3_client=s3)
+
+        upload.write(b"same brief")
+        info = upload.close()
+
+        s3.put_object.assert_not_called()
+        assert info["s3_key"].endswith(info["sha256"])
+
+    def test_existing_multipart_content_drops_staged_copy(self):
+        s3 = MagicMock()
+        s3.create_multipart_upload.return_value = {"UploadId": "u1"}
+        s3.upload_part.return_value = {"ETag": "e"}
+        upload = AttachmentUpload("a.pdf", "application/pdf", "b", "p/", 4, s3)
+
+        upload.write(b"abcdefgh")
+        upload.close()
+
+        s3.copy_object.assert_not_called()
+        s3.delete_object.assert_called_once_with(Bucket="b", Key=upload._staging_key)
+
+    def test_redelivered_message_is_counted_once(self):
+        table = MagicMock()
+        table.update_item.side_effect = ClientError(
+            {"Error": {"Code": "ConditionalCheckFailedException"}}, "UpdateItem"
+        )
+        table.get_item.return_value = {"Item": {"ref_count": 1, "first_message_id": "<m1>"}}
+        index = AttachmentIndex(dynamodb_resource=MagicMock(Table=MagicMock(return_value=table)))
+
+        reference = index.add_reference("conv", "<m1>", {"sha256": "abc", "filename": "a"})
+
+        assert reference["first_message_id"] == "<m1>"
+        table.get_item.assert_called_once_with(
+            Key={"sha256": "abc", "conversation_id": "conv"}, ConsistentRead=True
+        )
+
+    def test_last_release_deletes_the_reference(self):
+        table = MagicMock()
+        table.update_item.return_value = {"Attributes": {"ref_count": 0}}
+        index = AttachmentIndex(dynamodb_resource=MagicMock(Table=MagicMock(return_value=table)))
+
+        assert index.release_reference("conv", "<m1>", "abc") == 0
+        assert table.delete_item.call_args.kwargs["Key"] == {
+            "sha256": "abc",
+            "conversation_id": "conv",
+        }
+
+    def test_repeated_attachment_is_compacted_in_history(self):
+        index = MagicMock()
+        index.add_reference.return_value = {"ref_count": 2, "first_message_id": "<m1>"}
+        parsed = {
+            "message_id": "<m2>",
+            "attachments": [{"filename": "a.pdf", "sha256": "abc", "size": 10, "s3_key": "k"}],
+        }
+        with patch.object(lambda_function.services, "attachment_index", return_value=index):
+            entries = lambda_function._index_attachments("conv", parsed)
+
+        assert entries == [
+            {"filename": "a.pdf", "sha256": "abc", "s3_key": "k", "duplicate_of": "<m1>"}
+        ]
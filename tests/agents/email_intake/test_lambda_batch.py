@@ -0,0 +1,203 @@
+"""Tests for SQS batch processing in the intake Lambda."""
+
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.agents.email_intake import lambda_function
+
+
+def _sqs_record(message_id, key, receive_count="1"):
+    body = {"Records": [{"s3": {"bucket": {"name": "emails"}, "object": {"key": key}}}]}
+    return {
+        "messageId": message_id,
+        "eventSource": "aws:sqs",
+        "body": json.dumps(body),
+        "attributes": {"ApproximateReceiveCount": receive_count},
+    }
+
+
+def _parsed(key):
+    # key encodes "<conversation>-<minute>"
+    conversation_id, minute = key.split("-")
+    return {
+        "conversation_id": conversation_id,
+        "message_id": f"<{key}@example.com>",
+        "timestamp": f"2025-01-01T10:{minute}:00+00:00",
+    }
+
+
+class TestSqsEmailLocations:
+    """Queue message bodies resolve to raw email locations."""
+
+    def test_s3_notification_in_sns_envelope(self):
+        inner = {"Records": [{"s3": {"bucket": {"name": "b"}, "object": {"key": "a%2Bb"}}}]}
+        record = {"body": json.dumps({"Type": "Notification", "Message": json.dumps(inner)})}
+
+        assert lambda_function._sqs_email_locations(record) == [("b", "a+b")]
+
+    def test_ses_notification_uses_action_location(self):
+        payload = {
+            "mail": {"messageId": "m1"},
+            "receipt": {"action": {"type": "S3", "bucketName": "in", "objectKey": "raw/m1"}},
+        }
+
+        assert lambda_function._sqs_email_locations({"body": json.dumps(payload)}) == [
+            ("in", "raw/m1")
+        ]
+
+    def test_s3_test_event_is_ignored(self):
+        record = {"body": json.dumps({"Event": "s3:TestEvent"})}
+
+        assert lambda_function._sqs_email_locations(record) == []
+
+
+@patch.object(lambda_function, "_respond_to_conversation")
+@patch.object(lambda_function, "_append_inbound_email")
+@patch.object(lambda_function, "_load_email", side_effect=lambda bucket, key: _parsed(key))
+class TestHandleSqsBatch:
+    """Records are grouped per conversation with one response pass each."""
+
+    def test_groups_in_date_order_with_one_pass_per_conversation(
+        self, _load, mock_append, mock_respond
+    ):
+        event = {
+            "Records": [
+                _sqs_record("1", "a-05"),
+                _sqs_record("2", "b-01"),
+                _sqs_record("3", "a-02"),
+            ]
+        }
+
+        result = lambda_function.lambda_handler(event, None)
+
+        assert result == {"batchItemFailures": []}
+        appended = [call.args[0]["message_id"] for call in mock_append.call_args_list]
+        assert appended == ["<a-02@example.com>", "<a-05@example.com>", "<b-01@example.com>"]
+        answered = [call.args[0]["message_id"] for call in mock_respond.call_args_list]
+        assert answered == ["<a-05@example.com>", "<b-01@example.com>"]
+
+    def test_failed_append_defers_later_emails_of_the_thread(
+        self, _load, mock_append, mock_respond
+    ):
+        mock_append.side_effect = [{}, RuntimeError("throttled"), {}]
+        event = {
+            "Records": [
+                _sqs_record("1", "a-01"),
+                _sqs_record("2", "a-02"),
+                _sqs_record("3", "a-03"),
+                _sqs_record("4", "b-01"),
+            ]
+        }
+
+        result = lambda_function.lambda_handler(event, None)
+
+        assert result == {
+            "batchItemFailures": [{"itemIdentifier": "2"}, {"itemIdentifier": "3"}]
+        }
+        answered = [call.args[0]["message_id"] for call in mock_respond.call_args_list]
+        assert answered == ["<a-01@example.com>", "<b-01@example.com>"]
+
+    def test_failed_response_pass_fails_the_answered_record(
+        self, _load, mock_append, mock_respond
+    ):
+        mock_respond.side_effect = RuntimeError("bedrock timeout")
+        event = {"Records": [_sqs_record("1", "a-01"), _sqs_record("2", "a-02")]}
+
+        result = lambda_function.lambda_handler(event, None)
+
+        assert result == {"batchItemFailures": [{"itemIdentifier": "2"}]}
+
+    def test_redelivered_records_skip_duplicates(self, _load, mock_append, mock_respond):
+        event = {"Records": [_sqs_record("1", "a-01", receive_count="2")]}
+
+        lambda_function.lambda_handler(event, None)
+
+        assert mock_append.call_args.kwargs["skip_duplicate"] is True
+
+    def test_unreadable_record_fails_alone(self, mock_load, mock_append, mock_respond):
+        mock_load.side_effect = [RuntimeError("NoSuchKey"), _parsed("a-01")]
+        event = {"Records": [_sqs_record("1", "x-01"), _sqs_record("2", "a-01")]}
+
+        result = lambda_function.lambda_handler(event, None)
+
+        assert result == {"batchItemFailures": [{"itemIdentifier": "1"}]}
+        assert mock_respond.call_count == 1
+
+
+@patch.object(lambda_function, "RESPONSE_DEBOUNCE_QUEUE_URL", "https://sqs/debounce")
+@patch.object(lambda_function, "RESPONSE_DEBOUNCE_SECONDS", 60)
+@patch.object(lambda_function, "sqs_client")
+@patch.object(lambda_function, "_respond_to_conversation")
+class TestDebouncedResponses:
+    """Generation waits for a quiet thread, then answers the latest email once."""
+
+    def _state_manager(self):
+        manager = MagicMock()
+        manager.hydrate_email_history.side_effect = lambda conversation: conversation
+        return manager
+
+    def test_append_schedules_delayed_check_instead_of_responding(self, mock_respond, mock_sqs):
+        manager = self._state_manager()
+        manager.schedule_response.return_value = True
+        with patch.object(lambda_function.services, "state_manager", return_value=manager):
+            _, scheduled = lambda_function._respond_or_schedule(
+                {"conversation_id": "a"}, {"conversation_id": "a", "last_seq": 7}
+            )
+
+        assert scheduled
+        mock_respond.assert_not_called()
+        manager.schedule_response.assert_called_once_with("a", 7)
+        kwargs = mock_sqs.send_message.call_args.kwargs
+        assert kwargs["DelaySeconds"] == 60
+        assert json.loads(kwargs["MessageBody"]) == {
+            "type": "debounced_response",
+            "conversation_id": "a",
+            "seq": 7,
+        }
+
+    def test_quiet_thread_check_answers_latest_inbound(self, mock_respond, _sqs):
+        manager = self._state_manager()
+        manager.claim_response.return_value = {
+            "conversation_id": "a",
+            "email_history": [
+                {"direction": "inbound", "message_id": "<1@x>", "references": []},
+                {"direction": "inbound", "message_id": "<2@x>", "references": ["<1@x>"]},
+                {"direction": "outbound", "message_id": "<3@x>"},
+            ],
+        }
+        check = {
+            "messageId": "m1",
+            "eventSource": "aws:sqs",
+            "body": json.dumps({"type": "debounced_response", "conversation_id": "a", "seq": 9}),
+        }
+        with patch.object(lambda_function.services, "state_manager", return_value=manager):
+            result = lambda_function.lambda_handler({"Records": [check]}, None)
+
+        assert result == {"batchItemFailures": []}
+        manager.claim_response.assert_called_once_with("a", 9)
+        parsed_email = mock_respond.call_args.args[0]
+        assert parsed_email["message_id"] == "<2@x>"
+        assert parsed_email["references"] == "<1@x>"
+
+    def test_superseded_check_is_dropped(self, mock_respond, _sqs):
+        manager = self._state_manager()
+        manager.claim_response.return_value = None
+        with patch.object(lambda_function.services, "state_manager", return_value=manager):
+            assert not lambda_function._run_response_check("a", 4)
+
+        mock_respond.assert_not_called()
+
+    def test_failed_pass_releases_claim(self, mock_respond, _sqs):
+        manager = self._state_manager()
+        manager.claim_response.return_value = {
+            "conversation_id": "a",
+            "email_history": [{"direction": "inbound", "message_id": "<1@x>"}],
+        }
+        mock_respond.side_effect = RuntimeError("bedrock timeout")
+        with patch.object(lambda_function.services, "state_manager", return_value=manager):
+            with pytest.raises(RuntimeError):
+                lambda_function._run_response_check("a", 4)
+
+        manager.release_response_claim.assert_called_once_with("a", 4)
@@ -0,0 +1,62 @@
+"""Tests for deferred imports and the Lambda import budget."""
+
+import sys
+
+import pytest
+
+from scripts.profile_imports import DEFERRED_MODULES, check_module, parse_importtime
+from src.agents.email_intake.lazy_imports import lazy_exports, lazy_import
+
+
+class TestLazyModule:
+    """Proxies import on first attribute access."""
+
+    def test_module_loads_on_first_attribute(self):
+        proxy = lazy_import("json")
+
+        assert not proxy.loaded
+        assert proxy.dumps({"a": 1}) == '{"a": 1}'
+        assert proxy.loaded
+
+    def test_falls_back_to_next_candidate(self):
+        proxy = lazy_import("solopilot_missing_module", "json")
+
+        assert proxy.load() is sys.modules["json"]
+
+    def test_missing_module_raises_on_use(self):
+        proxy = lazy_import("solopilot_missing_module")
+
+        with pytest.raises(ImportError):
+            _ = proxy.anything
+
+    def test_lazy_exports_resolves_and_rejects_unknown(self):
+        getter = lazy_exports("src.agents.email_intake", {"EmailParser": ".email_parser"})
+
+        assert getter("EmailParser").__name__ == "EmailParser"
+        with pytest.raises(AttributeError):
+            getter("NotExported")
+
+
+class TestImportBudget:
+    """Entry points keep route-specific modules out of cold start."""
+
+    def test_parse_importtime(self):
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |     json.decoder\n"
+            "import time:       300 |        420 |   json\n"
+        )
+
+        records = parse_importtime(output)
+
+        assert [(r.module, r.self_us, r.cumulative_us) for r in records] == [
+            ("json.decoder", 120, 120),
+            ("json", 300, 420),
+        ]
+        assert records[0].depth == 2
+
+    @pytest.mark.parametrize("module", sorted(DEFERRED_MODULES))
+    def test_entry_point_defers_route_modules(self, module):
+        summary = check_module(module, runs=1, deferred=DEFERRED_MODULES[module])
+
+        assert summary["violations"] == []
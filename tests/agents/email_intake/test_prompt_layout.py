@@ -0,0 +1,100 @@
+"""Tests for the cacheable prompt layout of the intake agents."""
+
+import io
+import json
+from unittest.mock import MagicMock, patch
+
+from src.agents.email_intake import conversational_responder, metadata_extractor, reviewer
+from src.common.llm_cache import LLMResponseCache
+
+
+def _conversation(client: str, body: str):
+    return {
+        "conversation_id": client,
+        "client_email": f"{client}@example.com",
+        "phase": "understanding",
+        "requirements": {},
+        "email_history": [
+            {"direction": "inbound", "from": f"{client}@example.com", "body": body},
+        ],
+    }
+
+
+def _bedrock_client(text: str, usage=None):
+    client = MagicMock()
+    client.invoke_model.side_effect = lambda **_: {
+        "body": io.BytesIO(json.dumps({"content": [{"text": text}], "usage": usage or {}}).encode())
+    }
+    return client
+
+
+def _sent_body(client):
+    return json.loads(client.invoke_model.call_args.kwargs["body"])
+
+
+class TestPromptLayout:
+    """Static instructions lead every request so Bedrock can cache them."""
+
+    def test_metadata_system_prompt_is_identical_across_conversations(self):
+        client = _bedrock_client("{}")
+        with patch.object(metadata_extractor, "USE_AI_PROVIDER", False), patch(
+            "src.common.bedrock_invoker.get_llm_cache", return_value=LLMResponseCache()
+        ):
+            extractor = metadata_extractor.MetadataExtractor(bedrock_client=client)
+            extractor.extract_metadata(_conversation("ana", "Need a booking site"), "understanding")
+            first = _sent_body(client)
+            extractor.extract_metadata(_conversation("ben", "Need a dashboard"), "proposal")
+            second = _sent_body(client)
+
+        assert first["system"] == second["system"]
+        # The instructions alone are well below Haiku 4.5's 4096-token minimum
+        assert "cache_control" not in first["system"][0]
+        assert first["messages"] != second["messages"]
+
+    def test_review_sends_conversation_context_before_the_response(self):
+        client = _bedrock_client('{"overall_score": 4}')
+        with patch.object(reviewer, "USE_AI_PROVIDER", False):
+            email_reviewer = reviewer.EmailReviewer(bedrock_client=client)
+            email_reviewer.review_response(_conversation("ana", "Budget?"), "Around $5k.")
+
+        content = _sent_body(client)["messages"][0]["content"]
+        assert "Budget?" in content[0]["text"]
+        assert "Around $5k." in content[1]["text"]
+        assert "cache_control" not in content[1]
+
+    def test_responder_caches_stage_guidance_and_history(self):
+        conversation = _conversation("ana", "Can you build it? " * 30)
+        conversation["email_history"] = [
+            {"direction": direction, "body": f"{direction} message {i} " * 40}
+            for i, direction in enumerate(["inbound", "outbound"] * 3)
+        ]
+        client = _bedrock_client("Happy to help.")
+        with patch.object(conversational_responder, "USE_AI_PROVIDER", False):
+            responder = conversational_responder.ConversationalResponder(
+                bedrock_client=client, metadata_extractor=MagicMock()
+            )
+            responder._generate_unified_response(conversation, {"body": "Sounds good"}, {})
+
+        body = _sent_body(client)
+        history, turn = body["messages"][0]["content"]
+        assert "YOUR CURRENT CAPABILITIES" in body["system"][0]["text"]
+        assert history["text"].startswith("CONVERSATION HISTORY")
+        assert history["cache_control"] == {"type": "ephemeral"}
+        assert "Sounds good" in turn["text"] and "cache_control" not in turn
+
+    def test_responder_records_cache_tokens(self):
+        usage = {"input_tokens": 150, "output_tokens": 80, "cache_read_input_tokens": 900}
+        client = _bedrock_client("Happy to help.", usage)
+        with patch.object(conversational_responder, "USE_AI_PROVIDER", False):
+            responder = conversational_responder.ConversationalResponder(
+                bedrock_client=client, metadata_extractor=MagicMock()
+            )
+            body, response_metadata, prompt = responder._generate_unified_response(
+                _conversation("ana", "Can you build it?"),
+                {"body": "Can you build it?"},
+                {"project_name": "Booking"},
+            )
+
+        assert body == "Happy to help."
+        assert response_metadata["llm_usage"]["cache_read_input_tokens"] == 900
+        assert prompt.startswith(_sent_body(client)["system"][0]["text"])
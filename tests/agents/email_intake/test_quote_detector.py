@@ -0,0 +1,64 @@
+"""Tests for the shared quote/reply-header detector."""
+
+from pathlib import Path
+
+import pytest
+import yaml
+
+from src.agents.email_intake import quote_detector
+from src.agents.email_intake.email_parser import EmailParser
+from src.agents.email_intake.utils import EmailThreadingUtils
+
+CORPUS = yaml.safe_load(
+    (Path(__file__).parent / "conversations" / "quoted_reply_corpus.yaml").read_text()
+)["samples"]
+
+
+@pytest.mark.parametrize("sample", CORPUS, ids=[sample["name"] for sample in CORPUS])
+class TestQuotedReplyCorpus:
+    """Both body cleaners agree with the expected splits for each client format."""
+
+    def test_extract_quoted_text(self, sample):
+        new_content, _ = EmailThreadingUtils.extract_quoted_text(sample["body"])
+
+        assert new_content == sample["new_content"].strip()
+
+    def test_clean_body(self, sample):
+        assert EmailParser()._clean_body(sample["body"]) == sample["clean_body"].strip()
+
+
+class TestLineClassifier:
+    """Lines are classified once and scanning stops at the first boundary."""
+
+    @pytest.mark.parametrize(
+        "line,kind",
+        [
+            ("> quoted", quote_detector.QUOTED),
+            ("> On Mon, Jan 6, 2025 Abdul wrote:", quote_detector.ATTRIBUTION),
+            ("Am 06.01.2025 um 09:14 schrieb Abdul:", quote_detector.ATTRIBUTION),
+            ("-----Original Message-----", quote_detector.SEPARATOR),
+            ("Subject: Re: Website", quote_detector.HEADER),
+            ("Sent from my iPhone", quote_detector.SIGNATURE),
+            ("-- ", quote_detector.SIGNATURE),
+            ("a -> b <c@d.com>", quote_detector.CONTENT),
+            ("   ", quote_detector.BLANK),
+        ],
+    )
+    def test_classify_line(self, line, kind):
+        assert quote_detector.classify_line(line) == kind
+
+    def test_single_header_line_is_not_a_boundary(self):
+        lines = ["To: be clear, we need the blog.", "Thanks"]
+
+        assert quote_detector.find_quote_start(lines) == len(lines)
+
+    def test_stops_classifying_at_first_boundary(self, monkeypatch):
+        calls = []
+        classify = quote_detector._classify
+        monkeypatch.setattr(
+            quote_detector, "_classify", lambda line: calls.append(line) or classify(line)
+        )
+        lines = ["New text", "> quoted"] + ["> more history"] * 5000
+
+        assert quote_detector.find_quote_start(lines) == 1
+        assert len(calls) == 2
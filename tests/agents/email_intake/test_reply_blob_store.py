@@ -0,0 +1,109 @@
+"""Tests for offloading large reply prompts to S3."""
+
+import gzip
+import io
+from unittest.mock import MagicMock, patch
+
+from botocore.exceptions import ClientError
+
+from src.agents.email_intake.conversation_state import ConversationStateManager
+from src.agents.email_intake.reply_blob_store import ReplyBlobStore, hydrate_reply
+
+
+def _missing():
+    return ClientError({"Error": {"Code": "404", "Message": "Not Found"}}, "HeadObject")
+
+
+class TestReplyBlobStore:
+    """Compression, content addressing and deduplication."""
+
+    def test_large_prompt_is_offloaded_and_restored(self):
+        s3 = MagicMock()
+        s3.head_object.side_effect = _missing()
+        store = ReplyBlobStore(bucket_name="blobs", threshold_bytes=10, s3_client=s3)
+        prompt = "system prompt " * 100
+
+        reply = store.offload_reply({"reply_id": "r1", "llm_prompt": prompt, "llm_response": "hi"})
+
+        assert reply["llm_prompt"] is None
+        assert reply["llm_response"] == "hi"
+        ref = reply["llm_prompt_ref"]
+        assert ref["bucket"] == "blobs"
+        assert ref["key"].endswith(f"{ref['sha256']}.gz")
+        body = s3.put_object.call_args.kwargs["Body"]
+        assert len(body) < len(prompt)
+
+        s3.get_object.return_value = {"Body": io.BytesIO(body)}
+        assert store.hydrate_reply(reply)["llm_prompt"] == prompt
+
+    def test_existing_blob_is_not_uploaded_again(self):
+        s3 = MagicMock()
+        store = ReplyBlobStore(bucket_name="blobs", threshold_bytes=10, s3_client=s3)
+
+        first = store.put_text("same prompt text")
+        second = store.put_text("same prompt text")
+
+        assert first == second
+        s3.put_object.assert_not_called()
+
+    def test_small_prompt_stays_inline(self):
+        s3 = MagicMock()
+        store = ReplyBlobStore(bucket_name="blobs", threshold_bytes=1000, s3_client=s3)
+
+        reply = store.offload_reply({"llm_prompt": "short"})
+
+        assert reply == {"llm_prompt": "short"}
+        s3.head_object.assert_not_called()
+
+    @patch("src.agents.email_intake.reply_blob_store.boto3.client")
+    def test_hydrate_without_store_reads_referenced_bucket(self, mock_client):
+        mock_client.return_value.get_object.return_value = {
+            "Body": io.BytesIO(gzip.compress(b"the prompt"))
+        }
+        reply = {
+            "llm_prompt": None,
+            "llm_prompt_ref": {"bucket": "blobs", "key": "reply-blobs/ab/abc.gz", "encoding": "gzip"},
+        }
+
+        hydrate_reply(reply)
+
+        assert reply["llm_prompt"] == "the prompt"
+        mock_client.return_value.get_object.assert_called_once_with(
+            Bucket="blobs", Key="reply-blobs/ab/abc.gz"
+        )
+
+
+@patch("src.agents.email_intake.conversation_state.boto3.resource")
+class TestPendingReplyOffload:
+    """ConversationStateManager stores references instead of prompts."""
+
+    def test_add_pending_reply_writes_reference(self, mock_resource):
+        table = MagicMock()
+        mock_resource.return_value.Table.return_value = table
+        s3 = MagicMock()
+        s3.head_object.side_effect = _missing()
+        store = ReplyBlobStore(bucket_name="blobs", threshold_bytes=10, s3_client=s3)
+        manager = ConversationStateManager(blob_store=store)
+
+        manager.add_pending_reply("conv-1", "x" * 100, "Thanks!", "understanding")
+
+        stored = table.update_item.call_args.kwargs["ExpressionAttributeValues"][":reply"][0]
+        assert stored["llm_prompt"] is None
+        assert stored["llm_prompt_ref"]["size"] == 100
+        assert stored["llm_response"] == "Thanks!"
+
+    def test_offload_failure_keeps_prompt_inline(self, mock_resource):
+        table = MagicMock()
+        mock_resource.return_value.Table.return_value = table
+        s3 = MagicMock()
+        s3.head_object.side_effect = ClientError(
+            {"Error": {"Code": "403", "Message": "Forbidden"}}, "HeadObject"
+        )
+        store = ReplyBlobStore(bucket_name="blobs", threshold_bytes=10, s3_client=s3)
+        manager = ConversationStateManager(blob_store=store)
+
+        manager.add_pending_reply("conv-1", "x" * 100, "Thanks!", "understanding")
+
+        stored = table.update_item.call_args.kwargs["ExpressionAttributeValues"][":reply"][0]
+        assert stored["llm_prompt"] == "x" * 100
+        assert "llm_prompt_ref" not in stored
@@ -0,0 +1,69 @@
+"""Tests for the shared service container."""
+
+from unittest.mock import MagicMock
+
+from src.agents.email_intake.service_container import (
+    AWS_CLIENT_CONFIG,
+    BEDROCK_CLIENT_CONFIG,
+    ServiceContainer,
+    get_services,
+)
+
+
+class TestServiceContainer:
+    """Clients and collaborators are built once and reused."""
+
+    def test_clients_are_cached_with_pooled_config(self):
+        session = MagicMock()
+        services = ServiceContainer(session=session)
+
+        first = services.client("s3")
+        second = services.client("s3")
+
+        assert first is second
+        session.client.assert_called_once_with("s3", region_name=None, config=AWS_CLIENT_CONFIG)
+        assert AWS_CLIENT_CONFIG.tcp_keepalive is True
+        assert AWS_CLIENT_CONFIG.max_pool_connections >= 10
+
+    def test_bedrock_client_uses_longer_read_timeout(self):
+        session = MagicMock()
+        services = ServiceContainer(session=session)
+
+        services.bedrock_client()
+
+        assert session.client.call_args.kwargs["config"] is BEDROCK_CLIENT_CONFIG
+        assert BEDROCK_CLIENT_CONFIG.read_timeout > AWS_CLIENT_CONFIG.read_timeout
+        assert BEDROCK_CLIENT_CONFIG.tcp_keepalive is True
+
+    def test_state_manager_reuses_shared_resource(self):
+        session = MagicMock()
+        services = ServiceContainer(session=session)
+
+        manager = services.state_manager("conversations")
+
+        assert services.state_manager("conversations") is manager
+        assert manager.dynamodb is session.resource.return_value
+        assert services.email_parser("conversations").state_manager is manager
+        session.resource.assert_called_once()
+
+    def test_responder_shares_metadata_extractor(self):
+        services = ServiceContainer(session=MagicMock())
+
+        responder = services.conversational_responder("https://cal.example/link")
+
+        assert responder.metadata_extractor is services.metadata_extractor()
+        assert services.conversational_responder("https://cal.example/link") is responder
+
+    def test_reset_drops_cached_instances(self):
+        session = MagicMock()
+        services = ServiceContainer(session=session)
+        services.client("sqs")
+
+        services.reset()
+        services._session = session
+        services.client("sqs")
+
+        assert session.client.call_count == 2
+
+    def test_get_services_is_process_wide(self):
+        assert get_services() is get_services()
@@ -44,3 +44,21 @@ def _no_network(monkeypatch):
         monkeypatch.setattr("langchain_aws.ChatBedrock.invoke", mock_chatbedrock_invoke)
     except ImportError:
         pass  # LangChain not available, skip mock
+
+
+@pytest.fixture(autouse=True)
+def _sync_llm_logs(monkeypatch):
+    """Write LLM call logs inline so tests can read llm_calls.log right after a call."""
+    monkeypatch.setenv("LLM_LOG_MODE", "sync")
+
+
+@pytest.fixture(autouse=True)
+def _fresh_provider_cache():
+    """Give each test its own providers, boto3 clients and parsed configs."""
+    from src.common.config_loader import clear_config_cache
+    from src.providers import clear_provider_cache
+
+    clear_provider_cache()
+    clear_config_cache()
+    yield
+    clear_provider_cache()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Quote/reply-header detection benchmark for the email intake body cleaners.
+
+Times EmailThreadingUtils.extract_quoted_text and EmailParser._clean_body over
+the quoted-reply corpus (tests/agents/email_intake/conversations), with each
+sample's quoted history repeated to simulate long threads.
+
+Usage:
+    python tests/performance/quote_detection_benchmark.py
+    python tests/performance/quote_detection_benchmark.py --history-lines 5000 --runs 50
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import yaml
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.agents.email_intake.email_parser import EmailParser  # noqa: E402
+from src.agents.email_intake.utils import EmailThreadingUtils  # noqa: E402
+
+CORPUS_PATH = (
+    project_root
+    / "tests"
+    / "agents"
+    / "email_intake"
+    / "conversations"
+    / "quoted_reply_corpus.yaml"
+)
+
+
+def load_corpus(history_lines: int) -> List[Dict[str, Any]]:
+    """Load the corpus and pad each sample's quoted part to roughly history_lines lines."""
+    samples = yaml.safe_load(CORPUS_PATH.read_text())["samples"]
+    for sample in samples:
+        new_content, quoted = EmailThreadingUtils.extract_quoted_text(sample["body"])
+        quoted_lines = quoted.split("\n") if quoted else []
+        if quoted_lines:
+            repeats = max(1, history_lines // len(quoted_lines))
+            quoted = "\n".join(quoted_lines * repeats)
+        sample["large_body"] = f"{new_content}\n\n{quoted}" if quoted else sample["body"]
+        sample["line_count"] = sample["large_body"].count("\n") + 1
+    return samples
+
+
+def time_call(func: Callable[[str], Any], body: str, runs: int) -> float:
+    """Median wall time of func(body) in microseconds."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func(body)
+        timings.append((time.perf_counter() - start) * 1_000_000)
+    return statistics.median(timings)
+
+
+def run(history_lines: int, runs: int) -> List[Dict[str, Any]]:
+    """Benchmark both cleaners on every corpus sample."""
+    parser = EmailParser()
+    results = []
+    for sample in load_corpus(history_lines):
+        body = sample["large_body"]
+        results.append(
+            {
+                "name": sample["name"],
+                "client": sample["client"],
+                "lines": sample["line_count"],
+                "extract_quoted_text_us": time_call(
+                    EmailThreadingUtils.extract_quoted_text, body, runs
+                ),
+                "clean_body_us": time_call(parser._clean_body, body, runs),
+            }
+        )
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark quote/reply-header detection")
+    parser.add_argument("--history-lines", type=int, default=2000, help="Quoted lines per body")
+    parser.add_argument("--runs", type=int, default=20, help="Timed runs per sample")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    results = run(args.history_lines, args.runs)
+
+    print(f"{'sample':<40} {'client':<18} {'lines':>6} {'extract µs':>11} {'clean µs':>10}")
+    for result in results:
+        print(
+            f"{result['name']:<40} {result['client']:<18} {result['lines']:>6} "
+            f"{result['extract_quoted_text_us']:>11.1f} {result['clean_body_us']:>10.1f}"
+        )
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+        print(f"\nResults written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared Bedrock invoker used by the email intake agents.
+"""
+
+import io
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+from botocore.exceptions import ClientError, EndpointConnectionError, ParamValidationError
+
+from src.common import bedrock_invoker
+from src.common.bedrock_client import BedrockAccessError, BedrockNetworkError
+from src.common.bedrock_invoker import BedrockDeadlineExceeded, BedrockInvoker
+
+REQUEST = {"anthropic_version": "bedrock-2023-05-31", "max_tokens": 10, "messages": []}
+ARN = "arn:aws:bedrock:us-east-2:123456789012:inference-profile/us.anthropic.claude"
+SONNET = "anthropic.claude-sonnet-4-5-20250929-v1:0"
+HAIKU = "anthropic.claude-haiku-4-5-20251001-v1:0"
+
+
+def _response(text="ok", input_tokens=12, output_tokens=3):
+    body = {
+        "content": [{"text": text}],
+        "usage": {"input_tokens": input_tokens, "output_tokens": output_tokens},
+    }
+    return {"body": io.BytesIO(json.dumps(body).encode())}
+
+
+def _client_error(code):
+    return ClientError({"Error": {"Code": code, "Message": code}}, "InvokeModel")
+
+
+@pytest.fixture(autouse=True)
+def _reset_shared_state():
+    bedrock_invoker.metrics.reset()
+    bedrock_invoker.throttle_state.reset()
+    bedrock_invoker.prompt_cache_prefixes.reset()
+    with patch.object(bedrock_invoker.time, "sleep") as sleep:
+        yield sleep
+
+
+class TestBedrockInvoker:
+    """Retries, deadlines and metrics around invoke_model."""
+
+    def test_throttled_call_is_retried_and_metered(self, _reset_shared_state):
+        client = MagicMock()
+        client.invoke_model.side_effect = [_client_error("ThrottlingException"), _response()]
+
+        text = BedrockInvoker(client=client).invoke_text(
+            REQUEST, model_id="haiku", agent="metadata_extractor"
+        )
+
+        assert text == "ok"
+        assert client.invoke_model.call_count == 2
+        assert _reset_shared_state.called
+        totals = bedrock_invoker.metrics.snapshot()["metadata_extractor"]
+        assert totals["calls"] == 1
+        assert totals["retries"] == 1
+        assert totals["throttles"] == 1
+        assert totals["input_tokens"] == 12
+        assert totals["output_tokens"] == 3
+
+    def test_access_denied_is_not_retried(self):
+        client = MagicMock()
+        client.invoke_model.side_effect = _client_error("AccessDeniedException")
+
+        with pytest.raises(BedrockAccessError):
+            BedrockInvoker(client=client).invoke(REQUEST, model_id="haiku")
+
+        assert client.invoke_model.call_count == 1
+        assert bedrock_invoker.metrics.snapshot()["unknown"]["errors"] == 1
+
+    def test_network_errors_exhaust_attempts(self):
+        client = MagicMock()
+        client.invoke_model.side_effect = EndpointConnectionError(endpoint_url="https://bedrock")
+
+        with pytest.raises(BedrockNetworkError):
+            BedrockInvoker(client=client, max_attempts=3).invoke(REQUEST, model_id="haiku")
+
+        assert client.invoke_model.call_count == 3
+
+    def test_deadline_stops_retries(self):
+        client = MagicMock()
+        client.invoke_model.side_effect = _client_error("ServiceUnavailableException")
+
+        with pytest.raises(BedrockDeadlineExceeded):
+            BedrockInvoker(client=client).invoke(REQUEST, model_id="haiku", deadline_s=0.001)
+
+        assert client.invoke_model.call_count <= 1
+
+    def test_legacy_signature_fallback_is_remembered(self):
+        client = MagicMock()
+        client.invoke_model.side_effect = [
+            ParamValidationError(report="modelId"),
+            _response(),
+            _response(),
+        ]
+        invoker = BedrockInvoker(client=client)
+
+        invoker.invoke(REQUEST, inference_profile_arn=ARN)
+        invoker.invoke(REQUEST, inference_profile_arn=ARN)
+
+        legacy_calls = client.invoke_model.call_args_list[1:]
+        for call in legacy_calls:
+            assert call.kwargs["modelId"] == "us.anthropic.claude"
+            assert call.kwargs["inferenceProfileArn"] == ARN
+
+    def test_throttle_delay_is_shared_per_model_and_decays(self):
+        state = bedrock_invoker.throttle_state
+
+        state.throttled("haiku")
+        state.throttled("haiku")
+        grown = state.delay("haiku")
+        state.succeeded("haiku")
+
+        assert grown == 2 * bedrock_invoker.BEDROCK_THROTTLE_BACKOFF_BASE
+        assert state.delay("haiku") == grown / 2
+        assert state.delay("sonnet") == 0.0
+
+    def test_injected_client_gets_its_own_invoker(self):
+        client = MagicMock()
+
+        assert bedrock_invoker.get_bedrock_invoker(client).client is client
+        assert bedrock_invoker.get_bedrock_invoker() is bedrock_invoker.get_bedrock_invoker()
+
+
+class TestCachedRequestLayout:
+    """Static prefixes carry cache_control and cache token counts are recorded."""
+
+    def test_breakpoint_goes_where_the_prefix_clears_the_minimum(self):
+        body = bedrock_invoker.build_cached_request(
+            "static instructions",
+            "per-call text",
+            500,
+            0.2,
+            cached_context="thread " * 700,
+            model_id=SONNET,
+        )
+
+        assert body["system"] == [{"type": "text", "text": "static instructions"}]
+        content = body["messages"][0]["content"]
+        assert content[0]["cache_control"] == {"type": "ephemeral"}
+        assert content[1] == {"type": "text", "text": "per-call text"}
+
+    def test_long_static_prefix_is_a_breakpoint_of_its_own(self):
+        body = bedrock_invoker.build_cached_request(
+            "instructions " * 400, "per-call text", 500, 0.2, model_id=SONNET
+        )
+
+        assert body["system"][0]["cache_control"] == {"type": "ephemeral"}
+
+    def test_short_prefix_is_not_marked(self):
+        # ~1.2k tokens clears Sonnet's 1024 minimum but not Haiku 4.5's 4096
+        body = bedrock_invoker.build_cached_request(
+            "static instructions", "per-call text", 500, 0.2, cached_context="thread " * 700
+        )
+        haiku = bedrock_invoker.build_cached_request(
+            "static instructions",
+            "per-call text",
+            500,
+            0.2,
+            cached_context="thread " * 700,
+            model_id=HAIKU,
+        )
+
+        assert "cache_control" in body["messages"][0]["content"][0]
+        assert "cache_control" not in haiku["system"][0]
+        assert "cache_control" not in haiku["messages"][0]["content"][0]
+
+    def test_repeated_prefix_that_misses_the_cache_is_counted(self):
+        request = bedrock_invoker.build_cached_request(
+            "instructions " * 400, "per-call text", 500, 0.2, model_id=SONNET
+        )
+        client = MagicMock()
+        client.invoke_model.side_effect = lambda **_: _response()
+        invoker = BedrockInvoker(client=client)
+
+        invoker.invoke(request, model_id=SONNET, agent="responder")
+        invoker.invoke(request, model_id=SONNET, agent="responder")
+
+        assert bedrock_invoker.metrics.snapshot()["responder"]["prompt_cache_misses"] == 1
+
+    def test_repeated_prefix_read_from_the_cache_is_not_counted(self):
+        request = bedrock_invoker.build_cached_request(
+            "instructions " * 400, "per-call text", 500, 0.2, model_id=SONNET
+        )
+        usage = {"input_tokens": 5, "output_tokens": 3, "cache_read_input_tokens": 1200}
+        client = MagicMock()
+        client.invoke_model.side_effect = lambda **_: {
+            "body": io.BytesIO(json.dumps({"content": [{"text": "ok"}], "usage": usage}).encode())
+        }
+        invoker = BedrockInvoker(client=client)
+
+        invoker.invoke(request, model_id=SONNET, agent="responder")
+        invoker.invoke(request, model_id=SONNET, agent="responder")
+
+        assert bedrock_invoker.metrics.snapshot()["responder"]["prompt_cache_misses"] == 0
+
+    def test_cache_tokens_are_metered(self):
+        usage = {
+            "input_tokens": 20,
+            "output_tokens": 5,
+            "cache_read_input_tokens": 1800,
+            "cache_creation_input_tokens": 0,
+        }
+        client = MagicMock()
+        client.invoke_model.return_value = {
+            "body": io.BytesIO(json.dumps({"content": [{"text": "ok"}], "usage": usage}).encode())
+        }
+
+        body = BedrockInvoker(client=client).invoke(REQUEST, model_id="haiku", agent="reviewer")
+
+        assert bedrock_invoker.usage_summary(body)["cache_read_input_tokens"] == 1800
+        totals = bedrock_invoker.metrics.snapshot()["reviewer"]
+        assert totals["cache_read_input_tokens"] == 1800
+        assert totals["cache_write_input_tokens"] == 0
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Tests for the LLM response cache and its use by the Bedrock invoker.
+"""
+
+import io
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.common import bedrock_invoker, llm_cache
+from src.common.bedrock_invoker import BedrockInvoker
+from src.common.llm_cache import DiskCacheTier, DynamoDBCacheTier, LLMResponseCache, cache_key
+
+REQUEST = {
+    "anthropic_version": "bedrock-2023-05-31",
+    "max_tokens": 1000,
+    "messages": [{"role": "user", "content": "Extract metadata"}],
+    "temperature": 0.1,
+}
+RESPONSE = {"content": [{"text": '{"client_name": "Priya"}'}], "usage": {"input_tokens": 40}}
+
+
+class TestCacheKey:
+    """Keys cover the model, the prompt and the sampling parameters."""
+
+    def test_key_ignores_dict_order(self):
+        reordered = dict(reversed(list(REQUEST.items())))
+
+        assert cache_key("haiku", REQUEST) == cache_key("haiku", reordered)
+
+    def test_key_changes_with_model_and_sampling(self):
+        warmer = dict(REQUEST, temperature=0.7)
+
+        assert cache_key("haiku", REQUEST) != cache_key("sonnet", REQUEST)
+        assert cache_key("haiku", REQUEST) != cache_key("haiku", warmer)
+
+
+class TestLLMResponseCache:
+    """LRU eviction, TTL and the shared tiers."""
+
+    def test_lru_evicts_least_recently_used(self):
+        cache = LLMResponseCache(max_entries=2)
+        cache.put("a", {"n": 1})
+        cache.put("b", {"n": 2})
+        cache.get("a")
+        cache.put("c", {"n": 3})
+
+        assert cache.get("b") is None
+        assert cache.get("a") == {"n": 1}
+
+    def test_expired_entries_miss(self):
+        cache = LLMResponseCache(ttl_seconds=60)
+        cache.put("a", {"n": 1})
+
+        with patch.object(llm_cache.time, "time", return_value=llm_cache.time.time() + 61):
+            assert cache.get("a") is None
+
+    def test_callers_get_independent_copies(self):
+        cache = LLMResponseCache()
+        response = {"content": [{"text": "a"}]}
+        cache.put("a", response)
+        response["content"][0]["text"] = "mutated after put"
+
+        cache.get("a")["content"][0]["text"] = "mutated after get"
+
+        assert cache.get("a") == {"content": [{"text": "a"}]}
+
+    def test_disk_tier_survives_new_process(self, tmp_path):
+        LLMResponseCache(shared_tier=DiskCacheTier(str(tmp_path))).put("abc123", RESPONSE)
+
+        fresh = LLMResponseCache(shared_tier=DiskCacheTier(str(tmp_path)))
+
+        assert fresh.get("abc123") == RESPONSE
+
+    def test_dynamodb_tier_checks_ttl_and_tolerates_errors(self):
+        table = MagicMock()
+        table.get_item.return_value = {
+            "Item": {"cache_key": "k", "response": json.dumps(RESPONSE), "ttl": 1}
+        }
+        tier = DynamoDBCacheTier("llm_response_cache", MagicMock(Table=MagicMock(return_value=table)))
+        cache = LLMResponseCache(shared_tier=tier)
+
+        assert cache.get("k") is None
+        table.put_item.side_effect = RuntimeError("throttled")
+        cache.put("k", RESPONSE)
+        assert cache.get("k") == RESPONSE
+
+
+class TestInvokerCaching:
+    """Only call sites that opt in are served from the cache."""
+
+    @pytest.fixture(autouse=True)
+    def _fresh_cache(self):
+        bedrock_invoker.metrics.reset()
+        with patch.object(bedrock_invoker, "get_llm_cache", return_value=LLMResponseCache()):
+            yield
+
+    def _client(self):
+        client = MagicMock()
+        client.invoke_model.side_effect = lambda **_: {
+            "body": io.BytesIO(json.dumps(RESPONSE).encode())
+        }
+        return client
+
+    def test_repeated_deterministic_call_is_served_from_cache(self):
+        client = self._client()
+        invoker = BedrockInvoker(client=client)
+
+        first = invoker.invoke(REQUEST, model_id="haiku", agent="metadata_extractor", cache=True)
+        second = invoker.invoke(REQUEST, model_id="haiku", agent="metadata_extractor", cache=True)
+
+        assert first == second == RESPONSE
+        assert client.invoke_model.call_count == 1
+        totals = bedrock_invoker.metrics.snapshot()["metadata_extractor"]
+        assert totals["calls"] == 1
+        assert totals["cache_hits"] == 1
+
+    def test_calls_without_opt_in_always_invoke(self):
+        client = self._client()
+        invoker = BedrockInvoker(client=client)
+
+        invoker.invoke(REQUEST, model_id="sonnet")
+        invoker.invoke(REQUEST, model_id="sonnet")
+
+        assert client.invoke_model.call_count == 2
+
+    def test_rejected_response_is_not_cached(self):
+        client = self._client()
+        invoker = BedrockInvoker(client=client)
+
+        for _ in range(2):
+            invoker.invoke(
+                REQUEST, model_id="haiku", cache=True, validate=lambda body: False
+            )
+
+        assert client.invoke_model.call_count == 2
+
+    def test_validator_error_skips_cache_but_returns_response(self):
+        client = self._client()
+        invoker = BedrockInvoker(client=client)
+
+        def validate(body):
+            return json.loads(body["content"][0]["text"])["missing"]
+
+        first = invoker.invoke(REQUEST, model_id="haiku", cache=True, validate=validate)
+        invoker.invoke(REQUEST, model_id="haiku", cache=True, validate=validate)
+
+        assert first == RESPONSE
+        assert client.invoke_model.call_count == 2
+
+    def test_valid_response_is_cached(self):
+        client = self._client()
+        invoker = BedrockInvoker(client=client)
+
+        for _ in range(2):
+            invoker.invoke(REQUEST, model_id="haiku", cache=True, validate=lambda body: True)
+
+        assert client.invoke_model.call_count == 1
+
+    def test_malformed_requirement_edit_is_not_replayed(self):
+        from src.agents.email_intake import requirement_extractor
+
+        client = MagicMock()
+        client.invoke_model.side_effect = lambda **_: {
+            "body": io.BytesIO(json.dumps({"content": [{"text": "not json"}]}).encode())
+        }
+        with patch.object(requirement_extractor, "USE_AI_PROVIDER", False):
+            extractor = requirement_extractor.RequirementExtractor(bedrock_client=client)
+            for _ in range(2):
+                with pytest.raises(requirement_extractor.RequirementEditError):
+                    extractor.apply_edit_instructions({"title": "Shop"}, "Rename it", 1)
+
+        assert client.invoke_model.call_count == 2
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Tests for the background LLM call log writer and its metrics export.
+"""
+
+import json
+
+from src.providers.log_writer import LLMCallLogWriter, LLMCallMetrics
+
+
+def _entry(latency_ms, provider="bedrock", model="sonnet", **extra):
+    return {"provider": provider, "model": model, "latency_ms": latency_ms, **extra}
+
+
+class TestLLMCallLogWriter:
+    """Entries are queued, written in batches and rotated."""
+
+    def test_background_entries_are_written_on_flush(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("LLM_LOG_MODE", "background")
+        monkeypatch.setenv("LLM_LOG_DIR", str(tmp_path / "logs"))
+        writer = LLMCallLogWriter()
+
+        for i in range(25):
+            writer.submit(_entry(i, tokens_in=i))
+        writer.flush()
+
+        lines = (tmp_path / "logs" / "llm_calls.log").read_text().splitlines()
+        assert [json.loads(line)["tokens_in"] for line in lines] == list(range(25))
+        assert writer.dropped == 0
+
+    def test_log_is_rotated_past_max_bytes(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("LLM_LOG_DIR", str(tmp_path))
+        writer = LLMCallLogWriter(max_bytes=200, backup_count=2)
+
+        for i in range(12):
+            writer.submit(_entry(i, note="x" * 40))
+
+        log_path = tmp_path / "llm_calls.log"
+        assert log_path.stat().st_size <= 200
+        assert (tmp_path / "llm_calls.log.1").exists()
+        assert (tmp_path / "llm_calls.log.2").exists()
+        assert not (tmp_path / "llm_calls.log.3").exists()
+
+
+class TestLLMCallMetrics:
+    """p50/p95 latency and token totals per provider/model."""
+
+    def test_percentiles_and_totals(self):
+        metrics = LLMCallMetrics()
+        for latency in range(1, 101):
+            metrics.record(_entry(latency, tokens_in=10, tokens_out=2))
+        metrics.record(_entry(5000, status="failed", tokens_in=None))
+
+        stats = metrics.snapshot()["bedrock/sonnet"]
+
+        assert stats["calls"] == 101
+        assert stats["errors"] == 1
+        assert stats["tokens_in"] == 1000
+        assert stats["latency_ms_p50"] == 51
+        assert stats["latency_ms_p95"] == 96
+
+    def test_export_writes_snapshot(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("LLM_LOG_DIR", str(tmp_path))
+        metrics_file = tmp_path / "metrics" / "llm_metrics.json"
+        writer = LLMCallLogWriter(metrics_file=str(metrics_file), metrics_interval=0)
+
+        writer.submit(_entry(120, provider="fake", model="fake-model", tokens_out=7))
+
+        exported = json.loads(metrics_file.read_text())
+        assert exported["providers"]["fake/fake-model"]["tokens_out"] == 7
+        assert exported["providers"]["fake/fake-model"]["latency_ms_p95"] == 120
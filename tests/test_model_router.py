@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Tests for cheapest-first model routing and its use by the intake agents.
+"""
+
+import io
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+from botocore.exceptions import ClientError
+
+from src.agents.email_intake import metadata_extractor, requirement_extractor, reviewer
+from src.common.bedrock_client import BedrockAccessError
+from src.common.bedrock_invoker import BedrockDeadlineExceeded
+from src.common.llm_cache import LLMResponseCache
+from src.common.model_router import (
+    DEFAULT_ESCALATION_MODEL_ID,
+    ModelTier,
+    RoutingRejected,
+    build_tiers,
+    route,
+    router_metrics,
+)
+
+HAIKU = "anthropic.claude-haiku-4-5-20251001-v1:0"
+SONNET = DEFAULT_ESCALATION_MODEL_ID
+SONNET_PROFILE = f"arn:aws:bedrock:us-east-1:123456789012:inference-profile/us.{SONNET}"
+TIERS = [ModelTier(HAIKU), ModelTier(SONNET)]
+
+
+@pytest.fixture(autouse=True)
+def _routing_env(monkeypatch):
+    for name in ("MODEL_ROUTING", "ESCALATION_MODEL_ID", "ESCALATION_INFERENCE_PROFILE_ARN"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.delenv("BEDROCK_IP_ARN", raising=False)
+    monkeypatch.delenv("VISION_INFERENCE_PROFILE_ARN", raising=False)
+    router_metrics.reset()
+
+
+@pytest.fixture
+def escalation_profile(monkeypatch):
+    monkeypatch.setenv("ESCALATION_INFERENCE_PROFILE_ARN", SONNET_PROFILE)
+
+
+def _bedrock_client(answers):
+    """Client answering per model ID from ``answers``."""
+    client = MagicMock()
+
+    def invoke_model(modelId, **_):
+        answer = answers[modelId]
+        if isinstance(answer, Exception):
+            raise answer
+        body = {"content": [{"text": answer}], "usage": {}}
+        return {"body": io.BytesIO(json.dumps(body).encode())}
+
+    client.invoke_model.side_effect = invoke_model
+    return client
+
+
+def _models_called(client):
+    return [call.kwargs["modelId"] for call in client.invoke_model.call_args_list]
+
+
+def _json_validator(text):
+    value = json.loads(text)
+    return value, value["confidence"] >= 0.6
+
+
+class TestRoute:
+    """Escalation only happens when validation fails."""
+
+    def test_accepted_answer_stops_at_cheapest_tier(self):
+        call = MagicMock(return_value='{"confidence": 0.9}')
+
+        result = route("task", TIERS, call, _json_validator)
+
+        assert result.tier.model_id == HAIKU
+        assert result.accepted and result.escalations == 0
+        assert call.call_count == 1
+        assert router_metrics.snapshot()["task"]["answered_by"] == {HAIKU: 1}
+
+    def test_low_confidence_escalates(self):
+        answers = {HAIKU: '{"confidence": 0.3}', SONNET: '{"confidence": 0.8}'}
+
+        result = route("task", TIERS, lambda tier: answers[tier.model_id], _json_validator)
+
+        assert result.tier.model_id == SONNET
+        assert result.value == {"confidence": 0.8}
+        assert router_metrics.snapshot()["task"]["escalations"] == 1
+
+    def test_unparseable_answer_escalates(self):
+        answers = {HAIKU: "not json", SONNET: '{"confidence": 0.7}'}
+
+        result = route("task", TIERS, lambda tier: answers[tier.model_id], _json_validator)
+
+        assert result.tier.model_id == SONNET
+
+    def test_returns_last_usable_answer_when_none_accepted(self):
+        answers = {HAIKU: '{"confidence": 0.2}', SONNET: "not json"}
+
+        result = route("task", TIERS, lambda tier: answers[tier.model_id], _json_validator)
+
+        assert not result.accepted
+        assert result.value == {"confidence": 0.2}
+
+    def test_raises_last_error_when_nothing_usable(self):
+        def validate(text):
+            raise RoutingRejected(text)
+
+        with pytest.raises(RoutingRejected, match="sonnet"):
+            route("task", TIERS, lambda tier: tier.model_id, validate)
+
+        assert router_metrics.snapshot()["task"]["failures"] == 1
+
+    def test_invocation_errors_are_not_escalated(self):
+        call = MagicMock(side_effect=BedrockDeadlineExceeded("deadline"))
+
+        with pytest.raises(BedrockDeadlineExceeded):
+            route("task", TIERS, call, _json_validator)
+
+        assert call.call_count == 1
+
+    def test_failed_escalation_returns_cheaper_answer(self):
+        def call(tier):
+            if tier.model_id == SONNET:
+                raise BedrockAccessError("on-demand throughput isn't supported")
+            return '{"confidence": 0.3}'
+
+        result = route("task", TIERS, call, _json_validator)
+
+        assert result.tier.model_id == HAIKU
+        assert not result.accepted
+        assert result.value == {"confidence": 0.3}
+
+    def test_failed_escalation_without_fallback_raises(self):
+        answers = {HAIKU: "not json"}
+
+        def call(tier):
+            if tier.model_id == SONNET:
+                raise BedrockAccessError("denied")
+            return answers[tier.model_id]
+
+        with pytest.raises(BedrockAccessError):
+            route("task", TIERS, call, _json_validator)
+
+
+class TestBuildTiers:
+    """Tier chains come from the caller's model plus environment overrides."""
+
+    def test_default_chain_escalates_to_sonnet_profile(self, escalation_profile):
+        assert build_tiers("metadata", HAIKU, "arn:haiku") == [
+            ModelTier(HAIKU, "arn:haiku"),
+            ModelTier(SONNET, SONNET_PROFILE),
+        ]
+
+    def test_no_escalation_without_inference_profile(self):
+        assert build_tiers("metadata", HAIKU, "arn:haiku") == [ModelTier(HAIKU, "arn:haiku")]
+
+    def test_routing_can_be_disabled(self, monkeypatch):
+        monkeypatch.setenv("MODEL_ROUTING", "false")
+
+        assert build_tiers("metadata", HAIKU) == [ModelTier(HAIKU)]
+
+    def test_per_task_override(self, monkeypatch):
+        monkeypatch.setenv("MODEL_ROUTER_REVIEW_MODELS", "model-a, model-b,model-c")
+
+        assert [tier.model_id for tier in build_tiers("review", HAIKU)] == [
+            "model-a",
+            "model-b",
+            "model-c",
+        ]
+
+    def test_escalation_model_already_configured_is_not_repeated(self, escalation_profile):
+        assert build_tiers("metadata", SONNET, SONNET_PROFILE) == [
+            ModelTier(SONNET, SONNET_PROFILE)
+        ]
+
+
+class TestAgentRouting:
+    """Intake agents escalate to the larger model only on weak output."""
+
+    def test_metadata_low_confidence_escalates(self, escalation_profile):
+        client = _bedrock_client(
+            {
+                HAIKU: '{"project_name": "Guess", "confidence_score": 0.3}',
+                SONNET_PROFILE: '{"project_name": "Booking site", "confidence_score": 0.9}',
+            }
+        )
+        conversation = {
+            "email_history": [{"direction": "inbound", "body": "Need a booking site"}],
+        }
+        with patch.object(metadata_extractor, "USE_AI_PROVIDER", False), patch(
+            "src.common.bedrock_invoker.get_llm_cache", return_value=LLMResponseCache()
+        ):
+            extractor = metadata_extractor.MetadataExtractor(bedrock_client=client)
+            metadata = extractor.extract_metadata(conversation, "understanding")
+
+        assert metadata["project_name"] == "Booking site"
+        assert _models_called(client) == [HAIKU, SONNET_PROFILE]
+
+    def test_confident_metadata_stays_on_haiku(self):
+        client = _bedrock_client({HAIKU: '{"project_name": "Shop", "confidence_score": 0.85}'})
+        with patch.object(metadata_extractor, "USE_AI_PROVIDER", False), patch(
+            "src.common.bedrock_invoker.get_llm_cache", return_value=LLMResponseCache()
+        ):
+            extractor = metadata_extractor.MetadataExtractor(bedrock_client=client)
+            metadata = extractor.extract_metadata({"email_history": []}, "understanding")
+
+        assert metadata["project_name"] == "Shop"
+        assert _models_called(client) == [HAIKU]
+
+    def test_review_missing_scores_escalates(self, escalation_profile):
+        scores = {
+            "relevance_score": 5,
+            "completeness_score": 4,
+            "accuracy_score": 4,
+            "next_steps_score": 4,
+            "overall_score": 4,
+        }
+        client = _bedrock_client(
+            {HAIKU: '{"overall_score": 2}', SONNET_PROFILE: json.dumps(scores)}
+        )
+        with patch.object(reviewer, "USE_AI_PROVIDER", False):
+            email_reviewer = reviewer.EmailReviewer(bedrock_client=client)
+            review = email_reviewer.review_response({"email_history": []}, "Thanks!")
+
+        assert review["overall_score"] == 4
+        assert _models_called(client) == [HAIKU, SONNET_PROFILE]
+
+    def test_requirements_missing_fields_escalate(self, escalation_profile):
+        complete = {
+            "title": "Booking",
+            "summary": "Booking site",
+            "project_type": "website",
+            "features": [],
+        }
+        client = _bedrock_client(
+            {HAIKU: '{"title": "Booking"}', SONNET_PROFILE: json.dumps(complete)}
+        )
+        with patch.object(requirement_extractor, "USE_AI_PROVIDER", False):
+            extractor = requirement_extractor.RequirementExtractor(bedrock_client=client)
+            requirements = extractor.extract([{"from": "a@example.com", "body": "Hi"}], {})
+
+        assert requirements["summary"] == "Booking site"
+        assert _models_called(client) == [HAIKU, SONNET_PROFILE]
+
+    def test_metadata_keeps_haiku_answer_when_escalation_is_denied(self, escalation_profile):
+        denied = ClientError(
+            {"Error": {"Code": "AccessDeniedException", "Message": "denied"}}, "InvokeModel"
+        )
+        client = _bedrock_client(
+            {HAIKU: '{"project_name": "Guess", "confidence_score": 0.3}', SONNET_PROFILE: denied}
+        )
+        with patch.object(metadata_extractor, "USE_AI_PROVIDER", False), patch(
+            "src.common.bedrock_invoker.get_llm_cache", return_value=LLMResponseCache()
+        ):
+            extractor = metadata_extractor.MetadataExtractor(bedrock_client=client)
+            metadata = extractor.extract_metadata({"email_history": []}, "understanding")
+
+        assert metadata["project_name"] == "Guess"
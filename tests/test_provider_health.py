@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Tests for provider health tracking, circuit breaking and hedged requests.
+"""
+
+import io
+import json
+import os
+import threading
+import uuid
+from unittest.mock import MagicMock, patch
+
+import pytest
+from botocore.exceptions import ClientError
+
+from src.common import provider_health
+from src.common.bedrock_client import (
+    BedrockCircuitOpenError,
+    BedrockError,
+    BedrockValidationError,
+    StandardizedBedrockClient,
+)
+from src.common.provider_health import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    ProviderHealth,
+    get_provider_health,
+    hedged_call,
+)
+from src.providers.factory import ProviderFactory
+
+HEALTH = {"window": 10, "min_calls": 4, "error_threshold": 0.5, "open_seconds": 30}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _arn(region="us-east-2"):
+    return f"arn:aws:bedrock:{region}:123456789012:inference-profile/us.anthropic.{uuid.uuid4()}"
+
+
+def _ok(text):
+    body = {"content": [{"text": text}], "usage": {}}
+    return {"body": io.BytesIO(json.dumps(body).encode()), "ResponseMetadata": {}}
+
+
+def _unavailable():
+    return ClientError(
+        {"Error": {"Code": "ServiceUnavailableException", "Message": "down"}}, "InvokeModel"
+    )
+
+
+def _client(secondary=False, health=HEALTH):
+    with patch.object(StandardizedBedrockClient, "_initialize_client"), patch.dict(
+        os.environ, {"NO_NETWORK": "0"}
+    ):
+        client = StandardizedBedrockClient(
+            _arn(),
+            secondary_inference_profile_arn=_arn("us-west-2") if secondary else None,
+            secondary_region="us-west-2" if secondary else None,
+            health=health,
+        )
+    client.client = MagicMock()
+    if secondary:
+        client.secondary_client = MagicMock()
+    return client
+
+
+class TestProviderHealth:
+    """Rolling error rate drives a closed -> open -> half-open -> closed breaker."""
+
+    def test_opens_at_error_threshold_and_fails_fast(self):
+        health = ProviderHealth.from_config(HEALTH)
+        for _ in range(2):
+            health.record_success(0.1)
+        health.record_failure(0.1)
+        assert health.state == CLOSED
+
+        health.record_failure(0.1)
+
+        assert health.state == OPEN
+        assert not health.allow()
+
+    def test_half_open_allows_one_trial_then_closes(self):
+        clock = FakeClock()
+        with patch.object(provider_health.time, "monotonic", clock):
+            health = ProviderHealth.from_config(HEALTH)
+            for _ in range(4):
+                health.record_failure(0.1)
+
+            clock.now += 31
+            assert health.allow()
+            assert health.state == HALF_OPEN
+            assert not health.allow()
+
+            health.record_success(0.2)
+            assert health.state == CLOSED
+            assert health.allow()
+
+    def test_failed_trial_reopens(self):
+        clock = FakeClock()
+        with patch.object(provider_health.time, "monotonic", clock):
+            health = ProviderHealth.from_config(HEALTH)
+            for _ in range(4):
+                health.record_failure(0.1)
+            clock.now += 31
+            health.allow()
+
+            health.record_failure(0.1)
+
+            assert health.state == OPEN
+            assert health.is_open()
+
+    def test_p95_needs_min_calls(self):
+        health = ProviderHealth.from_config(dict(HEALTH, hedge=True))
+        health.record_success(1.0)
+        assert health.hedge_delay() is None
+
+        for latency in (0.1, 0.2, 0.3, 2.0):
+            health.record_success(latency)
+
+        assert health.p95_latency() == 2.0
+        assert health.hedge_delay() == 2.0
+
+    def test_registry_is_shared_per_key(self):
+        key = f"test:{uuid.uuid4()}"
+
+        assert get_provider_health(key, HEALTH) is get_provider_health(key)
+        assert get_provider_health(key).min_calls == 4
+
+
+class TestHedgedCall:
+    """The duplicate call only starts after the hedge delay, and the first success wins."""
+
+    def test_fast_primary_is_not_hedged(self):
+        secondary = MagicMock(return_value="secondary")
+
+        assert hedged_call(lambda: "primary", secondary, hedge_after=1.0) == "primary"
+        secondary.assert_not_called()
+
+    def test_slow_primary_is_hedged(self):
+        release = threading.Event()
+
+        def slow():
+            release.wait(5)
+            return "primary"
+
+        try:
+            assert hedged_call(slow, lambda: "secondary", hedge_after=0.01) == "secondary"
+        finally:
+            release.set()
+
+    def test_failed_secondary_waits_for_primary(self):
+        release = threading.Event()
+
+        def slow():
+            release.wait(5)
+            return "primary"
+
+        def failing():
+            release.set()
+            raise RuntimeError("secondary down")
+
+        assert hedged_call(slow, failing, hedge_after=0.01) == "primary"
+
+
+class TestBedrockClientHealth:
+    """StandardizedBedrockClient stops retrying into an open circuit."""
+
+    def test_open_circuit_fails_fast_without_retry_sleeps(self):
+        client = _client()
+        client.client.invoke_model.side_effect = _unavailable()
+
+        with patch("src.common.bedrock_client.time.sleep") as sleep:
+            with pytest.raises(BedrockError):
+                client.invoke_model_with_metadata([], max_retries=4)
+            with pytest.raises(BedrockCircuitOpenError):
+                client.invoke_model_with_metadata([], max_retries=4)
+
+        assert client.client.invoke_model.call_count == 4
+        assert sleep.call_count == 3
+        assert client.health.state == OPEN
+
+    def test_caller_errors_do_not_open_circuit(self):
+        client = _client()
+        client.client.invoke_model.side_effect = ClientError(
+            {"Error": {"Code": "ValidationException", "Message": "bad"}}, "InvokeModel"
+        )
+
+        for _ in range(5):
+            with pytest.raises(BedrockValidationError):
+                client.invoke_model_with_metadata([])
+
+        assert client.health.state == CLOSED
+
+    def test_open_primary_routes_to_secondary(self):
+        client = _client(secondary=True)
+        for _ in range(4):
+            client.health.record_failure(0.1)
+        client.secondary_client.invoke_model.return_value = _ok("from west")
+
+        text, _ = client.invoke_model_with_metadata([])
+
+        assert text == "from west"
+        client.client.invoke_model.assert_not_called()
+
+    def test_slow_primary_is_hedged_to_secondary(self):
+        client = _client(secondary=True, health=dict(HEALTH, hedge=True, hedge_after_seconds=0.01))
+        release = threading.Event()
+
+        def slow(**_):
+            release.wait(5)
+            return _ok("from east")
+
+        client.client.invoke_model.side_effect = slow
+        client.secondary_client.invoke_model.return_value = _ok("from west")
+
+        try:
+            text, metadata = client.invoke_model_with_metadata([])
+        finally:
+            release.set()
+
+        assert text == "from west"
+        assert metadata["model_id"] == client.secondary_inference_profile_arn
+
+
+class TestProviderFactoryHealth:
+    """The factory routes to the fallback provider when Bedrock's circuits are open."""
+
+    def test_open_bedrock_uses_fallback(self, monkeypatch):
+        monkeypatch.delenv("AI_PROVIDER", raising=False)
+        arn = _arn()
+        for _ in range(4):
+            get_provider_health(f"bedrock:{arn}", HEALTH).record_failure(0.1)
+        config = {
+            "llm": {
+                "primary": "bedrock",
+                "fallback": "fake",
+                "bedrock": {"inference_profile_arn": arn, "health": HEALTH},
+            }
+        }
+
+        assert not ProviderFactory.is_healthy("bedrock", config)
+        with patch.dict(os.environ, {"NO_NETWORK": "0"}):
+            provider = ProviderFactory.create_provider(config)
+
+        assert provider.__class__.__name__ == "FakeProvider"
+        assert ProviderFactory.get_provider_health()[f"bedrock:{arn}"]["state"] == OPEN
+
+    def test_healthy_secondary_keeps_bedrock(self):
+        arn = _arn()
+        for _ in range(4):
+            get_provider_health(f"bedrock:{arn}", HEALTH).record_failure(0.1)
+        config = {
+            "llm": {
+                "bedrock": {
+                    "inference_profile_arn": arn,
+                    "secondary_inference_profile_arn": _arn("us-west-2"),
+                }
+            }
+        }
+
+        assert ProviderFactory.is_healthy("bedrock", config)
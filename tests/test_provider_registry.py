@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared provider registry, parsed-config cache and boto3 clients.
+"""
+
+import os
+import threading
+from unittest.mock import patch
+
+from src.common import config_loader
+from src.common.bedrock_client import get_bedrock_runtime_client
+from src.common.config_loader import load_config
+from src.providers import get_provider
+from src.providers.factory import ProviderFactory
+
+
+def _write(path, text):
+    path.write_text(text)
+    # Bump the mtime explicitly; rewrites within one timestamp tick would look unchanged
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+class TestConfigCache:
+    """model_config.yaml is parsed once and re-read only when it changes."""
+
+    def test_file_is_parsed_once(self, tmp_path):
+        config_file = tmp_path / "model_config.yaml"
+        _write(config_file, "llm:\n  primary: bedrock\n")
+
+        safe_load = config_loader.yaml.safe_load
+        with patch.object(config_loader.yaml, "safe_load", wraps=safe_load) as parse:
+            first = load_config(str(config_file))
+            second = load_config(str(config_file))
+
+        assert first == second == {"llm": {"primary": "bedrock"}}
+        assert parse.call_count == 1
+
+    def test_callers_get_independent_copies(self, tmp_path):
+        config_file = tmp_path / "model_config.yaml"
+        _write(config_file, "llm:\n  primary: bedrock\n")
+
+        load_config(str(config_file))["llm"]["primary"] = "fake"
+
+        assert load_config(str(config_file))["llm"]["primary"] == "bedrock"
+
+    def test_mtime_change_reloads(self, tmp_path):
+        config_file = tmp_path / "model_config.yaml"
+        _write(config_file, "llm:\n  primary: bedrock\n")
+        load_config(str(config_file))
+
+        _write(config_file, "llm:\n  primary: fake\n")
+
+        assert load_config(str(config_file))["llm"]["primary"] == "fake"
+
+    def test_env_substitution_tracks_environment(self, tmp_path, monkeypatch):
+        config_file = tmp_path / "model_config.yaml"
+        _write(config_file, 'arn: "${BEDROCK_IP_ARN:-default-arn}"\n')
+        monkeypatch.delenv("BEDROCK_IP_ARN", raising=False)
+
+        assert load_config(str(config_file))["arn"] == "default-arn"
+        monkeypatch.setenv("BEDROCK_IP_ARN", "env-arn")
+        assert load_config(str(config_file))["arn"] == "env-arn"
+
+    def test_missing_file_returns_default(self, tmp_path):
+        default = {"llm": {"primary": "bedrock"}}
+
+        assert load_config(str(tmp_path / "missing.yaml"), default=default) == default
+
+
+class TestProviderRegistry:
+    """get_provider() hands out one provider per resolved name and config."""
+
+    def test_same_config_reuses_provider(self):
+        assert get_provider("fake") is get_provider("fake")
+
+    def test_different_config_builds_new_provider(self):
+        first = get_provider("fake", llm={"primary": "fake", "fake": {"seed": 1}})
+        second = get_provider("fake", llm={"primary": "fake", "fake": {"seed": 2}})
+
+        assert first is not second
+
+    def test_concurrent_callers_share_one_instance(self):
+        providers = []
+        with patch.object(
+            ProviderFactory, "create_provider", wraps=ProviderFactory.create_provider
+        ) as create:
+            threads = [
+                threading.Thread(target=lambda: providers.append(get_provider("fake")))
+                for _ in range(8)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert create.call_count == 1
+        assert all(provider is providers[0] for provider in providers)
+
+    def test_bedrock_runtime_clients_are_shared_per_region(self):
+        east = get_bedrock_runtime_client("us-east-2")
+
+        assert get_bedrock_runtime_client("us-east-2") is east
+        assert get_bedrock_runtime_client("us-west-2") is not east
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Tests for streaming responses through StandardizedBedrockClient and the providers.
+"""
+
+import json
+import os
+from unittest.mock import MagicMock, patch
+
+import pytest
+from botocore.exceptions import ParamValidationError
+
+from src.common.bedrock_client import StandardizedBedrockClient
+from src.providers.base import BaseProvider, consume_stream
+from src.providers.bedrock import BedrockProvider
+from src.providers.fake import FakeProvider
+
+ARN = "arn:aws:bedrock:us-east-2:123456789012:inference-profile/us.anthropic.claude"
+
+
+def _event(payload):
+    return {"chunk": {"bytes": json.dumps(payload).encode()}}
+
+
+def _stream(*texts):
+    events = [_event({"type": "message_start", "message": {"usage": {"input_tokens": 42}}})]
+    for text in texts:
+        events.append(
+            _event({"type": "content_block_delta", "delta": {"type": "text_delta", "text": text}})
+        )
+    events.append(
+        _event(
+            {
+                "type": "message_delta",
+                "delta": {"stop_reason": "end_turn"},
+                "usage": {"output_tokens": 7},
+            }
+        )
+    )
+    return {"body": iter(events), "ResponseMetadata": {}}
+
+
+def _client():
+    with patch.object(StandardizedBedrockClient, "_initialize_client"), patch.dict(
+        os.environ, {"NO_NETWORK": "0"}
+    ):
+        client = StandardizedBedrockClient(ARN)
+    client.client = MagicMock()
+    return client
+
+
+@pytest.fixture(autouse=True)
+def _log_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("LLM_LOG_DIR", str(tmp_path))
+    return tmp_path
+
+
+class TestBedrockClientStreaming:
+    """invoke_model_with_response_stream is surfaced as a generator of text deltas."""
+
+    def test_deltas_are_yielded_in_order_with_usage(self):
+        client = _client()
+        stream = _stream("def ", "f(): ", "pass")
+        client.client.invoke_model_with_response_stream.return_value = stream
+        metadata = {}
+
+        deltas = list(client.simple_stream("write f", metadata=metadata))
+
+        assert deltas == ["def ", "f(): ", "pass"]
+        assert metadata["usage"] == {"input_tokens": 42, "output_tokens": 7}
+        assert metadata["stop_reason"] == "end_turn"
+        assert metadata["model_id"] == ARN
+
+    def test_legacy_signature_fallback(self):
+        client = _client()
+        client.client.invoke_model_with_response_stream.side_effect = [
+            ParamValidationError(report="Unknown parameter inferenceProfileArn"),
+            _stream("ok"),
+        ]
+
+        assert "".join(client.simple_stream("hi")) == "ok"
+
+        legacy = client.client.invoke_model_with_response_stream.call_args.kwargs
+        assert legacy["modelId"] == "us.anthropic.claude"
+        assert legacy["inferenceProfileArn"] == ARN
+
+
+class TestProviderStreaming:
+    """stream_code() on the providers and consume_stream() for callers."""
+
+    def test_bedrock_provider_streams_and_records_cost(self, _log_dir):
+        client = _client()
+        client.client.invoke_model_with_response_stream.return_value = _stream("a", "b")
+        with patch("src.providers.bedrock.create_bedrock_client", return_value=client):
+            provider = BedrockProvider({"llm": {"bedrock": {"inference_profile_arn": ARN}}})
+
+        seen = []
+        text, ttft = consume_stream(provider.stream_code("prompt"), seen.append)
+
+        assert text == "ab"
+        assert seen == ["a", "b"]
+        assert ttft is not None
+        assert provider.get_cost_info()["tokens_in"] == 42
+        assert provider.get_cost_info()["tokens_out"] == 7
+        log_entry = json.loads((_log_dir / "llm_calls.log").read_text().splitlines()[-1])
+        assert log_entry["stream"] is True
+        assert log_entry["tokens_out"] == 7
+        assert "ttft_ms" in log_entry
+
+    def test_stream_logs_its_own_usage_on_a_shared_provider(self, _log_dir):
+        client = _client()
+        client.client.invoke_model_with_response_stream.return_value = _stream("a", "b")
+        with patch("src.providers.bedrock.create_bedrock_client", return_value=client):
+            provider = BedrockProvider({"llm": {"bedrock": {"inference_profile_arn": ARN}}})
+        extract_cost_info = provider._extract_cost_info
+
+        def other_stream_finishes(*args):
+            cost_info = extract_cost_info(*args)
+            # Another thread's stream on the same provider completes in between
+            provider.last_cost_info = {"tokens_in": 999, "tokens_out": 999}
+            return cost_info
+
+        with patch.object(provider, "_extract_cost_info", side_effect=other_stream_finishes):
+            "".join(provider.stream_code("prompt"))
+
+        log_entry = json.loads((_log_dir / "llm_calls.log").read_text().splitlines()[-1])
+        assert log_entry["tokens_in"] == 42
+        assert log_entry["tokens_out"] == 7
+
+    def test_fake_provider_streams_the_full_response(self):
+        provider = FakeProvider()
+
+        chunks = list(provider.stream_code("Create a python function"))
+
+        assert len(chunks) > 1
+        assert "".join(chunks) == FakeProvider().generate_code("Create a python function")
+
+    def test_default_stream_yields_generate_code_once(self):
+        provider = MagicMock()
+        provider.generate_code.return_value = "whole response"
+
+        chunks = list(BaseProvider.stream_code(provider, "prompt"))
+
+        assert chunks == ["whole response"]
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Tests for provider rate limiting and the async provider interface.
+"""
+
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+from src.providers import rate_limiter
+from src.providers.bedrock import BedrockProvider
+from src.providers.fake import FakeProvider
+from src.providers.rate_limiter import RateLimiter, TokenBucket, get_rate_limiter
+
+ARN = "arn:aws:bedrock:us-east-2:123456789012:inference-profile/us.anthropic.claude"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenBucket:
+    """Buckets refill continuously and report how long to wait."""
+
+    def test_wait_reflects_refill_rate(self):
+        clock = FakeClock()
+        with patch.object(rate_limiter.time, "monotonic", clock):
+            bucket = TokenBucket(per_minute=60)
+
+            assert bucket.try_acquire(60) == 0.0
+            assert bucket.try_acquire(30) == 30.0
+
+            clock.now += 30
+            assert bucket.try_acquire(30) == 0.0
+
+    def test_refund_returns_unused_reservation(self):
+        clock = FakeClock()
+        with patch.object(rate_limiter.time, "monotonic", clock):
+            bucket = TokenBucket(per_minute=1000)
+            bucket.try_acquire(900)
+            bucket.refund(800)
+
+            assert bucket.available() == 900
+
+    def test_oversized_request_is_capped_at_capacity(self):
+        bucket = TokenBucket(per_minute=100)
+
+        assert bucket.try_acquire(10_000) == 0.0
+
+
+class TestRateLimiter:
+    """Requests/min, tokens/min and the concurrency cap."""
+
+    def test_token_limit_refunds_unused_output_budget(self):
+        limiter = RateLimiter(tokens_per_minute=10_000)
+
+        with limiter.limit(estimated_tokens=4_000) as usage:
+            usage["tokens"] = 1_000
+
+        assert limiter.tokens.available() >= 9_000
+
+    def test_request_slot_is_returned_while_waiting_on_tokens(self):
+        limiter = RateLimiter(requests_per_minute=10, tokens_per_minute=100)
+        limiter.tokens.try_acquire(100)
+
+        assert limiter._reserve_wait(50) > 0
+        assert limiter.requests.available() >= 10 - 1e-6
+
+    def test_concurrency_is_bounded_across_threads(self):
+        limiter = RateLimiter(max_concurrency=2)
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def call():
+            with limiter.limit():
+                with lock:
+                    active.append(1)
+                    peak.append(len(active))
+                time.sleep(0.02)
+                with lock:
+                    active.pop()
+
+        threads = [threading.Thread(target=call) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert max(peak) == 2
+
+    def test_limiter_is_shared_per_key(self):
+        first = get_rate_limiter("test:shared", {"max_concurrency": 3})
+        second = get_rate_limiter("test:shared", {"max_concurrency": 9})
+
+        assert first is second
+        assert first.max_concurrency == 3
+
+
+class TestAsyncLimiter:
+    """Async callers wait on release() and keep the slot while their thread runs."""
+
+    def test_waiter_is_woken_by_release_from_another_thread(self):
+        limiter = RateLimiter(max_concurrency=1)
+        limiter.acquire()
+
+        async def run():
+            waiting = asyncio.ensure_future(limiter.aacquire())
+            await asyncio.sleep(0.01)
+            assert not waiting.done()
+            threading.Timer(0.01, limiter.release).start()
+            await asyncio.wait_for(waiting, timeout=1)
+
+        asyncio.run(run())
+        assert not limiter._semaphore.acquire(blocking=False)
+
+    def test_cancelled_caller_keeps_slot_until_thread_finishes(self):
+        limiter = RateLimiter(max_concurrency=1)
+        started = threading.Event()
+        finish = threading.Event()
+
+        def call():
+            started.set()
+            finish.wait(5)
+            return "done"
+
+        async def run():
+            task = asyncio.ensure_future(limiter.arun(0, call))
+            await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+            task.cancel()
+            await asyncio.sleep(0.01)
+            assert task.cancelled()
+            # The worker thread is still calling Bedrock; no second slot is free
+            assert not limiter._semaphore.acquire(blocking=False)
+            finish.set()
+            await asyncio.wait_for(limiter.aacquire(), timeout=1)
+            limiter.release()
+
+        asyncio.run(run())
+
+    def test_arun_refunds_from_result(self):
+        limiter = RateLimiter(tokens_per_minute=1000, max_concurrency=1)
+
+        result = asyncio.run(limiter.arun(600, lambda: (1, 100), tokens_used=lambda r: r[1]))
+
+        assert result == (1, 100)
+        assert limiter.tokens.available() > 850
+
+
+class TestAsyncProviders:
+    """agenerate_code() runs generations concurrently within the limits."""
+
+    def test_default_agenerate_code_uses_generate_code(self):
+        provider = FakeProvider()
+
+        result = asyncio.run(provider.agenerate_code("Create a python function"))
+
+        assert result == FakeProvider().generate_code("Create a python function")
+
+    def test_bedrock_agenerate_code_respects_concurrency(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("LLM_LOG_DIR", str(tmp_path))
+        in_flight = []
+        peak = []
+        lock = threading.Lock()
+
+        def invoke(prompt, max_tokens, temperature, timeout=None):
+            with lock:
+                in_flight.append(1)
+                peak.append(len(in_flight))
+            time.sleep(0.02)
+            with lock:
+                in_flight.pop()
+            headers = {"x-amzn-bedrock-tokens-in": "10", "x-amzn-bedrock-tokens-out": "5"}
+            return f"code for {prompt}", {"ResponseMetadata": {"HTTPHeaders": headers}}
+
+        client = MagicMock()
+        client.simple_invoke_with_metadata.side_effect = invoke
+        config = {
+            "llm": {
+                "bedrock": {
+                    "inference_profile_arn": f"{ARN}-async-test",
+                    "rate_limits": {"max_concurrency": 2, "tokens_per_minute": 1_000_000},
+                }
+            }
+        }
+        with patch("src.providers.bedrock.create_bedrock_client", return_value=client):
+            provider = BedrockProvider(config)
+
+        async def run():
+            return await asyncio.gather(*(provider.agenerate_code(f"p{i}") for i in range(5)))
+
+        results = asyncio.run(run())
+
+        assert results == [f"code for p{i}" for i in range(5)]
+        assert max(peak) == 2
+        assert provider.rate_limiter.max_concurrency == 2
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Tests for token accounting, the model cost table and per-agent usage.
+"""
+
+import asyncio
+import io
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.common import bedrock_invoker
+from src.common.bedrock_invoker import BedrockInvoker
+from src.common.model_pricing import cost_usd, model_pricing
+from src.providers.base import agent_scope
+from src.providers.bedrock import BedrockProvider
+from src.providers.log_writer import LLMCallMetrics
+
+ARN = "arn:aws:bedrock:us-east-2:123456789012:inference-profile/us.anthropic.claude-sonnet-4-5-v1:0"
+USAGE = {
+    "input_tokens": 1200,
+    "output_tokens": 300,
+    "cache_read_input_tokens": 2000,
+    "cache_creation_input_tokens": 0,
+}
+
+
+@pytest.fixture
+def log_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("LLM_LOG_DIR", str(tmp_path))
+    return tmp_path
+
+
+def _log_entries(log_dir):
+    return [json.loads(line) for line in (log_dir / "llm_calls.log").read_text().splitlines()]
+
+
+def _provider(usage=USAGE):
+    client = MagicMock()
+    client.simple_invoke_with_metadata.return_value = (
+        "def f(): pass",
+        {"ResponseMetadata": {}, "model_id": ARN, "usage": usage},
+    )
+    config = {"llm": {"bedrock": {"inference_profile_arn": ARN}}}
+    with patch("src.providers.bedrock.create_bedrock_client", return_value=client):
+        return BedrockProvider(config)
+
+
+class TestModelPricing:
+    """Cost table lookups by model ID or inference profile ARN."""
+
+    def test_profile_arn_and_model_id_resolve_to_same_price(self):
+        assert model_pricing(ARN) == model_pricing("anthropic.claude-sonnet-4-5-20250929-v1:0")
+        assert model_pricing("us.anthropic.claude-haiku-4-5-20251001-v1:0")["input"] == 1.0
+        assert model_pricing("amazon.titan-text") is None
+
+    def test_cost_includes_cache_tokens(self):
+        # 1200 * $3 + 300 * $15 + 2000 * $0.30 per million tokens
+        assert cost_usd(ARN, USAGE) == pytest.approx(0.0087)
+        assert cost_usd("unknown-model", USAGE) is None
+
+
+class TestProviderUsage:
+    """log_call records the usage Bedrock reports instead of word counts."""
+
+    def test_bedrock_usage_reaches_log_entry(self, log_dir):
+        _provider().generate_code("write a function")
+
+        entry = _log_entries(log_dir)[-1]
+        assert entry["tokens_in"] == 1200
+        assert entry["tokens_out"] == 300
+        assert entry["cache_read_input_tokens"] == 2000
+        assert entry["cost_usd"] == pytest.approx(0.0087)
+        assert "tokens_estimated" not in entry
+
+    def test_async_calls_report_their_own_usage(self, log_dir):
+        provider = _provider()
+
+        async def run():
+            await asyncio.gather(provider.agenerate_code("a"), provider.agenerate_code("b"))
+
+        asyncio.run(run())
+
+        entries = _log_entries(log_dir)
+        assert [entry["tokens_in"] for entry in entries] == [1200, 1200]
+
+    def test_agent_scope_aggregates_usage_per_agent(self, log_dir):
+        provider = _provider()
+        with agent_scope("dev_agent"):
+            provider.generate_code("write a function")
+        provider.generate_code("unattributed")
+
+        entries = _log_entries(log_dir)
+        metrics = LLMCallMetrics()
+        for entry in entries:
+            metrics.record(entry)
+
+        assert entries[0]["agent"] == "dev_agent"
+        assert "agent" not in entries[1]
+        assert metrics.agent_snapshot()["dev_agent"]["tokens_in"] == 1200
+        assert metrics.agent_snapshot()["dev_agent"]["cost_usd"] == pytest.approx(0.0087)
+
+
+class TestInvokerCost:
+    """Per-agent invoker metrics include cost."""
+
+    def test_cost_is_metered_per_agent(self):
+        bedrock_invoker.metrics.reset()
+        client = MagicMock()
+        client.invoke_model.return_value = {
+            "body": io.BytesIO(json.dumps({"content": [{"text": "ok"}], "usage": USAGE}).encode())
+        }
+
+        BedrockInvoker(client=client).invoke({}, inference_profile_arn=ARN, agent="email_reviewer")
+
+        totals = bedrock_invoker.metrics.snapshot()["email_reviewer"]
+        assert totals["cost_usd"] == pytest.approx(0.0087)